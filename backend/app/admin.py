@@ -54,6 +54,28 @@ async def _ensure_platform_admin_org() -> str:
     return platform_org_id
 
 
+# Sort keys accepted by list_tenants; each is backed by an index on tenants or tenant_stats.
+TENANT_SORT_COLUMNS = {
+    "created_at": "t.created_at",
+    "email": "t.email",
+    "total_sessions": "COALESCE(ts.total_sessions, 0)",
+    "last_active_at": "ts.last_active_at",
+}
+
+_TENANT_SUMMARY_SELECT = """
+    SELECT t.tenant_id, t.email, t.subscription_tier, t.current_usage, t.monthly_quota,
+           t.billing_cycle_start, t.billing_cycle_end,
+           COALESCE(ts.total_sessions, 0) AS total_sessions,
+           COALESCE(ts.last_active_at, t.billing_cycle_start) AS last_active_at,
+           COALESCE(ts.scored_sessions, 0) AS scored_sessions,
+           COALESCE(ts.passed_sessions, 0) AS passed_sessions,
+           COALESCE(ts.trust_score_sum, 0) AS trust_score_sum,
+           'active' AS status
+    FROM tenants t
+    LEFT JOIN tenant_stats ts ON ts.tenant_id = t.tenant_id
+"""
+
+
 @router.get("/tenants")
 async def list_tenants(
     limit: int = 50,
@@ -61,30 +83,33 @@ async def list_tenants(
     search: Optional[str] = None,
     subscription_tier: Optional[str] = None,
     status: Optional[str] = None,
+    sort: str = "created_at",
+    order: str = "desc",
     _admin_context: AuthContext = Depends(require_permission("platform.metadata.read")),
 ):
-    query = """
-        SELECT t.tenant_id, t.email, t.subscription_tier, t.current_usage, t.monthly_quota,
-               t.billing_cycle_start, t.billing_cycle_end,
-               COALESCE((SELECT COUNT(*) FROM sessions s WHERE s.tenant_id = t.tenant_id), 0) as total_sessions,
-               COALESCE((SELECT MAX(created_at) FROM sessions s WHERE s.tenant_id = t.tenant_id), t.billing_cycle_start) as last_active_at,
-               'active' as status
-        FROM tenants t
-        WHERE t.tenant_id <> $1
-    """
+    if sort not in TENANT_SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(TENANT_SORT_COLUMNS)}")
+    if order.lower() not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+
+    where = " WHERE t.tenant_id <> $1"
     params = [_platform_admin_org_id()]
     if search:
-        query += f" AND t.email ILIKE ${len(params) + 1}"
+        where += f" AND t.email ILIKE ${len(params) + 1}"
         params.append(f"%{search}%")
     if subscription_tier:
-        query += f" AND t.subscription_tier = ${len(params) + 1}"
+        where += f" AND t.subscription_tier = ${len(params) + 1}"
         params.append(subscription_tier)
-    query += f" LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}"
-    params.extend([limit, offset])
 
-    tenants = await db_manager.fetch_all(query, *params)
-    total_result = await db_manager.fetch_one("SELECT COUNT(*) as count FROM tenants WHERE tenant_id <> $1", _platform_admin_org_id())
-    total = total_result['count'] if total_result else len(tenants)
+    direction = "DESC NULLS LAST" if order.lower() == "desc" else "ASC NULLS FIRST"
+    query = (
+        _TENANT_SUMMARY_SELECT
+        + where
+        + f" ORDER BY {TENANT_SORT_COLUMNS[sort]} {direction}, t.tenant_id"
+        + f" LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}"
+    )
+    tenants = await db_manager.fetch_all(query, *params, limit, offset)
+    total = await db_manager.fetch_val("SELECT COUNT(*) FROM tenants t" + where, *params)
     return {
         "tenants": [
             {
@@ -100,7 +125,7 @@ async def list_tenants(
             }
             for t in tenants
         ],
-        "total": total,
+        "total": total if total is not None else len(tenants),
         "limit": limit,
         "offset": offset,
     }
@@ -109,21 +134,14 @@ async def list_tenants(
 @router.get("/tenants/{tenant_id}")
 async def get_tenant_detail(tenant_id: str, _admin_context: AuthContext = Depends(require_permission("platform.metadata.read"))):
     tenant = await db_manager.fetch_one(
-        """
-        SELECT t.tenant_id, t.email, t.subscription_tier, t.current_usage, t.monthly_quota,
-               t.billing_cycle_start, t.billing_cycle_end,
-               COALESCE((SELECT COUNT(*) FROM sessions s WHERE s.tenant_id = t.tenant_id), 0) as total_sessions,
-               COALESCE((SELECT MAX(created_at) FROM sessions s WHERE s.tenant_id = t.tenant_id), t.billing_cycle_start) as last_active_at,
-               'active' as status,
-               COALESCE((SELECT COUNT(*) FROM webhooks w WHERE w.tenant_id = t.tenant_id), 0) as webhooks_count
-        FROM tenants t
-        WHERE t.tenant_id = $1 AND t.tenant_id <> $2
-        """,
+        _TENANT_SUMMARY_SELECT + " WHERE t.tenant_id = $1 AND t.tenant_id <> $2",
         tenant_id,
         _platform_admin_org_id(),
     )
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
+    webhooks_count = await db_manager.fetch_val("SELECT COUNT(*) FROM webhooks WHERE tenant_id = $1", tenant_id, tenant_id=tenant_id)
+    scored_sessions = tenant["scored_sessions"]
     return {
         "tenant_id": str(tenant["tenant_id"]),
         "email": tenant["email"],
@@ -135,9 +153,9 @@ async def get_tenant_detail(tenant_id: str, _admin_context: AuthContext = Depend
         "last_active_at": tenant["last_active_at"].isoformat() if tenant["last_active_at"] else datetime.utcnow().isoformat(),
         "status": tenant["status"],
         "api_keys_count": 1,
-        "webhooks_count": tenant["webhooks_count"],
-        "success_rate": 95.0,
-        "average_trust_score": 92.5,
+        "webhooks_count": webhooks_count or 0,
+        "success_rate": round(tenant["passed_sessions"] / scored_sessions * 100, 2) if scored_sessions else 0.0,
+        "average_trust_score": round(tenant["trust_score_sum"] / scored_sessions, 2) if scored_sessions else 0.0,
         "billing_cycle_start": tenant["billing_cycle_start"].isoformat() if tenant["billing_cycle_start"] else None,
         "billing_cycle_end": tenant["billing_cycle_end"].isoformat() if tenant["billing_cycle_end"] else None,
     }
@@ -245,44 +263,23 @@ async def get_platform_stats(_admin_context: AuthContext = Depends(require_permi
     metrics = await db_manager.fetch_one(
         """
         SELECT
-            (SELECT COUNT(*) FROM tenants WHERE tenant_id <> $1) AS total_tenants,
-            (
-                SELECT COUNT(DISTINCT s.tenant_id)
-                FROM sessions s
-                WHERE s.created_at >= NOW() - INTERVAL '30 days'
-            ) AS active_tenants,
-            (SELECT COUNT(*) FROM sessions) AS total_sessions,
-            (
-                SELECT COUNT(*)
-                FROM sessions
-                WHERE created_at >= CURRENT_DATE
-            ) AS sessions_today,
-            (
-                SELECT COUNT(*)
-                FROM sessions
-                WHERE final_trust_score IS NOT NULL AND final_trust_score >= 50
-            ) AS successful_sessions,
-            (
-                SELECT COUNT(*)
-                FROM sessions
-                WHERE final_trust_score IS NOT NULL AND final_trust_score < 50
-            ) AS failed_sessions,
-            (
-                SELECT AVG(final_trust_score)::float
-                FROM sessions
-                WHERE final_trust_score IS NOT NULL
-            ) AS average_trust_score,
-            (
-                SELECT COALESCE(SUM(CASE subscription_tier
-                    WHEN 'Starter' THEN 49
-                    WHEN 'Professional' THEN 199
-                    WHEN 'Pro' THEN 199
-                    WHEN 'Enterprise' THEN 999
-                    ELSE 0
-                END), 0)
-                FROM tenants
-                WHERE tenant_id <> $1
-            ) AS estimated_mrr
+            COUNT(*) AS total_tenants,
+            COUNT(*) FILTER (WHERE ts.last_active_at >= NOW() - INTERVAL '30 days') AS active_tenants,
+            COALESCE(SUM(ts.total_sessions), 0) AS total_sessions,
+            COALESCE(SUM(ts.sessions_today) FILTER (WHERE ts.today_date = CURRENT_DATE), 0) AS sessions_today,
+            COALESCE(SUM(ts.passed_sessions), 0) AS successful_sessions,
+            COALESCE(SUM(ts.scored_sessions - ts.passed_sessions), 0) AS failed_sessions,
+            SUM(ts.trust_score_sum)::float / NULLIF(SUM(ts.scored_sessions), 0) AS average_trust_score,
+            COALESCE(SUM(CASE t.subscription_tier
+                WHEN 'Starter' THEN 49
+                WHEN 'Professional' THEN 199
+                WHEN 'Pro' THEN 199
+                WHEN 'Enterprise' THEN 999
+                ELSE 0
+            END), 0) AS estimated_mrr
+        FROM tenants t
+        LEFT JOIN tenant_stats ts ON ts.tenant_id = t.tenant_id
+        WHERE t.tenant_id <> $1
         """,
         _platform_admin_org_id(),
     )
@@ -317,3 +314,30 @@ async def get_system_health(_admin_context: AuthContext = Depends(require_permis
         "uptime_percentage": 99.99,
         "last_incident": None,
     }
+
+
+@router.get("/ai-providers")
+async def get_ai_provider_stats(_admin_context: AuthContext = Depends(require_permission("platform.metadata.read"))):
+    from app.ai_router import genai_router
+
+    return genai_router.snapshot()
+
+
+@router.get("/query-stats")
+async def get_query_stats(_admin_context: AuthContext = Depends(require_permission("platform.metadata.read"))):
+    from app.query_registry import query_registry
+
+    return query_registry.stats()
+
+
+@router.post("/analytics/rollups/backfill", status_code=202)
+async def backfill_analytics_rollups(
+    tenant_id: Optional[str] = None,
+    _admin_context: AuthContext = Depends(require_permission("platform.operations.manage")),
+):
+    """Start a rollup rebuild in the background; progress is logged per tenant."""
+    from app.analytics_rollups import analytics_rollup_manager
+
+    if not analytics_rollup_manager.schedule_backfill(tenant_id):
+        raise HTTPException(status_code=409, detail="An analytics rollup backfill is already running")
+    return {"status": "accepted", "tenant_id": tenant_id}
@@ -1,4 +1,5 @@
 import abc
+import asyncio
 import base64
 import json
 import logging
@@ -6,6 +7,7 @@ from typing import List, Dict, Any, Tuple
 import boto3
 from app.aws_credentials import aws_cred_manager
 from app.config import settings
+from app.prompt_builder import CachedPrefixRegistry, build_evidence_block, static_prompt_prefix
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,17 @@ def _coerce_mapping(value: Any, field_name: str) -> Dict[str, Any]:
     logger.warning("Unexpected %s type: %s", field_name, type(value).__name__)
     return {}
 
+
+def _parse_verdict(result: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+    """Score and explanation from a Tier 3 JSON verdict; `confidence` is kept only when the model reported a number."""
+    score = float(result.get("trust_score", 0))
+    explanation = {"summary": str(result.get("explanation", ""))}
+    try:
+        explanation["confidence"] = max(0.0, min(100.0, float(result["confidence"])))
+    except (KeyError, TypeError, ValueError):
+        pass
+    return score, explanation
+
 class VisionProvider(abc.ABC):
     @abc.abstractmethod
     async def extract_context(self, frames_base64: List[str], metadata: Dict[str, Any] = None) -> Tuple[bool, Dict[str, Any]]:
@@ -45,6 +58,10 @@ class VisionProvider(abc.ABC):
         pass
 
 class GenAIProvider(abc.ABC):
+    provider_name: str = "unknown"
+    cost_per_call_usd: float = 0.0
+    cost_per_frame_usd: float = 0.0
+
     @abc.abstractmethod
     async def evaluate_trust(self, frames_base64: List[str], vision_context: Dict[str, Any], metadata: Dict[str, Any] = None, imu_context: Dict[str, Any] = None) -> Tuple[float, Dict[str, Any]]:
         """
@@ -57,21 +74,21 @@ class GenAIProvider(abc.ABC):
 def get_ai_pipeline() -> Tuple[VisionProvider, GenAIProvider]:
     """
     Factory function yielding the active 3-Tier AI forensic engines.
-    Defaults to AWS Rekognition (Tier 2) -> Google Gemini 3.1 Flash-Lite (Tier 3).
+    Tier 2 is AWS Rekognition; Tier 3 is the process-wide GenAI router, which picks
+    between Gemini and Nova per call according to the configured routing policy.
     """
-    import os
-    provider_name = os.environ.get("VERAPROOF_AI_MODEL_ID", "gemini").lower()
-    
+    from app.ai_router import genai_router
+
     vision_engine = AmazonRekognitionProvider()
-    
-    if provider_name != "gemini":
-        logger.warning(f"Unsupported AI provider '{provider_name}', defaulting to Gemini Flash Lite.")
-    genai_engine = GoogleGeminiProvider()
-        
-    return vision_engine, genai_engine
+    return vision_engine, genai_router
 
 
 class GoogleGeminiProvider(GenAIProvider):
+    provider_name = "gemini"
+    # Rough list-price estimates used by the router's cost-aware policy.
+    cost_per_call_usd = 0.0002
+    cost_per_frame_usd = 0.00003
+
     def __init__(self):
         try:
             from google import genai
@@ -108,6 +125,20 @@ class GoogleGeminiProvider(GenAIProvider):
                 
         self.client = genai.Client(api_key=api_key)
         self.model_id = os.environ.get("GEMINI_MODEL_ID", "gemini-3.1-flash-lite-preview")
+        self.prefix_cache = CachedPrefixRegistry(ttl_seconds=settings.gemini_prompt_cache_ttl_seconds)
+
+    def _create_cached_prefix(self, prefix: str) -> str:
+        from google.genai import types
+
+        cached = self.client.caches.create(
+            model=self.model_id,
+            config=types.CreateCachedContentConfig(
+                display_name="veraproof-trust-prefix",
+                system_instruction=prefix,
+                ttl=f"{settings.gemini_prompt_cache_ttl_seconds}s",
+            ),
+        )
+        return cached.name
 
     async def evaluate_trust(self, frames_base64: List[str], vision_context: Dict[str, Any], metadata: Dict[str, Any] = None, imu_context: Dict[str, Any] = None) -> Tuple[float, Dict[str, Any]]:
         from google.genai import types
@@ -116,83 +147,52 @@ class GoogleGeminiProvider(GenAIProvider):
             metadata = _coerce_mapping(metadata, "metadata")
             vision_context = _coerce_mapping(vision_context, "vision_context")
 
-            logger.info(f"Tier 2 AWS Rekognition Vision Context Extracted:\n{json.dumps(vision_context, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Tier 2 AWS Rekognition Vision Context Extracted:\n{json.dumps(vision_context, indent=2)}")
             
             # Resolve verification profile from metadata
             verification_profile = metadata.get("verification_profile", "standard")
             logger.info(f"Gemini evaluation using verification_profile='{verification_profile}'")
             
-            # 1. Build profile-aware preamble
-            profile_preamble = ""
-            if verification_profile == "object_originality":
-                profile_preamble = (
-                    "IMPORTANT CONTEXT: This verification session is for OBJECT ORIGINALITY, not human liveness. "
-                    "The user is proving that a physical object (e.g., a keyboard, monitor, laptop, or other item) is real and physically present in 3D space. "
-                    "Do NOT penalize the absence of a human face. Do NOT penalize the presence of electronics or screens as spoofing indicators—they may be the legitimate subject of verification. "
-                    "Instead, focus on: (1) camera parallax and perspective shifts proving 3D depth, (2) natural ambient lighting and reflections consistent with a real environment, "
-                    "(3) subtle sensor noise and compression artifacts typical of a live camera feed vs. a digitally replayed recording, "
-                    "(4) any evidence of moiré patterns, screen bezels, or pixel grids that would indicate a screen-of-a-screen attack.\n\n"
-                )
-            elif verification_profile == "static_human":
-                profile_preamble = (
-                    "IMPORTANT CONTEXT: This verification session involves a STATIC HUMAN subject. "
-                    "The user is expected to remain relatively still—minimal head or body movement is NORMAL and should NOT be treated as a spoofing indicator. "
-                    "Do NOT penalize near-identical facial positions or consistent confidence scores across frames. "
-                    "Instead, focus on: (1) subtle depth-of-field variations proving a 3D environment, (2) natural skin micro-textures, pores, and physiological details inconsistent with printed photos or screens, "
-                    "(3) ambient lighting gradients and soft shadows that shift naturally, (4) slight camera sensor noise and compression patterns consistent with live capture, "
-                    "(5) any telltale signs of a flat 2D source such as moiré patterns, screen bezels, edge distortion, or uniform backlighting.\n\n"
-                )
-            
-            # 2. Build IMU cross-modal context block
-            imu_block = ""
-            if imu_context and imu_context.get("has_data"):
-                imu_block = (
-                    f"\nDevice IMU Sensor Data (Gyroscope + Accelerometer): {json.dumps(imu_context)}\n"
-                    "Cross-validate: Does the device's physical motion (gyroscope rotation and accelerometer shake) "
-                    "correlate with the visual motion you observe in the video frames? "
-                    "If the video shows panning but the IMU shows zero movement, this is a strong spoofing indicator. "
-                    "If the IMU shows natural hand tremor and motion consistent with the visual feed, this supports genuineness.\n\n"
+            # 1. Static, profile-specific instructions go out as a cached prefix when Gemini accepts one
+            prompt_prefix = static_prompt_prefix(verification_profile, "detailed")
+            cached_prefix = None
+            if settings.gemini_prompt_cache_enabled:
+                cached_prefix = await asyncio.to_thread(
+                    self.prefix_cache.get_or_create, self.model_id, prompt_prefix, self._create_cached_prefix
                 )
             
-            # 3. Structure the prompt with the Tier 2 JSON and IMU context
-            prompt_text = (
-                f"{profile_preamble}"
-                "You are an expert fraud detection AI system. Analyze these sequential keyframes extracted from a user's verification video "
-                "alongside the attached AWS Rekognition machine-vision output.\n\n"
-                f"AWS Rekognition Vision Context: {json.dumps(vision_context)}\n\n"
-                f"{imu_block}"
-                "Assess if the video represents a genuine physical interaction in 3D space or a spoofed presentation attack (e.g., a video of a screen, printed photo, or AI generated).\n"
-                "Respond with ONLY a valid JSON object with EXACTLY two keys:\n"
-                "- 'trust_score' (a number between 0 and 100, where 100 means fully genuine and 0 means definitely spoofed or fake)\n"
-                "- 'explanation' (a highly detailed and analytical 3-4 sentence paragraph explaining your reasoning. Detail specifically what you observed in the video frames—like lighting, depth, physics, and fluid movements—and reference the Rekognition context and IMU sensor data to justify your score. Do not be generic.)\n"
-                "No other text should be in your output, just the JSON block."
-            )
+            # 2. Per-session evidence: minified, schema-pruned vision context and IMU summary
+            contents = [build_evidence_block(vision_context, imu_context)]
             
-            contents = [prompt_text]
-            
-            # 2. Append the visual frames
+            # 3. Append the visual frames
             for frame_b64 in frames_base64:
                 frame_bytes = base64.b64decode(frame_b64)
                 contents.append(
                     types.Part.from_bytes(data=frame_bytes, mime_type='image/jpeg')
                 )
 
-            # 3. Request evaluation from Gemini 3.1 Flash-Lite
-            response = self.client.models.generate_content(
+            generation_config = {"temperature": 0.1, "top_p": 0.9}
+            if cached_prefix:
+                generation_config["cached_content"] = cached_prefix
+            else:
+                generation_config["system_instruction"] = prompt_prefix
+
+            # 4. Request evaluation from Gemini 3.1 Flash-Lite
+            response = await asyncio.to_thread(
+                self.client.models.generate_content,
                 model=self.model_id,
                 contents=contents,
-                config=types.GenerateContentConfig(
-                    temperature=0.1,
-                    top_p=0.9
-                )
+                config=types.GenerateContentConfig(**generation_config)
             )
             
-            # Log the full raw response to capture thought signatures and tracing metadata
-            try:
-                raw_log = response.model_dump_json(indent=2) if hasattr(response, "model_dump_json") else str(response)
-                logger.info(f"Full Gemini AI Response Dump:\n{raw_log}")
-            except Exception as e:
-                logger.warning(f"Failed to dump Gemini response: {e}")
+            # Full raw response (thought signatures, tracing metadata) is opt-in via DEBUG logging
+            if logger.isEnabledFor(logging.DEBUG):
+                try:
+                    raw_log = response.model_dump_json(indent=2) if hasattr(response, "model_dump_json") else str(response)
+                    logger.debug(f"Full Gemini AI Response Dump:\n{raw_log}")
+                except Exception as e:
+                    logger.warning(f"Failed to dump Gemini response: {e}")
                 
             # Extract text carefully to avoid the 'thought_signature' SDK warning
             output_text = ""
@@ -205,7 +205,7 @@ class GoogleGeminiProvider(GenAIProvider):
             if not output_text.strip():
                 output_text = response.text # Safe fallback
             
-            # 4. Clean up Markdown JSON blocks
+            # 5. Clean up Markdown JSON blocks
             clean_json_str = output_text.strip()
             if clean_json_str.startswith("```json"):
                 clean_json_str = clean_json_str[7:]
@@ -213,9 +213,7 @@ class GoogleGeminiProvider(GenAIProvider):
                 clean_json_str = clean_json_str[:-3]
             clean_json_str = clean_json_str.strip()
 
-            result = json.loads(clean_json_str)
-            score = float(result.get("trust_score", 0))
-            explanation = {"summary": str(result.get("explanation", ""))}
+            score, explanation = _parse_verdict(json.loads(clean_json_str))
 
             return score, explanation
             
@@ -225,6 +223,10 @@ class GoogleGeminiProvider(GenAIProvider):
 
 
 class AmazonNova2LiteProvider(GenAIProvider):
+    provider_name = "nova"
+    cost_per_call_usd = 0.00015
+    cost_per_frame_usd = 0.00006
+
     def __init__(self, region_name: str = None):
         session = aws_cred_manager.get_session()
         resolved_region = region_name or settings.aws_region
@@ -251,39 +253,9 @@ class AmazonNova2LiteProvider(GenAIProvider):
             # Resolve verification profile from metadata
             verification_profile = metadata.get("verification_profile", "standard")
             
-            profile_preamble = ""
-            if verification_profile == "object_originality":
-                profile_preamble = (
-                    "IMPORTANT CONTEXT: This verification is for OBJECT ORIGINALITY, not human liveness. "
-                    "Do NOT penalize the absence of a human face or the presence of electronics—they may be the legitimate subject. "
-                    "Focus on 3D parallax, ambient lighting, and sensor noise vs. screen replay indicators.\n\n"
-                )
-            elif verification_profile == "static_human":
-                profile_preamble = (
-                    "IMPORTANT CONTEXT: The subject is expected to remain STATIC. Minimal movement is NORMAL. "
-                    "Focus on depth-of-field, skin micro-textures, and ambient lighting instead of motion.\n\n"
-                )
-            
-            # Build IMU cross-modal context block
-            imu_block = ""
-            if imu_context and imu_context.get("has_data"):
-                imu_block = (
-                    f"\nDevice IMU Sensor Data: {json.dumps(imu_context)}\n"
-                    "Cross-validate device motion with visual motion. Mismatch = spoofing indicator.\n\n"
-                )
-            
             prompt_text = (
-                f"{profile_preamble}"
-                "You are an expert fraud detection AI system. Analyze these sequential keyframes extracted from a user's verification video "
-                "alongside the attached AWS Rekognition machine-vision output.\n\n"
-                f"AWS Rekognition Vision Context: {json.dumps(vision_context)}\n\n"
-                f"{imu_block}"
-                "Assess if the video represents a genuine physical interaction in 3D space or a spoofed event (e.g., a video of a screen, printed photo, or AI generated).\n"
-                "Check for signs of screen glare, lack of depth, or unnatural movements.\n"
-                "Respond with ONLY a valid JSON object with EXACTLY two keys:\n"
-                "- 'trust_score' (a number between 0 and 100, where 100 means fully genuine and 0 means definitely spoofed or fake)\n"
-                "- 'explanation' (a brief one paragraph explanation of your reasoning)\n"
-                "No other text should be in your output, just the JSON block."
+                f"{static_prompt_prefix(verification_profile, 'brief')}\n\n"
+                f"{build_evidence_block(vision_context, imu_context)}"
             )
             content.append({
                 "text": prompt_text
@@ -305,7 +277,8 @@ class AmazonNova2LiteProvider(GenAIProvider):
                 }
             })
 
-            response = self.bedrock_runtime.invoke_model(
+            response = await asyncio.to_thread(
+                self.bedrock_runtime.invoke_model,
                 modelId=self.model_id,
                 body=body,
                 contentType="application/json",
@@ -322,9 +295,7 @@ class AmazonNova2LiteProvider(GenAIProvider):
                 clean_json_str = clean_json_str[:-3]
             clean_json_str = clean_json_str.strip()
 
-            result = json.loads(clean_json_str)
-            score = float(result.get("trust_score", 0))
-            explanation = {"summary": str(result.get("explanation", ""))}
+            score, explanation = _parse_verdict(json.loads(clean_json_str))
 
             return score, explanation
         except Exception as e:
@@ -382,7 +353,8 @@ class AmazonRekognitionProvider(VisionProvider):
             for index, frame_b64 in enumerate(frames_base64):
                 image_bytes = base64.b64decode(frame_b64)
                 
-                response = self.rekognition.detect_labels(
+                response = await asyncio.to_thread(
+                    self.rekognition.detect_labels,
                     Image={'Bytes': image_bytes},
                     MaxLabels=15,
                     MinConfidence=60.0
@@ -440,7 +412,8 @@ class AmazonRekognitionProvider(VisionProvider):
                 # --- DetectFaces: Face attribute analysis for human profiles ---
                 if run_face_analysis:
                     try:
-                        face_response = self.rekognition.detect_faces(
+                        face_response = await asyncio.to_thread(
+                            self.rekognition.detect_faces,
                             Image={'Bytes': image_bytes},
                             Attributes=['ALL']
                         )
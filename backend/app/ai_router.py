@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from app.ai_provider import GenAIProvider
+from app.config import settings
+from app.database import db_manager
+
+logger = logging.getLogger(__name__)
+
+ROUTING_POLICIES = {"ordered", "cheapest", "lowest_p95"}
+
+
+class ProviderStats:
+    """Rolling latency, error-rate and cost window for a single GenAI provider."""
+
+    def __init__(self, window: int = 100):
+        self.samples: Deque[Tuple[float, bool, float]] = deque(maxlen=max(1, window))
+        self.total_calls = 0
+        self.total_errors = 0
+        self.total_cost_usd = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record(self, latency_ms: float, ok: bool, cost_usd: float = 0.0):
+        self.samples.append((latency_ms, ok, cost_usd))
+        self.total_calls += 1
+        self.total_cost_usd += cost_usd
+        if ok:
+            self.consecutive_failures = 0
+        else:
+            self.total_errors += 1
+            self.consecutive_failures += 1
+
+    def trip(self, cooldown_seconds: float):
+        """Take the provider out of rotation and start it with a clean window once it returns."""
+        self.cooldown_until = time.monotonic() + cooldown_seconds
+        self.consecutive_failures = 0
+        self.samples.clear()
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _latency, ok, _cost in self.samples if not ok) / len(self.samples)
+
+    @property
+    def p95_latency_ms(self) -> Optional[float]:
+        latencies = sorted(latency for latency, ok, _cost in self.samples if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))
+        return latencies[index]
+
+    @property
+    def avg_cost_usd(self) -> Optional[float]:
+        costs = [cost for _latency, ok, cost in self.samples if ok]
+        if not costs:
+            return None
+        return sum(costs) / len(costs)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "window_size": len(self.samples),
+            "total_calls": self.total_calls,
+            "total_errors": self.total_errors,
+            "error_rate": round(self.error_rate, 4),
+            "p95_latency_ms": round(self.p95_latency_ms, 2) if self.p95_latency_ms is not None else None,
+            "avg_cost_usd": self.avg_cost_usd,
+            "total_cost_usd": round(self.total_cost_usd, 6),
+            "consecutive_failures": self.consecutive_failures,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+
+def _default_provider_factories() -> Dict[str, Callable[[], GenAIProvider]]:
+    from app.ai_provider import AmazonNova2LiteProvider, GoogleGeminiProvider
+
+    return {
+        "gemini": GoogleGeminiProvider,
+        "nova": AmazonNova2LiteProvider,
+    }
+
+
+class GenAIRouter(GenAIProvider):
+    """
+    Tier 3 router that spreads evaluate_trust calls across the configured GenAI providers.
+
+    Providers are instantiated lazily and kept for the life of the process so their
+    rolling statistics survive across sessions. Routing honours per-tenant pins first,
+    then the configured policy among healthy providers, and falls over to the next
+    candidate when the chosen provider errors.
+    """
+
+    provider_name = "router"
+
+    def __init__(
+        self,
+        factories: Optional[Dict[str, Callable[[], GenAIProvider]]] = None,
+        provider_order: Optional[List[str]] = None,
+        policy: Optional[str] = None,
+        tenant_pins: Optional[Dict[str, str]] = None,
+        shadow_sample_rate: Optional[float] = None,
+        shadow_provider: Optional[str] = None,
+    ):
+        self._factories = factories
+        self._provider_order = provider_order
+        self._policy = policy
+        self._tenant_pins = tenant_pins
+        self._shadow_sample_rate = shadow_sample_rate
+        self._shadow_provider = shadow_provider
+        self._providers: Dict[str, GenAIProvider] = {}
+        self._unavailable: Set[str] = set()
+        self.stats: Dict[str, ProviderStats] = {}
+        self._shadow_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def policy(self) -> str:
+        policy = (self._policy or settings.genai_routing_policy or "ordered").lower()
+        if policy not in ROUTING_POLICIES:
+            logger.warning(f"Unknown GenAI routing policy '{policy}', falling back to 'ordered'")
+            return "ordered"
+        return policy
+
+    @property
+    def provider_order(self) -> List[str]:
+        if self._provider_order is not None:
+            return list(self._provider_order)
+        order = settings.genai_providers_list
+        # VERAPROOF_AI_MODEL_ID keeps its historical meaning as the preferred provider.
+        preferred = os.environ.get("VERAPROOF_AI_MODEL_ID", "").strip().lower()
+        if preferred in order:
+            order = [preferred] + [name for name in order if name != preferred]
+        return order
+
+    @property
+    def tenant_pins(self) -> Dict[str, str]:
+        if self._tenant_pins is not None:
+            return self._tenant_pins
+        return settings.genai_tenant_pins_map
+
+    @property
+    def shadow_sample_rate(self) -> float:
+        rate = settings.genai_shadow_sample_rate if self._shadow_sample_rate is None else self._shadow_sample_rate
+        return max(0.0, min(1.0, float(rate or 0.0)))
+
+    def _stats_for(self, name: str) -> ProviderStats:
+        if name not in self.stats:
+            self.stats[name] = ProviderStats(window=settings.genai_stats_window)
+        return self.stats[name]
+
+    def _get_provider(self, name: str) -> Optional[GenAIProvider]:
+        if name in self._providers:
+            return self._providers[name]
+        if name in self._unavailable:
+            return None
+
+        factories = self._factories if self._factories is not None else _default_provider_factories()
+        factory = factories.get(name)
+        if factory is None:
+            logger.warning(f"Unsupported GenAI provider '{name}' in routing configuration")
+            self._unavailable.add(name)
+            return None
+
+        try:
+            provider = factory()
+        except Exception as e:
+            logger.error(f"Failed to initialize GenAI provider '{name}': {e}")
+            self._unavailable.add(name)
+            return None
+
+        self._providers[name] = provider
+        return provider
+
+    def is_healthy(self, name: str) -> bool:
+        if name in self._unavailable:
+            return False
+        return self._stats_for(name).cooldown_until <= time.monotonic()
+
+    def _estimate_cost(self, provider, frame_count: int) -> float:
+        per_call = float(getattr(provider, "cost_per_call_usd", 0.0) or 0.0)
+        per_frame = float(getattr(provider, "cost_per_frame_usd", 0.0) or 0.0)
+        return per_call + per_frame * frame_count
+
+    def _rank_candidates(self, tenant_id: Optional[str]) -> List[str]:
+        order = self.provider_order
+        healthy = [name for name in order if self.is_healthy(name)]
+        # When every provider is tripped, still try them in configured order rather than failing outright.
+        candidates = healthy or [name for name in order if name not in self._unavailable]
+
+        policy = self.policy
+        if policy == "cheapest":
+            def cost_key(name: str):
+                observed = self._stats_for(name).avg_cost_usd
+                if observed is None:
+                    # Fall back to the provider's list-price estimate before it has traffic.
+                    provider = self._get_provider(name)
+                    observed = self._estimate_cost(provider, 1) if provider is not None else None
+                return (observed if observed is not None else float("inf"), order.index(name))
+            candidates = sorted(candidates, key=cost_key)
+        elif policy == "lowest_p95":
+            def latency_key(name: str):
+                p95 = self._stats_for(name).p95_latency_ms
+                # Unmeasured providers sort first so they get sampled.
+                return (p95 if p95 is not None else -1.0, order.index(name))
+            candidates = sorted(candidates, key=latency_key)
+
+        pinned = self.tenant_pins.get(str(tenant_id)) if tenant_id else None
+        if pinned and pinned in candidates:
+            candidates = [pinned] + [name for name in candidates if name != pinned]
+        elif pinned:
+            logger.warning(f"Pinned GenAI provider '{pinned}' unavailable for tenant {tenant_id}; routing by policy")
+
+        return candidates
+
+    async def _invoke(
+        self,
+        name: str,
+        provider: GenAIProvider,
+        frames_base64: List[str],
+        vision_context: Dict[str, Any],
+        metadata: Dict[str, Any],
+        imu_context: Dict[str, Any],
+    ) -> Tuple[float, Dict[str, Any]]:
+        stats = self._stats_for(name)
+        started = time.perf_counter()
+        try:
+            score, explanation = await provider.evaluate_trust(frames_base64, vision_context, metadata, imu_context)
+        except Exception as e:
+            logger.error(f"GenAI provider '{name}' raised during evaluation: {e}")
+            score, explanation = -1.0, {"error": f"AI evaluation failed: {str(e)}"}
+
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        ok = score >= 0
+        stats.record(latency_ms, ok, self._estimate_cost(provider, len(frames_base64)) if ok else 0.0)
+        if not ok and (
+            stats.consecutive_failures >= 3
+            or (len(stats.samples) >= 10 and stats.error_rate >= settings.genai_max_error_rate)
+        ):
+            logger.warning(f"GenAI provider '{name}' tripped for {settings.genai_failure_cooldown_seconds}s", extra={
+                "consecutive_failures": stats.consecutive_failures,
+                "error_rate": round(stats.error_rate, 4),
+            })
+            stats.trip(settings.genai_failure_cooldown_seconds)
+        return score, explanation
+
+    def _maybe_schedule_shadow(
+        self,
+        primary: str,
+        frames_base64: List[str],
+        vision_context: Dict[str, Any],
+        metadata: Dict[str, Any],
+        imu_context: Dict[str, Any],
+        primary_score: float,
+        candidates: List[str],
+    ):
+        if self.shadow_sample_rate <= 0 or random.random() >= self.shadow_sample_rate:
+            return
+
+        shadow_name = (self._shadow_provider or settings.genai_shadow_provider or "").strip().lower()
+        if not shadow_name:
+            shadow_name = next((name for name in candidates if name != primary), "")
+        if not shadow_name or shadow_name == primary:
+            return
+
+        async def run_shadow():
+            provider = self._get_provider(shadow_name)
+            if provider is None:
+                return
+            score, _explanation = await self._invoke(shadow_name, provider, frames_base64, vision_context, metadata, imu_context)
+            logger.info("GenAI shadow evaluation complete", extra={
+                "primary_provider": primary,
+                "shadow_provider": shadow_name,
+                "primary_score": primary_score,
+                "shadow_score": score,
+                "score_delta": round(score - primary_score, 2) if score >= 0 and primary_score >= 0 else None,
+            })
+
+        task = asyncio.create_task(run_shadow())
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+
+    async def evaluate_trust(self, frames_base64: List[str], vision_context: Dict[str, Any], metadata: Dict[str, Any] = None, imu_context: Dict[str, Any] = None) -> Tuple[float, Dict[str, Any]]:
+        tenant_id = db_manager.get_request_context().get("tenant_id")
+        candidates = self._rank_candidates(tenant_id)
+        last_result: Tuple[float, Dict[str, Any]] = (-1.0, {"error": "AI evaluation failed: no GenAI provider available"})
+
+        for name in candidates:
+            provider = self._get_provider(name)
+            if provider is None:
+                continue
+
+            score, explanation = await self._invoke(name, provider, frames_base64, vision_context, metadata, imu_context)
+            if score >= 0:
+                if isinstance(explanation, dict):
+                    explanation.setdefault("provider", name)
+                self._maybe_schedule_shadow(name, frames_base64, vision_context, metadata, imu_context, score, candidates)
+                return score, explanation
+
+            logger.warning(f"GenAI provider '{name}' failed; trying next candidate", extra={"tenant_id": tenant_id})
+            last_result = (score, explanation)
+
+        return last_result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "providers": {
+                name: {
+                    "healthy": self.is_healthy(name),
+                    "initialized": name in self._providers,
+                    **self._stats_for(name).snapshot(),
+                }
+                for name in self.provider_order
+            },
+            "shadow_sample_rate": self.shadow_sample_rate,
+        }
+
+
+genai_router = GenAIRouter()
@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import contextvars
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.database import db_manager
+from app.query_registry import query_registry
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ('success', 'failed', 'timeout', 'cancelled')
+
+# Trend windows: period -> (bucket granularity, number of buckets)
+TREND_PERIODS = {
+    'hourly': ('hour', 24),
+    'daily': ('day', 7),
+    'monthly': ('day', 30),
+}
+
+query_registry.register_scoped(
+    'analytics.stats',
+    """
+    SELECT
+        COALESCE(SUM(session_count), 0) AS total_sessions,
+        COALESCE(SUM(session_count) FILTER (WHERE bucket_start >= CURRENT_DATE), 0) AS sessions_today,
+        COALESCE(SUM(session_count) FILTER (WHERE bucket_start >= DATE_TRUNC('week', CURRENT_DATE)), 0) AS sessions_this_week,
+        COALESCE(SUM(session_count) FILTER (WHERE bucket_start >= DATE_TRUNC('month', CURRENT_DATE)), 0) AS sessions_this_month,
+        COALESCE(SUM(scored_count), 0) AS scored_count,
+        COALESCE(SUM(passed_count), 0) AS passed_count,
+        COALESCE(SUM(trust_score_sum), 0) AS trust_score_sum
+    FROM session_rollups
+    WHERE tenant_id = $1 AND granularity = 'day'
+    """,
+    first_param=2,
+    environment_column='tenant_environment_id',
+)
+query_registry.register_scoped(
+    'analytics.trend',
+    """
+    SELECT bucket_start,
+           SUM(session_count) AS session_count,
+           SUM(success_count) AS success_count,
+           SUM(failed_count) AS failed_count,
+           SUM(scored_count) AS scored_count,
+           SUM(trust_score_sum) AS trust_score_sum
+    FROM session_rollups
+    WHERE tenant_id = $1 AND granularity = $2 AND bucket_start >= $3
+    """,
+    first_param=4,
+    environment_column='tenant_environment_id',
+    tail='GROUP BY bucket_start ORDER BY bucket_start',
+)
+query_registry.register_scoped(
+    'analytics.outcomes',
+    """
+    SELECT COALESCE(SUM(success_count), 0) AS success,
+           COALESCE(SUM(failed_count), 0) AS failed,
+           COALESCE(SUM(timeout_count), 0) AS timeout,
+           COALESCE(SUM(cancelled_count), 0) AS cancelled
+    FROM session_rollups
+    WHERE tenant_id = $1 AND granularity = 'day'
+    """,
+    first_param=2,
+    environment_column='tenant_environment_id',
+)
+
+_BACKFILL_LOCK_SQL = 'SELECT app.lock_tenant_rollups($1::uuid, TRUE)'
+_BACKFILL_DELETE_SQL = 'DELETE FROM session_rollups WHERE tenant_id = $1'
+
+_TENANT_STATS_BACKFILL_SQL = """
+    INSERT INTO tenant_stats (
+        tenant_id, total_sessions, scored_sessions, passed_sessions, trust_score_sum,
+        sessions_today, today_date, last_active_at
+    )
+    SELECT $1::uuid,
+           COUNT(*),
+           COUNT(final_trust_score),
+           COUNT(*) FILTER (WHERE final_trust_score >= 50),
+           COALESCE(SUM(final_trust_score), 0),
+           COUNT(*) FILTER (WHERE created_at::date = CURRENT_DATE),
+           CURRENT_DATE,
+           MAX(created_at)
+    FROM sessions
+    WHERE tenant_id = $1
+    ON CONFLICT (tenant_id) DO UPDATE SET
+        total_sessions = EXCLUDED.total_sessions,
+        scored_sessions = EXCLUDED.scored_sessions,
+        passed_sessions = EXCLUDED.passed_sessions,
+        trust_score_sum = EXCLUDED.trust_score_sum,
+        sessions_today = EXCLUDED.sessions_today,
+        today_date = EXCLUDED.today_date,
+        last_active_at = EXCLUDED.last_active_at
+"""
+
+_BACKFILL_INSERT_SQL = """
+    INSERT INTO session_rollups (
+        tenant_id, tenant_environment_id, granularity, bucket_start,
+        session_count, success_count, failed_count, timeout_count, cancelled_count,
+        scored_count, passed_count, trust_score_sum
+    )
+    SELECT s.tenant_id, s.tenant_environment_id, g.granularity, date_trunc(g.granularity, s.created_at),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE lower(s.verification_status) = 'success'),
+           COUNT(*) FILTER (WHERE lower(s.verification_status) = 'failed'),
+           COUNT(*) FILTER (WHERE lower(s.verification_status) = 'timeout'),
+           COUNT(*) FILTER (WHERE lower(s.verification_status) = 'cancelled'),
+           COUNT(s.final_trust_score),
+           COUNT(*) FILTER (WHERE s.final_trust_score >= 50),
+           COALESCE(SUM(s.final_trust_score), 0)
+    FROM sessions s
+    CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+    WHERE s.tenant_id = $1 AND s.created_at IS NOT NULL
+    GROUP BY s.tenant_id, s.tenant_environment_id, g.granularity, date_trunc(g.granularity, s.created_at)
+"""
+
+
+class AnalyticsRollupManager:
+    """
+    Serves tenant analytics from the session_rollups buckets.
+
+    The buckets are kept current by the sessions_rollup trigger (db/init.sql), so every
+    read here is bounded by the number of buckets in the window, not the number of sessions.
+    """
+
+    async def get_stats(self, tenant_id: str, environment_id: Optional[str] = None) -> Dict[str, Any]:
+        query, args = query_registry.scoped('analytics.stats', [tenant_id], environment_id=environment_id)
+        row = await db_manager.fetch_one(query, *args, tenant_id=tenant_id) or {}
+        scored = int(row.get('scored_count') or 0)
+        return {
+            'total_sessions': int(row.get('total_sessions') or 0),
+            'sessions_today': int(row.get('sessions_today') or 0),
+            'sessions_this_week': int(row.get('sessions_this_week') or 0),
+            'sessions_this_month': int(row.get('sessions_this_month') or 0),
+            'success_rate': round(int(row.get('passed_count') or 0) / scored * 100, 2) if scored else 0.0,
+            'average_trust_score': round(int(row.get('trust_score_sum') or 0) / scored, 2) if scored else 0.0,
+        }
+
+    async def get_usage_trend(
+        self,
+        tenant_id: str,
+        environment_id: Optional[str] = None,
+        period: str = 'daily',
+        now: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        granularity, bucket_count = TREND_PERIODS.get(period, TREND_PERIODS['monthly'])
+        now = now or datetime.utcnow()
+        step = timedelta(hours=1) if granularity == 'hour' else timedelta(days=1)
+        if granularity == 'hour':
+            last_bucket = now.replace(minute=0, second=0, microsecond=0)
+        else:
+            last_bucket = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        first_bucket = last_bucket - step * (bucket_count - 1)
+
+        query, args = query_registry.scoped(
+            'analytics.trend', [tenant_id, granularity, first_bucket], environment_id=environment_id
+        )
+        rows = await db_manager.fetch_all(query, *args, tenant_id=tenant_id)
+        by_bucket = {row['bucket_start']: row for row in rows}
+
+        trend = []
+        for index in range(bucket_count):
+            bucket = first_bucket + step * index
+            row = by_bucket.get(bucket) or {}
+            scored = int(row.get('scored_count') or 0)
+            trend.append({
+                'date': bucket.strftime('%Y-%m-%dT%H:00') if granularity == 'hour' else bucket.strftime('%Y-%m-%d'),
+                'session_count': int(row.get('session_count') or 0),
+                'success_count': int(row.get('success_count') or 0),
+                'failed_count': int(row.get('failed_count') or 0),
+                'average_trust_score': round(int(row.get('trust_score_sum') or 0) / scored, 2) if scored else 0,
+            })
+        return trend
+
+    async def get_outcome_distribution(self, tenant_id: str, environment_id: Optional[str] = None) -> Dict[str, int]:
+        query, args = query_registry.scoped('analytics.outcomes', [tenant_id], environment_id=environment_id)
+        row = await db_manager.fetch_one(query, *args, tenant_id=tenant_id) or {}
+        return {outcome: int(row.get(outcome) or 0) for outcome in OUTCOMES}
+
+    def __init__(self):
+        self._backfill_task: Optional[asyncio.Task] = None
+
+    async def backfill(self, tenant_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Rebuild rollups and tenant_stats from the sessions table, one tenant per transaction.
+
+        Each rebuild holds that tenant's rollup lock (app.lock_tenant_rollups) exclusively: it
+        waits for the tenant's in-flight session writes and holds back new ones, whose trigger
+        deltas then land on top of the fresh buckets. Other tenants' writes are unaffected.
+        """
+        # A fresh context: a caller's environment scope would hide other environments' rows from the rebuild.
+        return await asyncio.create_task(self._backfill(tenant_id), context=contextvars.Context())
+
+    def schedule_backfill(self, tenant_id: Optional[str] = None) -> bool:
+        """Start a backfill in the background; False if one is already running."""
+        if self._backfill_task is not None and not self._backfill_task.done():
+            return False
+        self._backfill_task = asyncio.create_task(self._run_scheduled_backfill(tenant_id), context=contextvars.Context())
+        return True
+
+    async def _run_scheduled_backfill(self, tenant_id: Optional[str]):
+        try:
+            rebuilt = await self._backfill(tenant_id)
+            logger.info('Analytics rollup backfill finished', extra={'tenants': len(rebuilt), 'buckets': sum(rebuilt.values())})
+        except Exception:
+            logger.error('Analytics rollup backfill failed', exc_info=True, extra={'tenant_id': tenant_id})
+
+    async def _backfill(self, tenant_id: Optional[str]) -> Dict[str, int]:
+        if tenant_id:
+            tenant_ids = [str(tenant_id)]
+        else:
+            rows = await db_manager.fetch_all('SELECT tenant_id FROM tenants ORDER BY tenant_id')
+            tenant_ids = [str(row['tenant_id']) for row in rows]
+
+        rebuilt = {}
+        for current_tenant in tenant_ids:
+            async with db_manager.transaction(context={'tenant_id': current_tenant}) as conn:
+                if conn is None:
+                    break
+                await conn.execute(_BACKFILL_LOCK_SQL, current_tenant)
+                await conn.execute(_BACKFILL_DELETE_SQL, current_tenant)
+                status = await conn.execute(_BACKFILL_INSERT_SQL, current_tenant)
+                await conn.execute(_TENANT_STATS_BACKFILL_SQL, current_tenant)
+            rebuilt[current_tenant] = int(status.rsplit(' ', 1)[-1]) if status else 0
+            logger.info('Analytics rollups rebuilt', extra={'tenant_id': current_tenant, 'buckets': rebuilt[current_tenant]})
+        return rebuilt
+
+
+analytics_rollup_manager = AnalyticsRollupManager()
+
+
+async def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Maintain analytics rollup tables')
+    parser.add_argument('command', choices=['backfill'])
+    parser.add_argument('--tenant', help='Only rebuild this tenant')
+    args = parser.parse_args(argv)
+
+    await db_manager.connect()
+    try:
+        rebuilt = await analytics_rollup_manager.backfill(args.tenant)
+        print(f'Rebuilt rollups for {len(rebuilt)} tenant(s), {sum(rebuilt.values())} bucket(s)')
+    finally:
+        await db_manager.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(_main())
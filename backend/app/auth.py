@@ -9,6 +9,7 @@ from opentelemetry import trace
 
 from app.config import settings
 from app.database import db_manager
+from app.query_registry import query_registry
 from app.tenant_environment import (
     DEFAULT_ENVIRONMENT,
     PRODUCTION_ENVIRONMENT,
@@ -355,13 +356,7 @@ class APIKeyManager:
     async def validate_key(self, raw_token: str) -> Tuple[str, str, str]:
         hashed_secret = hashlib.sha256(raw_token.encode()).hexdigest()
         key_data = await db_manager.fetch_one(
-            """
-            SELECT tenant_id,
-                   COALESCE(environment, $2) AS environment,
-                   tenant_environment_id
-            FROM api_keys
-            WHERE api_secret = $1 AND revoked_at IS NULL
-            """,
+            query_registry.get('api_keys.validate'),
             hashed_secret,
             DEFAULT_ENVIRONMENT,
         )
@@ -38,15 +38,12 @@ class BrandingManager:
         s3_key = f"{tenant_id}/branding/{filename}"
         
         try:
-            storage_manager.s3_client.put_object(
-                Bucket=storage_manager.bucket_name,
-                Key=s3_key,
-                Body=file_data,
-                ContentType=content_type
-            )
+            if not await storage_manager.ensure_connected():
+                raise RuntimeError("S3 storage is not available")
+            await storage_manager.put_object(s3_key, file_data, content_type)
             
             # Generate URL (in production, this would be CloudFront URL)
-            logo_url = f"{storage_manager.s3_client._endpoint.host}/{storage_manager.bucket_name}/{s3_key}"
+            logo_url = f"{storage_manager.s3.endpoint_host}/{storage_manager.bucket_name}/{s3_key}"
             
             # Update database
             await self.update_logo_url(tenant_id, logo_url)
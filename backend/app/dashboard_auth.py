@@ -13,6 +13,7 @@ from app.auth import api_key_manager, local_auth_manager
 from app.config import settings
 from app.database import db_manager
 from app.identity_adapter import ExternalIdentityProfile
+from app.query_registry import query_registry
 from app.tenant_environment import (
     ensure_tenant_environments,
     list_tenant_environments,
@@ -44,6 +45,7 @@ LEGACY_ROLE_PERMISSIONS = {
         'api_keys.manage',
         'org.members.manage',
         'platform.metadata.read',
+        'platform.operations.manage',
     },
     'API_Key': {
         'sessions.create',
@@ -116,7 +118,7 @@ class DashboardSessionManager:
         roles = {row['role_slug'] for row in rows if row.get('role_slug')}
         permissions = {row['permission_slug'] for row in rows if row.get('permission_slug')}
         if 'platform_admin' in roles:
-            permissions.add('platform.metadata.read')
+            permissions.update({'platform.metadata.read', 'platform.operations.manage'})
         if 'org_admin' in roles:
             permissions.update(LEGACY_ROLE_PERMISSIONS['Admin'])
         return roles, permissions
@@ -234,20 +236,7 @@ class DashboardSessionManager:
         if memory_session:
             return memory_session
 
-        query = """
-            SELECT s.session_id,
-                   s.user_id,
-                   s.org_id,
-                   s.active_environment_id,
-                   s.active_environment_slug,
-                   s.csrf_token,
-                   s.expires_at,
-                   u.email
-            FROM auth_sessions s
-            JOIN users u ON u.user_id = s.user_id
-            WHERE s.session_secret_hash = $1 AND s.revoked_at IS NULL AND s.expires_at > NOW()
-        """
-        session = await db_manager.fetch_one(query, hashed)
+        session = await db_manager.fetch_one(query_registry.get('auth_sessions.lookup'), hashed)
         if not session:
             return None
 
@@ -265,20 +254,14 @@ class DashboardSessionManager:
             or session.get('active_environment_slug') != active_environment['slug']
         ):
             await db_manager.execute_query(
-                """
-                UPDATE auth_sessions
-                SET active_environment_id = $1,
-                    active_environment_slug = $2,
-                    last_seen_at = NOW()
-                WHERE session_secret_hash = $3
-                """,
+                query_registry.get('auth_sessions.set_environment'),
                 active_environment['environment_id'],
                 active_environment['slug'],
                 hashed,
             )
         else:
             await db_manager.execute_query(
-                'UPDATE auth_sessions SET last_seen_at = NOW() WHERE session_secret_hash = $1',
+                query_registry.get('auth_sessions.touch'),
                 hashed,
             )
 
@@ -318,13 +301,7 @@ class DashboardSessionManager:
             raise HTTPException(status_code=400, detail='Platform admins do not use tenant environments')
 
         await db_manager.execute_query(
-            """
-            UPDATE auth_sessions
-            SET active_environment_id = $1,
-                active_environment_slug = $2,
-                last_seen_at = NOW()
-            WHERE session_secret_hash = $3
-            """,
+            query_registry.get('auth_sessions.set_environment'),
             active_environment['environment_id'],
             active_environment['slug'],
             hashed,
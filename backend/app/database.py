@@ -2,11 +2,13 @@ import asyncio
 import asyncpg
 import json
 import logging
+import uuid
 from contextlib import asynccontextmanager
 from contextvars import ContextVar
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.config import settings
+from app.query_registry import query_registry
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,56 @@ _current_environment_id_var: ContextVar[Optional[str]] = ContextVar('veraproof_c
 _current_environment_slug_var: ContextVar[Optional[str]] = ContextVar('veraproof_current_environment_slug', default=None)
 _current_actor_id_var: ContextVar[Optional[str]] = ContextVar('veraproof_current_actor_id', default=None)
 _current_actor_type_var: ContextVar[Optional[str]] = ContextVar('veraproof_current_actor_type', default=None)
+_current_unit_of_work_var: ContextVar[Optional['UnitOfWork']] = ContextVar('veraproof_current_unit_of_work', default=None)
+
+# All five RLS settings in one statement (one round trip, cached as a prepared statement by asyncpg).
+# Session scope so the values survive for every statement issued on the held connection;
+# the pool's RESET ALL on release clears them before the connection is handed to anyone else.
+_APPLY_CONTEXT_SQL = """
+    SELECT
+        set_config('app.current_tenant', COALESCE($1, ''), false),
+        set_config('app.current_environment', COALESCE($2, ''), false),
+        set_config('app.current_environment_slug', COALESCE($3, ''), false),
+        set_config('app.current_actor', COALESCE($4, ''), false),
+        set_config('app.current_actor_type', COALESCE($5, ''), false)
+"""
+
+ContextKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+class UnitOfWork:
+    """
+    One pooled connection shared by every db_manager helper inside a request or job scope.
+
+    The connection is acquired lazily on first use and released when the scope ends.
+    Tasks spawned inside the scope inherit it through the context var; a task-aware
+    re-entrant lock serialises their statements, and once the scope closes they fall
+    back to acquiring their own connections.
+    """
+
+    def __init__(self, transactional: bool = False):
+        self.transactional = transactional
+        self.conn: Optional[asyncpg.Connection] = None
+        self.transaction = None
+        self.closed = False
+        self._lock = asyncio.Lock()
+        self._owner: Optional[asyncio.Task] = None
+        self._depth = 0
+
+    async def enter(self):
+        task = asyncio.current_task()
+        if self._owner is task:
+            self._depth += 1
+            return
+        await self._lock.acquire()
+        self._owner = task
+        self._depth = 1
+
+    def exit(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            self._lock.release()
 
 
 class TenantDatabaseManager:
@@ -22,6 +74,10 @@ class TenantDatabaseManager:
 
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
+        # Context last applied to each currently-held connection, keyed by id(conn).
+        self._applied_contexts: Dict[int, ContextKey] = {}
+        # Identifies this process's connections, e.g. so it can ignore its own change notifications.
+        self.application_name = f'veraproof-{uuid.uuid4().hex[:12]}'
 
     async def _init_connection(self, conn: asyncpg.Connection):
         await conn.set_type_codec(
@@ -36,6 +92,8 @@ class TenantDatabaseManager:
             decoder=json.loads,
             schema='pg_catalog'
         )
+        if settings.db_prepare_hot_queries:
+            await query_registry.warm(conn)
 
     async def connect(self):
         try:
@@ -45,6 +103,7 @@ class TenantDatabaseManager:
                     min_size=5,
                     max_size=20,
                     command_timeout=60,
+                    server_settings={'application_name': self.application_name},
                     init=self._init_connection
                 ),
                 timeout=5.0
@@ -67,29 +126,17 @@ class TenantDatabaseManager:
                 raise
 
     async def initialize_schema(self):
+        """Check the schema version; apply pending migrations only if DB_AUTO_MIGRATE is on."""
         if not self.pool:
             return
 
-        try:
-            import os
-            sql_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'db', 'init.sql')
-            if not os.path.exists(sql_path):
-                logger.warning(f'Database initialization script not found at {sql_path}')
-                return
-
-            with open(sql_path, 'r', encoding='utf-8-sig') as f:
-                init_script = f.read()
+        from app.migrations import migration_runner
 
+        try:
             async with self.pool.acquire() as conn:
-                advisory_lock_id = 847321905114
-                await conn.fetchval('SELECT pg_advisory_lock($1)', advisory_lock_id)
-                try:
-                    await conn.execute(init_script)
-                finally:
-                    await conn.fetchval('SELECT pg_advisory_unlock($1)', advisory_lock_id)
-            logger.info('Successfully executed database initialization script (init.sql)')
+                await migration_runner.ensure_current(conn, apply=settings.db_auto_migrate)
         except Exception as e:
-            logger.error(f'Failed to execute database initialization script: {e}')
+            logger.error(f'Database schema initialization failed: {e}')
             raise
 
     async def disconnect(self):
@@ -129,7 +176,7 @@ class TenantDatabaseManager:
     def current_environment_slug(self) -> Optional[str]:
         return _current_environment_slug_var.get()
 
-    async def _apply_context(self, conn: asyncpg.Connection, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
+    def _resolve_context(self, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> ContextKey:
         context = context or {}
         request_context = self.get_request_context()
         effective_tenant = tenant_id or context.get('tenant_id') or request_context.get('tenant_id')
@@ -138,34 +185,182 @@ class TenantDatabaseManager:
         actor_id = context.get('actor_id') or request_context.get('actor_id')
         actor_type = context.get('actor_type') or request_context.get('actor_type')
 
-        await conn.execute("SELECT set_config('app.current_tenant', COALESCE($1, ''), true)", str(effective_tenant) if effective_tenant else None)
-        await conn.execute("SELECT set_config('app.current_environment', COALESCE($1, ''), true)", str(effective_environment_id) if effective_environment_id else None)
-        await conn.execute("SELECT set_config('app.current_environment_slug', COALESCE($1, ''), true)", effective_environment_slug)
-        await conn.execute("SELECT set_config('app.current_actor', COALESCE($1, ''), true)", str(actor_id) if actor_id else None)
-        await conn.execute("SELECT set_config('app.current_actor_type', COALESCE($1, ''), true)", actor_type)
+        return (
+            str(effective_tenant) if effective_tenant else None,
+            str(effective_environment_id) if effective_environment_id else None,
+            effective_environment_slug or None,
+            str(actor_id) if actor_id else None,
+            actor_type or None,
+        )
+
+    async def _apply_context(self, conn: asyncpg.Connection, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
+        resolved = self._resolve_context(tenant_id=tenant_id, context=context)
+        if self._applied_contexts.get(id(conn)) == resolved:
+            return
+
+        await conn.execute(_APPLY_CONTEXT_SQL, *resolved)
+        self._applied_contexts[id(conn)] = resolved
+
+    def _active_unit_of_work(self) -> Optional[UnitOfWork]:
+        unit = _current_unit_of_work_var.get()
+        if unit is None or unit.closed:
+            return None
+        return unit
+
+    async def _ensure_unit_connection(self, unit: UnitOfWork) -> asyncpg.Connection:
+        if unit.conn is None:
+            unit.conn = await self.pool.acquire()
+            if unit.transactional:
+                unit.transaction = unit.conn.transaction()
+                await unit.transaction.start()
+        return unit.conn
+
+    async def _close_unit_of_work(self, unit: UnitOfWork, failed: bool):
+        # New callers stop joining the unit at once; tasks already queued on its lock see
+        # `closed` when they get it and fall back to their own connections.
+        unit.closed = True
+        # Wait for any statement a spawned task still has in flight before ending the transaction
+        # and handing the connection back to the pool (which runs RESET ALL on it).
+        await unit.enter()
+        try:
+            if unit.conn is None:
+                return
+            try:
+                if unit.transaction is not None:
+                    if failed:
+                        await unit.transaction.rollback()
+                    else:
+                        await unit.transaction.commit()
+            finally:
+                self._applied_contexts.pop(id(unit.conn), None)
+                await self.pool.release(unit.conn)
+                unit.conn = None
+                unit.transaction = None
+        finally:
+            unit.exit()
+
+    async def release_unit_of_work(self):
+        """
+        End the current non-transactional unit early, e.g. once a response has started streaming,
+        so its connection is not held while the body is sent. Later calls use their own connections.
+        """
+        unit = self._active_unit_of_work()
+        if unit is not None and not unit.transactional:
+            await self._close_unit_of_work(unit, failed=False)
+
+    @asynccontextmanager
+    async def unit_of_work(self, transactional: bool = False):
+        """
+        Share one connection across every helper call made inside the block.
+
+        Nested scopes reuse the outer unit. With transactional=True the outer-most
+        scope wraps everything in a single transaction, committed on clean exit.
+        """
+        if not self.pool:
+            yield
+            return
+
+        if self._active_unit_of_work() is not None:
+            if transactional:
+                async with self.transaction():
+                    yield
+            else:
+                yield
+            return
+
+        unit = UnitOfWork(transactional=transactional)
+        token = _current_unit_of_work_var.set(unit)
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _current_unit_of_work_var.reset(token)
+            await self._close_unit_of_work(unit, failed)
+
+    @asynccontextmanager
+    async def transaction(self, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
+        """
+        Run the block atomically. Helpers called inside it (in this task) share the
+        transaction; inside an outer unit of work it becomes a savepoint on the shared
+        connection. Do not fan out DB calls to other tasks from inside the block.
+        """
+        if not self.pool:
+            yield None
+            return
+
+        unit = self._active_unit_of_work()
+        if unit is None:
+            async with self.unit_of_work(transactional=True):
+                async with self.transaction(tenant_id=tenant_id, context=context) as conn:
+                    yield conn
+            return
+
+        await unit.enter()
+        if unit.closed:
+            # The scope ended while this task waited for the connection.
+            unit.exit()
+            async with self.unit_of_work(transactional=True):
+                async with self.transaction(tenant_id=tenant_id, context=context) as conn:
+                    yield conn
+            return
+
+        try:
+            conn = await self._ensure_unit_connection(unit)
+            await self._apply_context(conn, tenant_id=tenant_id, context=context)
+            try:
+                if unit.transaction is not None and unit._depth == 1:
+                    yield conn
+                else:
+                    async with conn.transaction():
+                        yield conn
+            except BaseException:
+                # The rollback also reverts any set_config issued inside the block.
+                self._applied_contexts.pop(id(conn), None)
+                raise
+        finally:
+            unit.exit()
 
     @asynccontextmanager
     async def get_connection(self, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
         if not self.pool:
             raise RuntimeError('Database pool not initialized')
 
+        unit = self._active_unit_of_work()
+        if unit is not None:
+            await unit.enter()
+            if not unit.closed:
+                try:
+                    conn = await self._ensure_unit_connection(unit)
+                    await self._apply_context(conn, tenant_id=tenant_id, context=context)
+                    yield conn
+                finally:
+                    unit.exit()
+                return
+            unit.exit()  # the scope ended while this task waited; use a connection of its own
+
         async with self.pool.acquire() as conn:
-            await self._apply_context(conn, tenant_id=tenant_id, context=context)
-            yield conn
+            try:
+                await self._apply_context(conn, tenant_id=tenant_id, context=context)
+                yield conn
+            finally:
+                self._applied_contexts.pop(id(conn), None)
 
     async def execute_query(self, query: str, *args, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> str:
         if not self.pool:
             logger.warning('Database not available - skipping query execution')
             return 'SKIPPED'
         async with self.get_connection(tenant_id=tenant_id, context=context) as conn:
-            return await conn.execute(query, *args)
+            return await query_registry.run(conn, query, 'execute', *args)
 
     async def fetch_one(self, query: str, *args, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         if not self.pool:
             logger.warning('Database not available - returning None')
             return None
         async with self.get_connection(tenant_id=tenant_id, context=context) as conn:
-            row = await conn.fetchrow(query, *args)
+            row = await query_registry.run(conn, query, 'fetchrow', *args)
             return dict(row) if row else None
 
     async def fetch_all(self, query: str, *args, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
@@ -173,7 +368,7 @@ class TenantDatabaseManager:
             logger.warning('Database not available - returning empty list')
             return []
         async with self.get_connection(tenant_id=tenant_id, context=context) as conn:
-            rows = await conn.fetch(query, *args)
+            rows = await query_registry.run(conn, query, 'fetch', *args)
             return [dict(row) for row in rows]
 
     async def fetch_val(self, query: str, *args, tenant_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> Any:
@@ -181,7 +376,7 @@ class TenantDatabaseManager:
             logger.warning('Database not available - returning None')
             return None
         async with self.get_connection(tenant_id=tenant_id, context=context) as conn:
-            return await conn.fetchval(query, *args)
+            return await query_registry.run(conn, query, 'fetchval', *args)
 
 
 db_manager = TenantDatabaseManager()
@@ -1,9 +1,15 @@
 ﻿import base64
 import hashlib
 import os
-from typing import Dict, Tuple
+import struct
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 from app.config import settings
 from app.dashboard_auth import dashboard_session_manager
@@ -14,92 +20,358 @@ class EncryptionError(Exception):
     pass
 
 
+# Envelope v1: whole-object AES-GCM. Still decrypted, no longer written.
+LEGACY_ALG = 'AES256_GCM'
+# Envelope v2: AES-GCM over fixed-size plaintext segments (see SegmentedCipher).
+SEGMENTED_ALG = 'AES256_GCM_STREAM'
+ENVELOPE_VERSION = 2
+ENVELOPE_ALGORITHMS = {1: LEGACY_ALG, 2: SEGMENTED_ALG}
+SEGMENT_SIZE = 64 * 1024
+TAG_SIZE = 16
+NONCE_PREFIX_SIZE = 7
+
+
+# Wrapping-key derivations, recorded per object as vp_kdf. Objects without it used LEGACY_KDF.
+LEGACY_KDF = 'sha256'
+HKDF_KDF = 'hkdf-sha256'
+SUPPORTED_KDFS = {LEGACY_KDF, HKDF_KDF}
+
+
+def _b64(value: bytes) -> str:
+    return base64.urlsafe_b64encode(value).decode('ascii')
+
+
+class SegmentedCipher:
+    """
+    STREAM construction over AES-GCM.
+
+    The plaintext is cut into `segment_size` pieces and each is sealed on its own. Segment
+    nonces are `prefix(7) || index(4, big-endian) || final(1)`, so reordering, dropping or
+    truncating segments fails authentication. The final segment may be short (or empty).
+    """
+
+    def __init__(self, data_key: bytes, nonce_prefix: bytes, segment_size: int = SEGMENT_SIZE):
+        if len(nonce_prefix) != NONCE_PREFIX_SIZE:
+            raise EncryptionError('Invalid segment nonce prefix')
+        self._aead = AESGCM(data_key)
+        self.nonce_prefix = nonce_prefix
+        self.segment_size = segment_size
+
+    @property
+    def sealed_segment_size(self) -> int:
+        return self.segment_size + TAG_SIZE
+
+    def _nonce(self, index: int, final: bool) -> bytes:
+        return self.nonce_prefix + struct.pack('>IB', index, 1 if final else 0)
+
+    def segment_count(self, ciphertext_size: int) -> int:
+        return max(1, -(-ciphertext_size // self.sealed_segment_size))
+
+    def plaintext_size(self, ciphertext_size: int) -> int:
+        return ciphertext_size - TAG_SIZE * self.segment_count(ciphertext_size)
+
+    def encrypt_segment(self, index: int, chunk: bytes, final: bool) -> bytes:
+        return self._aead.encrypt(self._nonce(index, final), chunk, None)
+
+    def decrypt_segment(self, index: int, sealed: bytes, final: bool) -> bytes:
+        try:
+            return self._aead.decrypt(self._nonce(index, final), sealed, None)
+        except InvalidTag as e:
+            raise EncryptionError(f'Artifact segment {index} failed authentication') from e
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        view = memoryview(plaintext)
+        count = max(1, -(-len(view) // self.segment_size))
+        sealed: List[bytes] = []
+        for index in range(count):
+            chunk = view[index * self.segment_size:(index + 1) * self.segment_size]
+            sealed.append(self.encrypt_segment(index, bytes(chunk), index == count - 1))
+        return b''.join(sealed)
+
+    def decrypt_segments(self, first_index: int, sealed: bytes, total_segments: int) -> bytes:
+        """Decrypt consecutive sealed segments starting at `first_index`."""
+        view = memoryview(sealed)
+        plain: List[bytes] = []
+        offset = 0
+        index = first_index
+        while offset < len(view):
+            piece = bytes(view[offset:offset + self.sealed_segment_size])
+            plain.append(self.decrypt_segment(index, piece, index == total_segments - 1))
+            offset += len(piece)
+            index += 1
+        return b''.join(plain)
+
+    def decrypt(self, ciphertext: bytes) -> bytes:
+        return self.decrypt_segments(0, ciphertext, self.segment_count(len(ciphertext)))
+
+
+class SegmentEncryptor:
+    """
+    Incremental encryption into the segmented envelope. `update` returns the sealed
+    segments that are complete; one segment is always held back because only
+    `finalize` knows which segment is the last. Memory stays at one segment.
+    """
+
+    def __init__(self, cipher: SegmentedCipher):
+        self._cipher = cipher
+        self._buffer = bytearray()
+        self._index = 0
+        self._finalized = False
+
+    def update(self, data: bytes) -> bytes:
+        if self._finalized:
+            raise EncryptionError('Encryptor already finalized')
+        self._buffer += data
+        segment_size = self._cipher.segment_size
+        sealed: List[bytes] = []
+        offset = 0
+        while len(self._buffer) - offset > segment_size:
+            chunk = bytes(self._buffer[offset:offset + segment_size])
+            sealed.append(self._cipher.encrypt_segment(self._index, chunk, False))
+            self._index += 1
+            offset += segment_size
+        del self._buffer[:offset]
+        return b''.join(sealed)
+
+    def finalize(self) -> bytes:
+        if self._finalized:
+            raise EncryptionError('Encryptor already finalized')
+        self._finalized = True
+        sealed = self._cipher.encrypt_segment(self._index, bytes(self._buffer), True)
+        self._buffer.clear()
+        return sealed
+
+
+def envelope_version(metadata: Dict[str, str]) -> int:
+    """Envelope version of an encrypted object, inferred from `vp_alg` when the field is absent."""
+    alg = metadata.get('vp_alg') or LEGACY_ALG
+    raw = metadata.get('vp_envelope')
+    if raw is None:
+        version = next((v for v, a in ENVELOPE_ALGORITHMS.items() if a == alg), None)
+    else:
+        version = int(raw) if raw.isdigit() else None
+    if version is None or ENVELOPE_ALGORITHMS.get(version) != alg:
+        raise EncryptionError(f'Unsupported encryption envelope: version={raw} alg={alg}')
+    return version
+
+
+def is_segmented(metadata: Dict[str, str]) -> bool:
+    return metadata.get('vp_encrypted') == '1' and envelope_version(metadata) == 2
+
+
+class TenantKeyCache:
+    """
+    Per-process LRU with TTL for tenant encryption config and derived wrapping keys.
+
+    Entries live in memory only. Rotations made through this process invalidate the
+    tenant at once; on other nodes the config TTL bounds how long the old key version
+    keeps being used for new writes (old versions stay decryptable either way).
+    """
+
+    def __init__(self, ttl_seconds_setting: str, max_entries: Optional[int] = None):
+        self._ttl_seconds_setting = ttl_seconds_setting
+        self._max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl_seconds(self) -> int:
+        return getattr(settings, self._ttl_seconds_setting)
+
+    @property
+    def max_entries(self) -> int:
+        return settings.tenant_key_cache_max_entries if self._max_entries is None else self._max_entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_tenant(self, tenant_id: str):
+        for key in [key for key in self._entries if key[0] == tenant_id]:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class TenantEncryptionManager:
+    def __init__(self):
+        self.config_cache = TenantKeyCache('tenant_encryption_config_ttl_seconds')
+        self.key_cache = TenantKeyCache('tenant_key_cache_ttl_seconds')
+
     def _derive_key(self, material: str) -> bytes:
         return hashlib.sha256(material.encode('utf-8')).digest()
 
+    def _hkdf(self, secret: str, info: str) -> bytes:
+        return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info.encode('utf-8')).derive(secret.encode('utf-8'))
+
     async def get_tenant_config(self, tenant_id: str) -> Dict[str, object]:
+        cached = self.config_cache.get((tenant_id,))
+        if cached is not None:
+            return dict(cached)
         record = await db_manager.fetch_one(
             "SELECT encryption_mode, encryption_key_version FROM tenants WHERE tenant_id = $1",
             tenant_id,
             tenant_id=tenant_id,
         )
-        return {
+        config = {
             'mode': (record or {}).get('encryption_mode') or 'managed',
             'key_version': int((record or {}).get('encryption_key_version') or 1),
         }
+        if record:
+            self.config_cache.put((tenant_id,), config)
+        return dict(config)
+
+    def invalidate_tenant(self, tenant_id: str):
+        """Drop cached config and keys after the tenant's encryption settings change."""
+        self.config_cache.invalidate_tenant(str(tenant_id))
+        self.key_cache.invalidate_tenant(str(tenant_id))
 
-    def _get_managed_wrapping_key(self, tenant_id: str, key_version: int) -> bytes:
-        return self._derive_key(f"{settings.app_encryption_key}:{tenant_id}:v{key_version}")
+    def clear_cache(self):
+        self.config_cache.clear()
+        self.key_cache.clear()
 
-    def _get_tenant_supplied_wrapping_key(self, tenant_id: str, passphrase: str) -> bytes:
+    def _write_kdf(self) -> str:
+        kdf = (settings.encryption_kdf or HKDF_KDF).lower()
+        if kdf not in SUPPORTED_KDFS:
+            raise EncryptionError(f'Unsupported encryption KDF: {kdf}')
+        return kdf
+
+    def _get_managed_wrapping_key(self, tenant_id: str, key_version: int, kdf: str = LEGACY_KDF) -> bytes:
+        cache_key = (tenant_id, kdf, key_version)
+        wrapping_key = self.key_cache.get(cache_key)
+        if wrapping_key is None:
+            if kdf == HKDF_KDF:
+                wrapping_key = self._hkdf(settings.app_encryption_key, f'veraproof/managed/{tenant_id}/v{key_version}')
+            else:
+                wrapping_key = self._derive_key(f"{settings.app_encryption_key}:{tenant_id}:v{key_version}")
+            self.key_cache.put(cache_key, wrapping_key)
+        return wrapping_key
+
+    def _get_tenant_supplied_wrapping_key(self, tenant_id: str, passphrase: str, kdf: str = LEGACY_KDF) -> bytes:
+        # Not cached: the passphrase already lives (with its own expiry) in the dashboard
+        # session manager, and a cached key would outlive clear_tenant_runtime_key.
+        if kdf == HKDF_KDF:
+            return self._hkdf(passphrase, f'veraproof/tenant-runtime/{tenant_id}')
         return self._derive_key(f"tenant-runtime:{tenant_id}:{passphrase}")
 
-    def _build_encrypted_payload(self, *, wrapping_key: bytes, mode: str, key_id: str, plaintext: bytes) -> Tuple[bytes, Dict[str, str]]:
+    def _new_envelope(self, *, wrapping_key: bytes, mode: str, key_id: str, kdf: str) -> Tuple[SegmentedCipher, Dict[str, str]]:
         data_key = os.urandom(32)
-        data_nonce = os.urandom(12)
+        nonce_prefix = os.urandom(NONCE_PREFIX_SIZE)
         wrap_nonce = os.urandom(12)
-        ciphertext = AESGCM(data_key).encrypt(data_nonce, plaintext, None)
         wrapped_key = AESGCM(wrapping_key).encrypt(wrap_nonce, data_key, None)
-        return ciphertext, {
+        return SegmentedCipher(data_key, nonce_prefix), {
             'vp_encrypted': '1',
+            'vp_envelope': str(ENVELOPE_VERSION),
             'vp_mode': mode,
-            'vp_alg': 'AES256_GCM',
+            'vp_alg': SEGMENTED_ALG,
+            'vp_segment_size': str(SEGMENT_SIZE),
             'vp_key_id': key_id,
-            'vp_data_nonce': base64.urlsafe_b64encode(data_nonce).decode('ascii'),
-            'vp_wrap_nonce': base64.urlsafe_b64encode(wrap_nonce).decode('ascii'),
-            'vp_wrapped_key': base64.urlsafe_b64encode(wrapped_key).decode('ascii'),
+            'vp_kdf': kdf,
+            'vp_data_nonce': _b64(nonce_prefix),
+            'vp_wrap_nonce': _b64(wrap_nonce),
+            'vp_wrapped_key': _b64(wrapped_key),
         }
 
-    async def encrypt_for_tenant(self, tenant_id: str, plaintext: bytes) -> Tuple[bytes, Dict[str, str]]:
+    async def _open_envelope(self, tenant_id: str) -> Tuple[SegmentedCipher, Dict[str, str]]:
         config = await self.get_tenant_config(tenant_id)
         mode = str(config['mode'])
         key_version = int(config['key_version'])
+        kdf = self._write_kdf()
 
         if mode == 'tenant_managed':
             passphrase = dashboard_session_manager.get_tenant_runtime_key(tenant_id)
             if not passphrase:
                 raise EncryptionError('Tenant-managed encryption key is not loaded for this tenant')
-            wrapping_key = self._get_tenant_supplied_wrapping_key(tenant_id, passphrase)
-            return self._build_encrypted_payload(
-                wrapping_key=wrapping_key,
+            return self._new_envelope(
+                wrapping_key=self._get_tenant_supplied_wrapping_key(tenant_id, passphrase, kdf),
                 mode=mode,
                 key_id=f'tenant:{tenant_id}:runtime',
-                plaintext=plaintext,
+                kdf=kdf,
             )
 
-        wrapping_key = self._get_managed_wrapping_key(tenant_id, key_version)
-        return self._build_encrypted_payload(
-            wrapping_key=wrapping_key,
+        return self._new_envelope(
+            wrapping_key=self._get_managed_wrapping_key(tenant_id, key_version, kdf),
             mode='managed',
             key_id=f'app-managed:{tenant_id}:v{key_version}',
-            plaintext=plaintext,
+            kdf=kdf,
         )
 
-    async def decrypt_for_tenant(self, tenant_id: str, ciphertext: bytes, metadata: Dict[str, str]) -> bytes:
-        if metadata.get('vp_encrypted') != '1':
-            return ciphertext
+    async def begin_encryption(self, tenant_id: str) -> Tuple[SegmentEncryptor, Dict[str, str]]:
+        """Start a streaming encryption; the metadata is final before any data is written."""
+        cipher, metadata = await self._open_envelope(tenant_id)
+        return SegmentEncryptor(cipher), metadata
+
+    async def encrypt_for_tenant(self, tenant_id: str, plaintext: bytes) -> Tuple[bytes, Dict[str, str]]:
+        cipher, metadata = await self._open_envelope(tenant_id)
+        return cipher.encrypt(plaintext), metadata
 
+    def _resolve_wrapping_key(self, tenant_id: str, metadata: Dict[str, str]) -> bytes:
+        kdf = metadata.get('vp_kdf') or LEGACY_KDF
+        if kdf not in SUPPORTED_KDFS:
+            raise EncryptionError(f'Unsupported encryption KDF: {kdf}')
         mode = metadata.get('vp_mode') or 'managed'
         if mode == 'tenant_managed':
             passphrase = dashboard_session_manager.get_tenant_runtime_key(tenant_id)
             if not passphrase:
                 raise EncryptionError('Tenant-managed encryption key is not loaded for this tenant')
-            wrapping_key = self._get_tenant_supplied_wrapping_key(tenant_id, passphrase)
-        else:
-            key_version = 1
-            key_id = metadata.get('vp_key_id') or ''
-            if ':v' in key_id:
-                try:
-                    key_version = int(key_id.rsplit(':v', 1)[1])
-                except ValueError:
-                    key_version = 1
-            wrapping_key = self._get_managed_wrapping_key(tenant_id, key_version)
+            return self._get_tenant_supplied_wrapping_key(tenant_id, passphrase, kdf)
 
-        data_nonce = base64.urlsafe_b64decode(metadata['vp_data_nonce'])
+        key_version = 1
+        key_id = metadata.get('vp_key_id') or ''
+        if ':v' in key_id:
+            try:
+                key_version = int(key_id.rsplit(':v', 1)[1])
+            except ValueError:
+                key_version = 1
+        return self._get_managed_wrapping_key(tenant_id, key_version, kdf)
+
+    def _unwrap_data_key(self, tenant_id: str, metadata: Dict[str, str]) -> bytes:
+        wrapping_key = self._resolve_wrapping_key(tenant_id, metadata)
         wrap_nonce = base64.urlsafe_b64decode(metadata['vp_wrap_nonce'])
         wrapped_key = base64.urlsafe_b64decode(metadata['vp_wrapped_key'])
-        data_key = AESGCM(wrapping_key).decrypt(wrap_nonce, wrapped_key, None)
+        return AESGCM(wrapping_key).decrypt(wrap_nonce, wrapped_key, None)
+
+    async def segmented_cipher(self, tenant_id: str, metadata: Dict[str, str]) -> Optional[SegmentedCipher]:
+        """Cipher for piecewise decryption, or None when the object is not segmented."""
+        if not is_segmented(metadata):
+            return None
+        return SegmentedCipher(
+            self._unwrap_data_key(tenant_id, metadata),
+            base64.urlsafe_b64decode(metadata['vp_data_nonce']),
+            int(metadata.get('vp_segment_size') or SEGMENT_SIZE),
+        )
+
+    async def decrypt_for_tenant(self, tenant_id: str, ciphertext: bytes, metadata: Dict[str, str]) -> bytes:
+        if metadata.get('vp_encrypted') != '1':
+            return ciphertext
+
+        cipher = await self.segmented_cipher(tenant_id, metadata)
+        if cipher is not None:
+            return cipher.decrypt(ciphertext)
+
+        # Envelope v1 (validated by segmented_cipher above).
+        data_key = self._unwrap_data_key(tenant_id, metadata)
+        data_nonce = base64.urlsafe_b64decode(metadata['vp_data_nonce'])
         return AESGCM(data_key).decrypt(data_nonce, ciphertext, None)
 
     def describe_encryption(self, metadata: Dict[str, str]) -> Dict[str, str | None]:
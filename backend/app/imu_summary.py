@@ -0,0 +1,100 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# (section, axis) pairs as sent by verification-interface/js/imu-collector.js.
+IMU_CHANNELS = (
+    ('acceleration', 'x'),
+    ('acceleration', 'y'),
+    ('acceleration', 'z'),
+    ('rotation_rate', 'alpha'),
+    ('rotation_rate', 'beta'),
+    ('rotation_rate', 'gamma'),
+)
+_SECTION_ALIASES = {'rotation_rate': ('rotation_rate', 'rotationRate')}
+# Raw (dotted) sample fields that imu_channel_arrays already turns into columns.
+IMU_SOURCE_FIELDS = frozenset(
+    ['timestamp']
+    + [f'{key}.{axis}' for section, axis in IMU_CHANNELS for key in _SECTION_ALIASES.get(section, (section,))]
+)
+
+
+def _sample_value(sample: Dict, section: str, axis: str) -> float:
+    for key in _SECTION_ALIASES.get(section, (section,)):
+        values = sample.get(key)
+        if isinstance(values, dict):
+            value = values.get(axis)
+            if isinstance(value, (int, float)):
+                return float(value)
+    return np.nan
+
+
+def downsample(values: np.ndarray, max_points: int) -> List[float]:
+    """Bucket means, so a long recording draws as at most `max_points` points."""
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return []
+    if values.size <= max_points:
+        buckets = [values[i:i + 1] for i in range(values.size)]
+    else:
+        buckets = np.array_split(values, max_points)
+    points = []
+    for bucket in buckets:
+        finite = bucket[np.isfinite(bucket)]
+        points.append(round(float(finite.mean()), 4) if finite.size else 0.0)
+    return points
+
+
+def imu_channel_arrays(samples: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """Column arrays (timestamp plus one per channel); missing readings are NaN."""
+    columns = {'timestamp': np.array([float(sample.get('timestamp') or 0.0) for sample in samples], dtype=float)}
+    for section, axis in IMU_CHANNELS:
+        columns[f'{section}.{axis}'] = np.array([_sample_value(sample, section, axis) for sample in samples], dtype=float)
+    return columns
+
+
+def summarize_imu(samples: Optional[Sequence[Dict]], max_points: int = 120) -> Optional[Dict]:
+    """
+    Fixed-size description of an IMU recording: per-channel statistics plus downsampled
+    acceleration-magnitude and gyro-gamma series. Size does not grow with session length.
+    Timestamps are the collector's millisecond clock.
+    """
+    if not samples:
+        return None
+    columns = imu_channel_arrays(samples)
+    return summarize_imu_columns(columns, max_points=max_points)
+
+
+def summarize_imu_columns(columns: Dict[str, np.ndarray], max_points: int = 120) -> Dict:
+    timestamps = columns['timestamp']
+    duration_ms = float(timestamps.max() - timestamps.min()) if timestamps.size > 1 else 0.0
+    channels = {}
+    for section, axis in IMU_CHANNELS:
+        name = f'{section}.{axis}'
+        values = columns[name]
+        finite = values[np.isfinite(values)]
+        if not finite.size:
+            channels[name] = {'min': None, 'max': None, 'mean': None, 'std': None}
+            continue
+        channels[name] = {
+            'min': round(float(finite.min()), 4),
+            'max': round(float(finite.max()), 4),
+            'mean': round(float(finite.mean()), 4),
+            'std': round(float(finite.std()), 4),
+        }
+
+    magnitude = np.sqrt(
+        np.nan_to_num(columns['acceleration.x']) ** 2
+        + np.nan_to_num(columns['acceleration.y']) ** 2
+        + np.nan_to_num(columns['acceleration.z']) ** 2
+    )
+    return {
+        'sample_count': int(timestamps.size),
+        'duration_ms': round(duration_ms, 1),
+        'sample_rate_hz': round((timestamps.size - 1) / (duration_ms / 1000.0), 2) if duration_ms > 0 else None,
+        'channels': channels,
+        'series': {
+            'acceleration_magnitude': downsample(magnitude, max_points),
+            'rotation_rate.gamma': downsample(columns['rotation_rate.gamma'], max_points),
+        },
+    }
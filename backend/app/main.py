@@ -24,10 +24,21 @@ async def lifespan(app: FastAPI):
     if db_manager.pool:
         from app.auth import local_auth_manager
         await local_auth_manager.ensure_development_bootstrap_user()
+        from app.session_manager import session_manager
+        await session_manager.start_invalidation_listener()
+        from app.partitions import partition_manager
+        partition_manager.start()
     from app.rate_limiter import rate_limiter
     rate_limiter.start_cleanup()
     yield
     logger.info("Shutting down VeraProof AI Backend", extra={"event": "app_shutdown"})
+    from app.session_manager import session_manager
+    await session_manager.flush_pending_writes()
+    await session_manager.stop_invalidation_listener()
+    from app.partitions import partition_manager
+    await partition_manager.stop()
+    from app.storage import storage_manager
+    storage_manager.close()
     await db_manager.disconnect()
 
 
@@ -46,9 +57,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Accept-Ranges", "Content-Range", "Content-Disposition"],
 )
 
 
+class DatabaseUnitOfWorkMiddleware:
+    """Share one pooled DB connection across the helper calls made until a request's response starts."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # WebSockets live for the whole capture session and must not pin a pooled connection.
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        async def send_releasing_connection(message):
+            # Hand the connection back before the body goes out: streamed downloads and
+            # BackgroundTasks must not keep a pooled connection checked out.
+            if message["type"] == "http.response.start":
+                await db_manager.release_unit_of_work()
+            await send(message)
+
+        async with db_manager.unit_of_work():
+            await self.app(scope, receive, send_releasing_connection)
+
+
+app.add_middleware(DatabaseUnitOfWorkMiddleware)
+
+
 @app.middleware("http")
 async def security_headers_middleware(request: Request, call_next):
     if request.url.path.startswith("/api/v1") and not await dashboard_session_manager.validate_csrf(request):
@@ -1,15 +1,24 @@
+import asyncio
 import base64
+import contextlib
+import contextvars
+import functools
 import json
 import logging
+import mimetypes
 import os
 import tempfile
 import uuid
-from typing import Any, Dict, Optional
+import zipfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 
 import cv2
 import numpy as np
 
 from app.ai_provider import get_ai_pipeline
+from app.config import settings
 from app.database import db_manager
 from app.models import MediaAnalysisStatus
 from app.quota import quota_manager
@@ -19,6 +28,35 @@ from app.video_utils import extract_sparse_keyframes
 
 logger = logging.getLogger(__name__)
 
+BATCH_READ_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass
+class BatchSource:
+    """One media item of a multipart batch, read on demand through `chunks()`."""
+    filename: str
+    content_type: str
+    media_type: str
+    size: int
+    chunks: Callable[[], AsyncIterator[bytes]]
+
+
+async def _read_chunks(upload) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload.read(BATCH_READ_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _read_zip_entry_chunks(archive: zipfile.ZipFile, entry: zipfile.ZipInfo) -> AsyncIterator[bytes]:
+    with archive.open(entry) as member:
+        while True:
+            chunk = await asyncio.to_thread(member.read, BATCH_READ_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
 
 class MediaAnalysisManager:
     ALLOWED_IMAGE_TYPES = {
@@ -33,9 +71,16 @@ class MediaAnalysisManager:
         'video/quicktime',
         'video/ogg',
     }
+    ZIP_CONTENT_TYPES = {
+        'application/zip',
+        'application/x-zip-compressed',
+    }
     MAX_IMAGE_BYTES = 10 * 1024 * 1024
     MAX_VIDEO_BYTES = 50 * 1024 * 1024
 
+    def __init__(self):
+        self._background_tasks: Set[asyncio.Task] = set()
+
     def _context_environment(self) -> tuple[Optional[str], Optional[str]]:
         context = db_manager.get_request_context()
         return context.get('environment_id'), context.get('environment_slug')
@@ -66,7 +111,6 @@ class MediaAnalysisManager:
         metadata = metadata or {}
         media_type = self.validate_upload(filename, content_type, len(media_bytes))
         job_id = str(uuid.uuid4())
-        environment_id, environment_slug = self._context_environment()
 
         artifact_s3_key = await storage_manager.store_media_artifact(
             tenant_id=tenant_id,
@@ -76,6 +120,127 @@ class MediaAnalysisManager:
             content_type=content_type,
         )
 
+        return await self._insert_job(
+            job_id=job_id,
+            tenant_id=tenant_id,
+            status=MediaAnalysisStatus.PENDING.value,
+            media_type=media_type,
+            content_type=content_type,
+            filename=filename,
+            file_size=len(media_bytes),
+            metadata=metadata,
+            artifact_s3_key=artifact_s3_key,
+        )
+
+    async def create_upload_job(
+        self,
+        tenant_id: str,
+        filename: str,
+        content_type: str,
+        file_size: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Create a job in `pending_upload` and a presigned form the client uploads the media to
+        directly. Processing starts once confirm_upload sees the object in storage.
+        """
+        media_type = self.validate_upload(filename, content_type, file_size)
+        job_id = str(uuid.uuid4())
+        staging_key = storage_manager.media_upload_key(tenant_id, job_id, filename)
+        max_bytes = self.MAX_IMAGE_BYTES if media_type == 'image' else self.MAX_VIDEO_BYTES
+        upload = await storage_manager.create_presigned_upload(staging_key, content_type.lower(), max_bytes)
+        job = await self._insert_job(
+            job_id=job_id,
+            tenant_id=tenant_id,
+            status=MediaAnalysisStatus.PENDING_UPLOAD.value,
+            media_type=media_type,
+            content_type=content_type.lower(),
+            filename=filename,
+            file_size=file_size,
+            metadata=metadata or {},
+            artifact_s3_key=staging_key,
+        )
+        return job, upload
+
+    async def confirm_upload(self, job_id: str, tenant_id: str, role: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start processing a `pending_upload` job once its object exists (upload-complete callback or
+        status poll). Safe to call repeatedly and concurrently: only one caller claims the job.
+        """
+        job = await self.get_job(job_id, tenant_id, role)
+        if not job:
+            raise FileNotFoundError('Media analysis job not found')
+        if job['status'] != MediaAnalysisStatus.PENDING_UPLOAD.value:
+            return job
+
+        uploaded = await storage_manager.stat_artifact(job['artifact_s3_key'])
+        if uploaded is None:
+            expired = await db_manager.fetch_one(
+                """
+                UPDATE media_analysis_jobs
+                SET status = $1, analysis_outcome = 'error', error_message = $2, completed_at = NOW()
+                WHERE job_id = $3 AND status = $4 AND created_at < NOW() - make_interval(secs => $5)
+                RETURNING job_id
+                """,
+                MediaAnalysisStatus.FAILED.value,
+                'Upload was not received before the upload URL expired',
+                job_id,
+                MediaAnalysisStatus.PENDING_UPLOAD.value,
+                float(settings.media_upload_url_expiration_seconds),
+            )
+            return await self.get_job(job_id, tenant_id, role) if expired else job
+
+        claimed = await db_manager.fetch_one(
+            """
+            UPDATE media_analysis_jobs
+            SET status = $1, file_size_bytes = $2
+            WHERE job_id = $3 AND status = $4
+            RETURNING job_id, tenant_id, tenant_environment_id
+            """,
+            MediaAnalysisStatus.PENDING.value,
+            uploaded['size'],
+            job_id,
+            MediaAnalysisStatus.PENDING_UPLOAD.value,
+        )
+        if claimed:
+            self.schedule_job(
+                job_id,
+                tenant_id=str(claimed['tenant_id']),
+                environment_id=str(claimed['tenant_environment_id']) if claimed.get('tenant_environment_id') else None,
+            )
+        return await self.get_job(job_id, tenant_id, role)
+
+    def schedule_job(
+        self,
+        job_id: str,
+        tenant_id: str,
+        environment_id: Optional[str] = None,
+        media_bytes: Optional[bytes] = None,
+    ) -> asyncio.Task:
+        # A fresh context so the job never runs under the scheduling request's scope; the tenant
+        # and environment are passed explicitly instead.
+        task = asyncio.create_task(
+            self.process_job(job_id, tenant_id=tenant_id, environment_id=environment_id, media_bytes=media_bytes),
+            context=contextvars.Context(),
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _insert_job(
+        self,
+        *,
+        job_id: str,
+        tenant_id: str,
+        status: str,
+        media_type: str,
+        content_type: str,
+        filename: str,
+        file_size: int,
+        metadata: Dict[str, Any],
+        artifact_s3_key: Optional[str],
+    ) -> Dict[str, Any]:
+        environment_id, environment_slug = self._context_environment()
         query = """
             INSERT INTO media_analysis_jobs (
                 job_id,
@@ -96,11 +261,11 @@ class MediaAnalysisManager:
             job_id,
             tenant_id,
             environment_id,
-            MediaAnalysisStatus.PENDING.value,
+            status,
             media_type,
             content_type,
             filename,
-            len(media_bytes),
+            file_size,
             json.dumps(metadata),
             artifact_s3_key,
         )
@@ -172,27 +337,254 @@ class MediaAnalysisManager:
 
         return await storage_manager.generate_signed_url(artifact_key)
 
-    async def process_job(self, job_id: str, media_bytes: Optional[bytes] = None):
+    def _is_zip_upload(self, filename: str, content_type: str) -> bool:
+        return (content_type or '').lower() in self.ZIP_CONTENT_TYPES or (filename or '').lower().endswith('.zip')
+
+    @asynccontextmanager
+    async def batch_sources(self, uploads: List[Tuple[str, str, Any]]) -> AsyncIterator[List[BatchSource]]:
+        """
+        List the media items of a multipart batch without reading them into memory.
+
+        `uploads` are (filename, content_type, file) where file has an async `read(size)`, such
+        as FastAPI's UploadFile. ZIP archives are spooled to a temp file and their entries
+        listed; item count and size limits are checked from declared sizes here and enforced
+        again while create_batch streams the bytes. Temp files live until the block exits.
+        """
+        sources: List[BatchSource] = []
+        total_bytes = 0
+
+        def add(filename: str, content_type: str, size: int, chunks: Callable[[], AsyncIterator[bytes]]):
+            nonlocal total_bytes
+            total_bytes += size
+            if len(sources) >= settings.media_batch_max_items:
+                raise ValueError(f'Batch uploads are limited to {settings.media_batch_max_items} files')
+            if total_bytes > settings.media_batch_max_bytes:
+                raise ValueError('Batch upload exceeds the total size limit')
+            try:
+                media_type = self.validate_upload(filename, content_type, size)
+            except ValueError as exc:
+                raise ValueError(f'{filename}: {exc}') from exc
+            sources.append(BatchSource(filename, content_type, media_type, size, chunks))
+
+        with contextlib.ExitStack() as cleanup:
+            for filename, content_type, upload in uploads:
+                if not self._is_zip_upload(filename, content_type):
+                    size = getattr(upload, 'size', None)
+                    if size == 0:
+                        raise ValueError(f'Uploaded file {filename} is empty')
+                    add(filename, content_type, size or 0, functools.partial(_read_chunks, upload))
+                    continue
+
+                spool = cleanup.enter_context(tempfile.TemporaryFile())
+                async for chunk in _read_chunks(upload):
+                    spool.write(chunk)
+                    if spool.tell() > settings.media_batch_max_bytes:
+                        raise ValueError('Batch upload exceeds the total size limit')
+                spool.seek(0)
+                try:
+                    archive = cleanup.enter_context(zipfile.ZipFile(spool))
+                except zipfile.BadZipFile as exc:
+                    raise ValueError(f'{filename}: not a valid ZIP archive') from exc
+
+                for entry in archive.infolist():
+                    entry_name = os.path.basename(entry.filename)
+                    if entry.is_dir() or not entry_name or entry_name.startswith('.') or entry.filename.startswith('__MACOSX/'):
+                        continue
+                    # Declared sizes are checked before anything is inflated, so a hostile archive cannot exhaust the disk.
+                    if entry.file_size > self.MAX_VIDEO_BYTES or total_bytes + entry.file_size > settings.media_batch_max_bytes:
+                        raise ValueError(f'{entry_name}: archive entry exceeds the batch size limit')
+                    entry_type = mimetypes.guess_type(entry_name)[0] or 'application/octet-stream'
+                    add(entry_name, entry_type, entry.file_size, functools.partial(_read_zip_entry_chunks, archive, entry))
+
+            if not sources:
+                raise ValueError('Batch upload did not contain any media files')
+            yield sources
+
+    async def _store_batch_source(self, tenant_id: str, job_id: str, source: BatchSource, budget: List[int]) -> Dict[str, Any]:
+        """
+        Stream one item to storage as it is read, spooling the plaintext to a temp file the decode
+        stage extracts frames from. `budget` is the batch's remaining byte allowance.
+        """
+        suffix = os.path.splitext(source.filename or '')[-1] or '.bin'
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as spool:
+            spool_path = spool.name
+
+            async def spooled_chunks():
+                size = 0
+                async for chunk in source.chunks():
+                    size += len(chunk)
+                    budget[0] -= len(chunk)
+                    # Declared sizes can lie (or be missing), so the limits hold on the bytes actually read.
+                    self.validate_upload(source.filename, source.content_type, size)
+                    if budget[0] < 0:
+                        raise ValueError('Batch upload exceeds the total size limit')
+                    spool.write(chunk)
+                    yield chunk
+                if not size:
+                    raise ValueError('Uploaded media payload was empty')
+
+            try:
+                stored = await storage_manager.store_media_artifact_chunks(
+                    tenant_id=tenant_id,
+                    job_id=job_id,
+                    filename=source.filename,
+                    chunks=spooled_chunks(),
+                    content_type=source.content_type,
+                )
+            except BaseException:
+                self._remove_temp_file(spool_path)
+                raise
+        return {
+            'job_id': job_id,
+            'filename': source.filename,
+            'content_type': source.content_type,
+            'media_type': source.media_type,
+            'artifact_s3_key': stored.key,
+            'file_size': stored.size,
+            'spool_path': spool_path,
+        }
+
+    async def create_batch(
+        self,
+        tenant_id: str,
+        sources: List[BatchSource],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Store each source as it is read, then register a batch and one pending job per item.
+
+        `sources` come from batch_sources, so callers can check quota against the real item
+        count before anything is stored. Returns the serialized batch plus the work items to
+        hand to process_batch; each holds a spooled copy of its media for frame extraction.
+        """
+        metadata = metadata or {}
+        items: List[Dict[str, Any]] = []
+        budget = [settings.media_batch_max_bytes]
+        try:
+            for source in sources:
+                items.append(await self._store_batch_source(tenant_id, str(uuid.uuid4()), source, budget))
+            return await self._register_batch(tenant_id, items, metadata), items
+        except BaseException:
+            await self._discard_batch_items(items)
+            raise
+
+    async def _register_batch(self, tenant_id: str, items: List[Dict[str, Any]], metadata: Dict[str, Any]) -> Dict[str, Any]:
+        batch_id = str(uuid.uuid4())
+        environment_id, environment_slug = self._context_environment()
+
+        await db_manager.execute_query(
+            """
+            INSERT INTO media_analysis_batches (
+                batch_id,
+                tenant_id,
+                tenant_environment_id,
+                status,
+                total_items,
+                metadata
+            ) VALUES ($1, $2, $3, $4, $5, $6::jsonb)
+            """,
+            batch_id,
+            tenant_id,
+            environment_id,
+            MediaAnalysisStatus.PENDING.value,
+            len(items),
+            json.dumps(metadata),
+        )
+
+        # One round trip for the whole batch regardless of item count.
+        await db_manager.execute_query(
+            """
+            INSERT INTO media_analysis_jobs (
+                job_id,
+                tenant_id,
+                tenant_environment_id,
+                batch_id,
+                status,
+                media_type,
+                content_type,
+                source_filename,
+                file_size_bytes,
+                artifact_s3_key,
+                metadata
+            )
+            SELECT item.job_id, $1, $2, $3, $4, item.media_type, item.content_type, item.source_filename,
+                   item.file_size_bytes, item.artifact_s3_key, $5::jsonb
+            FROM unnest($6::uuid[], $7::text[], $8::text[], $9::text[], $10::bigint[], $11::text[])
+                AS item(job_id, media_type, content_type, source_filename, file_size_bytes, artifact_s3_key)
+            """,
+            tenant_id,
+            environment_id,
+            batch_id,
+            MediaAnalysisStatus.PENDING.value,
+            json.dumps(metadata),
+            [item['job_id'] for item in items],
+            [item['media_type'] for item in items],
+            [item['content_type'] for item in items],
+            [item['filename'] for item in items],
+            [item['file_size'] for item in items],
+            [item['artifact_s3_key'] for item in items],
+        )
+
+        batch = await self.get_batch(batch_id, tenant_id)
+        if not batch:
+            raise ValueError('Failed to create media analysis batch')
+        batch['environment'] = environment_slug
+        return batch
+
+    async def _discard_batch_items(self, items: List[Dict[str, Any]]):
+        """Best-effort cleanup of items stored for a batch that was never registered."""
+        for item in items:
+            self._remove_temp_file(item['spool_path'])
+            try:
+                await storage_manager.delete_artifact(item['artifact_s3_key'])
+            except Exception:
+                logger.warning('Failed to delete orphaned batch artifact', extra={'job_id': item['job_id']})
+
+    async def get_batch(self, batch_id: str, tenant_id: str, role: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        batch = await db_manager.fetch_one('SELECT * FROM media_analysis_batches WHERE batch_id = $1', batch_id)
+        if not batch:
+            return None
+
+        if role != 'Master_Admin' and str(batch['tenant_id']) != str(tenant_id):
+            return None
+
+        jobs = await db_manager.fetch_all(
+            """
+            SELECT maj.*, te.slug AS environment
+            FROM media_analysis_jobs maj
+            LEFT JOIN tenant_environments te ON te.tenant_environment_id = maj.tenant_environment_id
+            WHERE maj.batch_id = $1
+            ORDER BY maj.source_filename ASC
+            """,
+            batch_id,
+        )
+        return self._serialize_batch(batch, jobs)
+
+    async def process_job(
+        self,
+        job_id: str,
+        tenant_id: str,
+        environment_id: Optional[str] = None,
+        media_bytes: Optional[bytes] = None,
+    ):
+        # Set the tenant before the first query: row-level security hides the job otherwise.
+        db_manager.set_request_context(tenant_id=tenant_id, environment_id=environment_id, actor_type='service_account')
         job_row = await db_manager.fetch_one('SELECT * FROM media_analysis_jobs WHERE job_id = $1', job_id)
         if not job_row:
             logger.error('Media analysis job disappeared before processing', extra={'job_id': job_id})
             return
 
-        tenant_id = str(job_row['tenant_id'])
-        db_manager.set_request_context(
-            tenant_id=tenant_id,
-            environment_id=str(job_row['tenant_environment_id']) if job_row.get('tenant_environment_id') else None,
-            actor_type='service_account',
-        )
-
         try:
             await self._update_status(job_id, MediaAnalysisStatus.ANALYZING.value)
             metadata = job_row.get('metadata') or {}
-            frames_b64 = self._extract_frames(
-                media_type=job_row['media_type'],
-                source_filename=job_row['source_filename'],
-                media_bytes=media_bytes,
-            )
+            if media_bytes is None:
+                frames_b64 = await self._extract_uploaded_frames(job_id, tenant_id, job_row)
+            else:
+                frames_b64 = self._extract_frames(
+                    media_type=job_row['media_type'],
+                    source_filename=job_row['source_filename'],
+                    media_bytes=media_bytes,
+                )
 
             if not frames_b64:
                 raise ValueError('No analyzable frames were extracted from the uploaded media')
@@ -201,73 +593,311 @@ class MediaAnalysisManager:
             is_spoofed, vision_context = await vision_engine.extract_context(frames_b64, metadata)
 
             if is_spoofed:
-                ai_score = 0.0
-                tier_2_score = 0
-                ai_explanation = vision_context if isinstance(vision_context, dict) else {'summary': str(vision_context)}
-                reasoning = ai_explanation.get('message') or ai_explanation.get('summary') or 'Spoof indicators detected'
-                analysis_outcome = 'spoof_detected'
-                final_trust_score = 0
+                result = self._build_spoof_result(vision_context)
             else:
-                tier_2_score = 100 if isinstance(vision_context, dict) and vision_context.get('status') == 'success' else 0
                 ai_score, ai_explanation = await genai_engine.evaluate_trust(
                     frames_b64,
                     vision_context,
                     metadata,
                     {'has_data': False},
                 )
-                if ai_score < 0:
-                    raise ValueError(ai_explanation.get('error') or 'AI evaluation failed')
+                result = self._build_genai_result(vision_context, ai_score, ai_explanation)
+
+            await self._complete_job(job_id, tenant_id, result)
+            logger.info('Media analysis job completed', extra={'job_id': job_id, 'tenant_id': tenant_id})
+        except Exception as exc:
+            logger.error('Media analysis job failed', exc_info=True, extra={'job_id': job_id, 'tenant_id': tenant_id})
+            await self._fail_job(job_id, exc)
+
+    def _build_spoof_result(self, vision_context: Any) -> Dict[str, Any]:
+        ai_explanation = vision_context if isinstance(vision_context, dict) else {'summary': str(vision_context)}
+        return {
+            'analysis_outcome': 'spoof_detected',
+            'tier_2_score': 0,
+            'final_trust_score': 0,
+            'ai_score': 0.0,
+            'reasoning': ai_explanation.get('message') or ai_explanation.get('summary') or 'Spoof indicators detected',
+            'ai_explanation': ai_explanation,
+            'vision_context': vision_context,
+        }
+
+    def _build_genai_result(self, vision_context: Any, ai_score: float, ai_explanation: Dict[str, Any]) -> Dict[str, Any]:
+        if ai_score < 0:
+            raise ValueError(ai_explanation.get('error') or 'AI evaluation failed')
+
+        final_trust_score = int(round(ai_score))
+        return {
+            'analysis_outcome': 'authentic' if evaluate_trust_status(final_trust_score) else 'suspicious',
+            'tier_2_score': 100 if isinstance(vision_context, dict) and vision_context.get('status') == 'success' else 0,
+            'final_trust_score': final_trust_score,
+            'ai_score': ai_score,
+            'reasoning': ai_explanation.get('summary') or 'Analysis completed',
+            'ai_explanation': ai_explanation,
+            'vision_context': vision_context,
+        }
+
+    async def _complete_job(self, job_id: str, tenant_id: str, result: Dict[str, Any]):
+        await db_manager.execute_query(
+            """
+            UPDATE media_analysis_jobs
+            SET
+                status = $1,
+                analysis_outcome = $2,
+                tier_2_score = $3,
+                final_trust_score = $4,
+                ai_score = $5,
+                reasoning = $6,
+                ai_explanation = $7::jsonb,
+                vision_context = $8::jsonb,
+                error_message = NULL,
+                completed_at = NOW()
+            WHERE job_id = $9
+            """,
+            MediaAnalysisStatus.COMPLETED.value,
+            result['analysis_outcome'],
+            result['tier_2_score'],
+            result['final_trust_score'],
+            result['ai_score'],
+            result['reasoning'],
+            json.dumps(result['ai_explanation']),
+            json.dumps(result['vision_context']),
+            job_id,
+        )
 
-                final_trust_score = int(round(ai_score))
-                reasoning = ai_explanation.get('summary') or 'Analysis completed'
-                analysis_outcome = 'authentic' if evaluate_trust_status(final_trust_score) else 'suspicious'
+        await quota_manager.decrement_quota(tenant_id)
+
+    async def _fail_job(self, job_id: str, exc: Exception):
+        await db_manager.execute_query(
+            """
+            UPDATE media_analysis_jobs
+            SET
+                status = $1,
+                analysis_outcome = $2,
+                error_message = $3,
+                completed_at = NOW()
+            WHERE job_id = $4
+            """,
+            MediaAnalysisStatus.FAILED.value,
+            'error',
+            str(exc)[:500],
+            job_id,
+        )
+
+    def schedule_batch(self, batch_id: str, items: List[Dict[str, Any]], tenant_id: str, environment_id: Optional[str] = None) -> asyncio.Task:
+        # A fresh context: the batch outlives the request, so it must not share its unit of work.
+        task = asyncio.create_task(
+            self.process_batch(batch_id, items, tenant_id=tenant_id, environment_id=environment_id),
+            context=contextvars.Context(),
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def process_batch(self, batch_id: str, items: List[Dict[str, Any]], tenant_id: str, environment_id: Optional[str] = None):
+        """
+        Run a batch through decode -> Rekognition -> GenAI stages connected by bounded queues.
+
+        Each stage has its own worker pool so throughput follows provider concurrency:
+        decoding the next files overlaps with Rekognition and GenAI calls for earlier ones,
+        and a slow stage applies back-pressure instead of buffering the whole batch.
+        Results are persisted per item as they finish.
+        """
+        try:
+            await self._run_batch(batch_id, items, tenant_id, environment_id)
+        finally:
+            # Spools the decode stage never reached (abort, missing batch row).
+            for item in items:
+                if item.get('spool_path'):
+                    self._remove_temp_file(item.pop('spool_path'))
+
+    async def _run_batch(self, batch_id: str, items: List[Dict[str, Any]], tenant_id: str, environment_id: Optional[str]):
+        # Set the tenant before the first query: row-level security hides the batch otherwise.
+        db_manager.set_request_context(tenant_id=tenant_id, environment_id=environment_id, actor_type='service_account')
+        batch_row = await db_manager.fetch_one('SELECT * FROM media_analysis_batches WHERE batch_id = $1', batch_id)
+        if not batch_row:
+            logger.error('Media analysis batch disappeared before processing', extra={'batch_id': batch_id})
+            return
+
+        metadata = batch_row.get('metadata') or {}
+
+        try:
+            await self._update_batch_status(batch_id, MediaAnalysisStatus.ANALYZING.value)
+            vision_engine, genai_engine = get_ai_pipeline()
+
+            source_queue: asyncio.Queue = asyncio.Queue()
+            for item in items:
+                source_queue.put_nowait(item)
+            vision_queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.media_batch_queue_size))
+            genai_queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.media_batch_queue_size))
+
+            decode_workers = max(1, settings.media_batch_decode_workers)
+            vision_workers = max(1, settings.media_batch_vision_workers)
+            genai_workers = max(1, settings.media_batch_genai_workers)
+
+            async def decode_stage():
+                await asyncio.gather(*[
+                    self._batch_decode_worker(batch_id, tenant_id, source_queue, vision_queue)
+                    for _ in range(decode_workers)
+                ])
+                for _ in range(vision_workers):
+                    await vision_queue.put(None)
+
+            async def vision_stage():
+                await asyncio.gather(*[
+                    self._batch_vision_worker(batch_id, tenant_id, vision_engine, metadata, vision_queue, genai_queue)
+                    for _ in range(vision_workers)
+                ])
+                for _ in range(genai_workers):
+                    await genai_queue.put(None)
+
+            async def genai_stage():
+                await asyncio.gather(*[
+                    self._batch_genai_worker(batch_id, tenant_id, genai_engine, metadata, genai_queue)
+                    for _ in range(genai_workers)
+                ])
+
+            stages = [asyncio.create_task(stage()) for stage in (decode_stage, vision_stage, genai_stage)]
+            try:
+                await asyncio.gather(*stages)
+            finally:
+                # gather leaves the other stages running when one raises, and they would then
+                # block forever on a queue nobody drains. Stop them before recording the failure.
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
 
             await db_manager.execute_query(
                 """
-                UPDATE media_analysis_jobs
+                UPDATE media_analysis_batches
                 SET
-                    status = $1,
-                    analysis_outcome = $2,
-                    tier_2_score = $3,
-                    final_trust_score = $4,
-                    ai_score = $5,
-                    reasoning = $6,
-                    ai_explanation = $7::jsonb,
-                    vision_context = $8::jsonb,
-                    error_message = NULL,
+                    status = CASE WHEN completed_items > 0 OR total_items = 0 THEN $1 ELSE $2 END,
                     completed_at = NOW()
-                WHERE job_id = $9
+                WHERE batch_id = $3
                 """,
                 MediaAnalysisStatus.COMPLETED.value,
-                analysis_outcome,
-                tier_2_score,
-                final_trust_score,
-                ai_score,
-                reasoning,
-                json.dumps(ai_explanation),
-                json.dumps(vision_context),
-                job_id,
+                MediaAnalysisStatus.FAILED.value,
+                batch_id,
             )
-
-            await quota_manager.decrement_quota(tenant_id)
-            logger.info('Media analysis job completed', extra={'job_id': job_id, 'tenant_id': tenant_id})
+            logger.info('Media analysis batch completed', extra={'batch_id': batch_id, 'tenant_id': tenant_id, 'items': len(items)})
         except Exception as exc:
-            logger.error('Media analysis job failed', exc_info=True, extra={'job_id': job_id, 'tenant_id': tenant_id})
+            logger.error('Media analysis batch failed', exc_info=True, extra={'batch_id': batch_id, 'tenant_id': tenant_id})
+            # Items not yet picked up, or cut off mid-pipeline, would otherwise never finish.
             await db_manager.execute_query(
                 """
-                UPDATE media_analysis_jobs
-                SET
-                    status = $1,
-                    analysis_outcome = $2,
-                    error_message = $3,
-                    completed_at = NOW()
-                WHERE job_id = $4
+                WITH abandoned AS (
+                    UPDATE media_analysis_jobs
+                    SET status = $1, analysis_outcome = 'error', error_message = $2, completed_at = NOW()
+                    WHERE batch_id = $3 AND status NOT IN ($1, $4)
+                    RETURNING job_id
+                )
+                UPDATE media_analysis_batches
+                SET status = $1, failed_items = failed_items + (SELECT COUNT(*) FROM abandoned), completed_at = NOW()
+                WHERE batch_id = $3
                 """,
                 MediaAnalysisStatus.FAILED.value,
-                'error',
-                str(exc)[:500],
-                job_id,
+                f'Batch processing aborted: {exc}'[:500],
+                batch_id,
+                MediaAnalysisStatus.COMPLETED.value,
+            )
+
+    async def _batch_decode_worker(self, batch_id: str, tenant_id: str, source_queue: asyncio.Queue, vision_queue: asyncio.Queue):
+        while True:
+            try:
+                item = source_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            job_id = item['job_id']
+            spool_path = item.pop('spool_path', None)
+            try:
+                await self._update_status(job_id, MediaAnalysisStatus.ANALYZING.value)
+                frames_b64 = await asyncio.to_thread(self._extract_frames_from_path, item['media_type'], spool_path)
+                if not frames_b64:
+                    raise ValueError('No analyzable frames were extracted from the uploaded media')
+            except Exception as exc:
+                await self._fail_batch_item(batch_id, job_id, exc)
+                continue
+            finally:
+                if spool_path:
+                    self._remove_temp_file(spool_path)
+
+            await vision_queue.put({'job_id': job_id, 'frames_b64': frames_b64})
+
+    async def _batch_vision_worker(
+        self,
+        batch_id: str,
+        tenant_id: str,
+        vision_engine,
+        metadata: Dict[str, Any],
+        vision_queue: asyncio.Queue,
+        genai_queue: asyncio.Queue,
+    ):
+        while True:
+            work = await vision_queue.get()
+            if work is None:
+                return
+
+            try:
+                is_spoofed, vision_context = await vision_engine.extract_context(work['frames_b64'], metadata)
+                if is_spoofed:
+                    await self._complete_batch_item(batch_id, work['job_id'], tenant_id, self._build_spoof_result(vision_context))
+                    continue
+            except Exception as exc:
+                await self._fail_batch_item(batch_id, work['job_id'], exc)
+                continue
+
+            work['vision_context'] = vision_context
+            await genai_queue.put(work)
+
+    async def _batch_genai_worker(
+        self,
+        batch_id: str,
+        tenant_id: str,
+        genai_engine,
+        metadata: Dict[str, Any],
+        genai_queue: asyncio.Queue,
+    ):
+        while True:
+            work = await genai_queue.get()
+            if work is None:
+                return
+
+            try:
+                ai_score, ai_explanation = await genai_engine.evaluate_trust(
+                    work['frames_b64'],
+                    work['vision_context'],
+                    metadata,
+                    {'has_data': False},
+                )
+                result = self._build_genai_result(work['vision_context'], ai_score, ai_explanation)
+                await self._complete_batch_item(batch_id, work['job_id'], tenant_id, result)
+            except Exception as exc:
+                await self._fail_batch_item(batch_id, work['job_id'], exc)
+
+    async def _complete_batch_item(self, batch_id: str, job_id: str, tenant_id: str, result: Dict[str, Any]):
+        await self._complete_job(job_id, tenant_id, result)
+        await db_manager.execute_query(
+            'UPDATE media_analysis_batches SET completed_items = completed_items + 1 WHERE batch_id = $1',
+            batch_id,
+        )
+
+    async def _fail_batch_item(self, batch_id: str, job_id: str, exc: Exception):
+        logger.error('Media analysis batch item failed', exc_info=exc, extra={'batch_id': batch_id, 'job_id': job_id})
+        try:
+            await self._fail_job(job_id, exc)
+            await db_manager.execute_query(
+                'UPDATE media_analysis_batches SET failed_items = failed_items + 1 WHERE batch_id = $1',
+                batch_id,
             )
+        except Exception:
+            logger.error('Failed to record batch item failure', exc_info=True, extra={'batch_id': batch_id, 'job_id': job_id})
+
+    async def _update_batch_status(self, batch_id: str, status: str):
+        await db_manager.execute_query(
+            'UPDATE media_analysis_batches SET status = $1 WHERE batch_id = $2',
+            status,
+            batch_id,
+        )
 
     async def _update_status(self, job_id: str, status: str):
         await db_manager.execute_query(
@@ -276,6 +906,49 @@ class MediaAnalysisManager:
             job_id,
         )
 
+    async def _extract_uploaded_frames(self, job_id: str, tenant_id: str, job_row: Dict[str, Any]) -> list[str]:
+        """
+        Read a directly uploaded object once: re-store it encrypted under the tenant key while
+        spooling it to a temp file for frame extraction, then drop the staged upload.
+        """
+        staging_key = job_row['artifact_s3_key']
+        stream = await storage_manager.open_artifact_stream(staging_key)
+        suffix = os.path.splitext(job_row['source_filename'] or '')[-1] or '.bin'
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
+            tmp_path = tmp_file.name
+
+            async def spool():
+                async for chunk in stream.iter_range():
+                    tmp_file.write(chunk)
+                    yield chunk
+
+            try:
+                stored = await storage_manager.store_media_artifact_chunks(
+                    tenant_id=tenant_id,
+                    job_id=job_id,
+                    filename=job_row['source_filename'],
+                    chunks=spool(),
+                    content_type=job_row['content_type'],
+                )
+            except BaseException:
+                self._remove_temp_file(tmp_path)
+                raise
+
+        try:
+            await db_manager.execute_query(
+                'UPDATE media_analysis_jobs SET artifact_s3_key = $1, file_size_bytes = $2 WHERE job_id = $3',
+                stored.key,
+                stored.size,
+                job_id,
+            )
+            try:
+                await storage_manager.delete_artifact(staging_key)
+            except Exception:
+                logger.warning('Failed to delete staged media upload', extra={'job_id': job_id, 'key': staging_key})
+            return await asyncio.to_thread(self._extract_frames_from_path, job_row['media_type'], tmp_path)
+        finally:
+            self._remove_temp_file(tmp_path)
+
     def _extract_frames(self, media_type: str, source_filename: str, media_bytes: Optional[bytes]) -> list[str]:
         if not media_bytes:
             raise ValueError('Uploaded media payload was not available for analysis')
@@ -290,12 +963,21 @@ class MediaAnalysisManager:
             tmp_path = tmp_file.name
 
         try:
-            return extract_sparse_keyframes(tmp_path, num_frames=5)
+            return self._extract_frames_from_path(media_type, tmp_path)
         finally:
-            try:
-                os.remove(tmp_path)
-            except OSError:
-                logger.warning('Failed to remove temporary analysis file', extra={'path': tmp_path})
+            self._remove_temp_file(tmp_path)
+
+    def _extract_frames_from_path(self, media_type: str, path: str) -> list[str]:
+        if media_type == 'image':
+            with open(path, 'rb') as media_file:
+                return self._extract_image_frames(media_file.read())
+        return extract_sparse_keyframes(path, num_frames=5)
+
+    def _remove_temp_file(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            logger.warning('Failed to remove temporary analysis file', extra={'path': path})
 
     def _extract_image_frames(self, media_bytes: bytes) -> list[str]:
         image_array = np.frombuffer(media_bytes, dtype=np.uint8)
@@ -347,6 +1029,30 @@ class MediaAnalysisManager:
             'created_at': job.get('created_at'),
             'completed_at': job.get('completed_at'),
             'environment': job.get('environment'),
+            'batch_id': str(job['batch_id']) if job.get('batch_id') else None,
+        }
+
+    def _serialize_batch(self, batch: Dict[str, Any], jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        total = batch.get('total_items') or 0
+        completed = batch.get('completed_items') or 0
+        failed = batch.get('failed_items') or 0
+        processed = completed + failed
+
+        return {
+            'batch_id': str(batch['batch_id']),
+            'tenant_id': str(batch['tenant_id']),
+            'status': batch.get('status'),
+            'metadata': batch.get('metadata') or {},
+            'progress': {
+                'total': total,
+                'completed': completed,
+                'failed': failed,
+                'pending': max(0, total - processed),
+                'percent': round(100.0 * processed / total, 1) if total else 100.0,
+            },
+            'items': [self._serialize_job(job) for job in jobs],
+            'created_at': batch.get('created_at'),
+            'completed_at': batch.get('completed_at'),
         }
 
 
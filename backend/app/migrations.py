@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import asyncpg
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'db')
+BASELINE_PATH = os.path.join(DB_DIR, 'init.sql')
+MIGRATIONS_DIR = os.path.join(DB_DIR, 'migrations')
+
+# Same lock id the old run-init.sql-on-every-boot path used, so mixed-version deploys still serialise.
+MIGRATION_LOCK_ID = 847321905114
+
+_MIGRATION_FILE_RE = re.compile(r'^(\d{4})_([a-z0-9_]+)\.sql$')
+
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(16) PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        checksum CHAR(64) NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        execution_ms INTEGER
+    )
+"""
+
+_RECORD_SQL = """
+    INSERT INTO schema_migrations (version, name, checksum, applied_at, execution_ms)
+    VALUES ($1, $2, $3, NOW(), $4)
+    ON CONFLICT (version) DO UPDATE SET
+        name = EXCLUDED.name,
+        checksum = EXCLUDED.checksum,
+        applied_at = EXCLUDED.applied_at,
+        execution_ms = EXCLUDED.execution_ms
+"""
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    sql: str
+    # The baseline (db/init.sql) is written to be idempotent and is re-applied whenever it
+    # changes; numbered migrations run exactly once and must not be edited afterwards.
+    repeatable: bool = False
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode('utf-8')).hexdigest()
+
+
+def _read(path: str) -> str:
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return f.read()
+
+
+def load_migrations(baseline_path: str = BASELINE_PATH, migrations_dir: str = MIGRATIONS_DIR) -> List[Migration]:
+    """The baseline followed by db/migrations/NNNN_name.sql in version order."""
+    migrations = [Migration('0000', 'baseline', _read(baseline_path), repeatable=True)]
+    if os.path.isdir(migrations_dir):
+        seen = set()
+        for file_name in sorted(os.listdir(migrations_dir)):
+            if not file_name.endswith('.sql'):
+                continue
+            match = _MIGRATION_FILE_RE.match(file_name)
+            if not match:
+                raise MigrationError(f'Migration file {file_name!r} does not match NNNN_name.sql')
+            version, name = match.groups()
+            if version in seen or version == '0000':
+                raise MigrationError(f'Duplicate migration version {version}')
+            seen.add(version)
+            migrations.append(Migration(version, name, _read(os.path.join(migrations_dir, file_name))))
+    return migrations
+
+
+class MigrationRunner:
+    """
+    Versioned schema migrations recorded in schema_migrations.
+
+    Startup calls `ensure_current`, which costs one SELECT when the database is up to date.
+    Pending work is applied under an advisory lock (or left to `python -m app.migrations migrate`
+    when DB_AUTO_MIGRATE is off), each migration in its own transaction.
+    """
+
+    def __init__(self, migrations: Optional[List[Migration]] = None):
+        self._migrations = migrations
+
+    @property
+    def migrations(self) -> List[Migration]:
+        if self._migrations is None:
+            self._migrations = load_migrations()
+        return self._migrations
+
+    async def applied(self, conn) -> Dict[str, str]:
+        """version -> checksum of applied migrations; empty if the table does not exist yet."""
+        exists = await conn.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        if not exists:
+            return {}
+        rows = await conn.fetch('SELECT version, checksum FROM schema_migrations')
+        return {row['version']: row['checksum'].strip() for row in rows}
+
+    def pending(self, applied: Dict[str, str]) -> List[Migration]:
+        pending = []
+        for migration in self.migrations:
+            checksum = applied.get(migration.version)
+            if checksum is None:
+                pending.append(migration)
+            elif checksum != migration.checksum:
+                if not migration.repeatable:
+                    raise MigrationError(
+                        f'Migration {migration.version}_{migration.name} was edited after it was applied; '
+                        'add a new migration instead'
+                    )
+                pending.append(migration)
+        return pending
+
+    async def migrate(self, conn) -> List[Migration]:
+        """Apply every pending migration. Safe to run from several processes at once."""
+        await conn.fetchval('SELECT pg_advisory_lock($1)', MIGRATION_LOCK_ID)
+        try:
+            # Re-check under the lock: another worker may have just finished.
+            pending = self.pending(await self.applied(conn))
+            if not pending:
+                return []
+            await conn.execute(_CREATE_TABLE_SQL)
+            for migration in pending:
+                started = time.perf_counter()
+                async with conn.transaction():
+                    await conn.execute(migration.sql)
+                    execution_ms = int((time.perf_counter() - started) * 1000)
+                    await conn.execute(_RECORD_SQL, migration.version, migration.name, migration.checksum, execution_ms)
+                logger.info('Applied schema migration', extra={'version': migration.version, 'migration': migration.name, 'execution_ms': execution_ms})
+            return pending
+        finally:
+            await conn.fetchval('SELECT pg_advisory_unlock($1)', MIGRATION_LOCK_ID)
+
+    async def ensure_current(self, conn, apply: bool = True) -> List[Migration]:
+        pending = self.pending(await self.applied(conn))
+        if not pending:
+            logger.info('Database schema is up to date', extra={'version': self.migrations[-1].version})
+            return []
+        if not apply:
+            raise MigrationError(
+                f'{len(pending)} schema migration(s) pending ({", ".join(m.version for m in pending)}); '
+                'run `python -m app.migrations migrate`'
+            )
+        return await self.migrate(conn)
+
+
+migration_runner = MigrationRunner()
+
+
+async def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Apply or inspect database schema migrations')
+    parser.add_argument('command', choices=['migrate', 'status'])
+    args = parser.parse_args(argv)
+
+    conn = await asyncpg.connect(settings.database_url)
+    try:
+        if args.command == 'status':
+            applied = await migration_runner.applied(conn)
+            pending = {m.version for m in migration_runner.pending(applied)}
+            for migration in migration_runner.migrations:
+                state = 'pending' if migration.version in pending else 'applied'
+                print(f'{migration.version}  {migration.name:<40} {state}')
+        else:
+            applied = await migration_runner.migrate(conn)
+            print(f'Applied {len(applied)} migration(s)' if applied else 'Database schema is up to date')
+    finally:
+        await conn.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -23,6 +23,7 @@ class VerificationStatus(str, Enum):
 
 
 class MediaAnalysisStatus(str, Enum):
+    PENDING_UPLOAD = 'pending_upload'
     PENDING = 'pending'
     ANALYZING = 'analyzing'
     COMPLETED = 'completed'
@@ -107,6 +108,33 @@ class MediaAnalysisJob(BaseModel):
     error_message: Optional[str] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
+    batch_id: Optional[str] = None
+
+
+class MediaUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    file_size_bytes: int
+    metadata: Optional[Dict[str, Any]] = {}
+
+
+class MediaAnalysisBatchProgress(BaseModel):
+    total: int
+    completed: int
+    failed: int
+    pending: int
+    percent: float
+
+
+class MediaAnalysisBatch(BaseModel):
+    batch_id: str
+    tenant_id: str
+    status: str
+    metadata: Dict[str, Any] = {}
+    progress: MediaAnalysisBatchProgress
+    items: List[MediaAnalysisJob] = []
+    created_at: datetime
+    completed_at: Optional[datetime] = None
 
 
 class WebhookPayload(BaseModel):
@@ -0,0 +1,134 @@
+import asyncio
+import contextvars
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.database import db_manager
+
+logger = logging.getLogger(__name__)
+
+# Monthly range-partitioned tables and their partition key (see db/init.sql).
+PARTITIONED_TABLES = {
+    'audit_events': 'created_at',
+    'usage_logs': 'timestamp',
+    'webhook_logs': 'created_at',
+}
+
+RETENTION_MODES = ('drop', 'detach')
+
+_UPPER_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+
+_LIST_PARTITIONS_SQL = """
+    SELECT child.relname AS partition_name,
+           pg_get_expr(child.relpartbound, child.oid) AS bound
+    FROM pg_inherits i
+    JOIN pg_class parent ON parent.oid = i.inhparent
+    JOIN pg_class child ON child.oid = i.inhrelid
+    WHERE parent.oid = to_regclass($1)
+    ORDER BY child.relname
+"""
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def partition_upper_bound(bound: str) -> Optional[datetime]:
+    """Exclusive upper bound of a range partition, or None for DEFAULT / MAXVALUE partitions."""
+    match = _UPPER_BOUND_RE.search(bound or '')
+    if not match:
+        return None
+    return datetime.fromisoformat(match.group(1))
+
+
+class PartitionManager:
+    """
+    Keeps the monthly log partitions ahead of time and enforces retention.
+
+    A maintenance pass creates partitions `partition_months_ahead` months into the future
+    and removes every partition whose whole range is older than `artifact_retention_days`,
+    detaching it (and dropping it unless `partition_retention_mode` is 'detach'). Retention
+    is a catalog operation per month instead of a DELETE over the table.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def ensure_future_partitions(self, months_ahead: Optional[int] = None) -> Dict[str, int]:
+        months_ahead = settings.partition_months_ahead if months_ahead is None else months_ahead
+        created = {}
+        for table in PARTITIONED_TABLES:
+            created[table] = int(await db_manager.fetch_val('SELECT app.ensure_monthly_partitions($1, $2)', table, months_ahead) or 0)
+        return created
+
+    async def list_partitions(self, table: str) -> List[Dict[str, Any]]:
+        rows = await db_manager.fetch_all(_LIST_PARTITIONS_SQL, table)
+        return [
+            {
+                'partition_name': row['partition_name'],
+                'bound': row['bound'],
+                'upper_bound': partition_upper_bound(row['bound']),
+            }
+            for row in rows
+        ]
+
+    async def apply_retention(
+        self,
+        retention_days: Optional[int] = None,
+        mode: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        retention_days = settings.artifact_retention_days if retention_days is None else retention_days
+        mode = mode or settings.partition_retention_mode
+        if mode not in RETENTION_MODES:
+            raise ValueError(f'partition_retention_mode must be one of {RETENTION_MODES}, got {mode!r}')
+        cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+
+        removed = []
+        for table in PARTITIONED_TABLES:
+            for partition in await self.list_partitions(table):
+                upper_bound = partition['upper_bound']
+                if upper_bound is None or upper_bound > cutoff:
+                    continue
+                name = partition['partition_name']
+                async with db_manager.transaction() as conn:
+                    # Detaching locks the parent; give up rather than queue behind long-running readers.
+                    await conn.execute("SET LOCAL lock_timeout = '5s'")
+                    await conn.execute(f'ALTER TABLE {_quote_ident(table)} DETACH PARTITION {_quote_ident(name)}')
+                    if mode == 'drop':
+                        await conn.execute(f'DROP TABLE {_quote_ident(name)}')
+                removed.append(name)
+                logger.info('Log partition past retention removed', extra={'partition': name, 'mode': mode, 'cutoff': cutoff.isoformat()})
+        return removed
+
+    async def run_maintenance(self) -> Dict[str, Any]:
+        created = await self.ensure_future_partitions()
+        removed = await self.apply_retention()
+        return {'created': created, 'removed': removed}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._maintenance_loop(), context=contextvars.Context())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _maintenance_loop(self):
+        while True:
+            try:
+                await self.run_maintenance()
+            except Exception as e:
+                logger.error(f'Partition maintenance failed: {e}')
+            await asyncio.sleep(settings.partition_maintenance_interval_seconds)
+
+
+partition_manager = PartitionManager()
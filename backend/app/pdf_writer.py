@@ -0,0 +1,151 @@
+import textwrap
+import zlib
+from typing import Dict, List, Sequence
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+
+_CATALOG_ID = 1
+_PAGES_ID = 2
+_FONT_ID = 3
+
+
+def _escape(text: str) -> bytes:
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)').replace('\r', ' ')
+    return escaped.encode('latin-1', errors='replace')
+
+
+class StreamingPdfWriter:
+    """
+    Minimal PDF 1.4 writer for text reports.
+
+    Each page is compressed (FlateDecode) and written out as soon as it is full, so memory
+    holds one page of drawing commands; `drain()` hands back the bytes produced so far. The
+    page tree, catalog and cross-reference table are written by `close()`.
+    """
+
+    def __init__(self, *, font_size: int = 10, leading: int = 14, margin: int = 40, wrap_width: int = 100, lines_per_page: int = 48):
+        self.font_size = font_size
+        self.leading = leading
+        self.margin = margin
+        self.wrap_width = wrap_width
+        self._top = PAGE_HEIGHT - 32
+        self._bottom = self._top - (lines_per_page - 1) * leading
+        self._pending = bytearray()
+        self._position = 0
+        self._offsets: Dict[int, int] = {}
+        self._next_id = _FONT_ID + 1
+        self._page_ids: List[int] = []
+        self._commands: List[bytes] = []
+        self._y = None
+        self._in_text = False
+        self._closed = False
+
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._write_object(_FONT_ID, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    def _write(self, data: bytes):
+        self._pending += data
+        self._position += len(data)
+
+    def _write_object(self, object_id: int, body: bytes):
+        self._offsets[object_id] = self._position
+        self._write(f'{object_id} 0 obj\n'.encode('ascii') + body + b'\nendobj\n')
+
+    def _allocate(self) -> int:
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def drain(self) -> bytes:
+        data = bytes(self._pending)
+        self._pending.clear()
+        return data
+
+    def _begin_text(self):
+        if not self._in_text:
+            self._commands.append(f'BT /F1 {self.font_size} Tf {self.leading} TL {self.margin} {self._y} Td'.encode('ascii'))
+            self._in_text = True
+
+    def _end_text(self):
+        if self._in_text:
+            self._commands.append(b'ET')
+            self._in_text = False
+
+    def _ensure_room(self, height: int):
+        if self._y is None or self._y - height < self._bottom - self.leading:
+            self._finish_page()
+            self._y = self._top
+
+    def _finish_page(self):
+        if self._y is None:
+            return
+        self._end_text()
+        stream = zlib.compress(b'\n'.join(self._commands), 6)
+        content_id, page_id = self._allocate(), self._allocate()
+        self._write_object(
+            content_id,
+            f'<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n'.encode('ascii') + stream + b'\nendstream',
+        )
+        self._write_object(
+            page_id,
+            (
+                f'<< /Type /Page /Parent {_PAGES_ID} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+                f'/Resources << /Font << /F1 {_FONT_ID} 0 R >> >> /Contents {content_id} 0 R >>'
+            ).encode('ascii'),
+        )
+        self._page_ids.append(page_id)
+        self._commands = []
+        self._y = None
+
+    def text(self, line: str):
+        """Add one logical line, wrapped at `wrap_width` characters."""
+        if len(line) <= self.wrap_width:
+            wrapped = [line]
+        else:
+            wrapped = textwrap.wrap(line, width=self.wrap_width, replace_whitespace=False, drop_whitespace=False) or ['']
+        for piece in wrapped:
+            self._ensure_room(self.leading)
+            self._begin_text()
+            self._commands.append(b'(' + _escape(piece) + b') Tj T*')
+            self._y -= self.leading
+
+    def sparkline(self, values: Sequence[float], height: int = 56):
+        """Draw `values` as a polyline across the text column, scaled to their own range."""
+        self._ensure_room(height + self.leading)
+        self._end_text()
+        width = PAGE_WIDTH - 2 * self.margin
+        base = self._y - height
+        commands = [f'0.6 G 0.5 w {self.margin} {base} {width} {height} re S 0 G 0.8 w'.encode('ascii')]
+        if values:
+            low, high = min(values), max(values)
+            span = (high - low) or 1.0
+            step = width / max(1, len(values) - 1)
+            for index, value in enumerate(values):
+                x = self.margin + index * step
+                y = base + 2 + (value - low) / span * (height - 4)
+                commands.append(f'{x:.1f} {y:.1f} {"m" if index == 0 else "l"}'.encode('ascii'))
+            commands.append(b'S')
+        self._commands.extend(commands)
+        self._y = base - self.leading
+
+    def close(self) -> bytes:
+        """Finish the document and return the remaining bytes."""
+        if self._closed:
+            return self.drain()
+        self._closed = True
+        if self._y is None and not self._page_ids:
+            self._y = self._top  # an empty document still gets one page
+        self._finish_page()
+        kids = ' '.join(f'{page_id} 0 R' for page_id in self._page_ids)
+        self._write_object(_PAGES_ID, f'<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>'.encode('ascii'))
+        self._write_object(_CATALOG_ID, f'<< /Type /Catalog /Pages {_PAGES_ID} 0 R >>'.encode('ascii'))
+
+        xref_offset = self._position
+        size = self._next_id
+        entries = [b'0000000000 65535 f \n']
+        for object_id in range(1, size):
+            entries.append(f'{self._offsets[object_id]:010d} 00000 n \n'.encode('ascii'))
+        self._write(f'xref\n0 {size}\n'.encode('ascii') + b''.join(entries))
+        self._write(f'trailer\n<< /Size {size} /Root {_CATALOG_ID} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'.encode('ascii'))
+        return self.drain()
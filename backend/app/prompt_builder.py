@@ -0,0 +1,196 @@
+import json
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Frame-level labels beyond this many per frame add tokens without changing the verdict.
+MAX_LABELS_PER_FRAME = 5
+
+_DETAILED_PROFILE_PREAMBLES = {
+    "object_originality": (
+        "IMPORTANT CONTEXT: This verification session is for OBJECT ORIGINALITY, not human liveness. "
+        "The user is proving that a physical object (e.g., a keyboard, monitor, laptop, or other item) is real and physically present in 3D space. "
+        "Do NOT penalize the absence of a human face. Do NOT penalize the presence of electronics or screens as spoofing indicators—they may be the legitimate subject of verification. "
+        "Instead, focus on: (1) camera parallax and perspective shifts proving 3D depth, (2) natural ambient lighting and reflections consistent with a real environment, "
+        "(3) subtle sensor noise and compression artifacts typical of a live camera feed vs. a digitally replayed recording, "
+        "(4) any evidence of moiré patterns, screen bezels, or pixel grids that would indicate a screen-of-a-screen attack.\n\n"
+    ),
+    "static_human": (
+        "IMPORTANT CONTEXT: This verification session involves a STATIC HUMAN subject. "
+        "The user is expected to remain relatively still—minimal head or body movement is NORMAL and should NOT be treated as a spoofing indicator. "
+        "Do NOT penalize near-identical facial positions or consistent confidence scores across frames. "
+        "Instead, focus on: (1) subtle depth-of-field variations proving a 3D environment, (2) natural skin micro-textures, pores, and physiological details inconsistent with printed photos or screens, "
+        "(3) ambient lighting gradients and soft shadows that shift naturally, (4) slight camera sensor noise and compression patterns consistent with live capture, "
+        "(5) any telltale signs of a flat 2D source such as moiré patterns, screen bezels, edge distortion, or uniform backlighting.\n\n"
+    ),
+}
+
+_BRIEF_PROFILE_PREAMBLES = {
+    "object_originality": (
+        "IMPORTANT CONTEXT: This verification is for OBJECT ORIGINALITY, not human liveness. "
+        "Do NOT penalize the absence of a human face or the presence of electronics—they may be the legitimate subject. "
+        "Focus on 3D parallax, ambient lighting, and sensor noise vs. screen replay indicators.\n\n"
+    ),
+    "static_human": (
+        "IMPORTANT CONTEXT: The subject is expected to remain STATIC. Minimal movement is NORMAL. "
+        "Focus on depth-of-field, skin micro-textures, and ambient lighting instead of motion.\n\n"
+    ),
+}
+
+_DETAILED_INSTRUCTIONS = (
+    "You are an expert fraud detection AI system. Analyze the sequential keyframes extracted from a user's verification video "
+    "alongside the AWS Rekognition machine-vision output and, when present, device IMU sensor data supplied with each request.\n"
+    "Vision context is compact JSON: frame entries map label names to confidence percentages and face entries carry pose in degrees.\n"
+    "When IMU data is present, cross-validate: does the device's physical motion (gyroscope rotation and accelerometer shake) "
+    "correlate with the visual motion you observe in the video frames? "
+    "If the video shows panning but the IMU shows zero movement, this is a strong spoofing indicator. "
+    "If the IMU shows natural hand tremor and motion consistent with the visual feed, this supports genuineness.\n\n"
+    "Assess if the video represents a genuine physical interaction in 3D space or a spoofed presentation attack (e.g., a video of a screen, printed photo, or AI generated).\n"
+    "Respond with ONLY a valid JSON object with EXACTLY three keys:\n"
+    "- 'trust_score' (a number between 0 and 100, where 100 means fully genuine and 0 means definitely spoofed or fake)\n"
+    "- 'confidence' (a number between 0 and 100 for how certain you are of that trust_score; keep it low when the frames are too few, blurred or inconclusive to decide)\n"
+    "- 'explanation' (a highly detailed and analytical 3-4 sentence paragraph explaining your reasoning. Detail specifically what you observed in the video frames—like lighting, depth, physics, and fluid movements—and reference the Rekognition context and IMU sensor data to justify your score. Do not be generic.)\n"
+    "No other text should be in your output, just the JSON block."
+)
+
+_BRIEF_INSTRUCTIONS = (
+    "You are an expert fraud detection AI system. Analyze these sequential keyframes extracted from a user's verification video "
+    "alongside the attached AWS Rekognition machine-vision output.\n"
+    "When IMU sensor data is supplied, cross-validate device motion with visual motion. Mismatch = spoofing indicator.\n"
+    "Assess if the video represents a genuine physical interaction in 3D space or a spoofed event (e.g., a video of a screen, printed photo, or AI generated).\n"
+    "Check for signs of screen glare, lack of depth, or unnatural movements.\n"
+    "Respond with ONLY a valid JSON object with EXACTLY three keys:\n"
+    "- 'trust_score' (a number between 0 and 100, where 100 means fully genuine and 0 means definitely spoofed or fake)\n"
+    "- 'confidence' (a number between 0 and 100 for how certain you are of that trust_score; keep it low when the frames are too few, blurred or inconclusive to decide)\n"
+    "- 'explanation' (a brief one paragraph explanation of your reasoning)\n"
+    "No other text should be in your output, just the JSON block."
+)
+
+
+def minify_json(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _round(value: Any, digits: int = 1) -> Any:
+    if isinstance(value, float):
+        return int(round(value)) if digits == 0 else round(value, digits)
+    return value
+
+
+def prune_vision_context(vision_context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a Rekognition vision context to the fields the GenAI prompt actually uses.
+
+    Private keys (raw artifacts) are dropped, per-frame label lists collapse to a
+    name -> confidence map capped at MAX_LABELS_PER_FRAME, and floats are rounded.
+    """
+    if not isinstance(vision_context, dict):
+        return {}
+
+    pruned: Dict[str, Any] = {}
+    for key in ("status", "message", "error", "verification_profile", "total_frames_analyzed", "most_consistent_global_subjects"):
+        if vision_context.get(key) is not None:
+            pruned[key] = vision_context[key]
+
+    frames = vision_context.get("frame_by_frame_details")
+    if isinstance(frames, list):
+        pruned["frames"] = [
+            {
+                "f": frame.get("frame_index"),
+                "labels": {
+                    subject.get("name"): _round(subject.get("confidence"), 0)
+                    for subject in (frame.get("frame_subjects") or [])[:MAX_LABELS_PER_FRAME]
+                    if subject.get("name")
+                },
+            }
+            for frame in frames
+            if isinstance(frame, dict)
+        ]
+
+    face_analysis = vision_context.get("face_analysis")
+    if isinstance(face_analysis, dict):
+        faces: Dict[str, Any] = {"frames_with_faces": face_analysis.get("frames_with_faces")}
+        per_frame = []
+        for face in face_analysis.get("per_frame_details") or []:
+            pose = face.get("pose") or {}
+            quality = face.get("quality") or {}
+            per_frame.append({
+                "f": face.get("frame_index"),
+                "yaw": _round(pose.get("yaw")),
+                "pitch": _round(pose.get("pitch")),
+                "roll": _round(pose.get("roll")),
+                "brightness": _round(quality.get("brightness")),
+                "sharpness": _round(quality.get("sharpness")),
+                "eyes_open": (face.get("eyes_open") or {}).get("value"),
+                "mouth_open": (face.get("mouth_open") or {}).get("value"),
+                "faces": face.get("face_count"),
+            })
+        if per_frame:
+            faces["per_frame"] = per_frame
+        variance = face_analysis.get("pose_variance_metrics")
+        if isinstance(variance, dict):
+            faces["pose_variance"] = {key: _round(value, 2) for key, value in variance.items()}
+        pruned["face_analysis"] = faces
+
+    spoof_indicators = vision_context.get("deferred_spoof_indicators")
+    if isinstance(spoof_indicators, list) and spoof_indicators:
+        pruned["deferred_spoof_indicators"] = [
+            {"label": item.get("label"), "confidence": _round(item.get("confidence"), 0), "f": item.get("frame")}
+            for item in spoof_indicators
+            if isinstance(item, dict)
+        ]
+
+    return pruned
+
+
+@lru_cache(maxsize=None)
+def static_prompt_prefix(verification_profile: str, style: str = "detailed") -> str:
+    """Profile-specific preamble plus task instructions; identical across sessions so it can be cached."""
+    preambles = _BRIEF_PROFILE_PREAMBLES if style == "brief" else _DETAILED_PROFILE_PREAMBLES
+    instructions = _BRIEF_INSTRUCTIONS if style == "brief" else _DETAILED_INSTRUCTIONS
+    return f"{preambles.get(verification_profile, '')}{instructions}"
+
+
+def build_evidence_block(vision_context: Dict[str, Any], imu_context: Optional[Dict[str, Any]] = None) -> str:
+    """Per-session evidence: pruned vision context and, when available, the IMU summary."""
+    evidence = f"AWS Rekognition Vision Context: {minify_json(prune_vision_context(vision_context))}\n"
+    if imu_context and imu_context.get("has_data"):
+        evidence += f"Device IMU Sensor Data (Gyroscope + Accelerometer): {minify_json(imu_context)}\n"
+    return evidence
+
+
+class CachedPrefixRegistry:
+    """
+    Remembers provider-side cached-content handles for static prompt prefixes.
+
+    Creation failures (e.g. the prefix is below the provider's minimum cacheable size)
+    are remembered per key for the TTL so we do not retry on every request.
+    """
+
+    def __init__(self, ttl_seconds: int = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+
+    def get_or_create(self, model_id: str, prefix: str, factory: Callable[[str], Optional[str]]) -> Optional[str]:
+        key = (model_id, prefix)
+        now = time.monotonic()
+        cached = self._entries.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+
+        try:
+            handle = factory(prefix)
+        except Exception as e:
+            logger.info(f"Cached prompt prefix unavailable for {model_id}; sending prefix inline: {e}")
+            handle = None
+
+        # Refresh slightly before the provider-side TTL lapses.
+        self._entries[key] = (handle, now + max(1, self.ttl_seconds - 60))
+        return handle
+
+    def clear(self):
+        self._entries.clear()
+
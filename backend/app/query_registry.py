@@ -0,0 +1,304 @@
+import logging
+import textwrap
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+
+class NamedQuery(str):
+    """
+    SQL text registered under a stable name.
+
+    It is still a plain string, so every db_manager helper accepts it unchanged; the
+    helpers recognise it and route it through the registry's prepared statements.
+    """
+
+    def __new__(cls, name: str, sql: str):
+        query = super().__new__(cls, textwrap.dedent(sql).strip())
+        query.name = name
+        return query
+
+
+class QueryStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if failed:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 3),
+        }
+
+
+class QueryRegistry:
+    """
+    Named, fixed-text SQL for hot paths.
+
+    Queries whose WHERE clause depends on optional tenant/environment filters are
+    registered once per filter combination, so each variant keeps identical text and
+    a stable plan. Statements are prepared when a pooled connection is created and
+    kept for the life of that connection; per-query timing counters are collected on
+    every execution.
+    """
+
+    def __init__(self):
+        self._queries: Dict[str, NamedQuery] = {}
+        self._stats: Dict[str, QueryStats] = {}
+        self._prepared: 'weakref.WeakKeyDictionary[asyncpg.Connection, Dict[str, Any]]' = weakref.WeakKeyDictionary()
+
+    def register(self, name: str, sql: str) -> NamedQuery:
+        if name in self._queries:
+            raise ValueError(f'Query {name!r} is already registered')
+        query = NamedQuery(name, sql)
+        self._queries[name] = query
+        return query
+
+    def register_scoped(
+        self,
+        name: str,
+        sql: str,
+        *,
+        first_param: int,
+        tenant_column: Optional[str] = None,
+        environment_column: Optional[str] = None,
+        tail: str = '',
+    ) -> None:
+        """
+        Register every combination of the optional tenant/environment filters.
+
+        Filter parameters are numbered from first_param, tenant before environment;
+        `tail` may reference the parameters that follow as {0}, {1}, ...
+        """
+        tenant_options = (False, True) if tenant_column else (False,)
+        environment_options = (False, True) if environment_column else (False,)
+        for with_tenant in tenant_options:
+            for with_environment in environment_options:
+                query = textwrap.dedent(sql).strip()
+                param = first_param
+                if with_tenant:
+                    query += f' AND {tenant_column} = ${param}'
+                    param += 1
+                if with_environment:
+                    query += f' AND {environment_column} = ${param}'
+                    param += 1
+                if tail:
+                    query += ' ' + tail.format(*range(param, param + tail.count('{')))
+                self.register(self._variant_name(name, with_tenant, with_environment), query)
+
+    @staticmethod
+    def _variant_name(name: str, with_tenant: bool, with_environment: bool) -> str:
+        suffix = '.'.join(part for part, enabled in (('tenant', with_tenant), ('env', with_environment)) if enabled)
+        return f'{name}.{suffix}' if suffix else name
+
+    def get(self, name: str) -> NamedQuery:
+        return self._queries[name]
+
+    def scoped(
+        self,
+        name: str,
+        args: Sequence[Any],
+        *,
+        tenant_id: Optional[str] = None,
+        environment_id: Optional[str] = None,
+    ) -> Tuple[NamedQuery, List[Any]]:
+        """Pick the registered variant for the filters in play and append their arguments."""
+        args = list(args)
+        with_tenant = f'{name}.tenant' in self._queries and bool(tenant_id)
+        with_environment = bool(environment_id)
+        if with_tenant:
+            args.append(tenant_id)
+        if with_environment:
+            args.append(environment_id)
+        return self.get(self._variant_name(name, with_tenant, with_environment)), args
+
+    @property
+    def queries(self) -> Dict[str, NamedQuery]:
+        return dict(self._queries)
+
+    @staticmethod
+    def _raw_connection(conn):
+        # Pool acquisitions hand out proxies; prepared statements belong to the wrapped connection.
+        return getattr(conn, '_con', None) or conn
+
+    async def warm(self, conn: asyncpg.Connection) -> int:
+        """Prepare every registered query on a freshly opened connection."""
+        statements = self._prepared.setdefault(self._raw_connection(conn), {})
+        for name, query in self._queries.items():
+            try:
+                statements[name] = await conn.prepare(query)
+            except Exception as e:
+                # Tables may not exist yet on a fresh database; the statement is prepared on first use instead.
+                logger.debug(f'Could not prepare query {name}: {e}')
+        return len(statements)
+
+    async def _statement(self, conn, query: NamedQuery, refresh: bool = False):
+        statements = self._prepared.setdefault(self._raw_connection(conn), {})
+        stmt = None if refresh else statements.get(query.name)
+        if stmt is None:
+            stmt = await conn.prepare(query)
+            statements[query.name] = stmt
+        return stmt
+
+    @staticmethod
+    async def _call(stmt, method: str, args: Sequence[Any]):
+        if method == 'execute':
+            await stmt.fetch(*args)
+            return stmt.get_statusmsg()
+        return await getattr(stmt, method)(*args)
+
+    async def run(self, conn, query: str, method: str, *args):
+        """Execute `query` with the named asyncpg method, using the prepared statement for named queries."""
+        if not isinstance(query, NamedQuery):
+            return await getattr(conn, method)(query, *args)
+
+        started = time.perf_counter()
+        failed = False
+        try:
+            stmt = await self._statement(conn, query)
+            try:
+                return await self._call(stmt, method, args)
+            except asyncpg.exceptions.FeatureNotSupportedError:
+                # Schema changes invalidate prepared plans ("cached plan must not change result type").
+                # Outside a transaction it is safe to re-prepare and retry once.
+                if conn.is_in_transaction():
+                    raise
+                stmt = await self._statement(conn, query, refresh=True)
+                return await self._call(stmt, method, args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stats.setdefault(query.name, QueryStats()).record(elapsed_ms, failed)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+
+    def reset_stats(self):
+        self._stats.clear()
+
+
+query_registry = QueryRegistry()
+
+_SESSION_SELECT = """
+    SELECT s.*, te.slug AS environment
+    FROM sessions s
+    LEFT JOIN tenant_environments te ON te.tenant_environment_id = s.tenant_environment_id
+"""
+
+query_registry.register_scoped(
+    'sessions.get',
+    _SESSION_SELECT + 'WHERE s.session_id = $1',
+    first_param=2,
+    tenant_column='s.tenant_id',
+    environment_column='s.tenant_environment_id',
+)
+
+# List views: no JSONB payload columns, keyset order served by idx_sessions_tenant_env_created.
+_SESSION_LIST_SELECT = """
+    SELECT s.session_id, s.tenant_id, s.tenant_environment_id, te.slug AS environment,
+           s.created_at, s.expires_at, s.state, s.verification_status, s.return_url, s.session_duration,
+           s.tier_1_score, s.tier_2_score, s.final_trust_score, s.correlation_value,
+           s.ai_score, s.physics_score, s.unified_score
+    FROM sessions s
+    LEFT JOIN tenant_environments te ON te.tenant_environment_id = s.tenant_environment_id
+"""
+
+query_registry.register_scoped(
+    'sessions.page',
+    _SESSION_LIST_SELECT + 'WHERE s.tenant_id = $1',
+    first_param=2,
+    environment_column='s.tenant_environment_id',
+    tail='ORDER BY s.created_at DESC, s.session_id DESC LIMIT ${0}',
+)
+query_registry.register_scoped(
+    'sessions.page_after',
+    _SESSION_LIST_SELECT + 'WHERE s.tenant_id = $1',
+    first_param=2,
+    environment_column='s.tenant_environment_id',
+    tail='AND (s.created_at, s.session_id) < (${0}, ${1}) ORDER BY s.created_at DESC, s.session_id DESC LIMIT ${2}',
+)
+query_registry.register_scoped(
+    'sessions.count_capped',
+    'SELECT COUNT(*) FROM (SELECT 1 FROM sessions s WHERE s.tenant_id = $1',
+    first_param=2,
+    environment_column='s.tenant_environment_id',
+    tail='LIMIT ${0}) capped',
+)
+query_registry.register_scoped(
+    'sessions.count_estimate',
+    'EXPLAIN (FORMAT JSON) SELECT 1 FROM sessions s WHERE s.tenant_id = $1',
+    first_param=2,
+    environment_column='s.tenant_environment_id',
+)
+query_registry.register_scoped(
+    'sessions.store_artifact_keys',
+    """
+    UPDATE sessions
+    SET
+        video_s3_key = COALESCE($1, video_s3_key),
+        imu_data_s3_key = COALESCE($2, imu_data_s3_key),
+        optical_flow_s3_key = COALESCE($3, optical_flow_s3_key)
+    WHERE session_id = $4
+    """,
+    first_param=5,
+    tenant_column='tenant_id',
+    environment_column='tenant_environment_id',
+)
+query_registry.register(
+    'api_keys.validate',
+    """
+    SELECT tenant_id,
+           COALESCE(environment, $2) AS environment,
+           tenant_environment_id
+    FROM api_keys
+    WHERE api_secret = $1 AND revoked_at IS NULL
+    """,
+)
+query_registry.register(
+    'auth_sessions.lookup',
+    """
+    SELECT s.session_id,
+           s.user_id,
+           s.org_id,
+           s.active_environment_id,
+           s.active_environment_slug,
+           s.csrf_token,
+           s.expires_at,
+           u.email
+    FROM auth_sessions s
+    JOIN users u ON u.user_id = s.user_id
+    WHERE s.session_secret_hash = $1 AND s.revoked_at IS NULL AND s.expires_at > NOW()
+    """,
+)
+query_registry.register(
+    'auth_sessions.touch',
+    'UPDATE auth_sessions SET last_seen_at = NOW() WHERE session_secret_hash = $1',
+)
+query_registry.register(
+    'auth_sessions.set_environment',
+    """
+    UPDATE auth_sessions
+    SET active_environment_id = $1,
+        active_environment_slug = $2,
+        last_seen_at = NOW()
+    WHERE session_secret_hash = $3
+    """,
+)
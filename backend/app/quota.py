@@ -29,7 +29,8 @@ class UsageQuotaManager:
         environment = await get_tenant_environment(tenant_id, slug=resolved_environment_slug, environment_id=resolved_environment_id)
         return environment
 
-    async def check_quota(self, tenant_id: str, environment_slug: Optional[str] = None) -> bool:
+    async def check_quota(self, tenant_id: str, environment_slug: Optional[str] = None, required: int = 1) -> bool:
+        """Whether `required` more verifications fit in the environment's monthly quota."""
         environment = await self._resolve_environment(tenant_id, environment_slug=environment_slug)
         if not environment:
             logger.warning(f'Tenant environment not found in database: {tenant_id} - allowing for development')
@@ -42,7 +43,7 @@ class UsageQuotaManager:
             )
             return False
 
-        has_quota = environment['current_usage'] < environment['monthly_quota']
+        has_quota = environment['current_usage'] + required <= environment['monthly_quota']
         logger.info(
             f"Quota check for {tenant_id}/{environment['slug']}: "
             f"{environment['current_usage']}/{environment['monthly_quota']} - "
@@ -218,20 +219,21 @@ class BillingManager:
         end_date = start_date + timedelta(days=30)
         quota = plan_quotas.get(plan, 3)
 
-        await db_manager.execute_query(
-            query,
-            plan,
-            start_date,
-            end_date,
-            quota,
-            tenant_id,
-        )
-        await update_environment_quota(
-            tenant_id,
-            PRODUCTION_ENVIRONMENT,
-            absolute_monthly_quota=quota,
-            absolute_current_usage=0,
-        )
+        async with db_manager.transaction():
+            await db_manager.execute_query(
+                query,
+                plan,
+                start_date,
+                end_date,
+                quota,
+                tenant_id,
+            )
+            await update_environment_quota(
+                tenant_id,
+                PRODUCTION_ENVIRONMENT,
+                absolute_monthly_quota=quota,
+                absolute_current_usage=0,
+            )
 
         logger.info(f'Payment success: {tenant_id} upgraded to {plan}')
 
@@ -242,13 +244,14 @@ class BillingManager:
             WHERE tenant_id = $1
         """
 
-        await db_manager.execute_query(query, tenant_id)
-        await update_environment_quota(
-            tenant_id,
-            PRODUCTION_ENVIRONMENT,
-            absolute_monthly_quota=3,
-            absolute_current_usage=0,
-        )
+        async with db_manager.transaction():
+            await db_manager.execute_query(query, tenant_id)
+            await update_environment_quota(
+                tenant_id,
+                PRODUCTION_ENVIRONMENT,
+                absolute_monthly_quota=3,
+                absolute_current_usage=0,
+            )
         logger.warning(f'Payment failed: {tenant_id} downgraded to Sandbox')
 
     async def upgrade_plan(self, tenant_id: str, new_plan: str):
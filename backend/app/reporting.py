@@ -1,34 +1,182 @@
+import asyncio
+import contextvars
 import hashlib
 import json
-import textwrap
+import logging
+import time
+import weakref
 from datetime import datetime, timezone
-from io import BytesIO
-from typing import Dict, List, Optional
-from zipfile import ZIP_DEFLATED, ZipFile
+from typing import AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
 
 from app.artifact_manager import artifact_manager
+from app.config import settings
+from app.database import db_manager
+from app.imu_summary import summarize_imu, summarize_imu_columns
+from app.pdf_writer import StreamingPdfWriter
 from app.storage import storage_manager
+from app.telemetry_format import TelemetryArtifact, is_columnar_key
+
+logger = logging.getLogger(__name__)
+
+# Artifacts generated from the others; never inputs to a report.
+DERIVED_ARTIFACT_TYPES = {'verification_report_pdf', 'artifact_bundle_zip', 'imu_summary'}
+BUNDLE_ARTIFACT_ORDER = ('verification_report_pdf', 'original_video', 'imu_telemetry', 'rekognition_raw')
+# Session fields printed in the report; a change to any of them makes the stored PDF stale.
+REPORT_SESSION_FIELDS = (
+    'session_id', 'tenant_id', 'verification_status', 'state', 'final_trust_score', 'tier_1_score', 'tier_2_score',
+    'ai_score', 'physics_score', 'correlation_value', 'reasoning', 'metadata', 'ai_explanation',
+)
+# Bump when the report layout (or bundle layout) changes so stored copies are regenerated.
+REPORT_FORMAT_VERSION = 2
+BUNDLE_FORMAT_VERSION = 1
+
+
+def report_fingerprint(session: Dict, source_artifacts: List[Dict]) -> str:
+    """Content hash of everything a report is rendered from."""
+    payload = {
+        'format': REPORT_FORMAT_VERSION,
+        'session': {field: session.get(field) for field in REPORT_SESSION_FIELDS},
+        'sources': sorted(
+            [artifact['artifact_type'], artifact['file_name'], artifact['content_type'], artifact.get('sha256')]
+            for artifact in source_artifacts
+        ),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def bundle_fingerprint(included_artifacts: List[Dict]) -> str:
+    """Content hash of the artifacts packed into a bundle (the report included)."""
+    payload = {
+        'format': BUNDLE_FORMAT_VERSION,
+        'artifacts': [[artifact['artifact_type'], artifact['file_name'], artifact.get('sha256')] for artifact in included_artifacts],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class Sparkline(NamedTuple):
+    values: List[float]
+
+
+ReportLine = Union[str, Sparkline]
+
+
+def _json_lines(payload, max_lines: int) -> Tuple[List[str], bool]:
+    """Pretty-printed JSON lines, encoding only as much of the payload as fits in `max_lines`."""
+    lines: List[str] = []
+    partial = ''
+    for piece in json.JSONEncoder(indent=2, default=str).iterencode(payload):
+        partial += piece
+        if '\n' not in piece:
+            continue
+        *complete, partial = partial.split('\n')
+        lines.extend(complete)
+        if len(lines) > max_lines:
+            return lines[:max_lines], True
+    lines.append(partial)
+    return lines, False
+
+
+def _stored_fingerprint(artifact: Optional[Dict]) -> Optional[str]:
+    return ((artifact or {}).get('metadata') or {}).get('source_fingerprint')
+
+
+class _ZipSink:
+    """Write-only, unseekable file for ZipFile; the bundle generator drains it as it fills."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class _ArtifactPrefetch:
+    """Reads one artifact ahead of the ZIP writer into a small bounded queue."""
+
+    def __init__(self, artifact: Dict, depth: int):
+        self.artifact = artifact
+        self.size = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, depth))
+        self._opened = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            stream = await storage_manager.open_artifact_stream(self.artifact['storage_key'])
+            self.size = stream.size
+            self._opened.set_result(None)
+            async for chunk in stream.iter_range():
+                await self._queue.put(chunk)
+            await self._queue.put(None)
+        except Exception as e:
+            if not self._opened.done():
+                self._opened.set_exception(e)
+            await self._queue.put(e)
+
+    async def opened(self):
+        await self._opened
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def cancel(self):
+        self._task.cancel()
 
 
 class VerificationEvidenceManager:
-    async def generate_report(self, session: Dict) -> Dict:
+    def __init__(self):
+        # One generation per (session, artifact type) at a time in this process, so a background
+        # pre-generation and a dashboard request share the work instead of both rendering.
+        self._generation_locks: 'weakref.WeakValueDictionary[tuple, asyncio.Lock]' = weakref.WeakValueDictionary()
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    def _generation_lock(self, session_id, artifact_type: str) -> asyncio.Lock:
+        key = (str(session_id), artifact_type)
+        lock = self._generation_locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._generation_locks[key] = lock
+        return lock
+
+    async def generate_report(self, session: Dict, artifacts: Optional[List[Dict]] = None) -> Dict:
         tenant_id = str(session['tenant_id'])
-        artifacts = await artifact_manager.list_artifacts(session['session_id'], tenant_id=tenant_id)
-        artifact_map = {artifact['artifact_type']: artifact for artifact in artifacts}
+        if artifacts is None:
+            artifacts = await artifact_manager.list_artifacts(session['session_id'], tenant_id=tenant_id)
+        sources = [artifact for artifact in artifacts if artifact['artifact_type'] not in DERIVED_ARTIFACT_TYPES]
+        artifact_map = {artifact['artifact_type']: artifact for artifact in sources}
 
-        imu_payload = await self._load_json_if_present(artifact_map.get('imu_telemetry'))
-        rekognition_payload = await self._load_json_if_present(artifact_map.get('rekognition_raw'))
+        imu_payload, rekognition_payload = await asyncio.gather(
+            self._load_imu_if_present(artifact_map.get('imu_telemetry')),
+            self._load_json_if_present(artifact_map.get('rekognition_raw')),
+        )
 
-        report_lines = self._build_report_lines(session, artifacts, imu_payload, rekognition_payload)
-        pdf_bytes = self._render_pdf(report_lines)
-        storage_key = await storage_manager.store_session_artifact(
+        report_lines = self._build_report_lines(session, sources, imu_payload, rekognition_payload)
+        stored = await storage_manager.store_session_artifact_chunks(
             tenant_id=session['tenant_id'],
             session_id=session['session_id'],
             filename='verification_report.pdf',
-            artifact_data=pdf_bytes,
+            chunks=self._render_pdf(report_lines),
             content_type='application/pdf',
         )
-        encryption_metadata = await storage_manager.get_object_metadata(storage_key)
 
         return await artifact_manager.upsert_artifact(
             session_id=session['session_id'],
@@ -37,32 +185,57 @@ class VerificationEvidenceManager:
             provider='veraproof_ai',
             file_name='verification_report.pdf',
             content_type='application/pdf',
-            storage_key=storage_key,
-            size_bytes=len(pdf_bytes),
-            sha256=hashlib.sha256(pdf_bytes).hexdigest(),
+            storage_key=stored.key,
+            size_bytes=stored.size,
+            sha256=stored.sha256,
             metadata={
                 'generated_at': datetime.now(timezone.utc).isoformat(),
                 'source_artifact_types': sorted(artifact_map.keys()),
+                'source_sha256': {artifact['artifact_type']: artifact.get('sha256') for artifact in sources},
+                'source_fingerprint': report_fingerprint(session, sources),
             },
-            encryption_mode=encryption_metadata.get('vp_mode'),
-            encryption_key_id=encryption_metadata.get('vp_key_id'),
+            encryption_mode=stored.encryption_mode,
+            encryption_key_id=stored.encryption_key_id,
         )
 
-    async def generate_bundle(self, session: Dict) -> Dict:
-        tenant_id = str(session['tenant_id'])
-        report_artifact = await self.generate_report(session)
-        artifacts = await artifact_manager.list_artifacts(session['session_id'], tenant_id=tenant_id)
+    async def ensure_report(self, session: Dict, artifacts: Optional[List[Dict]] = None) -> Dict:
+        """Return the stored report if it was rendered from the current inputs, else regenerate it."""
+        lock = self._generation_lock(session['session_id'], 'verification_report_pdf')
+        contended = lock.locked()
+        async with lock:
+            if artifacts is None or contended:
+                # After waiting, the holder may just have stored a fresh report: re-read.
+                artifacts = await artifact_manager.list_artifacts(session['session_id'], tenant_id=str(session['tenant_id']))
+            existing = next((artifact for artifact in artifacts if artifact['artifact_type'] == 'verification_report_pdf'), None)
+            sources = [artifact for artifact in artifacts if artifact['artifact_type'] not in DERIVED_ARTIFACT_TYPES]
+            if existing is not None and _stored_fingerprint(existing) == report_fingerprint(session, sources):
+                return existing
+            return await self.generate_report(session, artifacts)
+
+    async def ensure_bundle(self, session: Dict) -> Dict:
+        """Return the stored bundle if its contents are unchanged, else rebuild it."""
+        async with self._generation_lock(session['session_id'], 'artifact_bundle_zip'):
+            artifacts = await artifact_manager.list_artifacts(session['session_id'], tenant_id=str(session['tenant_id']))
+            report_artifact = await self.ensure_report(session, artifacts)
+            included = self._bundle_members(artifacts, report_artifact)
+            existing = next((artifact for artifact in artifacts if artifact['artifact_type'] == 'artifact_bundle_zip'), None)
+            if existing is not None and _stored_fingerprint(existing) == bundle_fingerprint(included):
+                return existing
+            return await self._build_bundle(session, included)
+
+    def _bundle_members(self, artifacts: List[Dict], report_artifact: Dict) -> List[Dict]:
         artifact_map = {artifact['artifact_type']: artifact for artifact in artifacts}
         artifact_map['verification_report_pdf'] = report_artifact
+        return [artifact_map[artifact_type] for artifact_type in BUNDLE_ARTIFACT_ORDER if artifact_map.get(artifact_type)]
 
-        bundle_entries = []
-        for artifact_type in ('verification_report_pdf', 'original_video', 'imu_telemetry', 'rekognition_raw'):
-            artifact = artifact_map.get(artifact_type)
-            if not artifact:
-                continue
-            artifact_bytes = await storage_manager.load_artifact_bytes(artifact['storage_key'])
-            bundle_entries.append((artifact['file_name'], artifact_bytes, artifact))
+    async def generate_bundle(self, session: Dict) -> Dict:
+        """Rebuild the bundle unconditionally (the report is still reused when current)."""
+        artifacts = await artifact_manager.list_artifacts(session['session_id'], tenant_id=str(session['tenant_id']))
+        report_artifact = await self.ensure_report(session, artifacts)
+        return await self._build_bundle(session, self._bundle_members(artifacts, report_artifact))
 
+    async def _build_bundle(self, session: Dict, included: List[Dict]) -> Dict:
+        tenant_id = str(session['tenant_id'])
         manifest = {
             'session_id': str(session['session_id']),
             'generated_at': datetime.now(timezone.utc).isoformat(),
@@ -73,25 +246,25 @@ class VerificationEvidenceManager:
                     'content_type': artifact['content_type'],
                     'sha256': artifact.get('sha256'),
                 }
-                for _, _, artifact in bundle_entries
+                for artifact in included
             ],
         }
 
-        zip_buffer = BytesIO()
-        with ZipFile(zip_buffer, 'w', compression=ZIP_DEFLATED) as bundle:
-            for file_name, artifact_bytes, _artifact in bundle_entries:
-                bundle.writestr(file_name, artifact_bytes)
-            bundle.writestr('manifest.json', json.dumps(manifest, indent=2))
-
-        zip_bytes = zip_buffer.getvalue()
-        storage_key = await storage_manager.store_session_artifact(
-            tenant_id=session['tenant_id'],
-            session_id=session['session_id'],
-            filename='verification_artifacts_bundle.zip',
-            artifact_data=zip_bytes,
-            content_type='application/zip',
-        )
-        encryption_metadata = await storage_manager.get_object_metadata(storage_key)
+        # Every artifact starts downloading and decrypting at once, each only a few chunks ahead
+        # of the ZIP writer, and the ZIP is encrypted and uploaded as it is produced.
+        prefetches = [_ArtifactPrefetch(artifact, settings.bundle_prefetch_chunks) for artifact in included]
+        try:
+            await asyncio.gather(*(prefetch.opened() for prefetch in prefetches))
+            stored = await storage_manager.store_session_artifact_chunks(
+                tenant_id=session['tenant_id'],
+                session_id=session['session_id'],
+                filename='verification_artifacts_bundle.zip',
+                chunks=self._stream_bundle(prefetches, manifest),
+                content_type='application/zip',
+            )
+        finally:
+            for prefetch in prefetches:
+                prefetch.cancel()
 
         return await artifact_manager.upsert_artifact(
             session_id=session['session_id'],
@@ -100,38 +273,106 @@ class VerificationEvidenceManager:
             provider='veraproof_ai',
             file_name='verification_artifacts_bundle.zip',
             content_type='application/zip',
-            storage_key=storage_key,
-            size_bytes=len(zip_bytes),
-            sha256=hashlib.sha256(zip_bytes).hexdigest(),
+            storage_key=stored.key,
+            size_bytes=stored.size,
+            sha256=stored.sha256,
             metadata={
                 'generated_at': datetime.now(timezone.utc).isoformat(),
-                'included_artifact_types': [artifact['artifact_type'] for _, _, artifact in bundle_entries],
+                'included_artifact_types': [artifact['artifact_type'] for artifact in included],
+                'source_fingerprint': bundle_fingerprint(included),
             },
-            encryption_mode=encryption_metadata.get('vp_mode'),
-            encryption_key_id=encryption_metadata.get('vp_key_id'),
+            encryption_mode=stored.encryption_mode,
+            encryption_key_id=stored.encryption_key_id,
         )
 
+    async def pregenerate(self, session_id: str, tenant_id: str, environment_id: Optional[str] = None):
+        """
+        Render the report ahead of the first download; failures are only logged.
+
+        The bundle is left to its first request: it repeats every stored artifact, so building
+        it for sessions nobody downloads would double their storage and PUT cost.
+        """
+        from app.session_manager import session_manager
+
+        db_manager.set_request_context(tenant_id=tenant_id, environment_id=environment_id, actor_type='service_account')
+        try:
+            session = await session_manager.get_session(session_id, tenant_id=tenant_id)
+            if not session:
+                return
+            report = await self.ensure_report(session)
+            logger.info('Evidence report pre-generated', extra={'session_id': session_id, 'report_sha256': report.get('sha256')})
+        except Exception as e:
+            logger.warning(f'Evidence pre-generation failed; it will be generated on first request: {e}', extra={'session_id': session_id})
+
+    def schedule_pregeneration(
+        self,
+        session_id: str,
+        tenant_id: str,
+        environment_id: Optional[str] = None,
+        after: Optional[asyncio.Future] = None,
+    ):
+        """Run `pregenerate` in the background, optionally once `after` (e.g. the AI pass) has finished."""
+        if not settings.evidence_pregenerate_enabled:
+            return
+
+        async def run():
+            if after is not None:
+                await asyncio.wait([after])
+            await self.pregenerate(session_id, tenant_id, environment_id)
+
+        # Fresh context: never inherit a request's tenant/environment scope; pregenerate sets its own.
+        task = asyncio.create_task(run(), context=contextvars.Context())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _stream_bundle(self, prefetches: List[_ArtifactPrefetch], manifest: Dict) -> AsyncIterator[bytes]:
+        sink = _ZipSink()
+        timestamp = time.localtime()[:6]
+        with ZipFile(sink, 'w') as bundle:
+            for prefetch in prefetches:
+                artifact = prefetch.artifact
+                entry = ZipInfo(artifact['file_name'], date_time=timestamp)
+                # Video is already compressed; deflating it would only burn event-loop CPU.
+                entry.compress_type = ZIP_STORED if artifact['content_type'].startswith('video/') else ZIP_DEFLATED
+                entry.file_size = prefetch.size
+                with bundle.open(entry, 'w') as member:
+                    async for chunk in prefetch.chunks():
+                        member.write(chunk)
+                        if len(sink):
+                            yield sink.drain()
+            manifest_entry = ZipInfo('manifest.json', date_time=timestamp)
+            manifest_entry.compress_type = ZIP_DEFLATED
+            bundle.writestr(manifest_entry, json.dumps(manifest, indent=2))
+        yield sink.drain()
+
     async def _load_json_if_present(self, artifact: Optional[Dict]):
         if not artifact:
             return None
         return await storage_manager.load_json_artifact(artifact['storage_key'])
 
-    def _build_report_lines(self, session: Dict, artifacts: List[Dict], imu_payload, rekognition_payload) -> List[str]:
-        lines: List[str] = []
+    async def _load_imu_if_present(self, artifact: Optional[Dict]):
+        if artifact and is_columnar_key(artifact['storage_key']):
+            return await storage_manager.load_telemetry_artifact(artifact['storage_key'], 'imu')
+        return await self._load_json_if_present(artifact)
+
+    def _build_report_lines(self, session: Dict, artifacts: List[Dict], imu_payload, rekognition_payload) -> List[ReportLine]:
+        lines: List[ReportLine] = []
 
         def add_heading(text: str):
             lines.append('')
             lines.append(text.upper())
             lines.append('=' * len(text))
 
-        def add_json_block(label: str, payload):
+        def add_json_block(label: str, payload, file_name: Optional[str] = None):
             add_heading(label)
             if payload is None:
                 lines.append('Not available')
                 return
-            for raw_line in json.dumps(payload, indent=2, default=str).splitlines():
-                wrapped = textwrap.wrap(raw_line, width=100, replace_whitespace=False, drop_whitespace=False) or ['']
-                lines.extend(wrapped)
+            json_lines, truncated = _json_lines(payload, settings.report_json_block_max_lines)
+            lines.extend(json_lines)
+            if truncated:
+                source = f' in {file_name}' if file_name else ''
+                lines.append(f'... truncated after {len(json_lines)} lines; the full payload is in the evidence bundle{source}')
 
         lines.append('VeraProof AI Certified Verification Report')
         lines.append(f"Generated: {datetime.now(timezone.utc).isoformat()}")
@@ -157,70 +398,50 @@ class VerificationEvidenceManager:
 
         add_json_block('Session Metadata', session.get('metadata') or {})
         add_json_block('AI Explanation', session.get('ai_explanation') or {})
-        add_json_block('Rekognition Raw Output', rekognition_payload)
-        add_json_block('IMU Telemetry', imu_payload)
+        add_json_block('Rekognition Raw Output', rekognition_payload, 'rekognition_raw.json')
+
+        imu_file = next((artifact['file_name'] for artifact in artifacts if artifact['artifact_type'] == 'imu_telemetry'), 'imu_data.json')
+        points = settings.report_imu_sparkline_points
+        if isinstance(imu_payload, TelemetryArtifact) and len(imu_payload):
+            add_heading('IMU Telemetry')
+            lines.extend(self._imu_summary_lines(summarize_imu_columns(imu_payload.columns, max_points=points), imu_file))
+        elif isinstance(imu_payload, list) and imu_payload:
+            add_heading('IMU Telemetry')
+            lines.extend(self._imu_summary_lines(summarize_imu(imu_payload, max_points=points), imu_file))
+        else:
+            add_json_block('IMU Telemetry', None if isinstance(imu_payload, TelemetryArtifact) else imu_payload, imu_file)
+        return lines
+
+    def _imu_summary_lines(self, summary: Dict, source_file: str) -> List[ReportLine]:
+        rate = summary['sample_rate_hz']
+        lines: List[ReportLine] = [
+            f"Samples: {summary['sample_count']}  Duration: {summary['duration_ms'] / 1000.0:.2f} s  "
+            f"Sample rate: {f'{rate:.1f} Hz' if rate else 'n/a'}  (raw samples are in {source_file})",
+            '',
+            f"{'Channel':<24}{'Min':>12}{'Mean':>12}{'Max':>12}{'Std':>12}",
+        ]
+        for name, stats in summary['channels'].items():
+            cells = ''.join(f"{'n/a' if stats[key] is None else f'{stats[key]:.4f}':>12}" for key in ('min', 'mean', 'max', 'std'))
+            lines.append(f'{name:<24}{cells}')
+        for name, label in (('acceleration_magnitude', 'Acceleration magnitude'), ('rotation_rate.gamma', 'Rotation rate (gamma)')):
+            values = summary['series'][name]
+            lines.append('')
+            lines.append(f'{label} over time ({len(values)} points)')
+            lines.append(Sparkline(values))
         return lines
 
-    def _render_pdf(self, lines: List[str]) -> bytes:
-        wrapped_lines: List[str] = []
+    def _render_pdf(self, lines: List[ReportLine]) -> Iterator[bytes]:
+        """Yield the PDF as it is written; each finished page is flushed straight to the output."""
+        writer = StreamingPdfWriter()
         for line in lines:
-            if not line:
-                wrapped_lines.append('')
-                continue
-            wrapped_lines.extend(textwrap.wrap(line, width=100, replace_whitespace=False, drop_whitespace=False) or [''])
-
-        lines_per_page = 48
-        pages = [wrapped_lines[i:i + lines_per_page] for i in range(0, len(wrapped_lines), lines_per_page)] or [[]]
-        objects: List[bytes] = []
-
-        def add_object(payload: str | bytes) -> int:
-            data = payload.encode('latin-1') if isinstance(payload, str) else payload
-            objects.append(data)
-            return len(objects)
-
-        font_id = add_object('<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
-        page_ids: List[int] = []
-        content_ids: List[int] = []
-
-        for page_lines in pages:
-            commands = ['BT', '/F1 10 Tf', '14 TL', '40 760 Td']
-            for line in page_lines:
-                escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
-                commands.append(f'({escaped}) Tj')
-                commands.append('T*')
-            commands.append('ET')
-            stream = '\n'.join(commands).encode('latin-1', errors='replace')
-            content_id = add_object(b'<< /Length ' + str(len(stream)).encode('ascii') + b' >>\nstream\n' + stream + b'\nendstream')
-            content_ids.append(content_id)
-            page_id = add_object('')
-            page_ids.append(page_id)
-
-        pages_kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
-        pages_id = add_object(f'<< /Type /Pages /Kids [{pages_kids}] /Count {len(page_ids)} >>')
-        catalog_id = add_object(f'<< /Type /Catalog /Pages {pages_id} 0 R >>')
-
-        for page_id, content_id in zip(page_ids, content_ids):
-            objects[page_id - 1] = (
-                f'<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] '
-                f'/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>'
-            ).encode('latin-1')
-
-        output = BytesIO()
-        output.write(b'%PDF-1.4\n')
-        offsets = [0]
-        for index, obj in enumerate(objects, start=1):
-            offsets.append(output.tell())
-            output.write(f'{index} 0 obj\n'.encode('ascii'))
-            output.write(obj)
-            output.write(b'\nendobj\n')
-
-        xref_offset = output.tell()
-        output.write(f'xref\n0 {len(objects) + 1}\n'.encode('ascii'))
-        output.write(b'0000000000 65535 f \n')
-        for offset in offsets[1:]:
-            output.write(f'{offset:010d} 00000 n \n'.encode('ascii'))
-        output.write((f'trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\nstartxref\n{xref_offset}\n%%EOF').encode('ascii'))
-        return output.getvalue()
+            if isinstance(line, Sparkline):
+                writer.sparkline(line.values)
+            else:
+                writer.text(line)
+            chunk = writer.drain()
+            if chunk:
+                yield chunk
+        yield writer.close()
 
 
 evidence_manager = VerificationEvidenceManager()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, Header, WebSocket, WebSocketDisconnect, UploadFile, File, Form, Request, Response, Query
-from fastapi.responses import RedirectResponse
-from typing import Optional
+from fastapi.responses import RedirectResponse, StreamingResponse
+from typing import List, Optional
 import logging
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
@@ -8,18 +8,21 @@ from opentelemetry import trace
 
 from app.models import (
     AuthSessionResponse, AuthenticatedUser, CreateSessionRequest, CreateSessionResponse, LoginRequest, SignupRequest,
-    ColorConfig, VerificationResult, SessionArtifactRecord
+    ColorConfig, VerificationResult, SessionArtifactRecord, MediaUploadRequest, MediaAnalysisStatus
 )
 from app.auth import local_auth_manager, api_key_manager
 from app.config import settings
 from app.dashboard_auth import AuthContext, dashboard_session_manager, get_auth_context, require_authenticated_context, require_permission
 from app.identity_adapter import IdentityAdapterError, get_identity_adapter
 from app.session_manager import session_manager
+from app.analytics_rollups import analytics_rollup_manager
 from app.quota import quota_manager, billing_manager
 from app.rate_limiter import rate_limiter
 from app.branding import branding_manager
 from app.webhooks import webhook_manager
 from app.storage import storage_manager
+from app.encryption import tenant_encryption_manager
+from app.telemetry_format import TELEMETRY_EXTENSION, is_columnar_key
 from app.websocket_handler import ws_handler
 from app.database import db_manager
 from app.tenant_environment import DEFAULT_ENVIRONMENT, ensure_tenant_environments, list_tenant_environments, update_environment_quota
@@ -270,17 +273,67 @@ def _build_content_disposition(filename: str, disposition: str = 'attachment') -
     return f'{disposition}; filename="{safe_name}"'
 
 
-async def _serve_storage_object(storage_key: str, file_name: str, disposition: str = 'attachment') -> Response:
-    payload, content_type, metadata = await storage_manager.load_artifact_object(storage_key)
+def _parse_byte_range(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Resolve a single `bytes=` range against `size`; None means serve the whole object.
+    Raises 416 for unsatisfiable ranges. Multi-range requests are answered with the full body.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    try:
+        if not sep:
+            return None
+        if first == '':
+            suffix = int(last)
+            if suffix <= 0:
+                raise ValueError
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start < 0 or start >= size or end < start:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable", headers={'Content-Range': f'bytes */{size}'})
+    return start, min(end, size - 1)
+
+
+async def _serve_storage_object(
+    storage_key: str,
+    file_name: str,
+    disposition: str = 'attachment',
+    range_header: Optional[str] = None,
+) -> Response:
+    artifact = await storage_manager.open_artifact_stream(storage_key)
+    metadata = artifact.metadata
     headers = {
         'Content-Disposition': _build_content_disposition(file_name, disposition=disposition),
         'Cache-Control': 'private, no-store',
+        'Accept-Ranges': 'bytes',
     }
     if metadata.get('vp_encrypted') == '1':
         headers['X-VeraProof-Encryption-Mode'] = metadata.get('vp_mode', 'managed')
         if metadata.get('vp_key_id'):
             headers['X-VeraProof-Key-Id'] = metadata['vp_key_id']
-    return Response(content=payload, media_type=content_type, headers=headers)
+
+    byte_range = _parse_byte_range(range_header, artifact.size)
+    status_code = 200
+    start, end = 0, artifact.size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers['Content-Range'] = f'bytes {start}-{end}/{artifact.size}'
+    headers['Content-Length'] = str(max(0, end - start + 1))
+    return StreamingResponse(
+        artifact.iter_range(start, end),
+        status_code=status_code,
+        media_type=artifact.content_type,
+        headers=headers,
+    )
 
 
 # Artifact Access Endpoints
@@ -300,13 +353,17 @@ async def list_session_artifacts(
 @router.get("/sessions/{session_id}/report")
 async def get_session_report(
     session_id: str,
+    refresh: bool = Query(False, description="Re-render even if the stored report is current"),
     auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
 ):
-    """Generate or refresh the final verification report PDF and return a signed URL."""
+    """Return the verification report PDF (regenerated only when its inputs changed) and a download URL."""
     from app.reporting import evidence_manager
 
     session = await _get_authorized_session_for_artifacts(session_id, auth_data)
-    artifact = await evidence_manager.generate_report(session)
+    if refresh:
+        artifact = await evidence_manager.generate_report(session)
+    else:
+        artifact = await evidence_manager.ensure_report(session)
     return {
         "artifact": artifact,
         "url": _build_backend_download_url(f"/api/v1/sessions/{session_id}/report/download"),
@@ -316,13 +373,17 @@ async def get_session_report(
 @router.get("/sessions/{session_id}/artifacts/bundle")
 async def get_session_artifact_bundle(
     session_id: str,
+    refresh: bool = Query(False, description="Rebuild even if the stored bundle is current"),
     auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
 ):
-    """Generate or refresh the full evidence bundle ZIP and return a signed URL."""
+    """Return the evidence bundle ZIP (rebuilt only when its contents changed) and a download URL."""
     from app.reporting import evidence_manager
 
     session = await _get_authorized_session_for_artifacts(session_id, auth_data)
-    artifact = await evidence_manager.generate_bundle(session)
+    if refresh:
+        artifact = await evidence_manager.generate_bundle(session)
+    else:
+        artifact = await evidence_manager.ensure_bundle(session)
     return {
         "artifact": artifact,
         "url": _build_backend_download_url(f"/api/v1/sessions/{session_id}/artifacts/bundle/download"),
@@ -394,14 +455,15 @@ async def get_optical_flow_artifact(
 @router.get("/sessions/{session_id}/report/download")
 async def download_session_report(
     session_id: str,
-    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth),
+    range_header: Optional[str] = Header(default=None, alias='Range'),
 ):
     from app.reporting import evidence_manager
 
     session = await _get_authorized_session_for_artifacts(session_id, auth_data)
-    artifact = await evidence_manager.generate_report(session)
+    artifact = await evidence_manager.ensure_report(session)
     try:
-        return await _serve_storage_object(artifact['storage_key'], artifact['file_name'])
+        return await _serve_storage_object(artifact['storage_key'], artifact['file_name'], range_header=range_header)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -409,14 +471,15 @@ async def download_session_report(
 @router.get("/sessions/{session_id}/artifacts/bundle/download")
 async def download_session_artifact_bundle(
     session_id: str,
-    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth),
+    range_header: Optional[str] = Header(default=None, alias='Range'),
 ):
     from app.reporting import evidence_manager
 
     session = await _get_authorized_session_for_artifacts(session_id, auth_data)
-    artifact = await evidence_manager.generate_bundle(session)
+    artifact = await evidence_manager.ensure_bundle(session)
     try:
-        return await _serve_storage_object(artifact['storage_key'], artifact['file_name'])
+        return await _serve_storage_object(artifact['storage_key'], artifact['file_name'], range_header=range_header)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -425,7 +488,8 @@ async def download_session_artifact_bundle(
 async def download_session_artifact(
     session_id: str,
     artifact_id: str,
-    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth),
+    range_header: Optional[str] = Header(default=None, alias='Range'),
 ):
     from app.artifact_manager import artifact_manager
 
@@ -436,7 +500,7 @@ async def download_session_artifact(
         raise HTTPException(status_code=404, detail="Artifact not found")
 
     try:
-        return await _serve_storage_object(artifact['storage_key'], artifact['file_name'])
+        return await _serve_storage_object(artifact['storage_key'], artifact['file_name'], range_header=range_header)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -444,27 +508,34 @@ async def download_session_artifact(
 @router.get("/sessions/{session_id}/video/download")
 async def download_video_artifact(
     session_id: str,
-    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth),
+    range_header: Optional[str] = Header(default=None, alias='Range'),
 ):
     session = await _get_authorized_session_for_artifacts(session_id, auth_data)
     if not session['video_s3_key']:
         raise HTTPException(status_code=404, detail="Video artifact not found")
     try:
-        return await _serve_storage_object(session['video_s3_key'], 'video.webm', disposition='inline')
+        return await _serve_storage_object(session['video_s3_key'], 'video.webm', disposition='inline', range_header=range_header)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
+def _telemetry_file_name(storage_key: str, stem: str) -> str:
+    return f"{stem}{TELEMETRY_EXTENSION if is_columnar_key(storage_key) else '.json'}"
+
+
 @router.get("/sessions/{session_id}/imu-data/download")
 async def download_imu_artifact(
     session_id: str,
-    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth),
+    range_header: Optional[str] = Header(default=None, alias='Range'),
 ):
     session = await _get_authorized_session_for_artifacts(session_id, auth_data)
     if not session['imu_data_s3_key']:
         raise HTTPException(status_code=404, detail="IMU data artifact not found")
     try:
-        return await _serve_storage_object(session['imu_data_s3_key'], 'imu_data.json', disposition='inline')
+        file_name = _telemetry_file_name(session['imu_data_s3_key'], 'imu_data')
+        return await _serve_storage_object(session['imu_data_s3_key'], file_name, disposition='inline', range_header=range_header)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -472,13 +543,15 @@ async def download_imu_artifact(
 @router.get("/sessions/{session_id}/optical-flow/download")
 async def download_optical_flow_artifact(
     session_id: str,
-    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth),
+    range_header: Optional[str] = Header(default=None, alias='Range'),
 ):
     session = await _get_authorized_session_for_artifacts(session_id, auth_data)
     if not session['optical_flow_s3_key']:
         raise HTTPException(status_code=404, detail="Optical flow artifact not found")
     try:
-        return await _serve_storage_object(session['optical_flow_s3_key'], 'optical_flow.json', disposition='inline')
+        file_name = _telemetry_file_name(session['optical_flow_s3_key'], 'optical_flow')
+        return await _serve_storage_object(session['optical_flow_s3_key'], file_name, disposition='inline', range_header=range_header)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -837,6 +910,7 @@ async def update_org_encryption_settings(
     record = await db_manager.fetch_one(query, encryption_mode, rotate_key, org_id, tenant_id=str(context.tenant_id))
     if not record:
         raise HTTPException(status_code=404, detail='Organization not found')
+    tenant_encryption_manager.invalidate_tenant(org_id)
     return record
 
 
@@ -1184,7 +1258,7 @@ async def get_webhook_logs(
     query = """
         SELECT log_id,
                webhook_id,
-               COALESCE(delivered_at, failed_at, NOW()) AS timestamp,
+               COALESCE(delivered_at, failed_at, created_at) AS timestamp,
                COALESCE(event_type, 'verification.complete') AS event_type,
                COALESCE(response_status, 0) AS status_code,
                COALESCE(response_time_ms, 0) AS response_time_ms,
@@ -1198,10 +1272,10 @@ async def get_webhook_logs(
     if environment_id:
         query += ' AND tenant_environment_id = $2'
         args.append(environment_id)
-        query += ' ORDER BY COALESCE(delivered_at, failed_at, NOW()) DESC LIMIT $3 OFFSET $4'
+        query += ' ORDER BY created_at DESC LIMIT $3 OFFSET $4'
         args.extend([limit, offset])
     else:
-        query += ' ORDER BY COALESCE(delivered_at, failed_at, NOW()) DESC LIMIT $2 OFFSET $3'
+        query += ' ORDER BY created_at DESC LIMIT $2 OFFSET $3'
         args.extend([limit, offset])
     logs = await db_manager.fetch_all(query, *args, tenant_id=tenant_id)
     return logs
@@ -1308,60 +1382,7 @@ async def get_analytics_stats(tenant_id: str = Depends(require_tenant_permission
     }
 
     try:
-        total_query = "SELECT COUNT(*) as count FROM sessions WHERE tenant_id = $1"
-        total_args = [tenant_id]
-        if environment_id:
-            total_query += " AND tenant_environment_id = $2"
-            total_args.append(environment_id)
-        total_result = await db_manager.fetch_one(total_query, *total_args, tenant_id=tenant_id)
-        if total_result:
-            analytics_data["total_sessions"] = total_result["count"]
-
-        today_query = "SELECT COUNT(*) as count FROM sessions WHERE tenant_id = $1 AND DATE(created_at) = CURRENT_DATE"
-        today_args = [tenant_id]
-        if environment_id:
-            today_query += " AND tenant_environment_id = $2"
-            today_args.append(environment_id)
-        today_result = await db_manager.fetch_one(today_query, *today_args, tenant_id=tenant_id)
-        if today_result:
-            analytics_data["sessions_today"] = today_result["count"]
-
-        week_query = "SELECT COUNT(*) as count FROM sessions WHERE tenant_id = $1 AND created_at >= DATE_TRUNC('week', CURRENT_DATE)"
-        week_args = [tenant_id]
-        if environment_id:
-            week_query += " AND tenant_environment_id = $2"
-            week_args.append(environment_id)
-        week_result = await db_manager.fetch_one(week_query, *week_args, tenant_id=tenant_id)
-        if week_result:
-            analytics_data["sessions_this_week"] = week_result["count"]
-
-        month_query = "SELECT COUNT(*) as count FROM sessions WHERE tenant_id = $1 AND created_at >= DATE_TRUNC('month', CURRENT_DATE)"
-        month_args = [tenant_id]
-        if environment_id:
-            month_query += " AND tenant_environment_id = $2"
-            month_args.append(environment_id)
-        month_result = await db_manager.fetch_one(month_query, *month_args, tenant_id=tenant_id)
-        if month_result:
-            analytics_data["sessions_this_month"] = month_result["count"]
-
-        stats_query = """
-            SELECT
-                COUNT(*) FILTER (WHERE final_trust_score >= 50) as success_count,
-                COUNT(*) as total_count,
-                AVG(final_trust_score) as avg_score
-            FROM sessions
-            WHERE tenant_id = $1 AND final_trust_score IS NOT NULL
-        """
-        stats_args = [tenant_id]
-        if environment_id:
-            stats_query += " AND tenant_environment_id = $2"
-            stats_args.append(environment_id)
-        stats_result = await db_manager.fetch_one(stats_query, *stats_args, tenant_id=tenant_id)
-        if stats_result and stats_result["total_count"] > 0:
-            analytics_data["success_rate"] = round(
-                (stats_result["success_count"] / stats_result["total_count"]) * 100, 2
-            )
-            analytics_data["average_trust_score"] = round(stats_result["avg_score"] or 0, 2)
+        analytics_data.update(await analytics_rollup_manager.get_stats(tenant_id, environment_id))
     except Exception as e:
         logger.warning(f"Could not fetch session analytics: {e}")
 
@@ -1372,11 +1393,14 @@ async def get_analytics_stats(tenant_id: str = Depends(require_tenant_permission
 async def get_analytics_sessions(
     tenant_id: str = Depends(require_tenant_permission("analytics.read")),
     limit: int = 100,
-    offset: int = 0
+    cursor: Optional[str] = None,
 ):
-    """Get session list"""
-    sessions = await session_manager.get_sessions_by_tenant(tenant_id, limit, offset)
-    return {"sessions": sessions}
+    """Get session list (pass `next_cursor` back as `cursor` for the next page)"""
+    try:
+        page = await session_manager.get_sessions_by_tenant(tenant_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"sessions": page["sessions"], "next_cursor": page["next_cursor"]}
 
 
 @router.get("/analytics/usage")
@@ -1391,50 +1415,35 @@ async def get_usage_trend(
     tenant_id: str = Depends(require_tenant_permission("analytics.read")),
     period: str = "daily"
 ):
-    """Get usage trend data"""
-    # Return mock data for now
-    from datetime import datetime, timedelta
-    
-    data = []
-    days = 7 if period == "daily" else 30
-    
-    for i in range(days):
-        date = datetime.utcnow() - timedelta(days=days-i-1)
-        data.append({
-            "date": date.strftime("%Y-%m-%d"),
-            "session_count": 0,
-            "success_count": 0,
-            "failed_count": 0,
-            "average_trust_score": 0
-        })
-    
-    return data
+    """Get usage trend data (hourly: last 24 hours, daily: last 7 days, otherwise last 30 days)"""
+    environment_id, _environment_slug = _current_environment_context()
+    return await analytics_rollup_manager.get_usage_trend(tenant_id, environment_id, period)
 
 
 @router.get("/analytics/outcome-distribution")
 async def get_outcome_distribution(tenant_id: str = Depends(require_tenant_permission("analytics.read"))):
     """Get outcome distribution"""
-    return {
-        "success": 0,
-        "failed": 0,
-        "timeout": 0,
-        "cancelled": 0
-    }
+    environment_id, _environment_slug = _current_environment_context()
+    return await analytics_rollup_manager.get_outcome_distribution(tenant_id, environment_id)
 
 
 @router.get("/sessions")
 async def list_sessions(
     tenant_id: str = Depends(require_tenant_permission("sessions.read")),
     limit: int = 10,
-    offset: int = 0
+    cursor: Optional[str] = None,
 ):
-    """Get list of sessions for tenant"""
-    sessions = await session_manager.get_sessions_by_tenant(tenant_id, limit, offset)
+    """Get list of sessions for tenant (pass `next_cursor` back as `cursor` for the next page)"""
+    try:
+        page = await session_manager.list_sessions_page(tenant_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
-        "sessions": sessions,
-        "total": len(sessions),
-        "limit": limit,
-        "offset": offset
+        "sessions": page["sessions"],
+        "total": page["total"],
+        "total_is_estimate": page["total_is_estimate"],
+        "limit": page["limit"],
+        "next_cursor": page["next_cursor"],
     }
 
 
@@ -1531,7 +1540,6 @@ async def create_media_analysis_job(
     auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
 ):
     """Upload an image or video and trigger asynchronous fraud analysis."""
-    import asyncio
     from app.media_analysis import media_analysis_manager
 
     tenant_id, _role = auth_data
@@ -1559,10 +1567,127 @@ async def create_media_analysis_job(
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    asyncio.create_task(media_analysis_manager.process_job(job["job_id"], file_bytes))
+    media_analysis_manager.schedule_job(
+        job["job_id"],
+        tenant_id=tenant_id,
+        environment_id=db_manager.current_environment_id(),
+        media_bytes=file_bytes,
+    )
+    return job
+
+
+@router.post("/media-analysis/uploads")
+async def create_media_analysis_upload(
+    request: MediaUploadRequest,
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+):
+    """
+    Start a direct-to-storage upload: returns a `pending_upload` job and a presigned POST form.
+    After uploading, call /media-analysis/{job_id}/upload-complete (or poll the job) to start analysis.
+    """
+    from app.media_analysis import media_analysis_manager
+
+    tenant_id, _role = auth_data
+
+    await ensure_tenant_exists(tenant_id)
+
+    if not await rate_limiter.check_api_rate_limit(tenant_id):
+        raise HTTPException(status_code=429, detail="API rate limit exceeded")
+
+    if not await quota_manager.check_quota(tenant_id):
+        raise HTTPException(status_code=429, detail="Usage quota exceeded")
+
+    if request.file_size_bytes <= 0:
+        raise HTTPException(status_code=400, detail="file_size_bytes must be positive")
+
+    try:
+        job, upload = await media_analysis_manager.create_upload_job(
+            tenant_id=tenant_id,
+            filename=request.filename or "upload.bin",
+            content_type=request.content_type,
+            file_size=request.file_size_bytes,
+            metadata=request.metadata or {},
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ConnectionError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+    return {"job": job, "upload": upload}
+
+
+@router.post("/media-analysis/{job_id}/upload-complete")
+async def complete_media_analysis_upload(
+    job_id: str,
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+):
+    """Confirm a direct upload; analysis starts once the object is found in storage."""
+    from app.media_analysis import media_analysis_manager
+
+    tenant_id, role = auth_data
+    try:
+        job = await media_analysis_manager.confirm_upload(job_id, tenant_id, role)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    if job['status'] == MediaAnalysisStatus.PENDING_UPLOAD.value:
+        raise HTTPException(status_code=409, detail="Upload not found in storage yet")
     return job
 
 
+@router.post("/media-analysis/batches")
+async def create_media_analysis_batch(
+    files: List[UploadFile] = File(...),
+    metadata: Optional[str] = Form(None),
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+):
+    """Upload many images/videos (or ZIP archives of them) as one pipelined fraud-analysis batch."""
+    from app.media_analysis import media_analysis_manager
+
+    tenant_id, _role = auth_data
+
+    await ensure_tenant_exists(tenant_id)
+
+    if not await rate_limiter.check_api_rate_limit(tenant_id):
+        raise HTTPException(status_code=429, detail="API rate limit exceeded")
+
+    if not await quota_manager.check_quota(tenant_id):
+        raise HTTPException(status_code=429, detail="Usage quota exceeded")
+
+    batch_metadata = _parse_metadata_json(metadata)
+    uploads = [(upload.filename or "upload.bin", upload.content_type or "application/octet-stream", upload) for upload in files]
+    try:
+        # Files are streamed to storage as they are read instead of being buffered in the worker.
+        async with media_analysis_manager.batch_sources(uploads) as sources:
+            # Every item consumes quota, so the whole batch has to fit.
+            if not await quota_manager.check_quota(tenant_id, required=len(sources)):
+                raise HTTPException(status_code=429, detail=f"Usage quota does not cover all {len(sources)} batch items")
+            batch, items = await media_analysis_manager.create_batch(
+                tenant_id=tenant_id,
+                sources=sources,
+                metadata=batch_metadata,
+            )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    media_analysis_manager.schedule_batch(batch["batch_id"], items, tenant_id, db_manager.current_environment_id())
+    return batch
+
+
+@router.get("/media-analysis/batches/{batch_id}")
+async def get_media_analysis_batch(
+    batch_id: str,
+    auth_data: tuple[str, str] = Depends(get_tenant_and_role_from_any_auth)
+):
+    """Get batch progress and the per-item results persisted so far."""
+    from app.media_analysis import media_analysis_manager
+
+    tenant_id, role = auth_data
+    batch = await media_analysis_manager.get_batch(batch_id, tenant_id, role)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Media analysis batch not found")
+    return batch
+
+
 @router.get("/media-analysis")
 async def list_media_analysis_jobs(
     limit: int = 20,
@@ -1588,6 +1713,9 @@ async def get_media_analysis_job(
     job = await media_analysis_manager.get_job(job_id, tenant_id, role)
     if not job:
         raise HTTPException(status_code=404, detail="Media analysis job not found")
+    if job['status'] == MediaAnalysisStatus.PENDING_UPLOAD.value:
+        # Polling doubles as the upload-complete signal for clients that never send it.
+        job = await media_analysis_manager.confirm_upload(job_id, tenant_id, role)
     return job
 
 
@@ -0,0 +1,195 @@
+import asyncio
+import functools
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from botocore.config import Config
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+from app.aws_credentials import aws_cred_manager
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# S3 error codes worth retrying; anything else (NoSuchKey, AccessDenied, ...) fails immediately.
+TRANSIENT_ERROR_CODES = {
+    'InternalError',
+    'RequestTimeout',
+    'ServiceUnavailable',
+    'SlowDown',
+    'Throttling',
+    'ThrottlingException',
+    '500',
+    '502',
+    '503',
+    '504',
+}
+# A vanished bucket (LocalStack restarts) is recreated by reconnecting before the retry.
+RECONNECT_ERROR_CODES = {'NoSuchBucket'}
+
+# asyncio.TimeoutError is deliberately absent: the timed-out attempt still occupies its worker,
+# so a retry would only stack a second call behind it. botocore's own connect/read timeouts
+# fire inside the worker, which is free again by then, and those are retried.
+_TRANSIENT_EXCEPTIONS = (
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    ConnectionError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+_MAX_BACKOFF_SECONDS = 5.0
+
+
+def error_code(error: BaseException) -> str:
+    if isinstance(error, ClientError):
+        return str(error.response.get('Error', {}).get('Code', ''))
+    return ''
+
+
+class AsyncS3Client:
+    """
+    boto3's S3 client driven from a dedicated, bounded thread pool.
+
+    Calls never run on the event loop: each operation (including reading a GET body) is
+    handed to the pool, whose size matches the client's HTTP connection pool. A semaphore of
+    the same size admits calls, and the per-operation timeout only starts once a slot is
+    held, so time spent queueing never counts against it. A slot is released when its worker
+    finishes, not when the caller stops waiting. Transient failures are retried with
+    exponential backoff and full jitter; botocore's own retries are disabled so attempts do
+    not multiply.
+    """
+
+    def __init__(
+        self,
+        bucket_name: str,
+        *,
+        client_factory: Optional[Callable[[], Any]] = None,
+        on_connect: Optional[Callable[['AsyncS3Client'], Any]] = None,
+        max_concurrency: Optional[int] = None,
+        operation_timeout: Optional[float] = None,
+        transfer_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+    ):
+        self.bucket_name = bucket_name
+        self.max_concurrency = max_concurrency or settings.s3_max_concurrency
+        self.operation_timeout = operation_timeout or settings.s3_operation_timeout_seconds
+        self.transfer_timeout = transfer_timeout or settings.s3_transfer_timeout_seconds
+        self.max_attempts = max(1, max_attempts or settings.s3_max_attempts)
+        self.retry_base_delay = settings.s3_retry_base_delay_seconds if retry_base_delay is None else retry_base_delay
+        self._client_factory = client_factory or self._build_client
+        self._on_connect = on_connect
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='s3-io')
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.client = None
+        self._connect_lock = asyncio.Lock()
+
+    def _build_client(self):
+        session = aws_cred_manager.get_session()
+        client_kwargs = {
+            'service_name': 's3',
+            'region_name': settings.aws_region,
+            'config': Config(
+                max_pool_connections=self.max_concurrency,
+                connect_timeout=settings.s3_connect_timeout_seconds,
+                read_timeout=settings.s3_read_timeout_seconds,
+                retries={'total_max_attempts': 1},
+            ),
+        }
+        if settings.aws_endpoint_url:
+            client_kwargs['endpoint_url'] = settings.aws_endpoint_url
+        return session.client(**client_kwargs)
+
+    @property
+    def endpoint_host(self) -> str:
+        return self.client.meta.endpoint_url if self.client is not None else ''
+
+    async def _run(self, func, timeout: float):
+        await self._slots.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, func)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release_slot)
+        # shield: a timeout abandons the wait, but the worker keeps its slot until it returns.
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    def _release_slot(self, future: asyncio.Future):
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()  # retrieved, so an abandoned attempt's error is not logged as unhandled
+
+    async def connect(self):
+        """(Re)build the boto3 client off the event loop, then run `on_connect` (bucket setup)."""
+        async with self._connect_lock:
+            self.client = await self._run(self._client_factory, self.operation_timeout)
+            if self._on_connect is not None:
+                await self._on_connect(self)
+
+    @staticmethod
+    def _invoke(client, operation: str, params: Dict[str, Any], read_body: bool):
+        response = getattr(client, operation)(**params)
+        if read_body:
+            # Draining the streaming body is blocking network I/O too; keep it in the worker.
+            body = response['Body']
+            try:
+                response['Body'] = body.read()
+            finally:
+                body.close()
+        return response
+
+    async def call(
+        self,
+        operation: str,
+        *,
+        transfer: bool = False,
+        read_body: bool = False,
+        **params,
+    ) -> Dict[str, Any]:
+        """Run one S3 operation with timeout and retries. Bucket defaults to this client's bucket."""
+        params.setdefault('Bucket', self.bucket_name)
+        timeout = self.transfer_timeout if transfer or read_body else self.operation_timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self._run(
+                    functools.partial(self._invoke, self.client, operation, params, read_body),
+                    timeout,
+                )
+            except Exception as e:
+                code = error_code(e)
+                retryable = isinstance(e, _TRANSIENT_EXCEPTIONS) or code in TRANSIENT_ERROR_CODES or code in RECONNECT_ERROR_CODES
+                if not retryable or attempt >= self.max_attempts:
+                    raise
+                delay = random.uniform(0, min(_MAX_BACKOFF_SECONDS, self.retry_base_delay * (2 ** (attempt - 1))))
+                logger.warning(
+                    f'S3 {operation} failed, retrying (attempt {attempt + 1}/{self.max_attempts}): {code or type(e).__name__}',
+                    extra={'key': params.get('Key'), 'delay_s': round(delay, 3)},
+                )
+                await asyncio.sleep(delay)
+                needs_reconnect = code in RECONNECT_ERROR_CODES or isinstance(e, (ConnectionClosedError, EndpointConnectionError, ConnectionError))
+                # Skip while a reconnect is already under way (including calls made by on_connect itself).
+                if needs_reconnect and not self._connect_lock.locked():
+                    await self.connect()
+
+    def generate_presigned_url(self, operation: str, params: Dict[str, Any], expires_in: int) -> str:
+        # Presigning is local signing only; no network round trip, so it stays on the loop.
+        params = {'Bucket': self.bucket_name, **params}
+        return self.client.generate_presigned_url(operation, Params=params, ExpiresIn=expires_in)
+
+    def generate_presigned_post(self, key: str, fields: Dict[str, Any], conditions: List[Any], expires_in: int) -> Dict[str, Any]:
+        return self.client.generate_presigned_post(self.bucket_name, key, Fields=fields, Conditions=conditions, ExpiresIn=expires_in)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -31,3 +32,27 @@ def evaluate_trust_status(unified_score: float, threshold: float = 75.0) -> bool
     Returns True if the verification is deemed Authentic (passes threshold).
     """
     return unified_score >= threshold
+
+
+def is_ambiguous_ai_score(ai_score: float, band: float, threshold: float = 75.0) -> bool:
+    """
+    Returns True if a valid AI score sits close enough to the pass threshold that
+    the verdict could flip with more evidence (used to escalate the keyframe budget).
+    """
+    if ai_score < 0:
+        return False
+    return abs(ai_score - threshold) < band
+
+
+def needs_more_keyframes(ai_score: float, confidence: Optional[float], min_confidence: float, band: float) -> bool:
+    """
+    Returns True if a valid Tier 3 verdict should be re-run on a denser keyframe sample.
+
+    Uses the confidence the model reported; providers that report none fall back to
+    the score sitting near the pass threshold.
+    """
+    if ai_score < 0:
+        return False
+    if confidence is None:
+        return is_ambiguous_ai_score(ai_score, band)
+    return confidence < min_confidence
@@ -1,8 +1,10 @@
 import numpy as np
 from scipy import stats
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import logging
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -113,6 +115,33 @@ class SensorFusionAnalyzer:
         
         return trigger
     
+    def recommend_keyframe_count(self, r: Optional[float], sample_count: int) -> int:
+        """
+        Size the Tier 2/3 keyframe budget from Tier 1 confidence
+        
+        Strong physics passes only need a couple of frames for the AI tiers to
+        confirm the scene; ambiguous or failing sessions get a dense sample.
+        
+        Args:
+            r: Pearson correlation coefficient (None when Tier 1 did not run)
+            sample_count: Number of gyro samples behind the correlation
+        
+        Returns:
+            Number of keyframes to extract
+        """
+        if r is None or sample_count < 10:
+            budget = settings.keyframes_failing
+        elif not self.should_trigger_tier_2(r):
+            budget = settings.keyframes_strong_pass if r >= 0.95 else settings.keyframes_pass
+        elif r >= 0.5:
+            budget = settings.keyframes_ambiguous
+        else:
+            budget = settings.keyframes_failing
+        
+        logger.info(f"Keyframe budget selected: {budget} (r={r}, samples={sample_count})")
+        
+        return max(1, int(budget))
+    
     def analyze(
         self,
         gyro_gamma: List[float],
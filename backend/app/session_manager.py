@@ -1,18 +1,32 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import base64
 import json
 import logging
+import time
 import uuid
 from urllib.parse import quote
 
+import asyncpg
 from opentelemetry import trace
 
 from app.config import settings
 from app.database import db_manager
 from app.models import SessionState
+from app.query_registry import query_registry
+from app.session_write_buffer import SessionWriteBuffer
 
 logger = logging.getLogger(__name__)
 
+# Populated by the sessions_notify_change trigger in db/init.sql.
+SESSION_CHANGES_CHANNEL = 'veraproof_session_changes'
+
+MAX_SESSION_PAGE_SIZE = 1000
+
+# Transitions other components act on as soon as they happen; these bypass write coalescing.
+SYNC_FLUSH_STATES = {SessionState.ANALYZING.value, SessionState.COMPLETE.value}
+
 
 def _normalize_json_field(value, fallback):
     if value is None:
@@ -28,16 +42,145 @@ def _normalize_json_field(value, fallback):
     return fallback
 
 
+def encode_session_cursor(created_at: datetime, session_id: Any) -> str:
+    payload = json.dumps([created_at.isoformat(), str(session_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_session_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(uuid.UUID(session_id))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid session cursor') from e
+
+
+class SessionRecordCache:
+    """
+    Short-lived per-process cache of session rows keyed by session_id.
+
+    SessionManager writes patch cached records in place (write-through); writes made
+    by other nodes arrive as LISTEN/NOTIFY invalidations, and the TTL bounds staleness
+    if a notification is missed.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl_seconds(self) -> int:
+        return settings.session_cache_ttl_seconds if self._ttl_seconds is None else self._ttl_seconds
+
+    @property
+    def max_entries(self) -> int:
+        return settings.session_cache_max_entries if self._max_entries is None else self._max_entries
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(session_id)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                self._entries.pop(session_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(session_id)
+        self.hits += 1
+        return dict(entry[0])
+
+    def put(self, session_id: str, record: Dict[str, Any]):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._entries[session_id] = (dict(record), time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def patch(self, session_id: str, fields: Dict[str, Any]):
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            entry[0].update(fields)
+
+    def invalidate(self, session_id: str):
+        self._entries.pop(session_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class SessionManager:
     """Manages verification sessions"""
 
     def __init__(self):
         self.in_memory_sessions = {}
+        self.session_cache = SessionRecordCache()
+        self.write_buffer = SessionWriteBuffer(on_unmatched=self.session_cache.invalidate)
+        self._listener_conn: Optional[asyncpg.Connection] = None
 
     def _context_environment(self) -> tuple[Optional[str], Optional[str]]:
         context = db_manager.get_request_context()
         return context.get('environment_id'), context.get('environment_slug')
 
+    def _cached_session(self, session_id: str, tenant_id: Optional[str], environment_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not settings.session_cache_enabled:
+            return None
+        session = self.session_cache.get(session_id)
+        if session is None:
+            return None
+        # Mirror the WHERE clause and the RLS tenant scope of the uncached query; on mismatch let Postgres decide.
+        effective_tenant = tenant_id or db_manager.get_request_context().get('tenant_id')
+        if effective_tenant and str(session.get('tenant_id')) != str(effective_tenant):
+            return None
+        if environment_id and str(session.get('tenant_environment_id')) != str(environment_id):
+            return None
+        return session
+
+    def _write_through(self, session_id: str, result: Any, fields: Dict[str, Any]):
+        """Patch the cached record after a successful UPDATE; drop it if no row matched."""
+        if isinstance(result, str) and result.startswith('UPDATE ') and result != 'UPDATE 0':
+            self.session_cache.patch(session_id, fields)
+        else:
+            self.session_cache.invalidate(session_id)
+
+    async def start_invalidation_listener(self):
+        """Listen for session changes made by other nodes so cached records are dropped promptly."""
+        if not settings.session_cache_enabled or not db_manager.pool or self._listener_conn is not None:
+            return
+        try:
+            # A dedicated connection: pooled ones run UNLISTEN * when they are released.
+            self._listener_conn = await asyncpg.connect(
+                settings.database_url,
+                server_settings={'application_name': f'{db_manager.application_name}-listener'},
+            )
+            await self._listener_conn.add_listener(SESSION_CHANGES_CHANNEL, self._on_session_change)
+            self._listener_conn.add_termination_listener(self._on_listener_terminated)
+            logger.info('Session cache invalidation listener started', extra={'channel': SESSION_CHANGES_CHANNEL})
+        except Exception as e:
+            logger.warning(f'Session cache invalidation listener unavailable; relying on TTL expiry: {e}')
+            self._listener_conn = None
+
+    async def stop_invalidation_listener(self):
+        conn, self._listener_conn = self._listener_conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
+
+    def _on_session_change(self, _conn, _pid, _channel, payload: str):
+        origin, _separator, session_id = payload.rpartition('|')
+        if origin == db_manager.application_name:
+            return
+        self.session_cache.invalidate(session_id)
+
+    def _on_listener_terminated(self, _conn):
+        logger.warning('Session cache invalidation listener disconnected; clearing cached sessions')
+        self._listener_conn = None
+        self.session_cache.clear()
+
     def _normalize_session_record(self, session: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         if not session:
             return session
@@ -137,25 +280,19 @@ class SessionManager:
 
     async def get_session(self, session_id: str, tenant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         environment_id, _environment_slug = self._context_environment()
-        query = """
-            SELECT s.*, te.slug AS environment
-            FROM sessions s
-            LEFT JOIN tenant_environments te ON te.tenant_environment_id = s.tenant_environment_id
-            WHERE s.session_id = $1
-        """
-        args = [session_id]
-        if tenant_id:
-            query += ' AND s.tenant_id = $2'
-            args.append(tenant_id)
-        if tenant_id and environment_id:
-            query += ' AND s.tenant_environment_id = $3'
-            args.append(environment_id)
-        elif environment_id:
-            query += ' AND s.tenant_environment_id = $2'
-            args.append(environment_id)
+        cached = self._cached_session(session_id, tenant_id, environment_id)
+        if cached is not None:
+            return cached
+
+        query, args = query_registry.scoped('sessions.get', [session_id], tenant_id=tenant_id, environment_id=environment_id)
 
         session = await db_manager.fetch_one(query, *args, tenant_id=tenant_id)
+        if session:
+            # Coalesced writes not yet flushed are newer than the row.
+            session.update(self.write_buffer.pending_fields(session_id))
         session = self._normalize_session_record(session)
+        if session and settings.session_cache_enabled:
+            self.session_cache.put(session_id, session)
 
         if session is None and session_id in self.in_memory_sessions:
             memory_session = self.in_memory_sessions[session_id]
@@ -169,22 +306,20 @@ class SessionManager:
             logger.warning('Session completely missing from all datastores', extra={'session_id': session_id})
         return session
 
-    async def update_session_state(self, session_id: str, state, tenant_id: Optional[str] = None):
-        state_value = state.value if hasattr(state, 'value') else str(state)
+    async def _buffered_write(self, session_id: str, fields: Dict[str, Any], tenant_id: Optional[str], sync: bool):
         environment_id, _environment_slug = self._context_environment()
-        query = 'UPDATE sessions SET state = $1 WHERE session_id = $2'
-        args = [state_value, session_id]
-        if tenant_id:
-            query += ' AND tenant_id = $3'
-            args.append(tenant_id)
-            if environment_id:
-                query += ' AND tenant_environment_id = $4'
-                args.append(environment_id)
-        elif environment_id:
-            query += ' AND tenant_environment_id = $3'
-            args.append(environment_id)
-
-        await db_manager.execute_query(query, *args, tenant_id=tenant_id)
+        self.session_cache.patch(session_id, fields)
+        await self.write_buffer.write(session_id, fields, tenant_id=tenant_id, environment_id=environment_id, sync=sync)
+
+    async def flush_pending_writes(self):
+        await self.write_buffer.close()
+
+    async def update_session_state(self, session_id: str, state, tenant_id: Optional[str] = None, sync: Optional[bool] = None):
+        """Record a phase change. Playbook steps are coalesced; state-critical transitions flush immediately."""
+        state_value = state.value if hasattr(state, 'value') else str(state)
+        if sync is None:
+            sync = state_value in SYNC_FLUSH_STATES
+        await self._buffered_write(session_id, {'state': state_value}, tenant_id, sync)
         logger.info('Session execution phase transition recorded', extra={'session_id': session_id, 'new_state': state_value})
 
         span = trace.get_current_span()
@@ -193,20 +328,7 @@ class SessionManager:
 
     async def extend_expiration(self, session_id: str, tenant_id: Optional[str] = None):
         new_expiration = datetime.utcnow() + timedelta(minutes=settings.session_extension_minutes)
-        environment_id, _environment_slug = self._context_environment()
-        query = 'UPDATE sessions SET expires_at = $1 WHERE session_id = $2'
-        args = [new_expiration, session_id]
-        if tenant_id:
-            query += ' AND tenant_id = $3'
-            args.append(tenant_id)
-            if environment_id:
-                query += ' AND tenant_environment_id = $4'
-                args.append(environment_id)
-        elif environment_id:
-            query += ' AND tenant_environment_id = $3'
-            args.append(environment_id)
-
-        await db_manager.execute_query(query, *args, tenant_id=tenant_id)
+        await self._buffered_write(session_id, {'expires_at': new_expiration}, tenant_id, sync=False)
         logger.info('Session expiration securely extended', extra={'session_id': session_id, 'new_expiration': new_expiration})
 
     async def update_session_results(
@@ -227,49 +349,25 @@ class SessionManager:
         if verification_status is None:
             verification_status = SessionState.COMPLETE.value
 
-        environment_id, _environment_slug = self._context_environment()
-        query = """
-            UPDATE sessions
-            SET
-                tier_1_score = $1,
-                tier_2_score = $2,
-                final_trust_score = $3,
-                correlation_value = $4,
-                reasoning = $5,
-                ai_score = $6,
-                physics_score = $7,
-                unified_score = $8,
-                ai_explanation = $9::jsonb,
-                verification_status = $10,
-                state = $11
-            WHERE session_id = $12
-        """
-        args = [
-            tier_1_score,
-            tier_2_score,
-            final_trust_score,
-            correlation_value,
-            reasoning,
-            ai_score,
-            physics_score,
-            unified_score,
-            json.dumps(ai_explanation) if ai_explanation else None,
-            verification_status,
-            verification_status,
-            session_id,
-        ]
-        if tenant_id:
-            query += ' AND tenant_id = $13'
-            args.append(tenant_id)
-            if environment_id:
-                query += ' AND tenant_environment_id = $14'
-                args.append(environment_id)
-        elif environment_id:
-            query += ' AND tenant_environment_id = $13'
-            args.append(environment_id)
+        fields = {
+            'tier_1_score': tier_1_score,
+            'tier_2_score': tier_2_score,
+            'final_trust_score': final_trust_score,
+            'correlation_value': correlation_value,
+            'reasoning': reasoning,
+            'ai_score': ai_score,
+            'physics_score': physics_score,
+            'unified_score': unified_score,
+            'ai_explanation': json.dumps(ai_explanation) if ai_explanation else None,
+            'verification_status': verification_status,
+            'state': verification_status,
+        }
 
         try:
-            await db_manager.execute_query(query, *args, tenant_id=tenant_id)
+            # Results are read by webhooks and reports right away, so they (and any coalesced
+            # state/expiry updates still pending for this session) are flushed synchronously.
+            await self._buffered_write(session_id, fields, tenant_id, sync=True)
+            self.session_cache.patch(session_id, {'ai_explanation': ai_explanation or {}})
         except Exception as e:
             logger.error(f'Failed to update session results in database: {e}', extra={'session_id': session_id})
             if session_id in self.in_memory_sessions:
@@ -299,26 +397,23 @@ class SessionManager:
         tenant_id: Optional[str] = None,
     ):
         environment_id, _environment_slug = self._context_environment()
-        query = """
-            UPDATE sessions
-            SET
-                video_s3_key = COALESCE($1, video_s3_key),
-                imu_data_s3_key = COALESCE($2, imu_data_s3_key),
-                optical_flow_s3_key = COALESCE($3, optical_flow_s3_key)
-            WHERE session_id = $4
-        """
-        args = [video_s3_key, imu_data_s3_key, optical_flow_s3_key, session_id]
-        if tenant_id:
-            query += ' AND tenant_id = $5'
-            args.append(tenant_id)
-            if environment_id:
-                query += ' AND tenant_environment_id = $6'
-                args.append(environment_id)
-        elif environment_id:
-            query += ' AND tenant_environment_id = $5'
-            args.append(environment_id)
-
-        await db_manager.execute_query(query, *args, tenant_id=tenant_id)
+        query, args = query_registry.scoped(
+            'sessions.store_artifact_keys',
+            [video_s3_key, imu_data_s3_key, optical_flow_s3_key, session_id],
+            tenant_id=tenant_id,
+            environment_id=environment_id,
+        )
+
+        result = await db_manager.execute_query(query, *args, tenant_id=tenant_id)
+        self._write_through(session_id, result, {
+            key: value
+            for key, value in (
+                ('video_s3_key', video_s3_key),
+                ('imu_data_s3_key', imu_data_s3_key),
+                ('optical_flow_s3_key', optical_flow_s3_key),
+            )
+            if value is not None
+        })
         logger.info('Artifact keys synced to session', extra={
             'session_id': session_id,
             'has_video': video_s3_key is not None,
@@ -331,32 +426,72 @@ class SessionManager:
             datetime.utcnow(),
             SessionState.COMPLETE.value,
         )
+        self.session_cache.clear()
         logger.info('Bulk expired session purges successfully executed', extra={'rows_deleted': result, 'scheduled_job': True})
 
-    async def get_sessions_by_tenant(self, tenant_id: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        environment_id, _environment_slug = self._context_environment()
-        query = """
-            SELECT s.*, te.slug AS environment
-            FROM sessions s
-            LEFT JOIN tenant_environments te ON te.tenant_environment_id = s.tenant_environment_id
-            WHERE s.tenant_id = $1
+    async def get_sessions_by_tenant(self, tenant_id: str, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await self.list_sessions_page(tenant_id, limit=limit, cursor=cursor, include_total=False)
+
+    async def list_sessions_page(
+        self,
+        tenant_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Dict[str, Any]:
         """
-        args = [tenant_id]
-        if environment_id:
-            query += ' AND s.tenant_environment_id = $2'
-            args.append(environment_id)
-            query += ' ORDER BY s.created_at DESC LIMIT $3 OFFSET $4'
-            args.extend([limit, offset])
-        else:
-            query += ' ORDER BY s.created_at DESC LIMIT $2 OFFSET $3'
-            args.extend([limit, offset])
+        One page of a tenant's sessions, newest first, with the slim list projection.
 
-        sessions = await db_manager.fetch_all(query, *args, tenant_id=tenant_id)
-        sessions = [self._normalize_session_record(session) for session in sessions]
-        if sessions is None:
-            logger.warning('Database unavailable during session indexing query', extra={'tenant_id': tenant_id, 'fallback': 'empty_list'})
-            return []
-        return sessions
+        Pass the returned `next_cursor` back as `cursor` to continue; the keyset seek makes
+        every page cost the same regardless of depth. There is no offset: skipping rows
+        would scan every one of them.
+        """
+        limit = max(1, min(int(limit), MAX_SESSION_PAGE_SIZE))
+        environment_id, _environment_slug = self._context_environment()
+        if cursor:
+            created_at, last_session_id = decode_session_cursor(cursor)
+            query, args = query_registry.scoped('sessions.page_after', [tenant_id], environment_id=environment_id)
+            args.extend([created_at, last_session_id, limit + 1])
+        else:
+            query, args = query_registry.scoped('sessions.page', [tenant_id], environment_id=environment_id)
+            args.append(limit + 1)
+
+        rows = await db_manager.fetch_all(query, *args, tenant_id=tenant_id)
+        has_more = len(rows) > limit
+        sessions = rows[:limit]
+        next_cursor = None
+        if has_more and sessions:
+            next_cursor = encode_session_cursor(sessions[-1]['created_at'], sessions[-1]['session_id'])
+
+        page: Dict[str, Any] = {'sessions': sessions, 'limit': limit, 'next_cursor': next_cursor}
+        if include_total:
+            page['total'], page['total_is_estimate'] = await self.count_sessions(tenant_id, environment_id)
+        return page
+
+    async def count_sessions(self, tenant_id: str, environment_id: Optional[str] = None) -> Tuple[int, bool]:
+        """
+        Exact count up to SESSION_COUNT_EXACT_LIMIT rows, planner estimate beyond that.
 
+        Returns (total, is_estimate). Both queries are bounded, so large tenants never pay
+        for a full COUNT(*).
+        """
+        cap = settings.session_count_exact_limit
+        query, args = query_registry.scoped('sessions.count_capped', [tenant_id], environment_id=environment_id)
+        exact = await db_manager.fetch_val(query, *args, cap + 1, tenant_id=tenant_id)
+        if exact is None:
+            return 0, False
+        if exact <= cap:
+            return int(exact), False
+
+        query, args = query_registry.scoped('sessions.count_estimate', [tenant_id], environment_id=environment_id)
+        try:
+            plan = await db_manager.fetch_val(query, *args, tenant_id=tenant_id)
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+        except Exception as e:
+            logger.warning(f'Session count estimate unavailable: {e}', extra={'tenant_id': tenant_id})
+            estimate = 0
+        return max(estimate, int(exact)), True
 
 session_manager = SessionManager()
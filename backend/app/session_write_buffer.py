@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.database import db_manager
+from app.query_registry import NamedQuery
+
+logger = logging.getLogger(__name__)
+
+# Session columns that may be written through the buffer, with the Postgres array element
+# type used to ship them. JSONB travels as text and is cast after unnesting.
+COALESCED_COLUMNS = {
+    'state': 'text',
+    'expires_at': 'timestamp',
+    'tier_1_score': 'integer',
+    'tier_2_score': 'integer',
+    'final_trust_score': 'integer',
+    'correlation_value': 'float8',
+    'reasoning': 'text',
+    'ai_score': 'float8',
+    'physics_score': 'float8',
+    'unified_score': 'float8',
+    'ai_explanation': 'jsonb',
+    'verification_status': 'text',
+}
+
+MAX_FLUSH_ATTEMPTS = 3
+
+
+@lru_cache(maxsize=None)
+def batch_update_query(columns: Tuple[str, ...]) -> NamedQuery:
+    """
+    One UPDATE for many sessions sharing the same set of changed columns.
+
+    Rows arrive as parallel arrays unnested into a VALUES-style relation, so the SQL text
+    depends only on the column set and stays a stable prepared statement whatever the batch size.
+    """
+    array_types = ['uuid', 'uuid', 'uuid'] + ['text' if COALESCED_COLUMNS[c] == 'jsonb' else COALESCED_COLUMNS[c] for c in columns]
+    params = ', '.join(f'${index}::{array_type}[]' for index, array_type in enumerate(array_types, start=1))
+    aliases = ', '.join(['session_id', 'tenant_filter', 'environment_filter', *columns])
+    assignments = ', '.join(
+        f'{column} = v.{column}::jsonb' if COALESCED_COLUMNS[column] == 'jsonb' else f'{column} = v.{column}'
+        for column in columns
+    )
+    return NamedQuery(
+        f"sessions.batch_update({','.join(columns)})",
+        f"""
+        UPDATE sessions AS s
+        SET {assignments}
+        FROM unnest({params}) AS v({aliases})
+        WHERE s.session_id = v.session_id
+          AND (v.tenant_filter IS NULL OR s.tenant_id = v.tenant_filter)
+          AND (v.environment_filter IS NULL OR s.tenant_environment_id = v.environment_filter)
+        """,
+    )
+
+
+def _row_count(result: Any) -> Optional[int]:
+    if isinstance(result, str) and result.startswith('UPDATE '):
+        try:
+            return int(result.rsplit(' ', 1)[1])
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass
+class PendingSessionWrite:
+    session_id: str
+    tenant_filter: Optional[str]
+    environment_filter: Optional[str]
+    context: Dict[str, Optional[str]]
+    fields: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+    @property
+    def key(self) -> str:
+        # One entry per session, so a flush never puts the same session_id in an UPDATE twice.
+        return self.session_id
+
+    def merge(self, newer: 'PendingSessionWrite'):
+        """Fold a later write for the same session in: its fields win, filters and context fill gaps."""
+        self.fields.update(newer.fields)
+        self.tenant_filter = newer.tenant_filter or self.tenant_filter
+        self.environment_filter = newer.environment_filter or self.environment_filter
+        self.context = {name: newer.context.get(name) or value for name, value in self.context.items()}
+
+
+class SessionWriteBuffer:
+    """
+    Coalesces session field updates and writes them in batches.
+
+    Updates to the same session merge in memory (last value per column wins) until the
+    next flush, which runs every `session_write_flush_interval_ms` and issues one UPDATE
+    per tenant context and column set inside a single transaction. Writers that need the
+    row durable before continuing pass sync=True to flush their session immediately.
+    """
+
+    def __init__(
+        self,
+        on_unmatched: Optional[Callable[[str], None]] = None,
+        enabled: Optional[bool] = None,
+        flush_interval_ms: Optional[int] = None,
+    ):
+        self.on_unmatched = on_unmatched
+        self._enabled = enabled
+        self._flush_interval_ms = flush_interval_ms
+        self._pending: Dict[str, PendingSessionWrite] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.session_write_coalescing_enabled if self._enabled is None else self._enabled
+
+    @property
+    def flush_interval(self) -> float:
+        interval_ms = settings.session_write_flush_interval_ms if self._flush_interval_ms is None else self._flush_interval_ms
+        return max(0, interval_ms) / 1000
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def pending_fields(self, session_id: str) -> Dict[str, Any]:
+        entry = self._pending.get(str(session_id))
+        return dict(entry.fields) if entry else {}
+
+    async def write(
+        self,
+        session_id: str,
+        fields: Dict[str, Any],
+        *,
+        tenant_id: Optional[str] = None,
+        environment_id: Optional[str] = None,
+        sync: bool = False,
+    ):
+        unknown = set(fields) - set(COALESCED_COLUMNS)
+        if unknown:
+            raise ValueError(f'Columns cannot be written through the session write buffer: {sorted(unknown)}')
+
+        context = db_manager.get_request_context()
+        if tenant_id:
+            context['tenant_id'] = str(tenant_id)
+        entry = PendingSessionWrite(
+            session_id=str(session_id),
+            tenant_filter=str(tenant_id) if tenant_id else None,
+            environment_filter=str(environment_id) if environment_id else None,
+            context=context,
+            fields=dict(fields),
+        )
+        pending = self._pending.get(entry.key)
+        if pending is None:
+            self._pending[entry.key] = entry
+        else:
+            pending.merge(entry)
+            entry = pending
+
+        if sync or not self.enabled or not db_manager.pool:
+            await self.flush({entry.session_id}, raise_errors=True)
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            # A fresh context: the flush must not inherit the scheduling request's tenant or connection.
+            self._flush_task = asyncio.create_task(self._flush_later(), context=contextvars.Context())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f'Coalesced session write flush failed: {e}')
+        self._flush_task = None
+        if self._pending:
+            self._schedule_flush()
+
+    def _take(self, session_ids: Optional[Set[str]]) -> List[PendingSessionWrite]:
+        if session_ids is None:
+            batch, self._pending = list(self._pending.values()), {}
+            return batch
+        return [self._pending.pop(session_id) for session_id in session_ids if session_id in self._pending]
+
+    @staticmethod
+    def _arrays(entries: Iterable[PendingSessionWrite], columns: Tuple[str, ...]) -> List[List[Any]]:
+        entries = list(entries)
+        arrays = [
+            [entry.session_id for entry in entries],
+            [entry.tenant_filter for entry in entries],
+            [entry.environment_filter for entry in entries],
+        ]
+        arrays.extend([entry.fields[column] for entry in entries] for column in columns)
+        return arrays
+
+    async def flush(self, session_ids: Optional[Set[str]] = None, raise_errors: bool = False):
+        """Write pending updates (all of them, or only those for `session_ids`)."""
+        async with self._flush_lock:
+            batch = self._take(session_ids)
+            if not batch:
+                return
+
+            groups: Dict[Tuple, List[PendingSessionWrite]] = {}
+            for entry in batch:
+                columns = tuple(sorted(entry.fields))
+                groups.setdefault((tuple(entry.context.items()), columns), []).append(entry)
+
+            unmatched: List[str] = []
+            try:
+                async with db_manager.transaction():
+                    for (context_items, columns), entries in groups.items():
+                        result = await db_manager.execute_query(
+                            batch_update_query(columns),
+                            *self._arrays(entries, columns),
+                            context=dict(context_items),
+                        )
+                        row_count = _row_count(result)
+                        if row_count is not None and row_count < len(entries):
+                            unmatched.extend(entry.session_id for entry in entries)
+            except BaseException as e:
+                if raise_errors:
+                    self._discard(batch)
+                    raise
+                self._requeue(batch, e)
+                if not isinstance(e, Exception):
+                    raise
+                return
+
+            logger.debug('Flushed coalesced session writes', extra={'sessions': len(batch), 'statements': len(groups)})
+            self._discard(unmatched)
+
+    def _discard(self, entries_or_ids):
+        if not self.on_unmatched:
+            return
+        for item in entries_or_ids:
+            self.on_unmatched(item.session_id if isinstance(item, PendingSessionWrite) else item)
+
+    def _requeue(self, batch: List[PendingSessionWrite], error: BaseException):
+        dropped = []
+        for entry in batch:
+            entry.attempts += 1
+            if entry.attempts >= MAX_FLUSH_ATTEMPTS:
+                dropped.append(entry)
+                continue
+            newer = self._pending.get(entry.key)
+            if newer is not None:
+                entry.merge(newer)
+            self._pending[entry.key] = entry
+        logger.warning(f'Session write flush failed; {len(batch) - len(dropped)} session(s) requeued: {error}')
+        if dropped:
+            logger.error('Dropping session writes after repeated flush failures', extra={'session_ids': [entry.session_id for entry in dropped]})
+            self._discard(dropped)
+
+    async def close(self):
+        """Flush everything that is still pending; call on shutdown."""
+        task, self._flush_task = self._flush_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush(raise_errors=True)
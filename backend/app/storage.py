@@ -1,73 +1,206 @@
-﻿import json
+﻿import asyncio
+import hashlib
+import json
 import logging
 import os
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Tuple, Union
 
-from botocore.exceptions import ClientError, ConnectionClosedError, EndpointConnectionError
+from botocore.exceptions import ClientError
 
-from app.aws_credentials import aws_cred_manager
 from app.config import settings
-from app.encryption import tenant_encryption_manager
+from app.encryption import TAG_SIZE, SegmentedCipher, tenant_encryption_manager
+from app.s3_client import AsyncS3Client, error_code
+from app.telemetry_format import (
+    TELEMETRY_CONTENT_TYPE,
+    TELEMETRY_EXTENSION,
+    TelemetryArtifact,
+    decode_telemetry,
+    encode_telemetry,
+    is_columnar_key,
+    telemetry_columns,
+)
 
 logger = logging.getLogger(__name__)
 
-_MAX_RETRIES = 2
+Chunks = Union[Iterable[bytes], AsyncIterable[bytes]]
+
+
+async def _iterate_chunks(chunks: Chunks) -> AsyncIterator[bytes]:
+    if hasattr(chunks, '__aiter__'):
+        async for chunk in chunks:
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+@dataclass
+class StoredObject:
+    """What a store call wrote: enough to register the artifact without asking S3 again."""
+
+    key: str
+    size: int  # plaintext bytes
+    sha256: str  # of the plaintext
+    content_type: str
+    encryption_metadata: Dict[str, str] = field(default_factory=dict)
+    etag: Optional[str] = None
+
+    @property
+    def encryption_mode(self) -> Optional[str]:
+        return self.encryption_metadata.get('vp_mode')
+
+    @property
+    def encryption_key_id(self) -> Optional[str]:
+        return self.encryption_metadata.get('vp_key_id')
+
+
+class ArtifactStream:
+    """
+    A stored artifact opened for streaming. `size` is the plaintext size; `iter_range`
+    yields plaintext for an inclusive byte range using ranged GETs of whole segments, so
+    memory stays bounded by the fetch window rather than the object size.
+    """
+
+    def __init__(
+        self,
+        manager: 'ArtifactStorageManager',
+        key: str,
+        *,
+        ciphertext_size: int,
+        content_type: str,
+        metadata: Dict[str, str],
+        cipher: Optional[SegmentedCipher],
+    ):
+        self._manager = manager
+        self.key = key
+        self.ciphertext_size = ciphertext_size
+        self.content_type = content_type
+        self.metadata = metadata
+        self._cipher = cipher
+        if cipher is not None:
+            self.size = cipher.plaintext_size(ciphertext_size)
+        elif metadata.get('vp_encrypted') == '1':
+            self.size = ciphertext_size - TAG_SIZE  # whole-object AES-GCM
+        else:
+            self.size = ciphertext_size
+
+    async def _get_range(self, start: int, end: int) -> bytes:
+        response = await self._manager.s3.call('get_object', read_body=True, Key=self.key, Range=f'bytes={start}-{end}')
+        return response['Body']
+
+    async def iter_range(self, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        end = self.size - 1 if end is None else min(end, self.size - 1)
+        if self.size == 0 or start > end:
+            return
+        window = max(1, settings.artifact_stream_chunk_bytes)
+
+        if self._cipher is not None:
+            cipher = self._cipher
+            total_segments = cipher.segment_count(self.ciphertext_size)
+            first, last = start // cipher.segment_size, end // cipher.segment_size
+            per_fetch = max(1, window // cipher.segment_size)
+            for batch_start in range(first, last + 1, per_fetch):
+                batch_end = min(last, batch_start + per_fetch - 1)
+                sealed = await self._get_range(
+                    batch_start * cipher.sealed_segment_size,
+                    min(self.ciphertext_size, (batch_end + 1) * cipher.sealed_segment_size) - 1,
+                )
+                plain = cipher.decrypt_segments(batch_start, sealed, total_segments)
+                offset = batch_start * cipher.segment_size
+                yield plain[max(0, start - offset):end - offset + 1]
+            return
+
+        if self.metadata.get('vp_encrypted') == '1':
+            # Whole-object AES-GCM predates segmenting: it has to be fetched and opened in one piece.
+            payload, _content_type, _metadata = await self._manager.load_artifact_object(self.key)
+            for offset in range(start, end + 1, window):
+                yield payload[offset:min(end + 1, offset + window)]
+            return
+
+        for offset in range(start, end + 1, window):
+            yield await self._get_range(offset, min(end, offset + window - 1))
+
+
+class _MultipartUpload:
+    """S3 multipart upload that is only created once the first part is ready."""
+
+    def __init__(self, manager: 'ArtifactStorageManager', key: str, content_type: str, metadata: Dict[str, str]):
+        self._manager = manager
+        self.key = key
+        self.content_type = content_type
+        self.metadata = metadata
+        self.upload_id: Optional[str] = None
+        self.parts = []
+
+    @property
+    def started(self) -> bool:
+        return self.upload_id is not None
+
+    async def send_part(self, body: bytes):
+        s3 = self._manager.s3
+        if self.upload_id is None:
+            response = await s3.call('create_multipart_upload', Key=self.key, ContentType=self.content_type, Metadata=self.metadata)
+            self.upload_id = response['UploadId']
+        part_number = len(self.parts) + 1
+        response = await s3.call('upload_part', transfer=True, Key=self.key, UploadId=self.upload_id, PartNumber=part_number, Body=body)
+        self.parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+
+    async def complete(self) -> Optional[str]:
+        response = await self._manager.s3.call(
+            'complete_multipart_upload',
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts},
+        )
+        return (response or {}).get('ETag')
+
+    async def abort(self):
+        if self.upload_id is None:
+            return
+        try:
+            await self._manager.s3.call('abort_multipart_upload', Key=self.key, UploadId=self.upload_id)
+        except Exception as e:
+            logger.warning(f'Failed to abort multipart upload for {self.key}: {e}')
 
 
 class ArtifactStorageManager:
     """Manages artifact storage in S3 (LocalStack for dev)."""
 
     def __init__(self):
-        self.s3_client = None
+        self.s3: Optional[AsyncS3Client] = None
         self.bucket_name = settings.s3_bucket_name
         self._initialized = False
 
-    def _lazy_init(self):
+    async def ensure_connected(self) -> bool:
+        """Connect on first use; returns False when S3 is unavailable (development only)."""
         if self._initialized:
-            return
-        self._connect()
-
-    def _connect(self):
+            return True
         try:
-            session = aws_cred_manager.get_session()
-            client_kwargs = {
-                'service_name': 's3',
-                'region_name': settings.aws_region,
-            }
-            if settings.aws_endpoint_url:
-                client_kwargs['endpoint_url'] = settings.aws_endpoint_url
-
-            self.s3_client = session.client(**client_kwargs)
-            self._ensure_bucket_exists()
+            if self.s3 is None:
+                self.s3 = AsyncS3Client(self.bucket_name, on_connect=self._ensure_bucket_exists)
+            await self.s3.connect()
             self._initialized = True
             logger.info('S3 storage manager initialized', extra={
                 'endpoint': settings.aws_endpoint_url or 'AWS (default)',
                 'bucket': self.bucket_name,
+                'max_concurrency': self.s3.max_concurrency,
             })
         except Exception as e:
             logger.warning(f'S3 storage not available: {e}')
-            self.s3_client = None
             self._initialized = False
             if settings.environment != 'development':
                 raise
+        return self._initialized
 
-    def _reconnect(self):
-        logger.info('Forcing S3 client reconnection')
-        self._initialized = False
-        self.s3_client = None
-        self._connect()
-
-    def _ensure_bucket_exists(self):
-        if not self.s3_client:
-            return
+    async def _ensure_bucket_exists(self, s3: AsyncS3Client):
         try:
-            self.s3_client.head_bucket(Bucket=self.bucket_name)
+            await s3.call('head_bucket')
         except ClientError as e:
-            error_code = int(e.response['Error'].get('Code', 0))
-            if error_code == 404:
+            if error_code(e) in ('404', 'NoSuchBucket'):
                 try:
-                    self.s3_client.create_bucket(Bucket=self.bucket_name)
+                    await s3.call('create_bucket')
                     logger.info(f'S3 bucket created: {self.bucket_name}')
                 except Exception as create_err:
                     logger.warning(f'Failed to create bucket: {create_err}')
@@ -76,10 +209,10 @@ class ArtifactStorageManager:
         except Exception as e:
             logger.warning(f'S3 connection not ready (will retry later): {e}')
 
-        if settings.environment == 'development' and self.s3_client:
+        if settings.environment == 'development':
             try:
-                self.s3_client.put_bucket_cors(
-                    Bucket=self.bucket_name,
+                await s3.call(
+                    'put_bucket_cors',
                     CORSConfiguration={
                         'CORSRules': [{
                             'AllowedHeaders': ['*'],
@@ -93,78 +226,173 @@ class ArtifactStorageManager:
             except Exception as cors_err:
                 logger.warning(f'Failed to set CORS on bucket: {cors_err}')
 
-    def _put_object_with_retry(self, key: str, body, content_type: str, metadata: Optional[dict] = None):
-        last_error = None
-        for attempt in range(_MAX_RETRIES):
-            try:
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=key,
-                    Body=body,
-                    ContentType=content_type,
-                    Metadata=metadata or {},
-                )
-                return
-            except ClientError as e:
-                error_code = e.response['Error'].get('Code', '')
-                last_error = e
-                if error_code in ('NoSuchBucket', 'NoSuchKey') and attempt < _MAX_RETRIES - 1:
-                    logger.warning(f'S3 bucket missing, reconnecting (attempt {attempt + 1})', extra={'key': key})
-                    self._reconnect()
-                else:
-                    raise
-            except (EndpointConnectionError, ConnectionClosedError, ConnectionError) as e:
-                last_error = e
-                if attempt < _MAX_RETRIES - 1:
-                    logger.warning(f'S3 connection lost, reconnecting (attempt {attempt + 1})', extra={'key': key})
-                    self._reconnect()
-                else:
-                    raise
-        if last_error:
-            raise last_error
-
-    async def _store_bytes(self, tenant_id: str, s3_key: str, payload: bytes, content_type: str) -> Tuple[str, dict]:
-        self._lazy_init()
-
-        ciphertext, encryption_metadata = await tenant_encryption_manager.encrypt_for_tenant(str(tenant_id), payload)
-
-        if not self.s3_client:
-            logger.warning('S3 not available - skipping storage')
-            return f'mock://{s3_key}', encryption_metadata
-
-        self._put_object_with_retry(s3_key, ciphertext, content_type, metadata=encryption_metadata)
-        return s3_key, encryption_metadata
+    async def put_object(self, key: str, body: bytes, content_type: str, metadata: Optional[dict] = None) -> Dict:
+        """Upload raw bytes as-is (no tenant encryption)."""
+        return await self.s3.call(
+            'put_object',
+            transfer=True,
+            Key=key,
+            Body=body,
+            ContentType=content_type,
+            Metadata=metadata or {},
+        )
+
+    async def _store_bytes(self, tenant_id: str, s3_key: str, payload: bytes, content_type: str) -> StoredObject:
+        return await self._store_chunks(tenant_id, s3_key, (payload,), content_type)
+
+    async def _store_chunks(self, tenant_id: str, s3_key: str, chunks: Chunks, content_type: str) -> StoredObject:
+        """
+        Hash, encrypt and upload plaintext chunks in one pass. Objects that outgrow one part go
+        up as a multipart upload, so neither the joined plaintext nor the full ciphertext is
+        ever held in memory: only the pending part and one open segment.
+        """
+        available = await self.ensure_connected()
+
+        encryptor, encryption_metadata = await tenant_encryption_manager.begin_encryption(str(tenant_id))
+        digest = hashlib.sha256()
+        size = 0
+        part_size = max(5 * 1024 * 1024, settings.s3_multipart_part_bytes)
+        pending = bytearray()
+        upload = _MultipartUpload(self, s3_key, content_type, encryption_metadata) if available else None
+
+        try:
+            async for chunk in _iterate_chunks(chunks):
+                view = memoryview(chunk)
+                for offset in range(0, len(view), part_size):
+                    piece = view[offset:offset + part_size]
+                    digest.update(piece)
+                    size += len(piece)
+                    sealed = encryptor.update(piece)
+                    if upload is None:
+                        continue
+                    pending += sealed
+                    if len(pending) >= part_size:
+                        await upload.send_part(bytes(pending))
+                        pending.clear()
+            pending += encryptor.finalize()
+
+            stored = StoredObject(
+                key=s3_key,
+                size=size,
+                sha256=digest.hexdigest(),
+                content_type=content_type,
+                encryption_metadata=encryption_metadata,
+            )
+            if upload is None:
+                logger.warning('S3 not available - skipping storage')
+                stored.key = f'mock://{s3_key}'
+                return stored
+
+            if upload.started:
+                await upload.send_part(bytes(pending))
+                stored.etag = await upload.complete()
+            else:
+                response = await self.put_object(s3_key, bytes(pending), content_type, metadata=encryption_metadata)
+                stored.etag = (response or {}).get('ETag')
+            return stored
+        except BaseException:
+            if upload is not None:
+                await upload.abort()
+            raise
 
     async def store_video(self, tenant_id: str, session_id: str, video_data: bytes) -> str:
-        s3_key, _metadata = await self._store_bytes(str(tenant_id), f'{str(tenant_id)}/sessions/{str(session_id)}/video.webm', video_data, 'video/webm')
-        logger.info(f'Video stored: {s3_key}', extra={'bytes': len(video_data)})
-        return s3_key
+        stored = await self._store_bytes(str(tenant_id), f'{str(tenant_id)}/sessions/{str(session_id)}/video.webm', video_data, 'video/webm')
+        logger.info(f'Video stored: {stored.key}', extra={'bytes': stored.size})
+        return stored.key
+
+    async def _store_telemetry(self, tenant_id: str, session_id: str, stem: str, kind: str, records: list) -> StoredObject:
+        prefix = f'{str(tenant_id)}/sessions/{str(session_id)}/{stem}'
+        if settings.telemetry_artifact_format == 'npz':
+            payload = await asyncio.to_thread(lambda: encode_telemetry(kind, telemetry_columns(kind, records)))
+            return await self._store_bytes(str(tenant_id), f'{prefix}{TELEMETRY_EXTENSION}', payload, TELEMETRY_CONTENT_TYPE)
+        json_data = json.dumps(records, separators=(',', ':')).encode('utf-8')
+        return await self._store_bytes(str(tenant_id), f'{prefix}.json', json_data, 'application/json')
 
     async def store_imu_data(self, tenant_id: str, session_id: str, imu_data: list) -> str:
-        json_data = json.dumps(imu_data, indent=2).encode('utf-8')
-        s3_key, _metadata = await self._store_bytes(str(tenant_id), f'{str(tenant_id)}/sessions/{str(session_id)}/imu_data.json', json_data, 'application/json')
-        logger.info(f'IMU data stored: {s3_key}', extra={'samples': len(imu_data)})
-        return s3_key
+        stored = await self._store_telemetry(tenant_id, session_id, 'imu_data', 'imu', imu_data)
+        logger.info(f'IMU data stored: {stored.key}', extra={'samples': len(imu_data), 'bytes': stored.size})
+        return stored.key
 
     async def store_optical_flow(self, tenant_id: str, session_id: str, flow_data: list) -> str:
-        json_data = json.dumps(flow_data, indent=2).encode('utf-8')
-        s3_key, _metadata = await self._store_bytes(str(tenant_id), f'{str(tenant_id)}/sessions/{str(session_id)}/optical_flow.json', json_data, 'application/json')
-        logger.info(f'Optical flow data stored: {s3_key}', extra={'samples': len(flow_data)})
-        return s3_key
+        stored = await self._store_telemetry(tenant_id, session_id, 'optical_flow', 'optical_flow', flow_data)
+        logger.info(f'Optical flow data stored: {stored.key}', extra={'samples': len(flow_data), 'bytes': stored.size})
+        return stored.key
 
-    async def store_media_artifact(self, tenant_id: str, job_id: str, filename: str, media_data: bytes, content_type: str) -> str:
+    async def store_session_telemetry_artifact(self, tenant_id: str, session_id: str, filename: str, kind: str, columns: Dict) -> StoredObject:
+        """Write already-extracted telemetry columns as a compressed, versioned NPZ artifact."""
+        payload = await asyncio.to_thread(encode_telemetry, kind, columns)
+        return await self.store_session_artifact(tenant_id, session_id, filename, payload, TELEMETRY_CONTENT_TYPE)
+
+    def _media_key(self, tenant_id: str, job_id: str, filename: str, stem: str) -> str:
         extension = os.path.splitext(filename or '')[1].lower() or '.bin'
-        s3_key, _metadata = await self._store_bytes(str(tenant_id), f'{str(tenant_id)}/media-analysis/{str(job_id)}/source{extension}', media_data, content_type)
-        logger.info(f'Media analysis source stored: {s3_key}', extra={'bytes': len(media_data)})
-        return s3_key
+        return f'{str(tenant_id)}/media-analysis/{str(job_id)}/{stem}{extension}'
 
-    async def store_session_artifact(self, tenant_id: str, session_id: str, filename: str, artifact_data: bytes, content_type: str) -> str:
+    async def store_media_artifact(self, tenant_id: str, job_id: str, filename: str, media_data: bytes, content_type: str) -> str:
+        stored = await self._store_bytes(str(tenant_id), self._media_key(tenant_id, job_id, filename, 'source'), media_data, content_type)
+        logger.info(f'Media analysis source stored: {stored.key}', extra={'bytes': stored.size})
+        return stored.key
+
+    async def store_media_artifact_chunks(self, tenant_id: str, job_id: str, filename: str, chunks: Chunks, content_type: str) -> StoredObject:
+        stored = await self._store_chunks(str(tenant_id), self._media_key(tenant_id, job_id, filename, 'source'), chunks, content_type)
+        logger.info(f'Media analysis source stored: {stored.key}', extra={'bytes': stored.size})
+        return stored
+
+    def media_upload_key(self, tenant_id: str, job_id: str, filename: str) -> str:
+        """Staging key a client uploads to directly, before the source is re-stored encrypted."""
+        return self._media_key(tenant_id, job_id, filename, 'upload')
+
+    async def create_presigned_upload(self, s3_key: str, content_type: str, max_bytes: int, expiration: int = None) -> Dict:
+        """
+        Presigned POST for a direct browser/client upload. S3 itself enforces the key, content
+        type, size limit and SSE-S3 at rest, so the API never handles the payload.
+        """
+        if expiration is None:
+            expiration = settings.media_upload_url_expiration_seconds
+        if not await self.ensure_connected():
+            raise ConnectionError('Direct uploads need S3, which is not available')
+
+        fields = {'Content-Type': content_type, 'x-amz-server-side-encryption': 'AES256'}
+        conditions = [
+            {'Content-Type': content_type},
+            {'x-amz-server-side-encryption': 'AES256'},
+            ['content-length-range', 1, max_bytes],
+        ]
+        presigned = self.s3.generate_presigned_post(s3_key, fields, conditions, expiration)
+        url = presigned['url']
+        if settings.environment == 'development' and 'localstack:4566' in url:
+            url = url.replace('localstack:4566', 'localhost:4566')
+        return {'method': 'POST', 'url': url, 'fields': presigned['fields'], 'expires_in': expiration, 'max_bytes': max_bytes}
+
+    async def stat_artifact(self, s3_key: str) -> Optional[Dict]:
+        """Size and content type of an object, or None when it does not exist (yet)."""
+        if not await self.ensure_connected():
+            return None
+        try:
+            response = await self.s3.call('head_object', Key=s3_key)
+        except ClientError as e:
+            if error_code(e) in ('404', 'NoSuchKey', 'NoSuchBucket'):
+                return None
+            raise
+        return {
+            'size': int(response.get('ContentLength') or 0),
+            'content_type': response.get('ContentType') or 'application/octet-stream',
+            'metadata': response.get('Metadata') or {},
+        }
+
+    async def store_session_artifact(self, tenant_id: str, session_id: str, filename: str, artifact_data: bytes, content_type: str) -> StoredObject:
+        safe_name = filename or 'artifact.bin'
+        stored = await self._store_bytes(str(tenant_id), f'{str(tenant_id)}/sessions/{str(session_id)}/{safe_name}', artifact_data, content_type)
+        logger.info(f'Session artifact stored: {stored.key}', extra={'bytes': stored.size, 'content_type': content_type})
+        return stored
+
+    async def store_session_artifact_chunks(self, tenant_id: str, session_id: str, filename: str, chunks: Chunks, content_type: str) -> StoredObject:
+        """Like store_session_artifact, for payloads produced in pieces (recorded video, bundle ZIPs)."""
         safe_name = filename or 'artifact.bin'
-        s3_key, _metadata = await self._store_bytes(str(tenant_id), f'{str(tenant_id)}/sessions/{str(session_id)}/{safe_name}', artifact_data, content_type)
-        logger.info(f'Session artifact stored: {s3_key}', extra={'bytes': len(artifact_data), 'content_type': content_type})
-        return s3_key
+        stored = await self._store_chunks(str(tenant_id), f'{str(tenant_id)}/sessions/{str(session_id)}/{safe_name}', chunks, content_type)
+        logger.info(f'Session artifact stored: {stored.key}', extra={'bytes': stored.size, 'content_type': content_type})
+        return stored
 
-    async def store_session_json_artifact(self, tenant_id: str, session_id: str, filename: str, payload) -> str:
+    async def store_session_json_artifact(self, tenant_id: str, session_id: str, filename: str, payload) -> StoredObject:
         json_data = json.dumps(payload, indent=2, default=str).encode('utf-8')
         return await self.store_session_artifact(
             tenant_id=tenant_id,
@@ -174,74 +402,68 @@ class ArtifactStorageManager:
             content_type='application/json',
         )
 
-    async def get_object_metadata(self, s3_key: str) -> Dict[str, str]:
-        if s3_key.startswith('mock://'):
-            return {}
-        self._lazy_init()
-        if not self.s3_client:
-            return {}
-        try:
-            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
-        except ClientError as e:
-            error_code = e.response['Error'].get('Code', '')
-            if error_code in ('404', 'NoSuchKey', 'NoSuchBucket'):
-                return {}
-            raise
-        return response.get('Metadata') or {}
-
     async def generate_signed_url(self, s3_key: str, expiration: int = None) -> str:
-        self._lazy_init()
         if expiration is None:
             expiration = settings.signed_url_expiration_seconds
-        if not self.s3_client:
+        if not await self.ensure_connected():
             logger.warning('S3 not available - returning mock artifact URL')
             return f'mock://artifact/{s3_key}'
 
         try:
-            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            await self.s3.call('head_object', Key=s3_key)
         except ClientError as e:
-            error_code = e.response['Error'].get('Code', '')
-            if error_code in ('404', 'NoSuchKey'):
+            if error_code(e) in ('404', 'NoSuchKey', 'NoSuchBucket'):
                 logger.error(f'Artifact not found in S3: {s3_key}')
-                raise FileNotFoundError(f'Artifact not found in S3: {s3_key}')
-            if error_code == 'NoSuchBucket':
-                self._reconnect()
-                try:
-                    self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
-                except Exception:
-                    logger.error(f'Artifact not found after reconnect: {s3_key}')
-                    raise FileNotFoundError(f'Artifact not found in S3: {s3_key}')
-
-        url = self.s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': self.bucket_name, 'Key': s3_key},
-            ExpiresIn=expiration,
-        )
+                raise FileNotFoundError(f'Artifact not found in S3: {s3_key}') from e
+            raise
+
+        url = self.s3.generate_presigned_url('get_object', {'Key': s3_key}, expiration)
         if settings.environment == 'development' and 'localstack:4566' in url:
             url = url.replace('localstack:4566', 'localhost:4566')
         logger.info(f'Signed URL generated for: {s3_key}')
         return url
 
     async def load_artifact_object(self, s3_key: str) -> Tuple[bytes, str, dict]:
-        self._lazy_init()
-        if not self.s3_client:
+        if not await self.ensure_connected():
             raise FileNotFoundError(f'Artifact not available in storage: {s3_key}')
 
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            response = await self.s3.call('get_object', read_body=True, Key=s3_key)
         except ClientError as e:
-            error_code = e.response['Error'].get('Code', '')
-            if error_code in ('404', 'NoSuchKey', 'NoSuchBucket'):
+            if error_code(e) in ('404', 'NoSuchKey', 'NoSuchBucket'):
                 raise FileNotFoundError(f'Artifact not found in storage: {s3_key}') from e
             raise
 
         metadata = response.get('Metadata') or {}
         content_type = response.get('ContentType') or 'application/octet-stream'
         tenant_id = s3_key.split('/', 1)[0]
-        payload = response['Body'].read()
+        payload = response['Body']
         plaintext = await tenant_encryption_manager.decrypt_for_tenant(tenant_id, payload, metadata)
         return plaintext, content_type, metadata
 
+    async def open_artifact_stream(self, s3_key: str) -> ArtifactStream:
+        """HEAD the object and prepare it for ranged, incremental reads."""
+        if not await self.ensure_connected():
+            raise FileNotFoundError(f'Artifact not available in storage: {s3_key}')
+
+        try:
+            response = await self.s3.call('head_object', Key=s3_key)
+        except ClientError as e:
+            if error_code(e) in ('404', 'NoSuchKey', 'NoSuchBucket'):
+                raise FileNotFoundError(f'Artifact not found in storage: {s3_key}') from e
+            raise
+
+        metadata = response.get('Metadata') or {}
+        tenant_id = s3_key.split('/', 1)[0]
+        return ArtifactStream(
+            self,
+            s3_key,
+            ciphertext_size=int(response.get('ContentLength') or 0),
+            content_type=response.get('ContentType') or 'application/octet-stream',
+            metadata=metadata,
+            cipher=await tenant_encryption_manager.segmented_cipher(tenant_id, metadata),
+        )
+
     async def load_artifact_bytes(self, s3_key: str) -> bytes:
         payload, _content_type, _metadata = await self.load_artifact_object(s3_key)
         return payload
@@ -250,6 +472,14 @@ class ArtifactStorageManager:
         artifact_bytes = await self.load_artifact_bytes(s3_key)
         return json.loads(artifact_bytes.decode('utf-8'))
 
+    async def load_telemetry_artifact(self, s3_key: str, kind: str) -> TelemetryArtifact:
+        """Telemetry as NumPy columns, whether it was stored as NPZ or as a JSON list of samples."""
+        artifact_bytes = await self.load_artifact_bytes(s3_key)
+        if is_columnar_key(s3_key):
+            return await asyncio.to_thread(decode_telemetry, artifact_bytes)
+        records = json.loads(artifact_bytes.decode('utf-8'))
+        return TelemetryArtifact(kind=kind, schema_version=0, columns=telemetry_columns(kind, records))
+
     async def schedule_deletion(self, s3_key: str, days: int = None):
         if days is None:
             days = settings.artifact_retention_days
@@ -257,16 +487,19 @@ class ArtifactStorageManager:
         logger.info(f'Artifact {s3_key} scheduled for deletion on {deletion_date}')
 
     async def delete_artifact(self, s3_key: str):
-        self._lazy_init()
-        if not self.s3_client:
+        if not await self.ensure_connected():
             logger.warning('S3 not available - skipping artifact deletion')
             return
         try:
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+            await self.s3.call('delete_object', Key=s3_key)
             logger.info(f'Artifact deleted: {s3_key}')
         except Exception as e:
             logger.error(f'Failed to delete artifact: {e}')
             raise
 
+    def close(self):
+        if self.s3 is not None:
+            self.s3.close()
+
 
 storage_manager = ArtifactStorageManager()
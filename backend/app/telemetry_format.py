@@ -0,0 +1,100 @@
+import io
+from dataclasses import dataclass
+from numbers import Number
+from typing import Dict, Sequence
+
+import numpy as np
+
+from app.imu_summary import IMU_SOURCE_FIELDS, imu_channel_arrays
+
+# Columnar telemetry artifacts are deflate-compressed NPZ archives: one float64 array per column
+# plus `__schema__` and `__kind__` entries. Bump the version when column names or dtypes change.
+TELEMETRY_SCHEMA_VERSION = 1
+TELEMETRY_CONTENT_TYPE = 'application/x-npz'
+TELEMETRY_EXTENSION = '.npz'
+_SCHEMA_KEY = '__schema__'
+_KIND_KEY = '__kind__'
+
+
+class TelemetryFormatError(ValueError):
+    pass
+
+
+@dataclass
+class TelemetryArtifact:
+    kind: str
+    schema_version: int
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+
+def is_columnar_key(s3_key: str) -> bool:
+    return (s3_key or '').endswith(TELEMETRY_EXTENSION)
+
+
+def _number_or_nan(value) -> float:
+    return float(value) if isinstance(value, Number) else np.nan
+
+
+def _numeric_fields(record: Dict, prefix: str = '') -> Dict[str, float]:
+    fields = {}
+    for name, value in record.items():
+        if isinstance(value, dict):
+            fields.update(_numeric_fields(value, f'{prefix}{name}.'))
+        elif isinstance(value, Number):
+            fields[f'{prefix}{name}'] = value
+    return fields
+
+
+def record_columns(records: Sequence) -> Dict[str, np.ndarray]:
+    """
+    Columns for a list of numbers (one `value` column) or of dicts (one column per numeric field,
+    nested fields named by their dotted path). Values missing from a record are NaN.
+    """
+    if all(isinstance(record, Number) for record in records):
+        return {'value': np.asarray(records, dtype=float)}
+    rows = [_numeric_fields(record) for record in records]
+    names: Dict[str, None] = {}
+    for row in rows:
+        names.update(dict.fromkeys(row))
+    return {
+        name: np.array([_number_or_nan(row.get(name)) for row in rows], dtype=float)
+        for name in names
+    }
+
+
+def telemetry_columns(kind: str, records: Sequence) -> Dict[str, np.ndarray]:
+    columns = record_columns(records)
+    if kind == 'imu':
+        # The IMU channels go under their canonical names (rotationRate -> rotation_rate); every
+        # other numeric field, e.g. accelerationIncludingGravity.* and interval, is kept as sent.
+        extra = {name: values for name, values in columns.items() if name not in IMU_SOURCE_FIELDS}
+        columns = {**imu_channel_arrays(records), **extra}
+    return columns
+
+
+def encode_telemetry(kind: str, columns: Dict[str, np.ndarray]) -> bytes:
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        **{_SCHEMA_KEY: np.array(TELEMETRY_SCHEMA_VERSION), _KIND_KEY: np.array(kind)},
+        **{name: np.asarray(values, dtype=float) for name, values in columns.items()},
+    )
+    return buffer.getvalue()
+
+
+def decode_telemetry(data: bytes) -> TelemetryArtifact:
+    try:
+        archive = np.load(io.BytesIO(data), allow_pickle=False)
+    except (OSError, ValueError) as exc:
+        raise TelemetryFormatError(f'Not a telemetry archive: {exc}') from exc
+    with archive:
+        if _SCHEMA_KEY not in archive.files:
+            raise TelemetryFormatError('Telemetry archive has no schema version')
+        schema_version = int(archive[_SCHEMA_KEY])
+        if schema_version > TELEMETRY_SCHEMA_VERSION:
+            raise TelemetryFormatError(f'Unsupported telemetry schema version {schema_version}')
+        columns = {name: archive[name] for name in archive.files if name not in (_SCHEMA_KEY, _KIND_KEY)}
+        return TelemetryArtifact(kind=str(archive[_KIND_KEY]), schema_version=schema_version, columns=columns)
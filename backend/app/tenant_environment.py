@@ -264,61 +264,62 @@ async def update_environment_quota(
     absolute_monthly_quota: Optional[int] = None,
     absolute_current_usage: Optional[int] = None,
 ) -> Optional[Dict[str, Any]]:
-    environment = await get_tenant_environment(tenant_id, slug=environment_slug)
-    if not environment:
-        return None
-
-    updates = []
-    params: List[Any] = []
-    next_index = 1
-
-    if absolute_monthly_quota is not None:
-        updates.append(f'monthly_quota = ${next_index}')
-        params.append(absolute_monthly_quota)
-        next_index += 1
-    elif monthly_quota_delta:
-        updates.append(f'monthly_quota = monthly_quota + ${next_index}')
-        params.append(monthly_quota_delta)
-        next_index += 1
-
-    if absolute_current_usage is not None:
-        updates.append(f'current_usage = ${next_index}')
-        params.append(absolute_current_usage)
-        next_index += 1
-    elif current_usage_delta:
-        updates.append(f'current_usage = current_usage + ${next_index}')
-        params.append(current_usage_delta)
-        next_index += 1
-
-    if not updates:
-        return environment
-
-    params.append(environment['environment_id'])
-    query = f"""
-        UPDATE tenant_environment_quotas
-        SET {', '.join(updates)}, updated_at = NOW()
-        WHERE tenant_environment_id = ${next_index}
-    """
-    await db_manager.execute_query(query, *params)
-
-    refreshed = await get_tenant_environment(tenant_id, environment_id=environment['environment_id'])
-    if refreshed and refreshed['slug'] == PRODUCTION_ENVIRONMENT:
-        await db_manager.execute_query(
-            """
-            UPDATE tenants
-            SET monthly_quota = $1,
-                current_usage = $2,
-                billing_cycle_start = $3,
-                billing_cycle_end = $4
-            WHERE tenant_id = $5
-            """,
-            refreshed.get('monthly_quota', 0),
-            refreshed.get('current_usage', 0),
-            refreshed.get('billing_cycle_start'),
-            refreshed.get('billing_cycle_end'),
-            tenant_id,
-        )
-    return refreshed
+    async with db_manager.transaction():
+        environment = await get_tenant_environment(tenant_id, slug=environment_slug)
+        if not environment:
+            return None
+
+        updates = []
+        params: List[Any] = []
+        next_index = 1
+
+        if absolute_monthly_quota is not None:
+            updates.append(f'monthly_quota = ${next_index}')
+            params.append(absolute_monthly_quota)
+            next_index += 1
+        elif monthly_quota_delta:
+            updates.append(f'monthly_quota = monthly_quota + ${next_index}')
+            params.append(monthly_quota_delta)
+            next_index += 1
+
+        if absolute_current_usage is not None:
+            updates.append(f'current_usage = ${next_index}')
+            params.append(absolute_current_usage)
+            next_index += 1
+        elif current_usage_delta:
+            updates.append(f'current_usage = current_usage + ${next_index}')
+            params.append(current_usage_delta)
+            next_index += 1
+
+        if not updates:
+            return environment
+
+        params.append(environment['environment_id'])
+        query = f"""
+            UPDATE tenant_environment_quotas
+            SET {', '.join(updates)}, updated_at = NOW()
+            WHERE tenant_environment_id = ${next_index}
+        """
+        await db_manager.execute_query(query, *params)
+
+        refreshed = await get_tenant_environment(tenant_id, environment_id=environment['environment_id'])
+        if refreshed and refreshed['slug'] == PRODUCTION_ENVIRONMENT:
+            await db_manager.execute_query(
+                """
+                UPDATE tenants
+                SET monthly_quota = $1,
+                    current_usage = $2,
+                    billing_cycle_start = $3,
+                    billing_cycle_end = $4
+                WHERE tenant_id = $5
+                """,
+                refreshed.get('monthly_quota', 0),
+                refreshed.get('current_usage', 0),
+                refreshed.get('billing_cycle_start'),
+                refreshed.get('billing_cycle_end'),
+                tenant_id,
+            )
+        return refreshed
 
 
 def _serialize_environment(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,136 @@
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+from app.sensor_fusion import sensor_fusion_analyzer
+
+logger = logging.getLogger(__name__)
+
+# full           - Tier 2 and Tier 3 run on every session (legacy behaviour)
+# physics_first  - strong Tier 1 passes skip both Tier 2 and Tier 3
+# vision_only    - strong Tier 1 passes run the Tier 2 vision scan but skip Tier 3
+TIER_POLICY_MODES = {"full", "physics_first", "vision_only"}
+
+
+@dataclass
+class TierExecutionDecision:
+    mode: str
+    run_tier_2: bool
+    run_tier_3: bool
+    strong_physics_pass: bool
+    audit_sampled: bool = False
+    reason: str = ""
+
+    @property
+    def runs_ai(self) -> bool:
+        return self.run_tier_2 or self.run_tier_3
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "run_tier_2": self.run_tier_2,
+            "run_tier_3": self.run_tier_3,
+            "strong_physics_pass": self.strong_physics_pass,
+            "audit_sampled": self.audit_sampled,
+            "reason": self.reason,
+        }
+
+
+class TierExecutionPolicy:
+    """
+    Decides which AI tiers run for a session once Tier 1 physics has scored it.
+
+    Sessions that fail or are ambiguous under Tier 1 always get the full AI pipeline.
+    Strong physics passes are gated by the resolved mode, with a configurable audit
+    sample still sent through every tier so the skipped population stays measurable.
+    """
+
+    def __init__(
+        self,
+        default_mode: Optional[str] = None,
+        tenant_overrides: Optional[Dict[str, str]] = None,
+        profile_overrides: Optional[Dict[str, str]] = None,
+        audit_sample_rate: Optional[float] = None,
+        rng: Optional[Callable[[], float]] = None,
+    ):
+        self._default_mode = default_mode
+        self._tenant_overrides = tenant_overrides
+        self._profile_overrides = profile_overrides
+        self._audit_sample_rate = audit_sample_rate
+        self._rng = rng or random.random
+
+    @property
+    def tenant_overrides(self) -> Dict[str, str]:
+        if self._tenant_overrides is not None:
+            return self._tenant_overrides
+        return settings.tier_policy_tenant_overrides_map
+
+    @property
+    def profile_overrides(self) -> Dict[str, str]:
+        if self._profile_overrides is not None:
+            return self._profile_overrides
+        return settings.tier_policy_profile_overrides_map
+
+    @property
+    def audit_sample_rate(self) -> float:
+        rate = settings.tier_audit_sample_rate if self._audit_sample_rate is None else self._audit_sample_rate
+        return max(0.0, min(1.0, float(rate or 0.0)))
+
+    def resolve_mode(self, tenant_id: Optional[str], verification_profile: Optional[str]) -> str:
+        """Tenant+profile overrides win over tenant overrides, which win over profile overrides."""
+        tenant_key = str(tenant_id).lower() if tenant_id else None
+        profile_key = (verification_profile or "standard").lower()
+        candidates = []
+        if tenant_key:
+            candidates.append(self.tenant_overrides.get(f"{tenant_key}:{profile_key}"))
+            candidates.append(self.tenant_overrides.get(tenant_key))
+        candidates.append(self.profile_overrides.get(profile_key))
+        candidates.append(self._default_mode or settings.tier_policy_default)
+
+        for mode in candidates:
+            if not mode:
+                continue
+            mode = mode.strip().lower()
+            if mode in TIER_POLICY_MODES:
+                return mode
+            logger.warning(f"Unknown tier execution mode '{mode}' ignored")
+        return "full"
+
+    def is_strong_physics_pass(self, correlation: Optional[float], sample_count: int) -> bool:
+        if correlation is None or sample_count < settings.tier_policy_min_imu_samples:
+            return False
+        return not sensor_fusion_analyzer.should_trigger_tier_2(correlation)
+
+    def decide(
+        self,
+        tenant_id: Optional[str],
+        verification_profile: Optional[str],
+        correlation: Optional[float],
+        sample_count: int,
+    ) -> TierExecutionDecision:
+        mode = self.resolve_mode(tenant_id, verification_profile)
+        strong_pass = self.is_strong_physics_pass(correlation, sample_count)
+
+        if mode == "full":
+            decision = TierExecutionDecision(mode, True, True, strong_pass, reason="policy requires full AI pipeline")
+        elif not strong_pass:
+            decision = TierExecutionDecision(mode, True, True, False, reason="Tier 1 physics inconclusive or failing")
+        elif self.audit_sample_rate > 0 and self._rng() < self.audit_sample_rate:
+            decision = TierExecutionDecision(mode, True, True, True, audit_sampled=True, reason="sampled for audit")
+        elif mode == "vision_only":
+            decision = TierExecutionDecision(mode, True, False, True, reason="strong Tier 1 pass; Tier 3 gated")
+        else:
+            decision = TierExecutionDecision(mode, False, False, True, reason="strong Tier 1 pass; AI tiers gated")
+
+        logger.info("Tier execution decision", extra={
+            "tenant_id": tenant_id,
+            "verification_profile": verification_profile,
+            "correlation": correlation,
+            **decision.to_dict(),
+        })
+        return decision
+
+
+tier_execution_policy = TierExecutionPolicy()
@@ -1,6 +1,5 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Optional
-import hashlib
+from typing import Dict, Iterable, List, Optional
 import json
 import logging
 import asyncio
@@ -314,13 +313,9 @@ class VerificationWebSocket:
         session_id: str,
         artifact_type: str,
         file_name: str,
-        content_type: str,
-        storage_key: str,
-        artifact_bytes: bytes,
+        stored,
         provider: Optional[str] = None,
         metadata: Optional[Dict] = None,
-        encryption_mode: Optional[str] = None,
-        encryption_key_id: Optional[str] = None,
     ):
         from app.artifact_manager import artifact_manager
 
@@ -330,13 +325,13 @@ class VerificationWebSocket:
             artifact_type=artifact_type,
             provider=provider,
             file_name=file_name,
-            content_type=content_type,
-            storage_key=storage_key,
-            size_bytes=len(artifact_bytes),
-            sha256=hashlib.sha256(artifact_bytes).hexdigest(),
+            content_type=stored.content_type,
+            storage_key=stored.key,
+            size_bytes=stored.size,
+            sha256=stored.sha256,
             metadata=metadata or {},
-            encryption_mode=encryption_mode,
-            encryption_key_id=encryption_key_id,
+            encryption_mode=stored.encryption_mode,
+            encryption_key_id=stored.encryption_key_id,
         )
 
     async def _store_json_session_artifact(
@@ -352,28 +347,22 @@ class VerificationWebSocket:
     ) -> Optional[str]:
         from app.storage import storage_manager
 
-        artifact_bytes = json.dumps(payload, indent=2, default=str).encode('utf-8')
-        storage_key = await storage_manager.store_session_json_artifact(
+        stored = await storage_manager.store_session_json_artifact(
             tenant_id=tenant_id,
             session_id=session_id,
             filename=file_name,
             payload=payload,
         )
-        encryption_metadata = await storage_manager.get_object_metadata(storage_key)
         await self._register_session_artifact(
             tenant_id=tenant_id,
             session_id=session_id,
             artifact_type=artifact_type,
             file_name=file_name,
-            content_type='application/json',
-            storage_key=storage_key,
-            artifact_bytes=artifact_bytes,
+            stored=stored,
             provider=provider,
             metadata=metadata,
-            encryption_mode=encryption_metadata.get('vp_mode'),
-            encryption_key_id=encryption_metadata.get('vp_key_id'),
         )
-        return storage_key
+        return stored.key
 
     async def _store_binary_session_artifact(
         self,
@@ -382,36 +371,84 @@ class VerificationWebSocket:
         session_id: str,
         artifact_type: str,
         file_name: str,
-        artifact_data: bytes,
+        artifact_chunks: Iterable[bytes],
         content_type: str,
         provider: Optional[str] = None,
         metadata: Optional[Dict] = None,
     ) -> Optional[str]:
         from app.storage import storage_manager
 
-        storage_key = await storage_manager.store_session_artifact(
+        stored = await storage_manager.store_session_artifact_chunks(
             tenant_id=tenant_id,
             session_id=session_id,
             filename=file_name,
-            artifact_data=artifact_data,
+            chunks=artifact_chunks,
             content_type=content_type,
         )
-        encryption_metadata = await storage_manager.get_object_metadata(storage_key)
         await self._register_session_artifact(
             tenant_id=tenant_id,
             session_id=session_id,
             artifact_type=artifact_type,
             file_name=file_name,
-            content_type=content_type,
-            storage_key=storage_key,
-            artifact_bytes=artifact_data,
+            stored=stored,
             provider=provider,
             metadata=metadata,
-            encryption_mode=encryption_metadata.get('vp_mode'),
-            encryption_key_id=encryption_metadata.get('vp_key_id'),
         )
-        return storage_key
+        return stored.key
     
+    async def _store_telemetry_session_artifact(
+        self,
+        *,
+        tenant_id,
+        session_id: str,
+        artifact_type: str,
+        stem: str,
+        kind: str,
+        records: List,
+        provider: Optional[str] = None,
+        metadata: Optional[Dict] = None,
+    ) -> Optional[str]:
+        """Raw telemetry as JSON, or (TELEMETRY_ARTIFACT_FORMAT=npz) as columnar NPZ plus a JSON summary."""
+        from app.config import settings
+        from app.imu_summary import summarize_imu_columns
+        from app.storage import storage_manager
+        from app.telemetry_format import TELEMETRY_EXTENSION, TELEMETRY_SCHEMA_VERSION, telemetry_columns
+
+        if settings.telemetry_artifact_format != 'npz':
+            return await self._store_json_session_artifact(
+                tenant_id=tenant_id,
+                session_id=session_id,
+                artifact_type=artifact_type,
+                file_name=f'{stem}.json',
+                payload=records,
+                provider=provider,
+                metadata=metadata,
+            )
+
+        columns = await asyncio.to_thread(telemetry_columns, kind, records)
+        file_name = f'{stem}{TELEMETRY_EXTENSION}'
+        stored = await storage_manager.store_session_telemetry_artifact(tenant_id, session_id, file_name, kind, columns)
+        await self._register_session_artifact(
+            tenant_id=tenant_id,
+            session_id=session_id,
+            artifact_type=artifact_type,
+            file_name=file_name,
+            stored=stored,
+            provider=provider,
+            metadata={**(metadata or {}), 'format': 'npz', 'schema_version': TELEMETRY_SCHEMA_VERSION},
+        )
+        if kind == 'imu':
+            await self._store_json_session_artifact(
+                tenant_id=tenant_id,
+                session_id=session_id,
+                artifact_type='imu_summary',
+                file_name='imu_summary.json',
+                payload=summarize_imu_columns(columns),
+                provider=provider,
+                metadata={'source_artifact_type': artifact_type},
+            )
+        return stored.key
+
     async def handle_video_chunk(self, session_id: str, chunk_data: bytes):
         """Handle incoming video chunk"""
         current = self._ensure_recording_transport_state(self.session_data.get(session_id))
@@ -651,9 +688,22 @@ class VerificationWebSocket:
                 "tier_1_status": tier_1_status
             })
 
-            asyncio.create_task(self.run_ai_verification_background(session_id, session_data))
+            ai_task = asyncio.create_task(self.run_ai_verification_background(session_id, session_data))
             await self.upload_session_artifacts(session_id)
 
+            # Once the AI pass has written its results (and rekognition_raw), build the evidence
+            # report and bundle so the first dashboard download is served from storage.
+            # The task runs outside any request scope, so hand it the session's tenant explicitly.
+            from app.reporting import evidence_manager
+            session_db = await session_manager.get_session(session_id)
+            if session_db:
+                evidence_manager.schedule_pregeneration(
+                    session_id,
+                    tenant_id=str(session_db['tenant_id']),
+                    environment_id=session_db.get('tenant_environment_id'),
+                    after=ai_task,
+                )
+
         except Exception as e:
             logger.error(f"Verification Tier 1 crashed: {e}", exc_info=True, extra={"session_id": session_id})
             await self.send_message(session_id, {
@@ -663,12 +713,15 @@ class VerificationWebSocket:
     
     async def run_ai_verification_background(self, session_id: str, session_data: dict):
         """Background asynchronous AI video frame analysis. Failures here are fully isolated."""
+        import os
+        tmp_video_path = None
         try:
             import tempfile
-            import os
             from app.video_utils import extract_sparse_keyframes
             from app.ai_provider import get_ai_pipeline
-            from app.scoring import calculate_unified_score, evaluate_trust_status
+            from app.scoring import calculate_unified_score, evaluate_trust_status, needs_more_keyframes
+            from app.sensor_fusion import sensor_fusion_analyzer
+            from app.tier_policy import tier_execution_policy
             from app.database import db_manager
             from app.webhooks import webhook_manager
             from app.quota import quota_manager
@@ -683,22 +736,6 @@ class VerificationWebSocket:
                 
             video_data = self._build_video_payload(session_data)
             
-            # 2. Extract frames
-            with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as tmp_video:
-                tmp_video.write(video_data)
-                tmp_video.flush()
-                tmp_video_path = tmp_video.name
-            
-            frames_b64 = extract_sparse_keyframes(tmp_video_path, num_frames=5)
-            
-            # Clean up temp file
-            try:
-                os.remove(tmp_video_path)
-            except:
-                pass
-            
-            # 3. Request AI classification via the 3-Tier Verification Engine
-            vision_engine, genai_engine = get_ai_pipeline()
             session_db = await session_manager.get_session(session_id)
             metadata = session_db.get("metadata", {}) if session_db else {}
             if session_db:
@@ -709,7 +746,40 @@ class VerificationWebSocket:
                     actor_type='service_account',
                 )
             
-            if not frames_b64:
+            # 2. Decide which AI tiers the Tier 1 result still warrants
+            correlation = session_db.get("correlation_value") if session_db else None
+            gyro_sample_count = len(session_data.get("gyro_gamma", []))
+            # Without client-measured optical flow, Tier 1 correlates the gyro with a series derived
+            # from the gyro itself, so its score says nothing about the scene and must not gate AI tiers.
+            physics_correlation = correlation if session_data.get("optical_flow_data") else None
+            tier_decision = tier_execution_policy.decide(
+                tenant_id=session_db.get("tenant_id") if session_db else None,
+                verification_profile=metadata.get("verification_profile", "standard"),
+                correlation=physics_correlation,
+                sample_count=gyro_sample_count,
+            )
+            
+            # 3. Extract frames, sized by how much the Tier 1 physics evidence already tells us
+            frames_b64 = []
+            keyframe_budget = 0
+            if tier_decision.runs_ai:
+                keyframe_budget = sensor_fusion_analyzer.recommend_keyframe_count(physics_correlation, gyro_sample_count)
+                with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as tmp_video:
+                    tmp_video.write(video_data)
+                    tmp_video.flush()
+                    tmp_video_path = tmp_video.name
+                
+                # Decoding is CPU-bound; keep it off the event loop serving live sessions.
+                frames_b64 = await asyncio.to_thread(extract_sparse_keyframes, tmp_video_path, num_frames=keyframe_budget)
+            
+            # 4. Request AI classification via the 3-Tier Verification Engine
+            vision_engine, genai_engine = get_ai_pipeline() if tier_decision.runs_ai else (None, None)
+            
+            if not tier_decision.runs_ai:
+                is_spoofed = False
+                vision_context = {"status": "skipped", "message": tier_decision.reason}
+                rekognition_artifact = None
+            elif not frames_b64:
                 logger.error(
                     "Skipping Tier 2 and Tier 3 analysis because no decodable video frames were extracted",
                     extra={"session_id": session_id},
@@ -720,6 +790,10 @@ class VerificationWebSocket:
                     "message": "No decodable video frames were extracted from the recorded video.",
                 }
                 rekognition_artifact = None
+            elif not tier_decision.run_tier_2:
+                is_spoofed = False
+                vision_context = {"status": "skipped", "message": tier_decision.reason}
+                rekognition_artifact = None
             else:
                 # --- TIER 2: VISION SCANNER (AWS Rekognition) ---
                 # Pass metadata so Rekognition can resolve the verification_profile for conditional spoof suppression
@@ -784,7 +858,13 @@ class VerificationWebSocket:
                     "imu_context": imu_context
                 })
             
-            if not frames_b64:
+            if not tier_decision.runs_ai:
+                tier_2_score = None  # Tier 2 did not run; 0 would read as a failed vision scan
+                ai_score = -1.0
+                ai_explanation = {
+                    "summary": "AI analysis was skipped because Tier 1 physics evidence was conclusive."
+                }
+            elif not frames_b64:
                 tier_2_score = 0
                 ai_score = -1.0
                 ai_explanation = {
@@ -795,6 +875,13 @@ class VerificationWebSocket:
                 tier_2_score = 0
                 ai_score = 0.0
                 ai_explanation = vision_context
+            elif not tier_decision.run_tier_3:
+                tier_2_score = 100 if vision_context.get("status") == "success" else 0
+                ai_score = -1.0
+                ai_explanation = {
+                    "summary": "Tier 3 evaluation was skipped because Tier 1 physics evidence was conclusive and the Tier 2 vision scan found no presentation attack.",
+                    "vision_context": vision_context,
+                }
             else:
                 # --- TIER 3: GENERATIVE AI EVALUATOR (Google Gemini / Amazon Nova) ---
                 # Calculate a rough Tier 2 pass/fail metric for the dashboard (just context extraction success)
@@ -802,8 +889,46 @@ class VerificationWebSocket:
                 
                 # Hand off the AWS Rekognition structured JSON and IMU context to the GenAI prompt
                 ai_score, ai_explanation = await genai_engine.evaluate_trust(frames_b64, vision_context, metadata, imu_context)
+
+                # Escalate to a denser frame sample only when the model reports low confidence in its verdict
+                escalation_frames = settings.keyframes_escalation_frames
+                reported_confidence = ai_explanation.get("confidence") if isinstance(ai_explanation, dict) else None
+                if (
+                    settings.keyframes_escalation_enabled
+                    and len(frames_b64) < escalation_frames
+                    and needs_more_keyframes(
+                        ai_score,
+                        reported_confidence,
+                        settings.keyframes_escalation_min_confidence,
+                        settings.keyframes_escalation_band,
+                    )
+                ):
+                    escalated_frames = await asyncio.to_thread(extract_sparse_keyframes, tmp_video_path, num_frames=escalation_frames)
+                    if len(escalated_frames) > len(frames_b64):
+                        logger.info("Escalating Tier 3 keyframe budget after low-confidence verdict", extra={
+                            "session_id": session_id,
+                            "initial_frames": len(frames_b64),
+                            "escalated_frames": len(escalated_frames),
+                            "initial_ai_score": ai_score,
+                            "initial_confidence": reported_confidence,
+                        })
+                        escalated_score, escalated_explanation = await genai_engine.evaluate_trust(
+                            escalated_frames, vision_context, metadata, imu_context
+                        )
+                        if escalated_score >= 0:
+                            ai_score, ai_explanation = escalated_score, escalated_explanation
+                            frames_b64 = escalated_frames
+
+            if isinstance(ai_explanation, dict):
+                ai_explanation = {**ai_explanation, "tier_execution": tier_decision.to_dict()}
+
+            logger.info("Tier 2/3 keyframe usage", extra={
+                "session_id": session_id,
+                "keyframe_budget": keyframe_budget,
+                "frames_analyzed": len(frames_b64),
+            })
             
-            # 4. Final Scoring Fusion
+            # 5. Final Scoring Fusion
             if not session_db:
                 logger.error("Session missing from DB during AI pass", extra={"session_id": session_id})
                 return
@@ -819,11 +944,11 @@ class VerificationWebSocket:
             final_status = "success" if is_authentic else "failed"
             final_reasoning = f"{ai_explanation.get('summary', 'N/A')}"
             
-            # 5. Update Session DB with Full 3-Tier enrichment
+            # 6. Update Session DB with Full 3-Tier enrichment
             await session_manager.update_session_results(
                 session_id=session_id,
                 tier_1_score=int(physics_score),
-                tier_2_score=int(tier_2_score),
+                tier_2_score=int(tier_2_score) if tier_2_score is not None else None,
                 final_trust_score=int(unified_score),
                 correlation_value=session_db.get("correlation_value"),
                 reasoning=final_reasoning,
@@ -844,7 +969,7 @@ class VerificationWebSocket:
                 except Exception as q_err:
                     logger.error(f"Failed to decrement quota: {q_err}", extra={"session_id": session_id})
             
-            # 6. Webhook Notification
+            # 7. Webhook Notification
             environment_id = session_db.get('tenant_environment_id') if session_db else None
             webhooks = await db_manager.fetch_all(
                 """
@@ -913,6 +1038,12 @@ class VerificationWebSocket:
             except Exception as db_err:
                 logger.error(f"Failed to record AI crash to DB: {db_err}", extra={"session_id": session_id})
         finally:
+            if tmp_video_path:
+                try:
+                    os.remove(tmp_video_path)
+                except OSError:
+                    pass
+
             # Clear in-memory data to free up memory ONLY after all background tasks are done
             # Also delay for 5 seconds to ensure any lagging connections are safely disconnected
             await asyncio.sleep(5)
@@ -946,36 +1077,38 @@ class VerificationWebSocket:
             # Upload video chunks if available
             if session_data.get('video_chunks'):
                 try:
-                    video_data = self._build_video_payload(session_data)
+                    # Stream the recorded chunks straight into the encrypted upload instead of joining them first.
+                    video_chunks = [chunk["data"] for chunk in self._ordered_video_chunks(session_data)]
                     video_key = await self._store_binary_session_artifact(
                         tenant_id=tenant_id,
                         session_id=session_id,
                         artifact_type='original_video',
                         file_name='video.webm',
-                        artifact_data=video_data,
+                        artifact_chunks=video_chunks,
                         content_type='video/webm',
                         provider='verification_interface',
                         metadata={'source': 'live_verification'},
                     )
-                    logger.info(f"Exported artifact file to S3 buckets", extra={"session_id": session_id, "tensor": "video", "bytes": len(video_data)})
+                    logger.info(f"Exported artifact file to S3 buckets", extra={"session_id": session_id, "tensor": "video", "bytes": sum(len(chunk) for chunk in video_chunks)})
                 except Exception as e:
                     logger.error(f"S3 Interfacing crash formatting WebM file: {e}", extra={"session_id": session_id})
             
             # Upload IMU data if available
             if session_data.get('imu_data'):
                 try:
-                    imu_key = await self._store_json_session_artifact(
+                    imu_key = await self._store_telemetry_session_artifact(
                         tenant_id=tenant_id,
                         session_id=session_id,
                         artifact_type='imu_telemetry',
-                        file_name='imu_data.json',
-                        payload=session_data['imu_data'],
+                        stem='imu_data',
+                        kind='imu',
+                        records=session_data['imu_data'],
                         provider='verification_interface',
                         metadata={'sample_count': len(session_data['imu_data'])},
                     )
                     logger.info(f"Exported artifact file to S3 buckets", extra={"session_id": session_id, "tensor": "imu", "length_samples": len(session_data['imu_data'])})
                 except Exception as e:
-                    logger.error(f"S3 Interfacing crash formatting IMU JSON file: {e}", extra={"session_id": session_id})
+                    logger.error(f"S3 Interfacing crash formatting IMU telemetry file: {e}", extra={"session_id": session_id})
             
             # Update session with S3 keys
             if video_key or imu_key:
@@ -120,7 +120,7 @@ CREATE TABLE IF NOT EXISTS user_invitations (
 );
 
 CREATE TABLE IF NOT EXISTS audit_events (
-    audit_event_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    audit_event_id UUID NOT NULL DEFAULT uuid_generate_v4(),
     tenant_id UUID REFERENCES tenants(tenant_id) ON DELETE CASCADE,
     actor_user_id UUID REFERENCES users(user_id) ON DELETE SET NULL,
     actor_type VARCHAR(50) NOT NULL,
@@ -128,8 +128,9 @@ CREATE TABLE IF NOT EXISTS audit_events (
     resource_type VARCHAR(100),
     resource_id VARCHAR(255),
     metadata JSONB,
-    created_at TIMESTAMP DEFAULT NOW()
-);
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (audit_event_id, created_at)
+) PARTITION BY RANGE (created_at);
 
 CREATE TABLE IF NOT EXISTS service_accounts (
     service_account_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -228,19 +229,20 @@ CREATE TABLE IF NOT EXISTS branding_configs (
 );
 
 CREATE TABLE IF NOT EXISTS usage_logs (
-    log_id BIGSERIAL PRIMARY KEY,
+    log_id BIGSERIAL,
     tenant_id UUID REFERENCES tenants(tenant_id) ON DELETE CASCADE,
     session_id UUID REFERENCES sessions(session_id) ON DELETE CASCADE,
-    timestamp TIMESTAMP DEFAULT NOW(),
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
     verification_status VARCHAR(50),
     tier_1_score INTEGER,
     tier_2_score INTEGER,
     final_trust_score INTEGER,
-    latency_ms INTEGER
-);
+    latency_ms INTEGER,
+    PRIMARY KEY (log_id, timestamp)
+) PARTITION BY RANGE (timestamp);
 
 CREATE TABLE IF NOT EXISTS webhook_logs (
-    log_id BIGSERIAL PRIMARY KEY,
+    log_id BIGSERIAL,
     tenant_id UUID REFERENCES tenants(tenant_id) ON DELETE CASCADE,
     session_id UUID REFERENCES sessions(session_id) ON DELETE CASCADE,
     webhook_url VARCHAR(500),
@@ -252,8 +254,10 @@ CREATE TABLE IF NOT EXISTS webhook_logs (
     webhook_id UUID,
     event_type VARCHAR(100),
     response_time_ms INTEGER,
-    success BOOLEAN
-);
+    success BOOLEAN,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (log_id, created_at)
+) PARTITION BY RANGE (created_at);
 
 CREATE TABLE IF NOT EXISTS webhooks (
     webhook_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -279,8 +283,126 @@ CREATE TABLE IF NOT EXISTS invoices (
     paid_at TIMESTAMP
 );
 
+-- Monthly range partitions for the append-only log tables. Partitions are named <table>_pYYYYMM;
+-- <table>_default catches rows outside every range. The app's partition manager keeps
+-- partitions created ahead of time and drops (or detaches) those past the retention window.
+CREATE OR REPLACE FUNCTION app.ensure_monthly_partitions(p_table TEXT, p_months_ahead INTEGER DEFAULT 3, p_from DATE DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_month DATE := date_trunc('month', COALESCE(p_from, CURRENT_DATE))::date;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I DEFAULT', p_table || '_default', p_table);
+
+    FOR i IN 0..p_months_ahead LOOP
+        v_name := p_table || '_p' || to_char(v_month, 'YYYYMM');
+        IF to_regclass(quote_ident(v_name)) IS NULL THEN
+            BEGIN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    v_name, p_table, v_month::timestamp, (v_month + INTERVAL '1 month')::timestamp
+                );
+                v_created := v_created + 1;
+            EXCEPTION
+                -- The month is already covered (a converted legacy partition), or rows for it
+                -- landed in the default partition; leave it there rather than fail.
+                WHEN invalid_object_definition OR check_violation THEN
+                    RAISE NOTICE 'Skipping partition %: %', v_name, SQLERRM;
+            END;
+        END IF;
+        v_month := (v_month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN v_created;
+END;
+$$;
+
+-- Converts a table created before partitioning into a partitioned one. The old heap is kept
+-- as <table>_legacy, attached as the partition for everything before next month, so the
+-- conversion copies no rows and retention eventually drops it like any other partition.
+CREATE OR REPLACE FUNCTION app.partition_by_month(p_table TEXT, p_column TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_legacy TEXT := p_table || '_legacy';
+    v_boundary TIMESTAMP := date_trunc('month', CURRENT_DATE) + INTERVAL '1 month';
+    v_key_columns TEXT;
+    r RECORD;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_class
+        WHERE oid = to_regclass(quote_ident(p_table)) AND relkind = 'r'
+    ) THEN
+        RETURN;
+    END IF;
+
+    SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY array_position(i.indkey::int2[], a.attnum))
+    INTO v_key_columns
+    FROM pg_index i
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+    WHERE i.indrelid = to_regclass(quote_ident(p_table)) AND i.indisprimary;
+
+    EXECUTE format('UPDATE %I SET %I = %L WHERE %I IS NULL', p_table, p_column, 'epoch'::timestamp, p_column);
+    EXECUTE format('ALTER TABLE %I ALTER COLUMN %I SET NOT NULL', p_table, p_column);
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, v_legacy);
+    EXECUTE format('ALTER TABLE %I RENAME CONSTRAINT %I TO %I', v_legacy, p_table || '_pkey', v_legacy || '_pkey');
+    -- Free the index names so the CREATE INDEX statements below build them on the new parent
+    -- (matching legacy indexes are attached to it rather than rebuilt).
+    FOR r IN
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = to_regclass(quote_ident(v_legacy)) AND NOT i.indisprimary
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', r.relname, left(r.relname, 56) || '_legacy');
+    END LOOP;
+
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS) PARTITION BY RANGE (%I)', p_table, v_legacy, p_column);
+    EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (%s, %I)', p_table, v_key_columns, p_column);
+
+    -- Serial sequences must belong to the parent, or dropping the legacy partition would drop them.
+    FOR r IN
+        SELECT a.attname, pg_get_serial_sequence(quote_ident(v_legacy), a.attname) AS seq
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass(quote_ident(v_legacy)) AND a.attnum > 0 AND NOT a.attisdropped
+    LOOP
+        IF r.seq IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.%I', r.seq, p_table, r.attname);
+        END IF;
+    END LOOP;
+
+    FOR r IN
+        SELECT conname, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(quote_ident(v_legacy)) AND contype = 'f'
+    LOOP
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s', p_table, r.conname, r.definition);
+    END LOOP;
+
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (MINVALUE) TO (%L)', p_table, v_legacy, v_boundary);
+END;
+$$;
+
+-- webhook_logs had no insertion timestamp before partitioning; date existing rows by delivery.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass('webhook_logs') AND relkind = 'r') THEN
+        ALTER TABLE webhook_logs ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT NOW();
+        UPDATE webhook_logs SET created_at = COALESCE(delivered_at, failed_at, created_at);
+    END IF;
+END;
+$$;
+
+SELECT app.partition_by_month('audit_events', 'created_at');
+SELECT app.partition_by_month('usage_logs', 'timestamp');
+SELECT app.partition_by_month('webhook_logs', 'created_at');
+
+SELECT app.ensure_monthly_partitions('audit_events');
+SELECT app.ensure_monthly_partitions('usage_logs');
+SELECT app.ensure_monthly_partitions('webhook_logs');
+
 -- Indexes
-CREATE INDEX IF NOT EXISTS idx_sessions_tenant_id ON sessions(tenant_id);
 CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions(created_at);
 CREATE INDEX IF NOT EXISTS idx_session_artifacts_session_id ON session_artifacts(session_id);
 CREATE INDEX IF NOT EXISTS idx_session_artifacts_tenant_id ON session_artifacts(tenant_id);
@@ -384,6 +506,7 @@ VALUES
     ('api_keys.manage', 'Manage API keys'),
     ('org.members.manage', 'Manage organization memberships'),
     ('platform.metadata.read', 'Read platform metadata'),
+    ('platform.operations.manage', 'Run platform maintenance operations'),
     ('media-analysis.create', 'Create media analysis jobs'),
     ('media-analysis.read', 'Read media analysis jobs')
 ON CONFLICT (permission_slug) DO NOTHING;
@@ -406,7 +529,8 @@ VALUES
     ('org_viewer', 'analytics.read'),
     ('org_viewer', 'billing.read'),
     ('org_viewer', 'media-analysis.read'),
-    ('platform_admin', 'platform.metadata.read')
+    ('platform_admin', 'platform.metadata.read'),
+    ('platform_admin', 'platform.operations.manage')
 ON CONFLICT (role_slug, permission_slug) DO NOTHING;
 
 INSERT INTO organizations (org_id, tenant_id, display_name, contact_email)
@@ -540,6 +664,7 @@ CREATE INDEX IF NOT EXISTS idx_session_artifacts_environment_id ON session_artif
 CREATE INDEX IF NOT EXISTS idx_media_analysis_jobs_environment_id ON media_analysis_jobs(tenant_environment_id);
 CREATE INDEX IF NOT EXISTS idx_usage_logs_environment_id ON usage_logs(tenant_environment_id);
 CREATE INDEX IF NOT EXISTS idx_webhook_logs_environment_id ON webhook_logs(tenant_environment_id);
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_webhook_created ON webhook_logs(webhook_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_webhooks_environment_id ON webhooks(tenant_environment_id);
 CREATE INDEX IF NOT EXISTS idx_auth_sessions_active_environment_id ON auth_sessions(active_environment_id);
 
@@ -723,3 +848,247 @@ DROP POLICY IF EXISTS webhooks_tenant_isolation ON webhooks;
 CREATE POLICY webhooks_tenant_isolation ON webhooks
     USING (tenant_id = app.current_tenant_uuid() AND (app.current_environment_uuid() IS NULL OR tenant_environment_id = app.current_environment_uuid()))
     WITH CHECK (tenant_id = app.current_tenant_uuid() AND (app.current_environment_uuid() IS NULL OR tenant_environment_id = app.current_environment_uuid()));
+
+-- Batched media analysis: one batch row tracks progress, each item is a media_analysis_jobs row
+CREATE TABLE IF NOT EXISTS media_analysis_batches (
+    batch_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id UUID REFERENCES tenants(tenant_id) ON DELETE CASCADE,
+    tenant_environment_id UUID REFERENCES tenant_environments(tenant_environment_id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    completed_at TIMESTAMP,
+    status VARCHAR(50) DEFAULT 'pending',
+    total_items INTEGER NOT NULL DEFAULT 0,
+    completed_items INTEGER NOT NULL DEFAULT 0,
+    failed_items INTEGER NOT NULL DEFAULT 0,
+    metadata JSONB
+);
+
+ALTER TABLE media_analysis_jobs ADD COLUMN IF NOT EXISTS batch_id UUID REFERENCES media_analysis_batches(batch_id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_media_analysis_batches_tenant_created ON media_analysis_batches(tenant_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_media_analysis_jobs_batch_id ON media_analysis_jobs(batch_id) WHERE batch_id IS NOT NULL;
+
+ALTER TABLE media_analysis_batches ENABLE ROW LEVEL SECURITY;
+ALTER TABLE media_analysis_batches FORCE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS media_analysis_batches_tenant_isolation ON media_analysis_batches;
+CREATE POLICY media_analysis_batches_tenant_isolation ON media_analysis_batches
+    USING (tenant_id = app.current_tenant_uuid() AND (app.current_environment_uuid() IS NULL OR tenant_environment_id = app.current_environment_uuid()))
+    WITH CHECK (tenant_id = app.current_tenant_uuid() AND (app.current_environment_uuid() IS NULL OR tenant_environment_id = app.current_environment_uuid()));
+
+-- Session change notifications: each API node keeps a short-lived session record cache and
+-- drops entries written by other nodes. The payload is "<application_name>|<session_id>".
+CREATE OR REPLACE FUNCTION app.notify_session_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM pg_notify('veraproof_session_changes', current_setting('application_name') || '|' || OLD.session_id::text);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS sessions_notify_change ON sessions;
+CREATE TRIGGER sessions_notify_change
+    AFTER UPDATE OR DELETE ON sessions
+    FOR EACH ROW EXECUTE FUNCTION app.notify_session_change();
+
+-- Keyset pagination for session lists: (created_at, session_id) seek within a tenant environment.
+-- The tenant-only variant serves callers without an environment filter.
+CREATE INDEX IF NOT EXISTS idx_sessions_tenant_env_created ON sessions(tenant_id, tenant_environment_id, created_at DESC, session_id DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_tenant_created ON sessions(tenant_id, created_at DESC, session_id DESC);
+-- Superseded by idx_sessions_tenant_created (tenant_id is its leading column).
+DROP INDEX IF EXISTS idx_sessions_tenant_id;
+
+-- Analytics rollups: hourly and daily per tenant/environment buckets keyed by session created_at,
+-- maintained by trigger as sessions are created, scored and deleted. Backfill with
+-- `python -m app.analytics_rollups backfill` (or POST /api/v1/admin/analytics/rollups/backfill, which runs it in the background).
+CREATE TABLE IF NOT EXISTS session_rollups (
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id) ON DELETE CASCADE,
+    tenant_environment_id UUID,
+    granularity VARCHAR(8) NOT NULL CHECK (granularity IN ('hour', 'day')),
+    bucket_start TIMESTAMP NOT NULL,
+    session_count INTEGER NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    failed_count INTEGER NOT NULL DEFAULT 0,
+    timeout_count INTEGER NOT NULL DEFAULT 0,
+    cancelled_count INTEGER NOT NULL DEFAULT 0,
+    scored_count INTEGER NOT NULL DEFAULT 0,
+    passed_count INTEGER NOT NULL DEFAULT 0,
+    trust_score_sum BIGINT NOT NULL DEFAULT 0,
+    CONSTRAINT session_rollups_bucket_key UNIQUE NULLS NOT DISTINCT (tenant_id, tenant_environment_id, granularity, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_session_rollups_tenant_bucket ON session_rollups(tenant_id, granularity, bucket_start);
+
+ALTER TABLE session_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE session_rollups FORCE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS session_rollups_tenant_isolation ON session_rollups;
+CREATE POLICY session_rollups_tenant_isolation ON session_rollups
+    USING (tenant_id = app.current_tenant_uuid() AND (app.current_environment_uuid() IS NULL OR tenant_environment_id = app.current_environment_uuid()))
+    WITH CHECK (tenant_id = app.current_tenant_uuid() AND (app.current_environment_uuid() IS NULL OR tenant_environment_id = app.current_environment_uuid()));
+
+-- Adds (p_sign = 1) or removes (p_sign = -1) one session's contribution to its hour and day buckets.
+CREATE OR REPLACE FUNCTION app.apply_session_rollup(
+    p_tenant_id UUID,
+    p_environment_id UUID,
+    p_created_at TIMESTAMP,
+    p_verification_status VARCHAR,
+    p_final_trust_score INTEGER,
+    p_sign INTEGER
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_status TEXT := lower(COALESCE(p_verification_status, ''));
+    v_granularity TEXT;
+BEGIN
+    IF p_tenant_id IS NULL OR p_created_at IS NULL THEN
+        RETURN;
+    END IF;
+
+    FOREACH v_granularity IN ARRAY ARRAY['hour', 'day'] LOOP
+        INSERT INTO session_rollups AS r (
+            tenant_id, tenant_environment_id, granularity, bucket_start,
+            session_count, success_count, failed_count, timeout_count, cancelled_count,
+            scored_count, passed_count, trust_score_sum
+        ) VALUES (
+            p_tenant_id, p_environment_id, v_granularity, date_trunc(v_granularity, p_created_at),
+            p_sign,
+            CASE WHEN v_status = 'success' THEN p_sign ELSE 0 END,
+            CASE WHEN v_status = 'failed' THEN p_sign ELSE 0 END,
+            CASE WHEN v_status = 'timeout' THEN p_sign ELSE 0 END,
+            CASE WHEN v_status = 'cancelled' THEN p_sign ELSE 0 END,
+            CASE WHEN p_final_trust_score IS NOT NULL THEN p_sign ELSE 0 END,
+            CASE WHEN p_final_trust_score >= 50 THEN p_sign ELSE 0 END,
+            COALESCE(p_final_trust_score, 0) * p_sign
+        )
+        ON CONFLICT ON CONSTRAINT session_rollups_bucket_key DO UPDATE SET
+            session_count = r.session_count + EXCLUDED.session_count,
+            success_count = r.success_count + EXCLUDED.success_count,
+            failed_count = r.failed_count + EXCLUDED.failed_count,
+            timeout_count = r.timeout_count + EXCLUDED.timeout_count,
+            cancelled_count = r.cancelled_count + EXCLUDED.cancelled_count,
+            scored_count = r.scored_count + EXCLUDED.scored_count,
+            passed_count = r.passed_count + EXCLUDED.passed_count,
+            trust_score_sum = r.trust_score_sum + EXCLUDED.trust_score_sum;
+    END LOOP;
+END;
+$$;
+
+-- Per-tenant totals for the platform admin console. Holds no session content, so like tenants it
+-- has no RLS and is readable across tenants; maintained by the same sessions trigger as the rollups.
+CREATE TABLE IF NOT EXISTS tenant_stats (
+    tenant_id UUID PRIMARY KEY REFERENCES tenants(tenant_id) ON DELETE CASCADE,
+    total_sessions BIGINT NOT NULL DEFAULT 0,
+    scored_sessions BIGINT NOT NULL DEFAULT 0,
+    passed_sessions BIGINT NOT NULL DEFAULT 0,
+    trust_score_sum BIGINT NOT NULL DEFAULT 0,
+    sessions_today INTEGER NOT NULL DEFAULT 0,
+    today_date DATE,
+    last_active_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tenant_stats_total_sessions ON tenant_stats(total_sessions DESC);
+CREATE INDEX IF NOT EXISTS idx_tenant_stats_last_active_at ON tenant_stats(last_active_at DESC);
+
+-- Admin tenant search is a substring match on email; trigram index keeps ILIKE '%term%' off a seq scan.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_tenants_email_trgm ON tenants USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_tenants_created_at ON tenants(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tenants_subscription_tier ON tenants(subscription_tier);
+
+-- Adds (p_sign = 1) or removes (p_sign = -1) one session's contribution to its tenant's totals.
+-- last_active_at only moves forward; sessions_today restarts when the first session of a new day lands.
+CREATE OR REPLACE FUNCTION app.apply_tenant_stats(
+    p_tenant_id UUID,
+    p_created_at TIMESTAMP,
+    p_final_trust_score INTEGER,
+    p_sign INTEGER
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_today INTEGER := CASE WHEN p_created_at::date = CURRENT_DATE THEN p_sign ELSE 0 END;
+BEGIN
+    IF p_tenant_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO tenant_stats AS t (
+        tenant_id, total_sessions, scored_sessions, passed_sessions, trust_score_sum,
+        sessions_today, today_date, last_active_at
+    ) VALUES (
+        p_tenant_id,
+        p_sign,
+        CASE WHEN p_final_trust_score IS NOT NULL THEN p_sign ELSE 0 END,
+        CASE WHEN p_final_trust_score >= 50 THEN p_sign ELSE 0 END,
+        COALESCE(p_final_trust_score, 0) * p_sign,
+        GREATEST(v_today, 0),
+        CURRENT_DATE,
+        CASE WHEN p_sign > 0 THEN p_created_at END
+    )
+    ON CONFLICT (tenant_id) DO UPDATE SET
+        total_sessions = t.total_sessions + EXCLUDED.total_sessions,
+        scored_sessions = t.scored_sessions + EXCLUDED.scored_sessions,
+        passed_sessions = t.passed_sessions + EXCLUDED.passed_sessions,
+        trust_score_sum = t.trust_score_sum + EXCLUDED.trust_score_sum,
+        sessions_today = GREATEST(CASE WHEN t.today_date = CURRENT_DATE THEN t.sessions_today ELSE 0 END + v_today, 0),
+        today_date = CURRENT_DATE,
+        last_active_at = GREATEST(t.last_active_at, EXCLUDED.last_active_at);
+END;
+$$;
+
+-- Per-tenant rollup lock. Session writes take it shared for their transaction; a backfill takes it
+-- exclusive, so rebuilding one tenant only waits for (and holds back) that tenant's session writes.
+CREATE OR REPLACE FUNCTION app.lock_tenant_rollups(p_tenant_id UUID, p_exclusive BOOLEAN DEFAULT FALSE)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_tenant_id IS NULL THEN
+        RETURN;
+    END IF;
+    IF p_exclusive THEN
+        PERFORM pg_advisory_xact_lock(hashtext('session_rollups'), hashtext(p_tenant_id::text));
+    ELSE
+        PERFORM pg_advisory_xact_lock_shared(hashtext('session_rollups'), hashtext(p_tenant_id::text));
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION app.session_rollup_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+        AND NEW.tenant_id IS NOT DISTINCT FROM OLD.tenant_id
+        AND NEW.tenant_environment_id IS NOT DISTINCT FROM OLD.tenant_environment_id
+        AND NEW.created_at IS NOT DISTINCT FROM OLD.created_at
+        AND NEW.verification_status IS NOT DISTINCT FROM OLD.verification_status
+        AND NEW.final_trust_score IS NOT DISTINCT FROM OLD.final_trust_score THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM app.lock_tenant_rollups(OLD.tenant_id);
+        PERFORM app.apply_session_rollup(OLD.tenant_id, OLD.tenant_environment_id, OLD.created_at, OLD.verification_status, OLD.final_trust_score, -1);
+        PERFORM app.apply_tenant_stats(OLD.tenant_id, OLD.created_at, OLD.final_trust_score, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM app.lock_tenant_rollups(NEW.tenant_id);
+        PERFORM app.apply_session_rollup(NEW.tenant_id, NEW.tenant_environment_id, NEW.created_at, NEW.verification_status, NEW.final_trust_score, 1);
+        PERFORM app.apply_tenant_stats(NEW.tenant_id, NEW.created_at, NEW.final_trust_score, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS sessions_rollup ON sessions;
+CREATE TRIGGER sessions_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF tenant_id, tenant_environment_id, created_at, verification_status, final_trust_score ON sessions
+    FOR EACH ROW EXECUTE FUNCTION app.session_rollup_trigger();
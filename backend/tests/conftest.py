@@ -8,9 +8,18 @@ from httpx import AsyncClient
 
 from app.auth import api_key_manager, local_auth_manager
 from app.database import db_manager
+from app.encryption import tenant_encryption_manager
 from app.main import app
 
 
+@pytest.fixture(autouse=True)
+def _reset_tenant_key_cache():
+    """Tests fake the tenants table per test; never let cached encryption config leak between them."""
+    tenant_encryption_manager.clear_cache()
+    yield
+    tenant_encryption_manager.clear_cache()
+
+
 @pytest.fixture(scope="function")
 async def client() -> AsyncGenerator[AsyncClient, None]:
     """Create test client"""
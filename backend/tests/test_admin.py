@@ -0,0 +1,55 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from app import admin
+
+
+@pytest.mark.asyncio
+async def test_list_tenants_reads_maintained_stats_with_indexed_sort(monkeypatch):
+    fetch_all = AsyncMock(return_value=[])
+    fetch_val = AsyncMock(return_value=7)
+    monkeypatch.setattr("app.admin.db_manager.fetch_all", fetch_all)
+    monkeypatch.setattr("app.admin.db_manager.fetch_val", fetch_val)
+
+    response = await admin.list_tenants(
+        limit=10, offset=20, search="acme", subscription_tier=None, status=None,
+        sort="total_sessions", order="desc", _admin_context=None,
+    )
+
+    query = fetch_all.await_args.args[0]
+    assert "LEFT JOIN tenant_stats ts" in query
+    assert "SELECT COUNT(*) FROM sessions" not in query
+    assert "ORDER BY COALESCE(ts.total_sessions, 0) DESC NULLS LAST, t.tenant_id LIMIT $3 OFFSET $4" in query
+    assert fetch_all.await_args.args[2:] == ("%acme%", 10, 20)
+    assert "t.email ILIKE $2" in fetch_val.await_args.args[0]
+    assert response["total"] == 7
+
+    with pytest.raises(HTTPException) as exc_info:
+        await admin.list_tenants(sort="t.email; DROP TABLE tenants", _admin_context=None)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_platform_stats_come_from_one_aggregate(monkeypatch):
+    fetch_one = AsyncMock(return_value={
+        "total_tenants": 4,
+        "active_tenants": 2,
+        "total_sessions": 100,
+        "sessions_today": 5,
+        "successful_sessions": 30,
+        "failed_sessions": 10,
+        "average_trust_score": 61.234,
+        "estimated_mrr": 447,
+    })
+    monkeypatch.setattr("app.admin.db_manager.fetch_one", fetch_one)
+
+    stats = await admin.get_platform_stats(_admin_context=None)
+
+    fetch_one.assert_awaited_once()
+    assert "FROM tenants t" in fetch_one.await_args.args[0]
+    assert stats["average_sessions_per_tenant"] == 25.0
+    assert stats["platform_success_rate"] == 75.0
+    assert stats["average_trust_score"] == 61.23
+    assert stats["total_revenue"] == 447.0
@@ -64,6 +64,7 @@ async def test_analyze_frames_success(mock_boto3_client):
     
     assert score == 92.5
     assert explanation["summary"] == "The video displays a natural 3D capture without static framing or screen glare."
+    assert "confidence" not in explanation  # not reported, so escalation falls back to the score band
     
     # Verify Bedrock InvokeModel was called correctly
     mock_runtime.invoke_model.assert_called_once()
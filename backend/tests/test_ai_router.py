@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from app.ai_provider import GenAIProvider
+from app.ai_router import GenAIRouter
+from app.database import db_manager
+
+
+class FakeProvider(GenAIProvider):
+    def __init__(self, name, score=80.0, cost_per_call=0.0, fail=False):
+        self.provider_name = name
+        self.score = score
+        self.cost_per_call_usd = cost_per_call
+        self.fail = fail
+        self.calls = 0
+
+    async def evaluate_trust(self, frames_base64, vision_context, metadata=None, imu_context=None):
+        self.calls += 1
+        if self.fail:
+            return -1.0, {"error": "AI evaluation failed: throttled"}
+        return self.score, {"summary": f"{self.provider_name} verdict"}
+
+
+def _router(providers, **kwargs):
+    return GenAIRouter(
+        factories={name: (lambda provider=provider: provider) for name, provider in providers.items()},
+        provider_order=list(providers.keys()),
+        tenant_pins=kwargs.pop("tenant_pins", {}),
+        shadow_sample_rate=kwargs.pop("shadow_sample_rate", 0.0),
+        **kwargs,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_request_context():
+    db_manager.set_request_context()
+    yield
+    db_manager.set_request_context()
+
+
+@pytest.mark.asyncio
+async def test_ordered_policy_prefers_first_provider():
+    gemini, nova = FakeProvider("gemini", 90.0), FakeProvider("nova", 70.0)
+    router = _router({"gemini": gemini, "nova": nova}, policy="ordered")
+
+    score, explanation = await router.evaluate_trust(["frame"], {})
+
+    assert score == 90.0
+    assert explanation["provider"] == "gemini"
+    assert nova.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_failover_to_next_provider_and_trip_after_repeated_failures():
+    gemini, nova = FakeProvider("gemini", fail=True), FakeProvider("nova", 70.0)
+    router = _router({"gemini": gemini, "nova": nova}, policy="ordered")
+
+    for _ in range(3):
+        score, explanation = await router.evaluate_trust(["frame"], {})
+        assert score == 70.0
+        assert explanation["provider"] == "nova"
+
+    assert router.is_healthy("gemini") is False
+    await router.evaluate_trust(["frame"], {})
+    assert gemini.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_cheapest_policy_uses_cost_estimates():
+    gemini = FakeProvider("gemini", 90.0, cost_per_call=0.002)
+    nova = FakeProvider("nova", 70.0, cost_per_call=0.001)
+    router = _router({"gemini": gemini, "nova": nova}, policy="cheapest")
+
+    _score, explanation = await router.evaluate_trust(["frame"], {})
+
+    assert explanation["provider"] == "nova"
+
+
+@pytest.mark.asyncio
+async def test_lowest_p95_policy_uses_observed_latency():
+    gemini, nova = FakeProvider("gemini"), FakeProvider("nova")
+    router = _router({"gemini": gemini, "nova": nova}, policy="lowest_p95")
+    router._stats_for("gemini").record(900.0, True)
+    router._stats_for("nova").record(150.0, True)
+
+    _score, explanation = await router.evaluate_trust(["frame"], {})
+
+    assert explanation["provider"] == "nova"
+
+
+@pytest.mark.asyncio
+async def test_tenant_pin_overrides_policy():
+    gemini, nova = FakeProvider("gemini"), FakeProvider("nova")
+    router = _router({"gemini": gemini, "nova": nova}, policy="ordered", tenant_pins={"tenant-1": "nova"})
+    db_manager.set_request_context(tenant_id="tenant-1")
+
+    _score, explanation = await router.evaluate_trust(["frame"], {})
+
+    assert explanation["provider"] == "nova"
+    assert gemini.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_shadow_evaluation_runs_secondary_provider_without_changing_result():
+    gemini, nova = FakeProvider("gemini", 90.0), FakeProvider("nova", 40.0)
+    router = _router({"gemini": gemini, "nova": nova}, policy="ordered", shadow_sample_rate=1.0)
+
+    score, explanation = await router.evaluate_trust(["frame"], {})
+    await asyncio.gather(*list(router._shadow_tasks))
+
+    assert score == 90.0
+    assert explanation["provider"] == "gemini"
+    assert nova.calls == 1
+    assert router.stats["nova"].total_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_returns_failure_when_all_providers_fail():
+    router = _router({"gemini": FakeProvider("gemini", fail=True)}, policy="ordered")
+
+    score, explanation = await router.evaluate_trust(["frame"], {})
+
+    assert score == -1.0
+    assert "error" in explanation
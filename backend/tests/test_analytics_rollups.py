@@ -0,0 +1,110 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.analytics_rollups import AnalyticsRollupManager
+
+
+@pytest.mark.asyncio
+async def test_stats_are_derived_from_bucket_sums(monkeypatch):
+    fetch_one = AsyncMock(return_value={
+        "total_sessions": 40,
+        "sessions_today": 3,
+        "sessions_this_week": 12,
+        "sessions_this_month": 30,
+        "scored_count": 8,
+        "passed_count": 6,
+        "trust_score_sum": 500,
+    })
+    monkeypatch.setattr("app.analytics_rollups.db_manager.fetch_one", fetch_one)
+
+    stats = await AnalyticsRollupManager().get_stats("tenant-1", "env-1")
+
+    assert stats == {
+        "total_sessions": 40,
+        "sessions_today": 3,
+        "sessions_this_week": 12,
+        "sessions_this_month": 30,
+        "success_rate": 75.0,
+        "average_trust_score": 62.5,
+    }
+    query = fetch_one.await_args.args[0]
+    assert query.name == "analytics.stats.env"
+    assert "FROM session_rollups" in query
+    assert fetch_one.await_args.args[1:] == ("tenant-1", "env-1")
+
+
+@pytest.mark.asyncio
+async def test_usage_trend_fills_missing_buckets_with_zeros(monkeypatch):
+    fetch_all = AsyncMock(return_value=[
+        {"bucket_start": datetime(2026, 3, 8), "session_count": 5, "success_count": 4, "failed_count": 1,
+         "scored_count": 4, "trust_score_sum": 300},
+    ])
+    monkeypatch.setattr("app.analytics_rollups.db_manager.fetch_all", fetch_all)
+
+    trend = await AnalyticsRollupManager().get_usage_trend("tenant-1", period="daily", now=datetime(2026, 3, 10, 15, 30))
+
+    assert [point["date"] for point in trend] == [f"2026-03-{day:02d}" for day in range(4, 11)]
+    assert trend[4] == {"date": "2026-03-08", "session_count": 5, "success_count": 4, "failed_count": 1, "average_trust_score": 75.0}
+    assert all(point["session_count"] == 0 for index, point in enumerate(trend) if index != 4)
+    assert fetch_all.await_args.args[1:] == ("tenant-1", "day", datetime(2026, 3, 4))
+
+    hourly = await AnalyticsRollupManager().get_usage_trend("tenant-1", period="hourly", now=datetime(2026, 3, 10, 15, 30))
+    assert len(hourly) == 24
+    assert hourly[-1]["date"] == "2026-03-10T15:00"
+    assert fetch_all.await_args.args[2:] == ("hour", datetime(2026, 3, 9, 16))
+
+
+@pytest.mark.asyncio
+async def test_backfill_rebuilds_each_tenant_in_its_own_transaction(monkeypatch):
+    conn = MagicMock()
+    conn.execute = AsyncMock(side_effect=lambda sql, *args: "INSERT 0 4" if sql.lstrip().startswith("INSERT") else "OK")
+    contexts = []
+
+    @asynccontextmanager
+    async def fake_transaction(tenant_id=None, context=None):
+        contexts.append(context)
+        yield conn
+
+    monkeypatch.setattr("app.analytics_rollups.db_manager.transaction", fake_transaction)
+    monkeypatch.setattr(
+        "app.analytics_rollups.db_manager.fetch_all",
+        AsyncMock(return_value=[{"tenant_id": "tenant-1"}, {"tenant_id": "tenant-2"}]),
+    )
+
+    rebuilt = await AnalyticsRollupManager().backfill()
+
+    assert rebuilt == {"tenant-1": 4, "tenant-2": 4}
+    assert contexts == [{"tenant_id": "tenant-1"}, {"tenant_id": "tenant-2"}]
+    statements = [call.args[0].strip() for call in conn.execute.await_args_list]
+    # Only the tenant being rebuilt is locked; other tenants' session writes carry on.
+    assert statements[0] == "SELECT app.lock_tenant_rollups($1::uuid, TRUE)"
+    assert conn.execute.await_args_list[0].args[1] == "tenant-1"
+    assert statements[1].startswith("DELETE FROM session_rollups")
+    assert statements[3].startswith("INSERT INTO tenant_stats")
+
+
+@pytest.mark.asyncio
+async def test_scheduled_backfill_runs_in_the_background_one_at_a_time(monkeypatch):
+    manager = AnalyticsRollupManager()
+    release = asyncio.Event()
+    calls = []
+
+    async def fake_backfill(tenant_id):
+        calls.append(tenant_id)
+        await release.wait()
+        return {"tenant-1": 4}
+
+    monkeypatch.setattr(manager, "_backfill", fake_backfill)
+
+    assert manager.schedule_backfill() is True
+    assert manager.schedule_backfill("tenant-1") is False
+    await asyncio.sleep(0)
+    release.set()
+    await manager._backfill_task
+    assert calls == [None]
+    assert manager.schedule_backfill("tenant-1") is True
+    await manager._backfill_task
@@ -0,0 +1,283 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.database import TenantDatabaseManager
+
+
+class FakeAcquire:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _manager_with_connection():
+    manager = TenantDatabaseManager()
+    conn = MagicMock()
+    conn.execute = AsyncMock(return_value="SELECT 1")
+    conn.fetchrow = AsyncMock(return_value={"ok": 1})
+    manager.pool = MagicMock()
+    manager.pool.acquire = MagicMock(side_effect=lambda: FakeAcquire(conn))
+    return manager, conn
+
+
+@pytest.mark.asyncio
+async def test_apply_context_sets_all_settings_in_one_statement():
+    manager, conn = _manager_with_connection()
+    manager.set_request_context(tenant_id="tenant-1", environment_id="env-1", environment_slug="production", actor_id="user-1", actor_type="user")
+
+    await manager.fetch_one("SELECT 1")
+
+    conn.execute.assert_awaited_once()
+    query, *args = conn.execute.await_args.args
+    assert query.count("set_config(") == 5
+    assert args == ["tenant-1", "env-1", "production", "user-1", "user"]
+
+
+@pytest.mark.asyncio
+async def test_apply_context_skips_when_connection_already_carries_context():
+    manager, conn = _manager_with_connection()
+    manager.set_request_context(tenant_id="tenant-1", actor_type="service_account")
+
+    await manager._apply_context(conn)
+    await manager._apply_context(conn)
+    assert conn.execute.await_count == 1
+
+    await manager._apply_context(conn, tenant_id="tenant-2")
+    assert conn.execute.await_count == 2
+    assert conn.execute.await_args.args[1] == "tenant-2"
+
+
+@pytest.mark.asyncio
+async def test_applied_context_is_forgotten_when_connection_is_released():
+    manager, conn = _manager_with_connection()
+    manager.set_request_context(tenant_id="tenant-1")
+
+    await manager.fetch_one("SELECT 1")
+    await manager.fetch_one("SELECT 1")
+
+    # The pool resets session settings on release, so each acquisition re-applies once.
+    assert conn.execute.await_count == 2
+    assert manager._applied_contexts == {}
+
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def start(self):
+        self.conn.events.append("begin")
+
+    async def commit(self):
+        self.conn.events.append("commit")
+
+    async def rollback(self):
+        self.conn.events.append("rollback")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, *_exc):
+        if exc_type:
+            await self.rollback()
+        else:
+            await self.commit()
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.events = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def execute(self, query, *args):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        self.events.append("context" if "set_config" in query else query)
+        return "OK"
+
+    async def fetchrow(self, query, *args):
+        await self.execute(query, *args)
+        return {"ok": 1}
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+
+class FakePool:
+    def __init__(self):
+        self.acquired = []
+        self.released = []
+
+    def acquire(self):
+        pool = self
+
+        class _Acquire:
+            def __await__(self):
+                return self._acquire().__await__()
+
+            async def _acquire(self):
+                conn = FakeConnection()
+                pool.acquired.append(conn)
+                return conn
+
+            async def __aenter__(self):
+                self.conn = await self._acquire()
+                return self.conn
+
+            async def __aexit__(self, *exc):
+                pool.released.append(self.conn)
+                return False
+
+        return _Acquire()
+
+    async def release(self, conn):
+        self.released.append(conn)
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_shares_one_connection_across_helpers():
+    manager = TenantDatabaseManager()
+    manager.pool = FakePool()
+    manager.set_request_context(tenant_id="tenant-1")
+
+    async with manager.unit_of_work():
+        await manager.fetch_one("SELECT 1")
+        await manager.execute_query("UPDATE a")
+        await manager.fetch_one("SELECT 2")
+
+    assert len(manager.pool.acquired) == 1
+    assert manager.pool.released == manager.pool.acquired
+    conn = manager.pool.acquired[0]
+    assert conn.events == ["context", "SELECT 1", "UPDATE a", "SELECT 2"]
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_serialises_concurrent_tasks_on_shared_connection():
+    manager = TenantDatabaseManager()
+    manager.pool = FakePool()
+
+    async with manager.unit_of_work():
+        await asyncio.gather(*[manager.execute_query(f"UPDATE {index}") for index in range(5)])
+
+    assert len(manager.pool.acquired) == 1
+    assert manager.pool.acquired[0].max_in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_transaction_commits_or_rolls_back_atomically():
+    manager = TenantDatabaseManager()
+    manager.pool = FakePool()
+
+    async with manager.transaction():
+        await manager.execute_query("UPDATE a")
+        await manager.execute_query("UPDATE b")
+
+    with pytest.raises(RuntimeError):
+        async with manager.transaction():
+            await manager.execute_query("UPDATE c")
+            raise RuntimeError("boom")
+
+    committed, rolled_back = manager.pool.acquired
+    assert committed.events == ["begin", "context", "UPDATE a", "UPDATE b", "commit"]
+    assert rolled_back.events == ["begin", "context", "UPDATE c", "rollback"]
+
+
+@pytest.mark.asyncio
+async def test_transaction_inside_request_scope_reuses_connection():
+    manager = TenantDatabaseManager()
+    manager.pool = FakePool()
+
+    async with manager.unit_of_work():
+        await manager.fetch_one("SELECT 1")
+        async with manager.transaction():
+            await manager.execute_query("UPDATE a")
+
+    conn, = manager.pool.acquired
+    assert conn.events == ["context", "SELECT 1", "begin", "UPDATE a", "commit"]
+
+
+@pytest.mark.asyncio
+async def test_tasks_outliving_the_scope_acquire_their_own_connection():
+    manager = TenantDatabaseManager()
+    manager.pool = FakePool()
+    release_task = asyncio.Event()
+
+    async def background_job():
+        await release_task.wait()
+        await manager.execute_query("UPDATE later")
+
+    async with manager.unit_of_work():
+        await manager.execute_query("UPDATE now")
+        task = asyncio.create_task(background_job())
+
+    release_task.set()
+    await task
+
+    assert len(manager.pool.acquired) == 2
+    assert manager.pool.acquired[1].events[-1] == "UPDATE later"
+
+
+@pytest.mark.asyncio
+async def test_closing_the_scope_waits_for_a_spawned_query_in_flight():
+    manager = TenantDatabaseManager()
+    manager.pool = FakePool()
+    started = asyncio.Event()
+
+    async def spawned_query():
+        started.set()
+        await manager.execute_query("UPDATE spawned")
+
+    async with manager.unit_of_work():
+        await manager.execute_query("UPDATE now")
+        task = asyncio.create_task(spawned_query())
+        await started.wait()
+        await asyncio.sleep(0)  # the spawned task now holds the shared connection
+
+    await task
+    conn, = manager.pool.acquired
+    assert conn.events[-1] == "UPDATE spawned"
+    assert manager.pool.released == [conn]
+
+
+@pytest.mark.asyncio
+async def test_release_unit_of_work_hands_the_connection_back_early():
+    manager = TenantDatabaseManager()
+    manager.pool = FakePool()
+
+    async with manager.unit_of_work():
+        await manager.execute_query("UPDATE before")
+        await manager.release_unit_of_work()
+        assert manager.pool.released == manager.pool.acquired
+        await manager.execute_query("UPDATE after")
+
+    first, second = manager.pool.acquired
+    assert first.events[-1] == "UPDATE before"
+    assert second.events[-1] == "UPDATE after"
+    assert manager.pool.released == [first, second]
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_savepoint_forgets_the_applied_context():
+    manager = TenantDatabaseManager()
+    manager.pool = FakePool()
+
+    async with manager.unit_of_work():
+        await manager.fetch_one("SELECT 1")
+        with pytest.raises(RuntimeError):
+            async with manager.transaction(tenant_id="tenant-2"):
+                raise RuntimeError("boom")
+        await manager.fetch_one("SELECT 2")
+
+    conn, = manager.pool.acquired
+    assert conn.events == ["context", "SELECT 1", "context", "begin", "rollback", "context", "SELECT 2"]
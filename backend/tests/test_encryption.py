@@ -1,6 +1,10 @@
-﻿import pytest
+﻿import base64
+import os
 
-from app.encryption import tenant_encryption_manager
+import pytest
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.encryption import HKDF_KDF, LEGACY_ALG, LEGACY_KDF, EncryptionError, SegmentEncryptor, SegmentedCipher, envelope_version, tenant_encryption_manager
 
 
 @pytest.mark.asyncio
@@ -50,3 +54,111 @@ async def test_tenant_managed_mode_encrypts_with_runtime_key(monkeypatch):
 
     decrypted = await tenant_encryption_manager.decrypt_for_tenant('tenant-456', ciphertext, metadata)
     assert decrypted == plaintext
+
+
+def test_segmented_cipher_authenticates_segment_order_and_end():
+    cipher = SegmentedCipher(os.urandom(32), os.urandom(7), segment_size=16)
+    plaintext = bytes(range(40))
+    sealed = cipher.encrypt(plaintext)
+    segment = cipher.sealed_segment_size
+
+    assert len(sealed) == 40 + 3 * 16
+    assert cipher.plaintext_size(len(sealed)) == 40
+    assert cipher.decrypt(sealed) == plaintext
+    assert cipher.decrypt_segments(1, sealed[segment:2 * segment], 3) == plaintext[16:32]
+    assert cipher.decrypt(cipher.encrypt(b'')) == b''
+
+    with pytest.raises(EncryptionError):
+        cipher.decrypt(sealed[segment:2 * segment] + sealed[:segment] + sealed[2 * segment:])
+    with pytest.raises(EncryptionError):
+        cipher.decrypt(sealed[:2 * segment])  # truncated at a segment boundary
+
+
+@pytest.mark.asyncio
+async def test_whole_object_ciphertexts_still_decrypt(monkeypatch):
+    wrapping_key = tenant_encryption_manager._get_managed_wrapping_key('tenant-123', 2)
+    data_key, data_nonce, wrap_nonce = os.urandom(32), os.urandom(12), os.urandom(12)
+    ciphertext = AESGCM(data_key).encrypt(data_nonce, b'legacy-object', None)
+    metadata = {
+        'vp_encrypted': '1',
+        'vp_mode': 'managed',
+        'vp_alg': LEGACY_ALG,
+        'vp_key_id': 'app-managed:tenant-123:v2',
+        'vp_data_nonce': base64.urlsafe_b64encode(data_nonce).decode('ascii'),
+        'vp_wrap_nonce': base64.urlsafe_b64encode(wrap_nonce).decode('ascii'),
+        'vp_wrapped_key': base64.urlsafe_b64encode(AESGCM(wrapping_key).encrypt(wrap_nonce, data_key, None)).decode('ascii'),
+    }
+
+    assert await tenant_encryption_manager.segmented_cipher('tenant-123', metadata) is None
+    assert await tenant_encryption_manager.decrypt_for_tenant('tenant-123', ciphertext, metadata) == b'legacy-object'
+
+
+@pytest.mark.parametrize('size', [0, 15, 16, 17, 64, 100])
+def test_incremental_encryption_matches_one_shot_envelope(size):
+    cipher = SegmentedCipher(os.urandom(32), os.urandom(7), segment_size=16)
+    plaintext = os.urandom(size)
+    encryptor = SegmentEncryptor(cipher)
+
+    sealed = b''.join(encryptor.update(plaintext[i:i + 7]) for i in range(0, size, 7)) + encryptor.finalize()
+
+    assert sealed == cipher.encrypt(plaintext)  # same nonces, deterministic for a fixed key
+    assert cipher.decrypt(sealed) == plaintext
+    with pytest.raises(EncryptionError):
+        encryptor.update(b'late')
+
+
+def test_envelope_version_rejects_unknown_formats():
+    assert envelope_version({'vp_alg': LEGACY_ALG}) == 1
+    assert envelope_version({'vp_alg': 'AES256_GCM_STREAM', 'vp_envelope': '2'}) == 2
+    with pytest.raises(EncryptionError):
+        envelope_version({'vp_alg': 'AES256_GCM_STREAM', 'vp_envelope': '3'})
+    with pytest.raises(EncryptionError):
+        envelope_version({'vp_alg': LEGACY_ALG, 'vp_envelope': '2'})
+
+
+@pytest.mark.asyncio
+async def test_tenant_config_and_keys_are_cached_until_rotation(monkeypatch):
+    rows = {'tenant-789': {'encryption_mode': 'managed', 'encryption_key_version': 1}}
+    queries = []
+
+    async def fake_fetch_one(query, tenant_id_value, tenant_id=None):
+        queries.append(tenant_id_value)
+        return dict(rows[tenant_id_value])
+
+    monkeypatch.setattr('app.encryption.db_manager.fetch_one', fake_fetch_one)
+
+    first_ct, first_meta = await tenant_encryption_manager.encrypt_for_tenant('tenant-789', b'one')
+    _ct, second_meta = await tenant_encryption_manager.encrypt_for_tenant('tenant-789', b'two')
+    assert queries == ['tenant-789']
+    assert first_meta['vp_kdf'] == HKDF_KDF
+    assert second_meta['vp_key_id'] == 'app-managed:tenant-789:v1'
+
+    rows['tenant-789']['encryption_key_version'] = 2
+    tenant_encryption_manager.invalidate_tenant('tenant-789')
+    _ct, rotated_meta = await tenant_encryption_manager.encrypt_for_tenant('tenant-789', b'three')
+    assert rotated_meta['vp_key_id'] == 'app-managed:tenant-789:v2'
+    assert len(queries) == 2
+
+    # Objects wrapped under the previous version still open after the rotation.
+    assert await tenant_encryption_manager.decrypt_for_tenant('tenant-789', first_ct, first_meta) == b'one'
+
+
+@pytest.mark.asyncio
+async def test_sha256_wrapped_objects_stay_readable_after_hkdf_switch(monkeypatch):
+    async def fake_fetch_one(query, tenant_id_value, tenant_id=None):
+        return {'encryption_mode': 'managed', 'encryption_key_version': 1}
+
+    monkeypatch.setattr('app.encryption.db_manager.fetch_one', fake_fetch_one)
+    monkeypatch.setattr('app.encryption.settings.encryption_kdf', LEGACY_KDF)
+    legacy_ct, legacy_meta = await tenant_encryption_manager.encrypt_for_tenant('tenant-kdf', b'before')
+    legacy_meta.pop('vp_kdf')  # written before the field existed
+
+    monkeypatch.setattr('app.encryption.settings.encryption_kdf', HKDF_KDF)
+    tenant_encryption_manager.clear_cache()
+    hkdf_ct, hkdf_meta = await tenant_encryption_manager.encrypt_for_tenant('tenant-kdf', b'after')
+
+    assert tenant_encryption_manager._get_managed_wrapping_key('tenant-kdf', 1, HKDF_KDF) != tenant_encryption_manager._get_managed_wrapping_key('tenant-kdf', 1)
+    assert await tenant_encryption_manager.decrypt_for_tenant('tenant-kdf', legacy_ct, legacy_meta) == b'before'
+    assert await tenant_encryption_manager.decrypt_for_tenant('tenant-kdf', hkdf_ct, hkdf_meta) == b'after'
+    with pytest.raises(EncryptionError):
+        await tenant_encryption_manager.decrypt_for_tenant('tenant-kdf', hkdf_ct, {**hkdf_meta, 'vp_kdf': 'argon2'})
@@ -0,0 +1,338 @@
+import asyncio
+import io
+import os
+import zipfile
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.media_analysis import media_analysis_manager
+from app.storage import StoredObject
+
+
+def _zip_bytes(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, payload in entries.items():
+            archive.writestr(name, payload)
+    return buffer.getvalue()
+
+
+class _FakeUpload:
+    def __init__(self, payload, size=None):
+        self._stream = io.BytesIO(payload)
+        self.size = len(payload) if size is None else size
+
+    async def read(self, size=-1):
+        return self._stream.read(size)
+
+
+async def _collect(source):
+    return b"".join([chunk async for chunk in source.chunks()])
+
+
+@pytest.mark.asyncio
+async def test_batch_sources_flattens_zip_archives():
+    archive = _zip_bytes({
+        "photos/a.jpg": b"jpeg-a",
+        "photos/b.png": b"png-b",
+        "__MACOSX/photos/._a.jpg": b"resource-fork",
+        ".DS_Store": b"finder",
+    })
+
+    async with media_analysis_manager.batch_sources([
+        ("bundle.zip", "application/zip", _FakeUpload(archive)),
+        ("clip.mp4", "video/mp4", _FakeUpload(b"mp4")),
+    ]) as sources:
+        listed = [(source.filename, source.content_type, source.media_type, source.size) for source in sources]
+        payloads = [await _collect(source) for source in sources]
+
+    assert listed == [
+        ("a.jpg", "image/jpeg", "image", 6),
+        ("b.png", "image/png", "image", 5),
+        ("clip.mp4", "video/mp4", "video", 3),
+    ]
+    assert payloads == [b"jpeg-a", b"png-b", b"mp4"]
+
+
+@pytest.mark.asyncio
+async def test_batch_sources_enforces_item_limit(monkeypatch):
+    monkeypatch.setattr("app.media_analysis.settings.media_batch_max_items", 2)
+
+    with pytest.raises(ValueError, match="limited to 2 files"):
+        async with media_analysis_manager.batch_sources([
+            ("a.jpg", "image/jpeg", _FakeUpload(b"a")),
+            ("b.jpg", "image/jpeg", _FakeUpload(b"b")),
+            ("c.jpg", "image/jpeg", _FakeUpload(b"c")),
+        ]):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_create_batch_streams_each_item_and_discards_stored_items_when_a_later_one_fails(monkeypatch):
+    monkeypatch.setattr("app.media_analysis.MediaAnalysisManager.MAX_IMAGE_BYTES", 8)
+    stored = {}
+
+    async def fake_store(tenant_id, job_id, filename, chunks, content_type):
+        stored[filename] = b"".join([chunk async for chunk in chunks])
+        return StoredObject(key=f"{tenant_id}/{filename}", size=len(stored[filename]), sha256="sha", content_type=content_type)
+
+    delete = AsyncMock()
+    register = AsyncMock()
+    monkeypatch.setattr("app.media_analysis.storage_manager.store_media_artifact_chunks", fake_store)
+    monkeypatch.setattr("app.media_analysis.storage_manager.delete_artifact", delete)
+    monkeypatch.setattr(media_analysis_manager, "_register_batch", register)
+
+    # The second file declares a small size but streams past the image limit.
+    async with media_analysis_manager.batch_sources([
+        ("a.jpg", "image/jpeg", _FakeUpload(b"jpeg-a")),
+        ("b.jpg", "image/jpeg", _FakeUpload(b"too-large-jpeg", size=4)),
+    ]) as sources:
+        with pytest.raises(ValueError, match="limited to 10 MB"):
+            await media_analysis_manager.create_batch(tenant_id="tenant-123", sources=sources)
+
+    assert stored["a.jpg"] == b"jpeg-a"
+    register.assert_not_awaited()
+    delete.assert_awaited_once_with("tenant-123/a.jpg")
+
+
+@pytest.mark.asyncio
+async def test_process_batch_shares_providers_and_persists_each_item(monkeypatch, tmp_path):
+    items = []
+    for index in range(4):
+        spool = tmp_path / f"{index}.jpg"
+        spool.write_bytes(b"img")
+        items.append({"job_id": f"job-{index}", "filename": f"{index}.jpg", "content_type": "image/jpeg", "media_type": "image", "spool_path": str(spool)})
+
+    def fake_extract_frames_from_path(media_type, path):
+        source_filename = os.path.basename(path)
+        if source_filename == "3.jpg":
+            raise ValueError("Failed to decode image payload")
+        return [f"frame-{source_filename}"]
+
+    async def fake_extract_context(frames_b64, metadata):
+        if frames_b64 == ["frame-2.jpg"]:
+            return True, {"status": "spoof_detected", "message": "Screen detected"}
+        return False, {"status": "success"}
+
+    vision_engine = MagicMock()
+    vision_engine.extract_context = AsyncMock(side_effect=fake_extract_context)
+    genai_engine = MagicMock()
+    genai_engine.evaluate_trust = AsyncMock(return_value=(88.0, {"summary": "looks authentic"}))
+    get_pipeline = MagicMock(return_value=(vision_engine, genai_engine))
+
+    executed = []
+
+    async def fake_execute(query, *args, **kwargs):
+        executed.append((" ".join(query.split()), args))
+        return "UPDATE 1"
+
+    monkeypatch.setattr(
+        "app.media_analysis.db_manager.fetch_one",
+        AsyncMock(return_value={"batch_id": "batch-1", "tenant_id": "tenant-123", "tenant_environment_id": None, "metadata": {}}),
+    )
+    monkeypatch.setattr("app.media_analysis.db_manager.execute_query", fake_execute)
+    set_context = MagicMock()
+    monkeypatch.setattr("app.media_analysis.db_manager.set_request_context", set_context)
+    monkeypatch.setattr("app.media_analysis.get_ai_pipeline", get_pipeline)
+    monkeypatch.setattr("app.media_analysis.quota_manager.decrement_quota", AsyncMock())
+    monkeypatch.setattr(media_analysis_manager, "_extract_frames_from_path", fake_extract_frames_from_path)
+
+    await media_analysis_manager.process_batch("batch-1", items, tenant_id="tenant-123")
+
+    set_context.assert_called_once_with(tenant_id="tenant-123", environment_id=None, actor_type="service_account")
+    get_pipeline.assert_called_once()
+    assert vision_engine.extract_context.await_count == 3
+    assert genai_engine.evaluate_trust.await_count == 2
+
+    completed = [args for query, args in executed if query.startswith("UPDATE media_analysis_jobs SET status = $1, analysis_outcome = $2, tier_2_score")]
+    assert sorted(args[-1] for args in completed) == ["job-0", "job-1", "job-2"]
+    assert {args[-1]: args[1] for args in completed}["job-2"] == "spoof_detected"
+
+    progress_updates = [query for query, _args in executed if "completed_items = completed_items + 1" in query]
+    failure_updates = [query for query, _args in executed if "failed_items = failed_items + 1" in query]
+    assert len(progress_updates) == 3
+    assert len(failure_updates) == 1
+    assert executed[-1][0].startswith("UPDATE media_analysis_batches SET status = CASE")
+    assert not list(tmp_path.iterdir())
+
+
+class _StagedUploadStream:
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def iter_range(self, start=0, end=None):
+        for offset in range(0, len(self.payload), 4):
+            yield self.payload[offset:offset + 4]
+
+
+@pytest.mark.asyncio
+async def test_process_batch_fails_unfinished_items_when_it_aborts_before_the_workers_start(monkeypatch, tmp_path):
+    executed = []
+
+    async def fake_execute(query, *args, **kwargs):
+        executed.append((" ".join(query.split()), args))
+        return "UPDATE 1"
+
+    monkeypatch.setattr(
+        "app.media_analysis.db_manager.fetch_one",
+        AsyncMock(return_value={"batch_id": "batch-1", "tenant_id": "tenant-123", "tenant_environment_id": None, "metadata": {}}),
+    )
+    monkeypatch.setattr("app.media_analysis.db_manager.execute_query", fake_execute)
+    monkeypatch.setattr("app.media_analysis.db_manager.set_request_context", MagicMock())
+    monkeypatch.setattr("app.media_analysis.get_ai_pipeline", MagicMock(side_effect=RuntimeError("no provider credentials")))
+
+    spool = tmp_path / "0.jpg"
+    spool.write_bytes(b"img")
+
+    await media_analysis_manager.process_batch("batch-1", [{"job_id": "job-0", "spool_path": str(spool)}], tenant_id="tenant-123")
+
+    query, args = executed[-1]
+    assert "UPDATE media_analysis_jobs" in query and "failed_items = failed_items + (SELECT COUNT(*) FROM abandoned)" in query
+    # Items already analyzing are failed too, not only the ones still pending.
+    assert "status NOT IN ($1, $4)" in query
+    assert args == ("failed", "Batch processing aborted: no provider credentials", "batch-1", "completed")
+    assert not spool.exists()
+
+
+@pytest.mark.asyncio
+async def test_process_batch_cancels_the_other_stages_when_one_fails(monkeypatch):
+    monkeypatch.setattr("app.media_analysis.settings.media_batch_queue_size", 1)
+    monkeypatch.setattr("app.media_analysis.settings.media_batch_vision_workers", 1)
+    executed = []
+
+    async def fake_execute(query, *args, **kwargs):
+        executed.append((" ".join(query.split()), args))
+        return "UPDATE 1"
+
+    async def broken_vision_worker(*args, **kwargs):
+        raise RuntimeError("vision stage crashed")
+
+    monkeypatch.setattr(
+        "app.media_analysis.db_manager.fetch_one",
+        AsyncMock(return_value={"batch_id": "batch-1", "tenant_id": "tenant-123", "tenant_environment_id": None, "metadata": {}}),
+    )
+    monkeypatch.setattr("app.media_analysis.db_manager.execute_query", fake_execute)
+    monkeypatch.setattr("app.media_analysis.db_manager.set_request_context", MagicMock())
+    monkeypatch.setattr("app.media_analysis.get_ai_pipeline", MagicMock(return_value=(MagicMock(), MagicMock())))
+    monkeypatch.setattr(media_analysis_manager, "_extract_frames_from_path", lambda media_type, path: ["frame"])
+    monkeypatch.setattr(media_analysis_manager, "_batch_vision_worker", broken_vision_worker)
+    items = [{"job_id": f"job-{index}", "media_type": "image"} for index in range(4)]
+
+    running_before = asyncio.all_tasks()
+    await asyncio.wait_for(media_analysis_manager.process_batch("batch-1", items, tenant_id="tenant-123"), timeout=5)
+
+    # The decode stage would otherwise stay blocked on the full vision queue forever.
+    assert [task for task in asyncio.all_tasks() - running_before if not task.done()] == []
+
+    query, args = executed[-1]
+    assert "WITH abandoned AS" in query
+    assert args[1] == "Batch processing aborted: vision stage crashed"
+
+
+@pytest.mark.asyncio
+async def test_direct_upload_job_waits_for_the_object_then_starts_once(monkeypatch):
+    job = {"job_id": "job-1", "tenant_id": "tenant-123", "status": "pending_upload", "artifact_s3_key": "tenant-123/media-analysis/job-1/upload.mp4"}
+    presign = AsyncMock(return_value={"method": "POST", "url": "https://s3/bucket", "fields": {"key": job["artifact_s3_key"]}})
+    inserted = []
+
+    async def fake_execute(query, *args, **kwargs):
+        inserted.append(args)
+        return "INSERT 1"
+
+    monkeypatch.setattr("app.media_analysis.db_manager.get_request_context", MagicMock(return_value={}))
+    monkeypatch.setattr("app.media_analysis.db_manager.execute_query", fake_execute)
+    monkeypatch.setattr("app.media_analysis.storage_manager.create_presigned_upload", presign)
+    monkeypatch.setattr(media_analysis_manager, "get_job", AsyncMock(return_value=dict(job)))
+
+    created, upload = await media_analysis_manager.create_upload_job("tenant-123", "clip.MP4", "Video/MP4", 20 * 1024 * 1024)
+
+    assert created["status"] == "pending_upload"
+    assert upload["url"] == "https://s3/bucket"
+    assert presign.await_args.args == ("tenant-123/media-analysis/" + inserted[0][0] + "/upload.mp4", "video/mp4", media_analysis_manager.MAX_VIDEO_BYTES)
+    assert inserted[0][3] == "pending_upload"
+    with pytest.raises(ValueError):
+        await media_analysis_manager.create_upload_job("tenant-123", "clip.mp4", "video/mp4", 60 * 1024 * 1024)
+
+    stat = AsyncMock(return_value=None)
+    claim = AsyncMock(return_value=None)
+    schedule = MagicMock()
+    monkeypatch.setattr("app.media_analysis.storage_manager.stat_artifact", stat)
+    monkeypatch.setattr("app.media_analysis.db_manager.fetch_one", claim)
+    monkeypatch.setattr(media_analysis_manager, "schedule_job", schedule)
+
+    assert (await media_analysis_manager.confirm_upload("job-1", "tenant-123"))["status"] == "pending_upload"
+    assert "make_interval" in claim.await_args.args[0]  # only the expiry check ran
+    schedule.assert_not_called()
+
+    stat.return_value = {"size": 1234, "content_type": "video/mp4", "metadata": {}}
+    claim.return_value = {"job_id": "job-1", "tenant_id": "tenant-123", "tenant_environment_id": "env-1"}
+    await media_analysis_manager.confirm_upload("job-1", "tenant-123")
+    claim.return_value = None  # a concurrent poll already claimed it
+    await media_analysis_manager.confirm_upload("job-1", "tenant-123")
+    schedule.assert_called_once_with("job-1", tenant_id="tenant-123", environment_id="env-1")
+    assert claim.await_args.args[1:3] == ("pending", 1234)
+
+
+@pytest.mark.asyncio
+async def test_process_job_re_stores_a_direct_upload_encrypted_and_analyzes_the_spooled_copy(monkeypatch):
+    staging_key = "tenant-123/media-analysis/job-1/upload.jpg"
+    job_row = {
+        "job_id": "job-1",
+        "tenant_id": "tenant-123",
+        "tenant_environment_id": None,
+        "media_type": "image",
+        "content_type": "image/jpeg",
+        "source_filename": "photo.jpg",
+        "artifact_s3_key": staging_key,
+        "metadata": {},
+    }
+    stored_chunks = []
+    executed = []
+
+    async def fake_store(tenant_id, job_id, filename, chunks, content_type):
+        async for chunk in chunks:
+            stored_chunks.append(chunk)
+        return StoredObject(key="tenant-123/media-analysis/job-1/source.jpg", size=len(b"".join(stored_chunks)), sha256="sha", content_type=content_type)
+
+    async def fake_execute(query, *args, **kwargs):
+        executed.append((" ".join(query.split()), args))
+        return "UPDATE 1"
+
+    def fake_extract_frames_from_path(media_type, path):
+        with open(path, "rb") as media_file:
+            assert media_file.read() == b"staged-jpeg-bytes"
+        return ["frame"]
+
+    vision_engine = MagicMock()
+    vision_engine.extract_context = AsyncMock(return_value=(False, {"status": "success"}))
+    genai_engine = MagicMock()
+    genai_engine.evaluate_trust = AsyncMock(return_value=(90.0, {"summary": "authentic"}))
+    delete = AsyncMock()
+
+    calls = []
+
+    async def fake_fetch_one(query, *args, **kwargs):
+        calls.append("fetch")
+        return job_row
+
+    monkeypatch.setattr("app.media_analysis.db_manager.fetch_one", fake_fetch_one)
+    monkeypatch.setattr("app.media_analysis.db_manager.execute_query", fake_execute)
+    monkeypatch.setattr("app.media_analysis.db_manager.set_request_context", lambda **context: calls.append(context))
+    monkeypatch.setattr("app.media_analysis.storage_manager.open_artifact_stream", AsyncMock(return_value=_StagedUploadStream(b"staged-jpeg-bytes")))
+    monkeypatch.setattr("app.media_analysis.storage_manager.store_media_artifact_chunks", fake_store)
+    monkeypatch.setattr("app.media_analysis.storage_manager.delete_artifact", delete)
+    monkeypatch.setattr("app.media_analysis.get_ai_pipeline", MagicMock(return_value=(vision_engine, genai_engine)))
+    monkeypatch.setattr("app.media_analysis.quota_manager.decrement_quota", AsyncMock())
+    monkeypatch.setattr(media_analysis_manager, "_extract_frames_from_path", fake_extract_frames_from_path)
+
+    await media_analysis_manager.process_job("job-1", tenant_id="tenant-123")
+
+    # The tenant scope is in place before the job row is read, or row-level security hides it.
+    assert calls[:2] == [{"tenant_id": "tenant-123", "environment_id": None, "actor_type": "service_account"}, "fetch"]
+
+    assert b"".join(stored_chunks) == b"staged-jpeg-bytes"
+    delete.assert_awaited_once_with(staging_key)
+    assert ("UPDATE media_analysis_jobs SET artifact_s3_key = $1, file_size_bytes = $2 WHERE job_id = $3",
+            ("tenant-123/media-analysis/job-1/source.jpg", 17, "job-1")) in executed
+    assert any(args and args[0] == "completed" for _query, args in executed)
@@ -0,0 +1,82 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.migrations import Migration, MigrationError, MigrationRunner, load_migrations
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _connection(applied=None):
+    conn = MagicMock()
+    conn.fetchval = AsyncMock(return_value=applied is not None)
+    conn.fetch = AsyncMock(return_value=[{"version": v, "checksum": c} for v, c in (applied or {}).items()])
+    conn.execute = AsyncMock(return_value="OK")
+    conn.transaction = MagicMock(side_effect=FakeTransaction)
+    return conn
+
+
+def test_load_migrations_orders_files_after_baseline(tmp_path):
+    baseline = tmp_path / "init.sql"
+    baseline.write_text("CREATE TABLE IF NOT EXISTS a (id INT);", encoding="utf-8")
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir()
+    (migrations_dir / "0002_second.sql").write_text("SELECT 2;", encoding="utf-8")
+    (migrations_dir / "0001_first.sql").write_text("SELECT 1;", encoding="utf-8")
+    (migrations_dir / "README.md").write_text("notes", encoding="utf-8")
+
+    migrations = load_migrations(str(baseline), str(migrations_dir))
+
+    assert [(m.version, m.name, m.repeatable) for m in migrations] == [
+        ("0000", "baseline", True),
+        ("0001", "first", False),
+        ("0002", "second", False),
+    ]
+
+    (migrations_dir / "3_bad.sql").write_text("SELECT 3;", encoding="utf-8")
+    with pytest.raises(MigrationError):
+        load_migrations(str(baseline), str(migrations_dir))
+
+
+@pytest.mark.asyncio
+async def test_up_to_date_schema_costs_one_check_and_no_lock():
+    baseline = Migration("0000", "baseline", "SELECT 0;", repeatable=True)
+    first = Migration("0001", "first", "SELECT 1;")
+    runner = MigrationRunner([baseline, first])
+    conn = _connection({"0000": baseline.checksum, "0001": first.checksum})
+
+    assert await runner.ensure_current(conn) == []
+
+    conn.execute.assert_not_awaited()
+    assert all("pg_advisory_lock" not in call.args[0] for call in conn.fetchval.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_pending_migrations_apply_under_lock_or_fail_fast():
+    baseline = Migration("0000", "baseline", "SELECT 0;", repeatable=True)
+    first = Migration("0001", "first", "SELECT 1;")
+    runner = MigrationRunner([baseline, first])
+
+    conn = _connection({"0000": "stale-checksum", "0001": first.checksum})
+    with pytest.raises(MigrationError, match="0000"):
+        await runner.ensure_current(conn, apply=False)
+
+    conn.fetchval = AsyncMock(side_effect=lambda query, *args: True)
+    applied = await runner.ensure_current(conn, apply=True)
+
+    assert applied == [baseline]
+    executed = [call.args[0] for call in conn.execute.await_args_list]
+    assert "SELECT 0;" in executed
+    assert "SELECT 1;" not in executed
+    lock_calls = [call.args[0] for call in conn.fetchval.await_args_list if "advisory" in call.args[0]]
+    assert lock_calls == ["SELECT pg_advisory_lock($1)", "SELECT pg_advisory_unlock($1)"]
+
+    edited = MigrationRunner([baseline, Migration("0001", "first", "SELECT 'edited';")])
+    with pytest.raises(MigrationError, match="edited after it was applied"):
+        edited.pending({"0000": baseline.checksum, "0001": first.checksum})
@@ -0,0 +1,53 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.partitions import PartitionManager, partition_upper_bound
+
+
+def test_partition_upper_bound_parses_range_bounds():
+    assert partition_upper_bound("FOR VALUES FROM ('2026-01-01 00:00:00') TO ('2026-02-01 00:00:00')") == datetime(2026, 2, 1)
+    assert partition_upper_bound("FOR VALUES FROM (MINVALUE) TO ('2025-11-01 00:00:00')") == datetime(2025, 11, 1)
+    assert partition_upper_bound("DEFAULT") is None
+
+
+@pytest.mark.asyncio
+async def test_retention_detaches_and_drops_only_partitions_entirely_past_cutoff(monkeypatch):
+    bounds = {
+        "usage_logs_legacy": "FOR VALUES FROM (MINVALUE) TO ('2026-01-01 00:00:00')",
+        "usage_logs_p202601": "FOR VALUES FROM ('2026-01-01 00:00:00') TO ('2026-02-01 00:00:00')",
+        "usage_logs_p202602": "FOR VALUES FROM ('2026-02-01 00:00:00') TO ('2026-03-01 00:00:00')",
+        "usage_logs_default": "DEFAULT",
+    }
+
+    async def fake_fetch_all(_query, table):
+        if table != "usage_logs":
+            return []
+        return [{"partition_name": name, "bound": bound} for name, bound in bounds.items()]
+
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+
+    @asynccontextmanager
+    async def fake_transaction(*_args, **_kwargs):
+        yield conn
+
+    monkeypatch.setattr("app.partitions.db_manager.fetch_all", fake_fetch_all)
+    monkeypatch.setattr("app.partitions.db_manager.transaction", fake_transaction)
+
+    removed = await PartitionManager().apply_retention(retention_days=90, mode="drop", now=datetime(2026, 5, 15))
+
+    # Cutoff is 2026-02-14: February still holds rows inside the window.
+    assert removed == ["usage_logs_legacy", "usage_logs_p202601"]
+    statements = [call.args[0] for call in conn.execute.await_args_list]
+    assert 'ALTER TABLE "usage_logs" DETACH PARTITION "usage_logs_p202601"' in statements
+    assert 'DROP TABLE "usage_logs_p202601"' in statements
+
+    conn.execute.reset_mock()
+    await PartitionManager().apply_retention(retention_days=90, mode="detach", now=datetime(2026, 5, 15))
+    assert not any(call.args[0].startswith("DROP TABLE") for call in conn.execute.await_args_list)
+
+    with pytest.raises(ValueError):
+        await PartitionManager().apply_retention(mode="truncate")
@@ -0,0 +1,46 @@
+import re
+import zlib
+
+from app.pdf_writer import StreamingPdfWriter
+
+
+def _objects(pdf: bytes):
+    return {int(match.group(1)): match.start() for match in re.finditer(rb"(\d+) 0 obj\n", pdf)}
+
+
+def test_pages_are_flushed_as_they_fill_and_the_xref_matches():
+    writer = StreamingPdfWriter(lines_per_page=10)
+    chunks = []
+    for index in range(38):
+        writer.text(f"line {index} (escaped) \\ done")
+        chunks.append(writer.drain())
+    writer.sparkline([0.0, 1.0, 0.5, 2.0])  # too tall for what is left of page 4
+    chunks.append(writer.close())
+
+    assert sum(1 for chunk in chunks if chunk) >= 4  # one flush per finished page, not one at the end
+    pdf = b"".join(chunks)
+    assert pdf.startswith(b"%PDF-1.4")
+    assert pdf.endswith(b"%%EOF\n")
+    assert b"/Count 5" in pdf
+
+    startxref = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+    xref = pdf[startxref:].split(b"trailer", 1)[0].splitlines()
+    offsets = [int(entry.split()[0]) for entry in xref[3:]]
+    objects = _objects(pdf)
+    assert offsets == [objects[object_id] for object_id in range(1, len(offsets) + 1)]
+
+    streams = [zlib.decompress(match.group(1)) for match in re.finditer(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", pdf, re.S)]
+    assert len(streams) == 5
+    assert b"(line 0 \\(escaped\\) \\\\ done) Tj T*" in streams[0]
+    assert b" re S " in streams[-1] and streams[-1].rstrip().endswith(b"S")
+
+
+def test_long_lines_wrap_and_empty_documents_have_one_page():
+    writer = StreamingPdfWriter(wrap_width=20, lines_per_page=48)
+    writer.text("word " * 20)
+    pdf = writer.close()
+    page = zlib.decompress(re.search(rb"stream\n(.*?)\nendstream", pdf, re.S).group(1))
+    assert page.count(b"Tj") == 5
+
+    empty = StreamingPdfWriter().close()
+    assert b"/Count 1" in empty
@@ -0,0 +1,106 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.prompt_builder import (
+    CachedPrefixRegistry,
+    build_evidence_block,
+    prune_vision_context,
+    static_prompt_prefix,
+)
+
+
+def _vision_context():
+    return {
+        "status": "success",
+        "verification_profile": "standard",
+        "total_frames_analyzed": 2,
+        "most_consistent_global_subjects": ["Person", "Face"],
+        "frame_by_frame_details": [
+            {
+                "frame_index": 0,
+                "frame_subjects": [{"name": f"Label{i}", "confidence": 90.123 + i} for i in range(8)],
+            },
+        ],
+        "face_analysis": {
+            "frames_with_faces": 1,
+            "per_frame_details": [
+                {
+                    "frame_index": 0,
+                    "pose": {"pitch": 1.234, "roll": -0.456, "yaw": 12.345},
+                    "quality": {"brightness": 55.55, "sharpness": 80.01},
+                    "eyes_open": {"value": True, "confidence": 99.1},
+                    "mouth_open": {"value": False, "confidence": 97.3},
+                    "face_count": 1,
+                },
+            ],
+        },
+        "_artifact_rekognition_raw": {"frames": [{"detect_labels": {"Labels": []}}]},
+    }
+
+
+def test_prune_vision_context_drops_raw_artifacts_and_caps_labels():
+    pruned = prune_vision_context(_vision_context())
+
+    assert "_artifact_rekognition_raw" not in pruned
+    assert "frame_by_frame_details" not in pruned
+    assert len(pruned["frames"][0]["labels"]) == 5
+    assert pruned["frames"][0]["labels"]["Label0"] == 90
+    assert pruned["face_analysis"]["per_frame"][0]["yaw"] == 12.3
+    assert pruned["face_analysis"]["per_frame"][0]["eyes_open"] is True
+
+
+def test_evidence_block_is_minified_and_smaller_than_raw_context():
+    context = _vision_context()
+    evidence = build_evidence_block(context, {"has_data": True, "motion_detected": True})
+
+    assert ": " not in evidence.split("Vision Context: ", 1)[1].split("\n", 1)[0]
+    assert "Device IMU Sensor Data" in evidence
+    assert len(evidence) < len(json.dumps(context))
+
+
+def test_static_prefix_is_memoized_per_profile():
+    assert static_prompt_prefix("static_human") is static_prompt_prefix("static_human")
+    assert "STATIC HUMAN" in static_prompt_prefix("static_human")
+    assert "OBJECT ORIGINALITY" in static_prompt_prefix("object_originality", "brief")
+    assert "IMPORTANT CONTEXT" not in static_prompt_prefix("standard")
+
+
+def test_cached_prefix_registry_remembers_failures():
+    registry = CachedPrefixRegistry(ttl_seconds=3600)
+    factory = MagicMock(side_effect=RuntimeError("prefix below minimum cacheable size"))
+
+    assert registry.get_or_create("model", "prefix", factory) is None
+    assert registry.get_or_create("model", "prefix", factory) is None
+    factory.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_gemini_uses_cached_prefix_and_sends_only_evidence_inline(monkeypatch):
+    from app.ai_provider import GoogleGeminiProvider
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    with patch("google.genai.Client") as mock_client_cls:
+        client = mock_client_cls.return_value
+        client.caches.create.return_value.name = "cachedContents/abc123"
+        response = MagicMock()
+        response.candidates = []
+        response.text = '{"trust_score": 91, "explanation": "Natural depth and lighting.", "confidence": 83}'
+        client.models.generate_content.return_value = response
+
+        provider = GoogleGeminiProvider()
+        score, explanation = await provider.evaluate_trust(["ZnJhbWU="], _vision_context(), {"verification_profile": "standard"})
+        await provider.evaluate_trust(["ZnJhbWU="], _vision_context(), {"verification_profile": "standard"})
+
+    assert score == 91
+    assert explanation["summary"] == "Natural depth and lighting."
+    assert explanation["confidence"] == 83.0
+    client.caches.create.assert_called_once()
+
+    call_kwargs = client.models.generate_content.call_args.kwargs
+    assert call_kwargs["config"].cached_content == "cachedContents/abc123"
+    assert call_kwargs["config"].system_instruction is None
+    prompt_text = call_kwargs["contents"][0]
+    assert prompt_text.startswith("AWS Rekognition Vision Context: ")
+    assert "You are an expert fraud detection AI system" not in prompt_text
@@ -0,0 +1,80 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg
+import pytest
+
+from app.query_registry import NamedQuery, QueryRegistry, query_registry
+
+
+def _statement(rows=None, status="UPDATE 1"):
+    stmt = MagicMock()
+    stmt.fetch = AsyncMock(return_value=rows or [])
+    stmt.fetchrow = AsyncMock(return_value=(rows or [None])[0])
+    stmt.get_statusmsg = MagicMock(return_value=status)
+    return stmt
+
+
+def test_scoped_variants_have_stable_text_and_parameter_numbering():
+    query, args = query_registry.scoped("sessions.get", ["session-1"], tenant_id="tenant-1", environment_id="env-1")
+    assert query.name == "sessions.get.tenant.env"
+    assert query.endswith("s.tenant_id = $2 AND s.tenant_environment_id = $3")
+    assert args == ["session-1", "tenant-1", "env-1"]
+
+    query, args = query_registry.scoped("sessions.get", ["session-1"], environment_id="env-1")
+    assert query.name == "sessions.get.env"
+    assert query.endswith("s.tenant_environment_id = $2")
+    assert args == ["session-1", "env-1"]
+
+    again, _args = query_registry.scoped("sessions.get", ["session-2"], environment_id="env-2")
+    assert again is query
+
+    query, args = query_registry.scoped("sessions.page_after", ["tenant-1"], environment_id="env-1")
+    assert query.endswith("AND (s.created_at, s.session_id) < ($3, $4) ORDER BY s.created_at DESC, s.session_id DESC LIMIT $5")
+    assert args == ["tenant-1", "env-1"]
+
+
+@pytest.mark.asyncio
+async def test_warmed_statements_are_reused_and_timed():
+    registry = QueryRegistry()
+    lookup = registry.register("things.lookup", "SELECT * FROM things WHERE id = $1")
+    touch = registry.register("things.touch", "UPDATE things SET seen = NOW() WHERE id = $1")
+
+    statements = {str(lookup): _statement(rows=[{"id": 1}]), str(touch): _statement()}
+    conn = MagicMock()
+    conn.prepare = AsyncMock(side_effect=lambda sql: statements[sql])
+    conn.fetchrow = AsyncMock(return_value={"ad_hoc": True})
+
+    assert await registry.warm(conn) == 2
+    assert await registry.run(conn, lookup, "fetchrow", 1) == {"id": 1}
+    assert await registry.run(conn, lookup, "fetchrow", 2) == {"id": 1}
+    assert await registry.run(conn, touch, "execute", 1) == "UPDATE 1"
+    assert await registry.run(conn, "SELECT 1", "fetchrow") == {"ad_hoc": True}
+
+    assert conn.prepare.await_count == 2
+    stats = registry.stats()
+    assert set(stats) == {"things.lookup", "things.touch"}
+    assert stats["things.lookup"]["calls"] == 2
+    assert stats["things.lookup"]["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidated_statement_is_reprepared_outside_transactions():
+    registry = QueryRegistry()
+    lookup = registry.register("things.lookup", "SELECT * FROM things WHERE id = $1")
+
+    stale = _statement()
+    stale.fetchrow = AsyncMock(side_effect=asyncpg.exceptions.FeatureNotSupportedError("cached plan must not change result type"))
+    fresh = _statement(rows=[{"id": 1}])
+    conn = MagicMock()
+    conn.prepare = AsyncMock(side_effect=[stale, fresh])
+    conn.is_in_transaction = MagicMock(return_value=False)
+
+    assert await registry.run(conn, lookup, "fetchrow", 1) == {"id": 1}
+    assert conn.prepare.await_count == 2
+    assert isinstance(lookup, NamedQuery)
+
+    conn.is_in_transaction = MagicMock(return_value=True)
+    fresh.fetchrow = AsyncMock(side_effect=asyncpg.exceptions.FeatureNotSupportedError("cached plan must not change result type"))
+    with pytest.raises(asyncpg.exceptions.FeatureNotSupportedError):
+        await registry.run(conn, lookup, "fetchrow", 1)
+    assert registry.stats()["things.lookup"]["errors"] == 1
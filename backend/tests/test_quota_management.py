@@ -29,6 +29,18 @@ class TestQuotaManagement:
         has_quota = await quota_manager.check_quota(tenant_id)
         assert has_quota is True
     
+    @pytest.mark.asyncio
+    async def test_check_quota_covers_the_required_count(self, monkeypatch):
+        """A multi-item request needs room for every item, not just the first"""
+        async def environment(*_args, **_kwargs):
+            return {"slug": "production", "current_usage": 95, "monthly_quota": 100}
+
+        monkeypatch.setattr(quota_manager, "_resolve_environment", environment)
+
+        assert await quota_manager.check_quota("tenant-1") is True
+        assert await quota_manager.check_quota("tenant-1", required=5) is True
+        assert await quota_manager.check_quota("tenant-1", required=6) is False
+    
     @pytest.mark.asyncio
     async def test_decrement_quota(self):
         """Test quota decrement handles non-existent tenant gracefully"""
@@ -1,10 +1,15 @@
-﻿import io
+﻿import asyncio
+import contextvars
+import io
 import json
-from zipfile import ZipFile
+from unittest.mock import AsyncMock
+from zipfile import ZIP_STORED, ZipFile
 
 import pytest
 
 from app import reporting
+from app.storage import StoredObject
+from app.telemetry_format import TelemetryArtifact, telemetry_columns
 
 
 @pytest.mark.asyncio
@@ -61,14 +66,22 @@ async def test_generate_report_persists_pdf(monkeypatch):
             return {"provider": "aws_rekognition", "frames": [{"frame_index": 0}]}
         raise AssertionError(f"Unexpected storage key: {storage_key}")
 
-    async def fake_store_session_artifact(tenant_id, session_id, filename, artifact_data, content_type):
+    async def fake_store_session_artifact_chunks(tenant_id, session_id, filename, chunks, content_type):
+        artifact_data = b"".join(chunks)
         stored_payloads[filename] = {
             "tenant_id": tenant_id,
             "session_id": session_id,
             "content_type": content_type,
             "artifact_data": artifact_data,
         }
-        return f"{tenant_id}/sessions/{session_id}/{filename}"
+        return StoredObject(
+            key=f"{tenant_id}/sessions/{session_id}/{filename}",
+            size=len(artifact_data),
+            sha256=f"{filename}-sha",
+            content_type=content_type,
+            encryption_metadata={"vp_mode": "managed", "vp_key_id": "key-1"},
+            etag='"etag"',
+        )
 
     async def fake_upsert_artifact(**kwargs):
         upsert_calls.append(kwargs)
@@ -76,7 +89,7 @@ async def test_generate_report_persists_pdf(monkeypatch):
 
     monkeypatch.setattr(reporting.artifact_manager, "list_artifacts", fake_list_artifacts)
     monkeypatch.setattr(reporting.storage_manager, "load_json_artifact", fake_load_json_artifact)
-    monkeypatch.setattr(reporting.storage_manager, "store_session_artifact", fake_store_session_artifact)
+    monkeypatch.setattr(reporting.storage_manager, "store_session_artifact_chunks", fake_store_session_artifact_chunks)
     monkeypatch.setattr(reporting.artifact_manager, "upsert_artifact", fake_upsert_artifact)
 
     artifact = await manager.generate_report(session)
@@ -90,15 +103,119 @@ async def test_generate_report_persists_pdf(monkeypatch):
     ]
     pdf_payload = stored_payloads["verification_report.pdf"]
     assert pdf_payload["artifact_data"].startswith(b"%PDF-1.4")
+    assert upsert_calls[0]["sha256"] == "verification_report.pdf-sha"
+    assert upsert_calls[0]["size_bytes"] == len(pdf_payload["artifact_data"])
+    assert upsert_calls[0]["encryption_mode"] == "managed"
+    assert upsert_calls[0]["encryption_key_id"] == "key-1"
     assert b"%%EOF" in pdf_payload["artifact_data"]
+    assert b"/Filter /FlateDecode" in pdf_payload["artifact_data"]
 
 
 @pytest.mark.asyncio
-async def test_generate_bundle_packages_expected_artifacts(monkeypatch):
+async def test_report_size_is_bounded_for_long_recordings(monkeypatch):
+    manager = reporting.VerificationEvidenceManager()
+    session = {"session_id": "session-789", "tenant_id": "tenant-789", "final_trust_score": 70}
+    artifacts = [
+        {
+            "artifact_type": "imu_telemetry",
+            "file_name": "imu_data.json",
+            "content_type": "application/json",
+            "storage_key": "imu-key",
+            "sha256": "imu-sha",
+        },
+        {
+            "artifact_type": "rekognition_raw",
+            "file_name": "rekognition_raw.json",
+            "content_type": "application/json",
+            "storage_key": "rekognition-key",
+            "sha256": "rekognition-sha",
+        },
+    ]
+    sample_count = 60000  # ten minutes at 100 Hz
+    imu_samples = [
+        {
+            "timestamp": index * 10.0,
+            "acceleration": {"x": 0.01 * (index % 50), "y": 0.2, "z": 9.8},
+            "rotationRate": {"alpha": 1.0, "beta": -1.0, "gamma": (index % 200) - 100.0},
+        }
+        for index in range(sample_count)
+    ]
+    rekognition = {"frames": [{"frame_index": index, "faces": [{"confidence": 99.1}]} for index in range(20000)]}
+    stored_payloads = {}
+
+    async def fake_load_json_artifact(storage_key):
+        return imu_samples if storage_key == "imu-key" else rekognition
+
+    async def fake_store_session_artifact_chunks(tenant_id, session_id, filename, chunks, content_type):
+        pieces = list(chunks)
+        stored_payloads[filename] = b"".join(pieces)
+        return StoredObject(key=filename, size=len(stored_payloads[filename]), sha256="sha", content_type=content_type)
+
+    async def fake_upsert_artifact(**kwargs):
+        return kwargs
+
+    monkeypatch.setattr(reporting.storage_manager, "load_json_artifact", fake_load_json_artifact)
+    monkeypatch.setattr(reporting.storage_manager, "store_session_artifact_chunks", fake_store_session_artifact_chunks)
+    monkeypatch.setattr(reporting.artifact_manager, "upsert_artifact", fake_upsert_artifact)
+
+    await manager.generate_report(session, artifacts)
+
+    pdf = stored_payloads["verification_report.pdf"]
+    assert pdf.endswith(b"%%EOF\n")
+    assert len(pdf) < 64 * 1024
+    assert pdf.count(b"/Type /Page ") < 20
+
+    lines = manager._build_report_lines(session, artifacts, imu_samples, rekognition)
+    text = [line for line in lines if isinstance(line, str)]
+    assert f"Samples: {sample_count}" in text[text.index("IMU TELEMETRY") + 2]
+    assert any(line.startswith("rotation_rate.gamma") for line in text)
+    assert any(line.startswith("... truncated after 200 lines") for line in text)
+    sparklines = [line for line in lines if isinstance(line, reporting.Sparkline)]
+    assert [len(line.values) for line in sparklines] == [120, 120]
+
+
+@pytest.mark.asyncio
+async def test_report_summarizes_columnar_imu_telemetry(monkeypatch):
     manager = reporting.VerificationEvidenceManager()
+    samples = [{"timestamp": index * 20.0, "acceleration": {"x": 1.0, "y": 0.0, "z": 0.0}} for index in range(500)]
+    artifact = {
+        "artifact_type": "imu_telemetry",
+        "file_name": "imu_data.npz",
+        "content_type": "application/x-npz",
+        "storage_key": "tenant-1/sessions/session-1/imu_data.npz",
+    }
+    columns = telemetry_columns("imu", samples)
+    load_telemetry = AsyncMock(return_value=TelemetryArtifact(kind="imu", schema_version=1, columns=columns))
+    monkeypatch.setattr(reporting.storage_manager, "load_telemetry_artifact", load_telemetry)
+    monkeypatch.setattr(reporting.storage_manager, "load_json_artifact", AsyncMock(side_effect=AssertionError("not JSON")))
+
+    imu_payload = await manager._load_imu_if_present(artifact)
+    lines = manager._build_report_lines({"session_id": "session-1"}, [artifact], imu_payload, None)
+
+    load_telemetry.assert_awaited_once_with(artifact["storage_key"], "imu")
+    text = [line for line in lines if isinstance(line, str)]
+    summary = text[text.index("IMU TELEMETRY") + 2]
+    assert "Samples: 500" in summary and "Sample rate: 50.0 Hz" in summary and "imu_data.npz" in summary
+    assert [line.values[0] for line in lines if isinstance(line, reporting.Sparkline)] == [1.0, 0.0]
+
+
+class FakeArtifactStream:
+    def __init__(self, payload, chunk_size=4):
+        self.payload = payload
+        self.size = len(payload)
+        self.chunk_size = chunk_size
+
+    async def iter_range(self, start=0, end=None):
+        for offset in range(0, self.size, self.chunk_size):
+            await asyncio.sleep(0)
+            yield self.payload[offset:offset + self.chunk_size]
+
+
+def _bundle_session_fixture(monkeypatch, report_metadata):
     session = {
         "session_id": "session-456",
         "tenant_id": "tenant-456",
+        "final_trust_score": 88,
     }
     artifacts = [
         {
@@ -123,63 +240,82 @@ async def test_generate_bundle_packages_expected_artifacts(monkeypatch):
             "sha256": "rekognition-sha",
         },
     ]
+    report = {
+        "artifact_type": "verification_report_pdf",
+        "file_name": "verification_report.pdf",
+        "content_type": "application/pdf",
+        "storage_key": "report-key",
+        "sha256": "report-sha",
+        "metadata": report_metadata(session, artifacts),
+    }
     bytes_by_key = {
         "report-key": b"%PDF-1.4\nreport\n%%EOF",
-        "video-key": b"fake-video",
+        "video-key": b"fake-video" * 50,
         "imu-key": b'{"imu": true}',
         "rekognition-key": b'{"rekognition": true}',
     }
-    stored_payloads = {}
-    upsert_calls = []
-
-    async def fake_generate_report(_session):
-        return {
-            "artifact_type": "verification_report_pdf",
-            "file_name": "verification_report.pdf",
-            "content_type": "application/pdf",
-            "storage_key": "report-key",
-            "sha256": "report-sha",
-        }
+    state = {"stored": {}, "upserts": [], "opened": []}
 
     async def fake_list_artifacts(session_id, tenant_id=None):
         assert session_id == "session-456"
-        return artifacts
+        return artifacts + [report]
 
-    async def fake_load_artifact_bytes(storage_key):
-        return bytes_by_key[storage_key]
+    async def fake_open_artifact_stream(storage_key):
+        state["opened"].append(storage_key)
+        return FakeArtifactStream(bytes_by_key[storage_key])
 
-    async def fake_store_session_artifact(tenant_id, session_id, filename, artifact_data, content_type):
-        stored_payloads[filename] = {
-            "tenant_id": tenant_id,
-            "session_id": session_id,
-            "content_type": content_type,
-            "artifact_data": artifact_data,
-        }
-        return f"{tenant_id}/sessions/{session_id}/{filename}"
+    async def fake_store_session_artifact_chunks(tenant_id, session_id, filename, chunks, content_type):
+        pieces = [chunk async for chunk in chunks]
+        payload = b"".join(pieces)
+        state["stored"][filename] = {"artifact_data": payload, "pieces": len(pieces)}
+        return StoredObject(
+            key=f"{tenant_id}/sessions/{session_id}/{filename}",
+            size=len(payload),
+            sha256=f"{filename}-sha",
+            content_type=content_type,
+        )
 
     async def fake_upsert_artifact(**kwargs):
-        upsert_calls.append(kwargs)
+        state["upserts"].append(kwargs)
         return {"artifact_id": "artifact-456", **kwargs}
 
-    monkeypatch.setattr(manager, "generate_report", fake_generate_report)
     monkeypatch.setattr(reporting.artifact_manager, "list_artifacts", fake_list_artifacts)
-    monkeypatch.setattr(reporting.storage_manager, "load_artifact_bytes", fake_load_artifact_bytes)
-    monkeypatch.setattr(reporting.storage_manager, "store_session_artifact", fake_store_session_artifact)
+    monkeypatch.setattr(reporting.storage_manager, "open_artifact_stream", fake_open_artifact_stream)
+    monkeypatch.setattr(reporting.storage_manager, "store_session_artifact_chunks", fake_store_session_artifact_chunks)
     monkeypatch.setattr(reporting.artifact_manager, "upsert_artifact", fake_upsert_artifact)
+    return session, bytes_by_key, state
+
+
+@pytest.mark.asyncio
+async def test_generate_bundle_packages_expected_artifacts(monkeypatch):
+    manager = reporting.VerificationEvidenceManager()
+    session, bytes_by_key, state = _bundle_session_fixture(
+        monkeypatch,
+        lambda session, artifacts: {"source_fingerprint": reporting.report_fingerprint(session, artifacts)},
+    )
+    regenerated = []
+
+    async def fake_generate_report(*args, **kwargs):
+        regenerated.append(args)
+        raise AssertionError("an up-to-date report must be reused")
+
+    monkeypatch.setattr(manager, "generate_report", fake_generate_report)
 
     artifact = await manager.generate_bundle(session)
 
     assert artifact["artifact_type"] == "artifact_bundle_zip"
     assert artifact["content_type"] == "application/zip"
-    assert upsert_calls[0]["metadata"]["included_artifact_types"] == [
+    assert state["upserts"][0]["metadata"]["included_artifact_types"] == [
         "verification_report_pdf",
         "original_video",
         "imu_telemetry",
         "rekognition_raw",
     ]
+    assert sorted(state["opened"]) == ["imu-key", "rekognition-key", "report-key", "video-key"]
 
-    bundle_payload = stored_payloads["verification_artifacts_bundle.zip"]["artifact_data"]
-    with ZipFile(io.BytesIO(bundle_payload), "r") as bundle:
+    stored = state["stored"]["verification_artifacts_bundle.zip"]
+    assert stored["pieces"] > 1  # produced incrementally, not as one buffer
+    with ZipFile(io.BytesIO(stored["artifact_data"]), "r") as bundle:
         names = sorted(bundle.namelist())
         assert names == [
             "imu_data.json",
@@ -188,6 +324,8 @@ async def test_generate_bundle_packages_expected_artifacts(monkeypatch):
             "verification_report.pdf",
             "video.webm",
         ]
+        assert bundle.read("video.webm") == bytes_by_key["video-key"]
+        assert bundle.getinfo("video.webm").compress_type == ZIP_STORED
         manifest = json.loads(bundle.read("manifest.json").decode("utf-8"))
         assert manifest["session_id"] == "session-456"
         assert [entry["artifact_type"] for entry in manifest["artifacts"]] == [
@@ -197,3 +335,122 @@ async def test_generate_bundle_packages_expected_artifacts(monkeypatch):
             "rekognition_raw",
         ]
 
+
+@pytest.mark.asyncio
+async def test_generate_bundle_regenerates_stale_report(monkeypatch):
+    manager = reporting.VerificationEvidenceManager()
+    session, _bytes_by_key, state = _bundle_session_fixture(monkeypatch, lambda session, artifacts: {"source_fingerprint": "stale"})
+    regenerated = []
+
+    async def fake_generate_report(session_arg, artifacts=None):
+        regenerated.append([artifact["artifact_type"] for artifact in artifacts])
+        return {
+            "artifact_type": "verification_report_pdf",
+            "file_name": "verification_report.pdf",
+            "content_type": "application/pdf",
+            "storage_key": "report-key",
+            "sha256": "fresh-report-sha",
+        }
+
+    monkeypatch.setattr(manager, "generate_report", fake_generate_report)
+
+    await manager.generate_bundle(session)
+
+    assert len(regenerated) == 1
+    assert state["upserts"][0]["metadata"]["included_artifact_types"][0] == "verification_report_pdf"
+
+
+@pytest.mark.asyncio
+async def test_ensure_bundle_returns_stored_bundle_until_a_source_changes(monkeypatch):
+    manager = reporting.VerificationEvidenceManager()
+    session, _bytes_by_key, state = _bundle_session_fixture(
+        monkeypatch,
+        lambda session, artifacts: {"source_fingerprint": reporting.report_fingerprint(session, artifacts)},
+    )
+    artifacts = await reporting.artifact_manager.list_artifacts("session-456")
+    report = artifacts[-1]
+    included = manager._bundle_members(artifacts, report)
+    stored_bundle = {
+        "artifact_type": "artifact_bundle_zip",
+        "file_name": "verification_artifacts_bundle.zip",
+        "content_type": "application/zip",
+        "storage_key": "bundle-key",
+        "sha256": "bundle-sha",
+        "metadata": {"source_fingerprint": reporting.bundle_fingerprint(included)},
+    }
+
+    async def list_with_bundle(session_id, tenant_id=None):
+        return artifacts + [stored_bundle]
+
+    monkeypatch.setattr(reporting.artifact_manager, "list_artifacts", list_with_bundle)
+
+    assert await manager.ensure_bundle(session) is stored_bundle
+    assert state["opened"] == [] and state["upserts"] == []
+
+    artifacts[1] = {**artifacts[1], "sha256": "imu-sha-v2"}  # new IMU upload: report and bundle are stale
+
+    async def fake_generate_report(session_arg, artifacts=None):
+        return {**report, "sha256": "report-sha-v2"}
+
+    monkeypatch.setattr(manager, "generate_report", fake_generate_report)
+    rebuilt = await manager.ensure_bundle(session)
+    assert rebuilt["artifact_type"] == "artifact_bundle_zip"
+    assert rebuilt["metadata"]["source_fingerprint"] != stored_bundle["metadata"]["source_fingerprint"]
+    assert len(state["upserts"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_pregeneration_waits_for_the_ai_pass(monkeypatch):
+    manager = reporting.VerificationEvidenceManager()
+    calls = []
+    ai_done = asyncio.get_running_loop().create_future()
+
+    async def fake_pregenerate(session_id, tenant_id, environment_id=None):
+        calls.append((session_id, tenant_id, environment_id))
+
+    monkeypatch.setattr(manager, "pregenerate", fake_pregenerate)
+    manager.schedule_pregeneration("session-789", tenant_id="tenant-1", environment_id="env-1", after=ai_done)
+    assert not manager._background_tasks  # off by default
+
+    monkeypatch.setattr("app.reporting.settings.evidence_pregenerate_enabled", True)
+    manager.schedule_pregeneration("session-789", tenant_id="tenant-1", environment_id="env-1", after=ai_done)
+    await asyncio.sleep(0)
+    assert calls == []
+
+    ai_done.set_result(None)
+    await asyncio.gather(*manager._background_tasks)
+    assert calls == [("session-789", "tenant-1", "env-1")]
+
+
+@pytest.mark.asyncio
+async def test_pregenerate_sets_the_tenant_scope_before_loading_the_session(monkeypatch):
+    from app.session_manager import session_manager
+
+    manager = reporting.VerificationEvidenceManager()
+    scopes = []
+
+    async def fake_get_session(session_id, tenant_id=None):
+        scopes.append(reporting.db_manager.get_request_context()["tenant_id"])
+        return None
+
+    monkeypatch.setattr(session_manager, "get_session", fake_get_session)
+    await asyncio.create_task(manager.pregenerate("session-789", "tenant-1", "env-1"), context=contextvars.Context())
+    assert scopes == ["tenant-1"]
+
+
+@pytest.mark.asyncio
+async def test_pregenerate_renders_only_the_report(monkeypatch):
+    from app.session_manager import session_manager
+
+    manager = reporting.VerificationEvidenceManager()
+    session = {"session_id": "session-789", "tenant_id": "tenant-1"}
+    ensure_report = AsyncMock(return_value={"sha256": "report-sha"})
+    ensure_bundle = AsyncMock()
+    monkeypatch.setattr(session_manager, "get_session", AsyncMock(return_value=session))
+    monkeypatch.setattr(manager, "ensure_report", ensure_report)
+    monkeypatch.setattr(manager, "ensure_bundle", ensure_bundle)
+
+    await asyncio.create_task(manager.pregenerate("session-789", "tenant-1"), context=contextvars.Context())
+
+    ensure_report.assert_awaited_once_with(session)
+    ensure_bundle.assert_not_awaited()
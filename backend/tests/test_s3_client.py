@@ -0,0 +1,339 @@
+import asyncio
+import hashlib
+import io
+import os
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from app.s3_client import AsyncS3Client
+from app.storage import ArtifactStorageManager
+
+
+def _client_error(code, operation):
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class LocalS3:
+    """In-memory stand-in for a boto3 S3 client, with latency and fault injection."""
+
+    def __init__(self, latency=0.0):
+        self.buckets = {}
+        self.latency = latency
+        self.failures = []
+        self.calls = []
+        self.ranges = []
+        self.uploads = {}
+        self.threads = set()
+
+    def _enter(self, operation, bucket):
+        self.calls.append(operation)
+        self.threads.add(threading.current_thread().name)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failures:
+            raise self.failures.pop(0)
+        if operation not in ("create_bucket", "head_bucket") and bucket not in self.buckets:
+            raise _client_error("NoSuchBucket", operation)
+
+    def head_bucket(self, Bucket):
+        self._enter("head_bucket", Bucket)
+        if Bucket not in self.buckets:
+            raise _client_error("404", "HeadBucket")
+        return {}
+
+    def create_bucket(self, Bucket):
+        self._enter("create_bucket", Bucket)
+        self.buckets.setdefault(Bucket, {})
+        return {}
+
+    def put_bucket_cors(self, Bucket, CORSConfiguration):
+        self._enter("put_bucket_cors", Bucket)
+        return {}
+
+    def put_object(self, Bucket, Key, Body, ContentType, Metadata):
+        self._enter("put_object", Bucket)
+        self.buckets[Bucket][Key] = (bytes(Body), ContentType, dict(Metadata))
+        return {"ETag": '"etag"'}
+
+    def _get(self, Bucket, Key, operation):
+        self._enter(operation, Bucket)
+        if Key not in self.buckets[Bucket]:
+            raise _client_error("NoSuchKey", operation)
+        return self.buckets[Bucket][Key]
+
+    def head_object(self, Bucket, Key):
+        body, content_type, metadata = self._get(Bucket, Key, "head_object")
+        return {"ContentLength": len(body), "ContentType": content_type, "Metadata": metadata}
+
+    def get_object(self, Bucket, Key, Range=None):
+        body, content_type, metadata = self._get(Bucket, Key, "get_object")
+        if Range:
+            self.ranges.append(Range)
+            start, end = (int(part) for part in Range.split("=", 1)[1].split("-"))
+            body = body[start:end + 1]
+        return {"Body": io.BytesIO(body), "ContentType": content_type, "Metadata": metadata}
+
+    def create_multipart_upload(self, Bucket, Key, ContentType, Metadata):
+        self._enter("create_multipart_upload", Bucket)
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {"key": Key, "parts": {}, "content_type": ContentType, "metadata": dict(Metadata)}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._enter("upload_part", Bucket)
+        self.uploads[UploadId]["parts"][PartNumber] = bytes(Body)
+        return {"ETag": f'"part-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._enter("complete_multipart_upload", Bucket)
+        upload = self.uploads.pop(UploadId)
+        body = b"".join(upload["parts"][part["PartNumber"]] for part in MultipartUpload["Parts"])
+        self.buckets[Bucket][Key] = (body, upload["content_type"], upload["metadata"])
+        return {"ETag": '"multipart-etag"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._enter("abort_multipart_upload", Bucket)
+        self.uploads.pop(UploadId, None)
+        return {}
+
+    def delete_object(self, Bucket, Key):
+        self._enter("delete_object", Bucket)
+        self.buckets[Bucket].pop(Key, None)
+        return {}
+
+
+@pytest.mark.asyncio
+async def test_calls_run_off_the_event_loop_within_the_bounded_pool():
+    backend = LocalS3(latency=0.2)
+    backend.buckets["bucket"] = {}
+    client = AsyncS3Client("bucket", client_factory=lambda: backend, max_concurrency=2, max_attempts=1)
+    await client.connect()
+
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        client.call("put_object", transfer=True, Key=f"k{i}", Body=b"x", ContentType="text/plain", Metadata={})
+        for i in range(4)
+    ])
+    elapsed = time.perf_counter() - started
+    beat.cancel()
+
+    assert ticks >= 20  # the loop kept running while uploads were in flight
+    assert 0.35 < elapsed < 0.7  # four 0.2s calls through two workers
+    assert backend.threads == {"s3-io_0", "s3-io_1"}
+
+    response = await client.call("get_object", read_body=True, Key="k0")
+    assert response["Body"] == b"x"
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_and_permanent_ones_are_not():
+    backend = LocalS3()
+    backend.buckets["bucket"] = {}
+    client = AsyncS3Client("bucket", client_factory=lambda: backend, max_attempts=3, retry_base_delay=0)
+    await client.connect()
+
+    backend.failures = [_client_error("SlowDown", "PutObject"), EndpointConnectionError(endpoint_url="http://s3")]
+    await client.call("put_object", Key="a", Body=b"1", ContentType="text/plain", Metadata={})
+    assert backend.calls.count("put_object") == 3
+
+    with pytest.raises(ClientError) as exc_info:
+        await client.call("head_object", Key="missing")
+    assert exc_info.value.response["Error"]["Code"] == "NoSuchKey"
+    assert backend.calls.count("head_object") == 1
+
+    backend.failures = [_client_error("503", "GetObject")] * 3
+    with pytest.raises(ClientError):
+        await client.call("get_object", read_body=True, Key="a")
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_attempts_keep_their_slot_and_are_not_retried():
+    backend = LocalS3(latency=0.3)
+    backend.buckets["bucket"] = {}
+    client = AsyncS3Client("bucket", client_factory=lambda: backend, operation_timeout=0.05, max_concurrency=1, max_attempts=2, retry_base_delay=0)
+    client.client = backend
+
+    with pytest.raises(asyncio.TimeoutError):
+        await client.call("head_object", Key="a")
+    assert backend.calls.count("head_object") == 1
+    assert client._slots.locked()  # the abandoned attempt still occupies the only worker
+
+    await asyncio.sleep(0.35)
+    assert not client._slots.locked()
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_time_spent_queueing_for_a_worker_does_not_count_against_the_timeout():
+    backend = LocalS3(latency=0.1)
+    backend.buckets["bucket"] = {"a": (b"1", "text/plain", {})}
+    client = AsyncS3Client("bucket", client_factory=lambda: backend, operation_timeout=0.15, max_concurrency=1, max_attempts=1)
+    client.client = backend
+
+    # Three 0.1s calls through one worker take 0.3s in total, but each attempt only 0.1s.
+    responses = await asyncio.gather(*[client.call("head_object", Key="a") for _ in range(3)])
+    assert [response["ContentLength"] for response in responses] == [1, 1, 1]
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_storage_manager_round_trip_recreates_missing_bucket(monkeypatch):
+    async def fake_fetch_one(query, tenant_id_value, tenant_id=None):
+        return {"encryption_mode": "managed", "encryption_key_version": 1}
+
+    monkeypatch.setattr("app.encryption.db_manager.fetch_one", fake_fetch_one)
+    backend = LocalS3()
+    manager = ArtifactStorageManager()
+    manager.s3 = AsyncS3Client(manager.bucket_name, client_factory=lambda: backend, on_connect=manager._ensure_bucket_exists, retry_base_delay=0)
+
+    stored = await manager.store_session_artifact("tenant-1", "session-1", "report.json", b'{"ok": true}', "application/json")
+    ciphertext, _content_type, object_metadata = backend.buckets[manager.bucket_name][stored.key]
+    assert ciphertext != b'{"ok": true}'
+    assert stored.size == len(b'{"ok": true}')
+    assert stored.sha256 == hashlib.sha256(b'{"ok": true}').hexdigest()
+    assert stored.encryption_metadata == object_metadata
+    assert stored.etag == '"etag"'
+    assert "head_object" not in backend.calls
+
+    backend.buckets.clear()  # e.g. LocalStack restarted
+    stored = await manager.store_session_artifact("tenant-1", "session-1", "report.json", b'{"ok": true}', "application/json")
+    assert await manager.load_json_artifact(stored.key) == {"ok": True}
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_artifact_stream_serves_ranges_from_whole_segments(monkeypatch):
+    async def fake_fetch_one(query, tenant_id_value, tenant_id=None):
+        return {"encryption_mode": "managed", "encryption_key_version": 1}
+
+    monkeypatch.setattr("app.encryption.db_manager.fetch_one", fake_fetch_one)
+    monkeypatch.setattr("app.storage.settings.artifact_stream_chunk_bytes", 2 * 64 * 1024)
+    backend = LocalS3()
+    manager = ArtifactStorageManager()
+    manager.s3 = AsyncS3Client(manager.bucket_name, client_factory=lambda: backend, on_connect=manager._ensure_bucket_exists, retry_base_delay=0)
+
+    video = os.urandom(5 * 64 * 1024 + 123)
+    stored = await manager.store_session_artifact("tenant-1", "session-1", "video.webm", video, "video/webm")
+    stream = await manager.open_artifact_stream(stored.key)
+    assert stream.size == len(video)
+    assert stream.content_type == "video/webm"
+
+    whole = [chunk async for chunk in stream.iter_range()]
+    assert b"".join(whole) == video
+    assert max(len(chunk) for chunk in whole) <= 2 * 64 * 1024
+
+    backend.ranges.clear()
+    start, end = 3 * 64 * 1024 + 10, 3 * 64 * 1024 + 20
+    assert b"".join([chunk async for chunk in stream.iter_range(start, end)]) == video[start:end + 1]
+    sealed = 64 * 1024 + 16
+    assert backend.ranges == [f"bytes={3 * sealed}-{4 * sealed - 1}"]  # only the segment holding the range
+
+    tail = b"".join([chunk async for chunk in stream.iter_range(len(video) - 50)])
+    assert tail == video[-50:]
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_large_artifacts_stream_through_multipart_upload(monkeypatch):
+    async def fake_fetch_one(query, tenant_id_value, tenant_id=None):
+        return {"encryption_mode": "managed", "encryption_key_version": 1}
+
+    monkeypatch.setattr("app.encryption.db_manager.fetch_one", fake_fetch_one)
+    monkeypatch.setattr("app.storage.settings.s3_multipart_part_bytes", 5 * 1024 * 1024)
+    backend = LocalS3()
+    manager = ArtifactStorageManager()
+    manager.s3 = AsyncS3Client(manager.bucket_name, client_factory=lambda: backend, on_connect=manager._ensure_bucket_exists, retry_base_delay=0)
+
+    chunks = [os.urandom(700 * 1024) for _ in range(16)]
+    video = b"".join(chunks)
+    stored = await manager.store_session_artifact_chunks("tenant-1", "session-1", "video.webm", chunks, "video/webm")
+
+    assert backend.calls.count("upload_part") == 3
+    assert "put_object" not in backend.calls
+    assert stored.etag == '"multipart-etag"'
+    assert stored.size == len(video)
+    assert stored.sha256 == hashlib.sha256(video).hexdigest()
+    assert await manager.load_artifact_bytes(stored.key) == video
+
+    original_upload_part = backend.upload_part
+
+    def failing_upload_part(**kwargs):
+        if kwargs["PartNumber"] == 2:
+            raise _client_error("AccessDenied", "UploadPart")
+        return original_upload_part(**kwargs)
+
+    backend.upload_part = failing_upload_part
+    with pytest.raises(ClientError):
+        await manager.store_session_artifact_chunks("tenant-1", "session-2", "video.webm", chunks, "video/webm")
+    assert backend.uploads == {}
+    assert "abort_multipart_upload" in backend.calls
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_telemetry_is_stored_as_npz_or_compact_json(monkeypatch):
+    async def fake_fetch_one(query, tenant_id_value, tenant_id=None):
+        return {"encryption_mode": "managed", "encryption_key_version": 1}
+
+    monkeypatch.setattr("app.encryption.db_manager.fetch_one", fake_fetch_one)
+    backend = LocalS3()
+    manager = ArtifactStorageManager()
+    manager.s3 = AsyncS3Client(manager.bucket_name, client_factory=lambda: backend, on_connect=manager._ensure_bucket_exists, retry_base_delay=0)
+    samples = [
+        {"timestamp": index * 10.0, "acceleration": {"x": 0.1, "y": 0.2, "z": 9.8}, "rotationRate": {"alpha": 0, "beta": 0, "gamma": index}}
+        for index in range(200)
+    ]
+
+    monkeypatch.setattr("app.storage.settings.telemetry_artifact_format", "npz")
+    npz_key = await manager.store_imu_data("tenant-1", "session-1", samples)
+    assert npz_key.endswith("/imu_data.npz")
+    assert backend.buckets[manager.bucket_name][npz_key][1] == "application/x-npz"
+    artifact = await manager.load_telemetry_artifact(npz_key, "imu")
+    assert artifact.columns["rotation_rate.gamma"].tolist() == [float(index) for index in range(200)]
+
+    monkeypatch.setattr("app.storage.settings.telemetry_artifact_format", "json")
+    json_key = await manager.store_imu_data("tenant-1", "session-1", samples)
+    assert json_key.endswith("/imu_data.json")
+    assert b"\n" not in await manager.load_artifact_bytes(json_key)
+    legacy = await manager.load_telemetry_artifact(json_key, "imu")
+    assert legacy.columns["rotation_rate.gamma"].tolist() == artifact.columns["rotation_rate.gamma"].tolist()
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_presigned_upload_form_pins_key_type_size_and_encryption(monkeypatch):
+    import base64
+    import json
+
+    import boto3
+
+    manager = ArtifactStorageManager()
+    manager.s3 = AsyncS3Client("bucket", client_factory=lambda: None)
+    manager.s3.client = boto3.client("s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test")
+    manager._initialized = True
+
+    key = manager.media_upload_key("tenant-1", "job-1", "Clip.MOV")
+    upload = await manager.create_presigned_upload(key, "video/quicktime", 50 * 1024 * 1024, expiration=300)
+
+    assert key == "tenant-1/media-analysis/job-1/upload.mov"
+    assert upload["method"] == "POST" and upload["expires_in"] == 300
+    assert upload["fields"]["key"] == key
+    policy = json.loads(base64.b64decode(upload["fields"]["policy"]))
+    assert {"Content-Type": "video/quicktime"} in policy["conditions"]
+    assert {"x-amz-server-side-encryption": "AES256"} in policy["conditions"]
+    assert ["content-length-range", 1, 50 * 1024 * 1024] in policy["conditions"]
+    manager.close()
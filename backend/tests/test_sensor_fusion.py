@@ -78,6 +78,21 @@ class TestSensorFusion:
         should_trigger = sensor_fusion_analyzer.should_trigger_tier_2(correlation)
         
         assert should_trigger is False
+    
+    def test_recommend_keyframe_count_strong_pass_is_sparse(self):
+        """Test strong physics passes only request a couple of keyframes"""
+        assert sensor_fusion_analyzer.recommend_keyframe_count(0.97, 60) == 2
+        assert sensor_fusion_analyzer.recommend_keyframe_count(0.90, 60) == 3
+    
+    def test_recommend_keyframe_count_ambiguous_and_failing_are_dense(self):
+        """Test ambiguous and failing Tier 1 results get a dense keyframe budget"""
+        assert sensor_fusion_analyzer.recommend_keyframe_count(0.70, 60) == 8
+        assert sensor_fusion_analyzer.recommend_keyframe_count(0.10, 60) == 12
+    
+    def test_recommend_keyframe_count_without_reliable_tier_1(self):
+        """Test missing or undersampled correlation falls back to the dense budget"""
+        assert sensor_fusion_analyzer.recommend_keyframe_count(None, 60) == 12
+        assert sensor_fusion_analyzer.recommend_keyframe_count(0.99, 4) == 12
 
 
 class TestPropertyBasedSensorFusion:
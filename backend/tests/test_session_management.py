@@ -183,3 +183,157 @@ class TestPropertyBasedSessions:
         # Should succeed without error
         retrieved = await session_manager.get_session(session["session_id"])
         assert retrieved is not None
+
+
+class TestSessionRecordCache:
+    """Unit tests for the write-through session record cache"""
+
+    @staticmethod
+    def _row(session_id, tenant_id):
+        return {
+            "session_id": session_id,
+            "tenant_id": tenant_id,
+            "tenant_environment_id": "env-1",
+            "state": SessionState.IDLE.value,
+            "metadata": "{}",
+            "verification_commands": "[]",
+            "ai_explanation": None,
+        }
+
+    @pytest.fixture
+    def cached_manager(self, monkeypatch):
+        from unittest.mock import AsyncMock
+        from app.session_manager import SessionManager
+
+        manager = SessionManager()
+        session_id, tenant_id = str(uuid.uuid4()), str(uuid.uuid4())
+        fetch_one = AsyncMock(return_value=self._row(session_id, tenant_id))
+        monkeypatch.setattr("app.session_manager.db_manager.fetch_one", fetch_one)
+        monkeypatch.setattr("app.session_manager.db_manager.execute_query", AsyncMock(return_value="UPDATE 1"))
+        monkeypatch.setattr("app.session_manager.db_manager.get_request_context", lambda: {})
+        return manager, session_id, tenant_id, fetch_one
+
+    @pytest.mark.asyncio
+    async def test_repeated_reads_hit_the_cache(self, cached_manager):
+        manager, session_id, tenant_id, fetch_one = cached_manager
+
+        first = await manager.get_session(session_id)
+        second = await manager.get_session(session_id, tenant_id=tenant_id)
+
+        assert fetch_one.await_count == 1
+        assert first == second and first is not second
+        assert second["metadata"] == {}
+
+        # A different tenant scope is not answered from the cache.
+        await manager.get_session(session_id, tenant_id=str(uuid.uuid4()))
+        assert fetch_one.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_patch_the_cached_record(self, cached_manager):
+        manager, session_id, _tenant_id, fetch_one = cached_manager
+
+        await manager.get_session(session_id)
+        await manager.update_session_state(session_id, SessionState.ANALYZING)
+        await manager.store_artifact_keys(session_id, video_s3_key="videos/a.webm")
+        await manager.update_session_results(
+            session_id, tier_1_score=90, tier_2_score=None, final_trust_score=90,
+            correlation_value=0.95, reasoning="ok",
+        )
+
+        session = await manager.get_session(session_id)
+        assert fetch_one.await_count == 1
+        assert session["state"] == SessionState.COMPLETE.value
+        assert session["video_s3_key"] == "videos/a.webm"
+        assert session["final_trust_score"] == 90
+
+    @pytest.mark.asyncio
+    async def test_unmatched_update_and_remote_notification_invalidate(self, cached_manager, monkeypatch):
+        from unittest.mock import AsyncMock
+        from app.database import db_manager
+
+        manager, session_id, _tenant_id, fetch_one = cached_manager
+
+        await manager.get_session(session_id)
+        manager._on_session_change(None, 1, "veraproof_session_changes", f"{db_manager.application_name}|{session_id}")
+        await manager.get_session(session_id)
+        assert fetch_one.await_count == 1
+
+        manager._on_session_change(None, 1, "veraproof_session_changes", f"veraproof-othernode|{session_id}")
+        await manager.get_session(session_id)
+        assert fetch_one.await_count == 2
+
+        monkeypatch.setattr("app.session_manager.db_manager.execute_query", AsyncMock(return_value="UPDATE 0"))
+        await manager.update_session_state(session_id, SessionState.ANALYZING)
+        assert len(manager.session_cache) == 0
+
+
+class TestSessionListing:
+    """Unit tests for keyset-paginated session listings"""
+
+    @staticmethod
+    def _rows(count):
+        from datetime import datetime, timedelta
+
+        newest = datetime(2026, 3, 1, 12, 0, 0)
+        return [
+            {"session_id": uuid.UUID(int=count - index), "created_at": newest - timedelta(minutes=index), "state": "complete"}
+            for index in range(count)
+        ]
+
+    def test_cursor_round_trip_and_rejects_garbage(self):
+        from datetime import datetime
+        from app.session_manager import decode_session_cursor, encode_session_cursor
+
+        created_at = datetime(2026, 3, 1, 12, 0, 0, 123456)
+        session_id = str(uuid.uuid4())
+
+        assert decode_session_cursor(encode_session_cursor(created_at, session_id)) == (created_at, session_id)
+        with pytest.raises(ValueError, match="Invalid session cursor"):
+            decode_session_cursor("not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_page_uses_keyset_seek_and_returns_next_cursor(self, monkeypatch):
+        from unittest.mock import AsyncMock
+        from app.session_manager import SessionManager, decode_session_cursor
+
+        rows = self._rows(3)
+        fetch_all = AsyncMock(return_value=rows)
+        fetch_val = AsyncMock(return_value=42)
+        monkeypatch.setattr("app.session_manager.db_manager.fetch_all", fetch_all)
+        monkeypatch.setattr("app.session_manager.db_manager.fetch_val", fetch_val)
+        monkeypatch.setattr("app.session_manager.db_manager.get_request_context", lambda: {"environment_id": "env-1"})
+
+        manager = SessionManager()
+        page = await manager.list_sessions_page("tenant-1", limit=2)
+
+        assert [row["session_id"] for row in page["sessions"]] == [rows[0]["session_id"], rows[1]["session_id"]]
+        assert page["total"] == 42 and page["total_is_estimate"] is False
+        assert decode_session_cursor(page["next_cursor"]) == (rows[1]["created_at"], str(rows[1]["session_id"]))
+        query, *args = fetch_all.await_args.args
+        assert query.name == "sessions.page.env"
+        assert "metadata" not in query and "ai_explanation" not in query
+        assert args == ["tenant-1", "env-1", 3]
+        assert "OFFSET" not in query
+
+        fetch_all.return_value = rows[2:]
+        next_page = await manager.list_sessions_page("tenant-1", limit=2, cursor=page["next_cursor"])
+
+        query, *args = fetch_all.await_args.args
+        assert query.name == "sessions.page_after.env"
+        assert args == ["tenant-1", "env-1", rows[1]["created_at"], str(rows[1]["session_id"]), 3]
+        assert next_page["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_large_tenants_get_a_planner_estimate(self, monkeypatch):
+        from unittest.mock import AsyncMock
+        from app.session_manager import SessionManager
+
+        monkeypatch.setattr("app.session_manager.settings.session_count_exact_limit", 100)
+        fetch_val = AsyncMock(side_effect=[101, [{"Plan": {"Plan Rows": 2500000}}]])
+        monkeypatch.setattr("app.session_manager.db_manager.fetch_val", fetch_val)
+
+        total, is_estimate = await SessionManager().count_sessions("tenant-1")
+
+        assert (total, is_estimate) == (2500000, True)
+        assert fetch_val.await_args_list[0].args[-1] == 101
+        assert fetch_val.await_args_list[1].args[0].startswith("EXPLAIN (FORMAT JSON)")
@@ -0,0 +1,115 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.session_write_buffer import SessionWriteBuffer, batch_update_query
+
+
+@asynccontextmanager
+async def _fake_transaction(*_args, **_kwargs):
+    yield None
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    execute = AsyncMock(side_effect=lambda query, *arrays, **kwargs: f"UPDATE {len(arrays[0])}")
+    monkeypatch.setattr("app.session_write_buffer.db_manager.pool", MagicMock())
+    monkeypatch.setattr("app.session_write_buffer.db_manager.transaction", _fake_transaction)
+    monkeypatch.setattr("app.session_write_buffer.db_manager.execute_query", execute)
+    monkeypatch.setattr("app.session_write_buffer.db_manager.get_request_context", lambda: {"tenant_id": None, "environment_id": None})
+    return execute
+
+
+def test_batch_update_query_text_depends_only_on_columns():
+    query = batch_update_query(("expires_at", "state"))
+
+    assert query is batch_update_query(("expires_at", "state"))
+    assert query.name == "sessions.batch_update(expires_at,state)"
+    assert "FROM unnest($1::uuid[], $2::uuid[], $3::uuid[], $4::timestamp[], $5::text[])" in query
+    assert "ai_explanation = v.ai_explanation::jsonb" in batch_update_query(("ai_explanation",))
+
+
+@pytest.mark.asyncio
+async def test_updates_to_a_session_are_merged_and_flushed_in_one_statement(fake_db):
+    buffer = SessionWriteBuffer(enabled=True, flush_interval_ms=60_000)
+    expires_at = datetime(2026, 1, 1, 12, 0)
+
+    await buffer.write("session-a", {"state": "cmd_0"}, tenant_id="tenant-1")
+    await buffer.write("session-a", {"state": "cmd_1"}, tenant_id="tenant-1")
+    await buffer.write("session-a", {"expires_at": expires_at}, tenant_id="tenant-1")
+    await buffer.write("session-b", {"state": "pan"}, tenant_id="tenant-1")
+    await buffer.write("session-c", {"state": "pan"}, tenant_id="tenant-1")
+
+    fake_db.assert_not_awaited()
+    assert buffer.pending_fields("session-a") == {"state": "cmd_1", "expires_at": expires_at}
+
+    await buffer.close()
+
+    assert fake_db.await_count == 2
+    by_name = {call.args[0].name: call for call in fake_db.await_args_list}
+    merged = by_name["sessions.batch_update(expires_at,state)"]
+    assert merged.args[1:] == (["session-a"], ["tenant-1"], [None], [expires_at], ["cmd_1"])
+    assert merged.kwargs["context"]["tenant_id"] == "tenant-1"
+    assert by_name["sessions.batch_update(state)"].args[1] == ["session-b", "session-c"]
+    assert len(buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_one_session_written_from_two_contexts_is_updated_once(fake_db):
+    buffer = SessionWriteBuffer(enabled=True, flush_interval_ms=60_000)
+
+    await buffer.write("session-a", {"state": "cmd_0"})
+    await buffer.write("session-a", {"state": "cmd_1"}, tenant_id="tenant-1", environment_id="env-1")
+    await buffer.write("session-a", {"reasoning": "steady"})
+
+    assert len(buffer) == 1
+    await buffer.close()
+
+    fake_db.assert_awaited_once()
+    assert fake_db.await_args.args[1:] == (["session-a"], ["tenant-1"], ["env-1"], ["steady"], ["cmd_1"])
+    assert fake_db.await_args.kwargs["context"]["tenant_id"] == "tenant-1"
+
+
+@pytest.mark.asyncio
+async def test_sync_write_flushes_only_its_session(fake_db):
+    buffer = SessionWriteBuffer(enabled=True, flush_interval_ms=60_000)
+
+    await buffer.write("session-a", {"state": "baseline"})
+    await buffer.write("session-b", {"state": "pan"})
+    await buffer.write("session-a", {"state": "analyzing"}, sync=True)
+
+    fake_db.assert_awaited_once()
+    assert fake_db.await_args.args[1] == ["session-a"]
+    assert fake_db.await_args.args[-1] == ["analyzing"]
+    assert buffer.pending_fields("session-b") == {"state": "pan"}
+
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_under_newer_writes_and_reports_unmatched(fake_db):
+    unmatched = []
+    buffer = SessionWriteBuffer(on_unmatched=unmatched.append, enabled=True, flush_interval_ms=60_000)
+
+    await buffer.write("session-a", {"state": "baseline", "expires_at": None})
+    fake_db.side_effect = RuntimeError("connection reset")
+    await buffer.flush()
+    await buffer.write("session-a", {"state": "pan"})
+
+    assert buffer.pending_fields("session-a") == {"state": "pan", "expires_at": None}
+
+    fake_db.side_effect = None
+    fake_db.return_value = "UPDATE 0"
+    await buffer.close()
+
+    assert unmatched == ["session-a"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_columns_are_rejected():
+    buffer = SessionWriteBuffer(enabled=True)
+
+    with pytest.raises(ValueError, match="video_s3_key"):
+        await buffer.write("session-a", {"video_s3_key": "videos/a.webm"})
@@ -0,0 +1,77 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from app.telemetry_format import (
+    TELEMETRY_SCHEMA_VERSION,
+    TelemetryFormatError,
+    decode_telemetry,
+    encode_telemetry,
+    telemetry_columns,
+)
+
+
+def _imu_samples(count):
+    return [
+        {
+            "timestamp": 1000.0 + index * 10,
+            "acceleration": {"x": 0.1 * index, "y": 0.2, "z": 9.81},
+            "accelerationIncludingGravity": {"x": 0.0, "y": 0.0, "z": 9.81},
+            "rotationRate": {"alpha": 1.5, "beta": -0.5, "gamma": float(index % 7)},
+            "interval": 10,
+        }
+        for index in range(count)
+    ]
+
+
+def test_imu_round_trip_is_columnar_and_smaller_than_json():
+    samples = _imu_samples(5000)
+    payload = encode_telemetry("imu", telemetry_columns("imu", samples))
+
+    artifact = decode_telemetry(payload)
+    assert artifact.kind == "imu"
+    assert artifact.schema_version == TELEMETRY_SCHEMA_VERSION
+    assert len(artifact) == 5000
+    assert artifact.columns["timestamp"][1] == 1010.0
+    np.testing.assert_allclose(artifact.columns["rotation_rate.gamma"][:8], [0, 1, 2, 3, 4, 5, 6, 0])
+    assert len(payload) < len(json.dumps(samples, indent=2)) / 4
+
+
+def test_imu_round_trip_keeps_every_numeric_field_of_collector_samples():
+    samples = _imu_samples(3)
+    samples[1]["accelerationIncludingGravity"]["z"] = 9.79
+    samples[2]["interval"] = 16
+
+    artifact = decode_telemetry(encode_telemetry("imu", telemetry_columns("imu", samples)))
+
+    canonical = {"rotationRate": "rotation_rate"}
+    for index, sample in enumerate(samples):
+        for field, value in sample.items():
+            if isinstance(value, dict):
+                for axis, reading in value.items():
+                    assert artifact.columns[f"{canonical.get(field, field)}.{axis}"][index] == reading
+            else:
+                assert artifact.columns[field][index] == value
+    assert "rotationRate.gamma" not in artifact.columns
+
+
+def test_sparse_records_fill_missing_values_with_nan():
+    columns = telemetry_columns("optical_flow", [{"t": 0, "flow_x": 1.5}, {"t": 1}, {"t": 2, "flow_x": -0.5, "label": "x"}])
+    assert list(columns) == ["t", "flow_x"]
+    assert np.isnan(columns["flow_x"][1])
+    assert telemetry_columns("optical_flow", [0.5, 1, 2.5])["value"].tolist() == [0.5, 1.0, 2.5]
+    nested = telemetry_columns("optical_flow", [{"t": 0, "flow": {"x": 1.0, "y": 2.0}}, {"t": 1, "flow": {"x": 3.0}}])
+    assert list(nested) == ["t", "flow.x", "flow.y"]
+    assert np.isnan(nested["flow.y"][1])
+
+
+def test_unknown_or_newer_archives_are_rejected():
+    with pytest.raises(TelemetryFormatError):
+        decode_telemetry(b'{"not": "npz"}')
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, __schema__=np.array(TELEMETRY_SCHEMA_VERSION + 1), __kind__=np.array("imu"), timestamp=np.zeros(2))
+    with pytest.raises(TelemetryFormatError, match="Unsupported telemetry schema version"):
+        decode_telemetry(buffer.getvalue())
@@ -0,0 +1,60 @@
+from app.tier_policy import TierExecutionPolicy
+
+
+def test_strong_pass_skips_ai_tiers_under_physics_first():
+    policy = TierExecutionPolicy(default_mode="physics_first", audit_sample_rate=0.0)
+
+    decision = policy.decide("tenant-1", "standard", correlation=0.95, sample_count=60)
+
+    assert decision.strong_physics_pass is True
+    assert decision.run_tier_2 is False
+    assert decision.run_tier_3 is False
+
+
+def test_ambiguous_or_undersampled_physics_runs_full_pipeline():
+    policy = TierExecutionPolicy(default_mode="physics_first", audit_sample_rate=0.0)
+
+    ambiguous = policy.decide("tenant-1", "standard", correlation=0.6, sample_count=60)
+    undersampled = policy.decide("tenant-1", "standard", correlation=0.99, sample_count=3)
+
+    assert ambiguous.run_tier_2 and ambiguous.run_tier_3
+    assert undersampled.run_tier_2 and undersampled.run_tier_3
+    assert undersampled.strong_physics_pass is False
+
+
+def test_vision_only_mode_keeps_tier_2_for_strong_pass():
+    policy = TierExecutionPolicy(default_mode="vision_only", audit_sample_rate=0.0)
+
+    decision = policy.decide("tenant-1", "standard", correlation=0.97, sample_count=60)
+
+    assert decision.run_tier_2 is True
+    assert decision.run_tier_3 is False
+
+
+def test_audit_sampling_sends_strong_pass_through_every_tier():
+    policy = TierExecutionPolicy(default_mode="physics_first", audit_sample_rate=0.1, rng=lambda: 0.05)
+
+    decision = policy.decide("tenant-1", "standard", correlation=0.97, sample_count=60)
+
+    assert decision.audit_sampled is True
+    assert decision.run_tier_2 and decision.run_tier_3
+
+
+def test_overrides_resolve_tenant_profile_then_tenant_then_profile():
+    policy = TierExecutionPolicy(
+        default_mode="physics_first",
+        tenant_overrides={"tenant-1:object_originality": "vision_only", "tenant-1": "full"},
+        profile_overrides={"static_human": "full", "object_originality": "physics_first"},
+        audit_sample_rate=0.0,
+    )
+
+    assert policy.resolve_mode("tenant-1", "object_originality") == "vision_only"
+    assert policy.resolve_mode("tenant-1", "standard") == "full"
+    assert policy.resolve_mode("tenant-2", "static_human") == "full"
+    assert policy.resolve_mode("tenant-2", "standard") == "physics_first"
+
+
+def test_unknown_mode_falls_through_to_next_candidate():
+    policy = TierExecutionPolicy(default_mode="physics_first", tenant_overrides={"tenant-1": "bogus"}, profile_overrides={})
+
+    assert policy.resolve_mode("tenant-1", "standard") == "physics_first"
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -197,3 +198,261 @@ async def test_run_ai_verification_background_skips_genai_when_no_frames(monkeyp
     assert kwargs["unified_score"] == 80.0
     assert kwargs["verification_status"] == "success"
     assert "skipped because the recorded video could not be decoded" in kwargs["ai_explanation"]["summary"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "first_verdict, expected_frame_counts",
+    [
+        ((70.0, {"summary": "borderline", "confidence": 40.0}), [8, 12]),
+        # A borderline score the model is sure about is final.
+        ((70.0, {"summary": "borderline", "confidence": 90.0}), [8]),
+        # Providers that report no confidence fall back to the score band.
+        ((70.0, {"summary": "borderline"}), [8, 12]),
+    ],
+)
+async def test_run_ai_verification_background_escalates_low_confidence_genai_verdict(monkeypatch, first_verdict, expected_frame_counts):
+    handler = VerificationWebSocket()
+    session_id = "session-456"
+    session_data = {
+        "video_chunks": [{"data": b"fake-webm-data", "timestamp": 0.0}],
+        "gyro_gamma": [float(value) for value in range(60)],
+        "optical_flow_data": [float(value) for value in range(60)],
+        "imu_data": [],
+    }
+    session_db = {
+        "session_id": session_id,
+        "tenant_id": "tenant-123",
+        "tenant_environment_id": None,
+        "environment": None,
+        "metadata": {},
+        "physics_score": 80.0,
+        "correlation_value": 0.7,
+    }
+
+    vision_engine = MagicMock()
+    vision_engine.extract_context = AsyncMock(return_value=(False, {"status": "success"}))
+    genai_engine = MagicMock()
+    genai_engine.evaluate_trust = AsyncMock(side_effect=[
+        first_verdict,
+        (92.0, {"summary": "confident", "confidence": 85.0}),
+    ])
+    requested_frame_counts = []
+
+    def fake_extract(_path, num_frames=5):
+        requested_frame_counts.append(num_frames)
+        return [f"frame-{index}" for index in range(num_frames)]
+
+    update_results = AsyncMock()
+
+    async def no_sleep(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr("app.video_utils.extract_sparse_keyframes", fake_extract)
+    monkeypatch.setattr("app.ai_provider.get_ai_pipeline", lambda: (vision_engine, genai_engine))
+    monkeypatch.setattr("app.websocket_handler.asyncio.sleep", no_sleep)
+    monkeypatch.setattr("app.websocket_handler.session_manager.get_session", AsyncMock(return_value=session_db))
+    monkeypatch.setattr("app.websocket_handler.session_manager.update_session_results", update_results)
+    monkeypatch.setattr("app.database.db_manager.set_request_context", MagicMock())
+    monkeypatch.setattr("app.database.db_manager.fetch_all", AsyncMock(return_value=[]))
+    monkeypatch.setattr("app.quota.quota_manager.decrement_quota", AsyncMock())
+    monkeypatch.setattr(handler, "_wait_for_recording_finalization", AsyncMock())
+    monkeypatch.setattr(handler, "_store_json_session_artifact", AsyncMock())
+
+    await handler.run_ai_verification_background(session_id, session_data)
+
+    assert requested_frame_counts == expected_frame_counts
+    assert genai_engine.evaluate_trust.await_count == len(expected_frame_counts)
+    assert update_results.await_args.kwargs["ai_score"] == (92.0 if len(expected_frame_counts) == 2 else 70.0)
+
+
+@pytest.mark.asyncio
+async def test_run_ai_verification_background_sizes_keyframes_without_synthetic_optical_flow(monkeypatch):
+    handler = VerificationWebSocket()
+    session_id = "session-457"
+    session_data = {
+        "video_chunks": [{"data": b"fake-webm-data", "timestamp": 0.0}],
+        "gyro_gamma": [float(value) for value in range(60)],
+        "imu_data": [],
+    }
+    session_db = {
+        "session_id": session_id,
+        "tenant_id": "tenant-123",
+        "tenant_environment_id": None,
+        "environment": None,
+        "metadata": {},
+        "physics_score": 98.0,
+        "correlation_value": 0.98,
+    }
+
+    vision_engine = MagicMock()
+    vision_engine.extract_context = AsyncMock(return_value=(False, {"status": "success"}))
+    genai_engine = MagicMock()
+    genai_engine.evaluate_trust = AsyncMock(return_value=(90.0, {"summary": "authentic", "confidence": 90.0}))
+    extract_threads = []
+
+    def fake_extract(_path, num_frames=5):
+        extract_threads.append((threading.current_thread() is threading.main_thread(), num_frames))
+        return [f"frame-{index}" for index in range(num_frames)]
+
+    async def no_sleep(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr("app.video_utils.extract_sparse_keyframes", fake_extract)
+    monkeypatch.setattr("app.ai_provider.get_ai_pipeline", lambda: (vision_engine, genai_engine))
+    monkeypatch.setattr("app.websocket_handler.asyncio.sleep", no_sleep)
+    monkeypatch.setattr("app.websocket_handler.session_manager.get_session", AsyncMock(return_value=session_db))
+    monkeypatch.setattr("app.websocket_handler.session_manager.update_session_results", AsyncMock())
+    monkeypatch.setattr("app.database.db_manager.set_request_context", MagicMock())
+    monkeypatch.setattr("app.database.db_manager.fetch_all", AsyncMock(return_value=[]))
+    monkeypatch.setattr("app.quota.quota_manager.decrement_quota", AsyncMock())
+    monkeypatch.setattr(handler, "_wait_for_recording_finalization", AsyncMock())
+    monkeypatch.setattr(handler, "_store_json_session_artifact", AsyncMock())
+
+    await handler.run_ai_verification_background(session_id, session_data)
+
+    # The correlation came from gyro-derived flow, so it earns no reduced budget; decoding ran off the loop.
+    assert extract_threads == [(False, 12)]
+
+
+@pytest.mark.asyncio
+async def test_run_ai_verification_background_skips_ai_tiers_for_strong_physics_pass(monkeypatch):
+    from app.tier_policy import TierExecutionPolicy
+
+    handler = VerificationWebSocket()
+    session_id = "session-789"
+    session_data = {
+        "video_chunks": [{"data": b"fake-webm-data", "timestamp": 0.0}],
+        "gyro_gamma": [float(value) for value in range(60)],
+        "optical_flow_data": [float(value) for value in range(60)],
+        "imu_data": [],
+    }
+    session_db = {
+        "session_id": session_id,
+        "tenant_id": "tenant-123",
+        "tenant_environment_id": None,
+        "environment": None,
+        "metadata": {"verification_profile": "standard"},
+        "physics_score": 92.0,
+        "correlation_value": 0.96,
+    }
+
+    extract_keyframes = MagicMock(return_value=["frame"])
+    get_pipeline = MagicMock()
+    update_results = AsyncMock()
+
+    async def no_sleep(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr("app.tier_policy.tier_execution_policy", TierExecutionPolicy(default_mode="physics_first", audit_sample_rate=0.0))
+    monkeypatch.setattr("app.video_utils.extract_sparse_keyframes", extract_keyframes)
+    monkeypatch.setattr("app.ai_provider.get_ai_pipeline", get_pipeline)
+    monkeypatch.setattr("app.websocket_handler.asyncio.sleep", no_sleep)
+    monkeypatch.setattr("app.websocket_handler.session_manager.get_session", AsyncMock(return_value=session_db))
+    monkeypatch.setattr("app.websocket_handler.session_manager.update_session_results", update_results)
+    monkeypatch.setattr("app.database.db_manager.set_request_context", MagicMock())
+    monkeypatch.setattr("app.database.db_manager.fetch_all", AsyncMock(return_value=[]))
+    monkeypatch.setattr("app.quota.quota_manager.decrement_quota", AsyncMock())
+    monkeypatch.setattr(handler, "_wait_for_recording_finalization", AsyncMock())
+    monkeypatch.setattr(handler, "_store_json_session_artifact", AsyncMock())
+
+    await handler.run_ai_verification_background(session_id, session_data)
+
+    extract_keyframes.assert_not_called()
+    get_pipeline.assert_not_called()
+
+    kwargs = update_results.await_args.kwargs
+    assert kwargs["tier_2_score"] is None
+    assert kwargs["ai_score"] == -1.0
+    assert kwargs["final_trust_score"] == 92
+    assert kwargs["verification_status"] == "success"
+    assert kwargs["ai_explanation"]["tier_execution"]["run_tier_2"] is False
+    assert kwargs["ai_explanation"]["tier_execution"]["strong_physics_pass"] is True
+
+
+@pytest.mark.asyncio
+async def test_run_ai_verification_background_never_gates_on_synthetic_optical_flow(monkeypatch):
+    from app.tier_policy import TierExecutionPolicy
+
+    handler = VerificationWebSocket()
+    session_id = "session-790"
+    session_data = {
+        "video_chunks": [{"data": b"fake-webm-data", "timestamp": 0.0}],
+        "gyro_gamma": [float(value) for value in range(60)],
+        "imu_data": [],
+    }
+    session_db = {
+        "session_id": session_id,
+        "tenant_id": "tenant-123",
+        "tenant_environment_id": None,
+        "environment": None,
+        "metadata": {"verification_profile": "standard"},
+        "physics_score": 99.0,
+        "correlation_value": 0.99,
+    }
+
+    vision_engine = MagicMock()
+    vision_engine.extract_context = AsyncMock(return_value=(True, {"status": "spoof_detected"}))
+    update_results = AsyncMock()
+
+    async def no_sleep(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr("app.tier_policy.tier_execution_policy", TierExecutionPolicy(default_mode="physics_first", audit_sample_rate=0.0))
+    monkeypatch.setattr("app.video_utils.extract_sparse_keyframes", lambda *_args, **_kwargs: ["frame"])
+    monkeypatch.setattr("app.ai_provider.get_ai_pipeline", lambda: (vision_engine, MagicMock()))
+    monkeypatch.setattr("app.websocket_handler.asyncio.sleep", no_sleep)
+    monkeypatch.setattr("app.websocket_handler.session_manager.get_session", AsyncMock(return_value=session_db))
+    monkeypatch.setattr("app.websocket_handler.session_manager.update_session_results", update_results)
+    monkeypatch.setattr("app.database.db_manager.set_request_context", MagicMock())
+    monkeypatch.setattr("app.database.db_manager.fetch_all", AsyncMock(return_value=[]))
+    monkeypatch.setattr("app.quota.quota_manager.decrement_quota", AsyncMock())
+    monkeypatch.setattr(handler, "_wait_for_recording_finalization", AsyncMock())
+    monkeypatch.setattr(handler, "_store_json_session_artifact", AsyncMock())
+
+    await handler.run_ai_verification_background(session_id, session_data)
+
+    # The gyro-derived flow correlates almost perfectly, yet Rekognition still scans the frames.
+    vision_engine.extract_context.assert_awaited_once()
+    kwargs = update_results.await_args.kwargs
+    assert kwargs["ai_explanation"]["tier_execution"]["run_tier_2"] is True
+    assert kwargs["verification_status"] == "failed"
+
+
+@pytest.mark.asyncio
+async def test_imu_telemetry_is_stored_columnar_with_a_dashboard_summary(monkeypatch):
+    from app.storage import StoredObject
+
+    handler = VerificationWebSocket()
+    samples = [
+        {"timestamp": index * 10.0, "acceleration": {"x": 0.0, "y": 0.0, "z": 9.8}, "rotationRate": {"alpha": 0, "beta": 0, "gamma": index}}
+        for index in range(50)
+    ]
+    stored = StoredObject(key="tenant-1/sessions/session-1/imu_data.npz", size=1200, sha256="npz-sha", content_type="application/x-npz")
+    store_columns = AsyncMock(return_value=stored)
+    register = AsyncMock()
+    store_json = AsyncMock()
+    monkeypatch.setattr("app.config.settings.telemetry_artifact_format", "npz")
+    monkeypatch.setattr("app.storage.storage_manager.store_session_telemetry_artifact", store_columns)
+    monkeypatch.setattr(handler, "_register_session_artifact", register)
+    monkeypatch.setattr(handler, "_store_json_session_artifact", store_json)
+
+    key = await handler._store_telemetry_session_artifact(
+        tenant_id="tenant-1",
+        session_id="session-1",
+        artifact_type="imu_telemetry",
+        stem="imu_data",
+        kind="imu",
+        records=samples,
+        metadata={"sample_count": len(samples)},
+    )
+
+    assert key == stored.key
+    _tenant, _session, file_name, kind, columns = store_columns.await_args.args
+    assert (file_name, kind) == ("imu_data.npz", "imu")
+    assert columns["rotation_rate.gamma"].tolist() == [float(index) for index in range(50)]
+    assert register.await_args.kwargs["metadata"] == {"sample_count": 50, "format": "npz", "schema_version": 1}
+    summary_call = store_json.await_args.kwargs
+    assert summary_call["artifact_type"] == "imu_summary"
+    assert summary_call["payload"]["sample_count"] == 50
+    assert summary_call["payload"]["duration_ms"] == 490.0
@@ -359,7 +359,7 @@ export class SessionDetailsComponent implements OnInit, OnDestroy {
     this.previewTitle = this.previewHeading(card.key);
     this.previewContent = null;
 
-    const request = this.resolveArtifactRequest(card);
+    const request = this.resolvePreviewRequest(card);
     if (!request) {
       this.previewLoading = false;
       this.notification.warning('This artifact is not available yet.');
@@ -573,6 +573,15 @@ export class SessionDetailsComponent implements OnInit, OnDestroy {
     }
   }
 
+  private resolvePreviewRequest(card: ArtifactCard) {
+    // Columnar (NPZ) IMU telemetry is binary; preview its JSON summary instead.
+    const summaryArtifact = card.key === 'imu_telemetry' ? this.getArtifactByType('imu_summary') : null;
+    if (summaryArtifact?.artifact_id && this.session?.session_id) {
+      return this.sessionsService.getSessionArtifact(this.session.session_id, summaryArtifact.artifact_id);
+    }
+    return this.resolveArtifactRequest(card);
+  }
+
   private downloadGeneratedArtifact(kind: 'report' | 'bundle'): void {
     if (!this.session?.session_id) {
       return;
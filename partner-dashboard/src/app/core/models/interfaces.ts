@@ -173,7 +173,7 @@ export interface VerificationResult {
 
 export interface SessionQueryParams {
   limit?: number;
-  offset?: number;
+  cursor?: string;
   status?: string;
   date_from?: string;
   date_to?: string;
@@ -183,11 +183,12 @@ export interface SessionQueryParams {
 export interface SessionListResponse {
   sessions: Session[];
   total: number;
+  total_is_estimate?: boolean;
   limit: number;
-  offset: number;
+  next_cursor?: string | null;
 }
 
-export type MediaAnalysisStatus = 'pending' | 'analyzing' | 'completed' | 'failed';
+export type MediaAnalysisStatus = 'pending_upload' | 'pending' | 'analyzing' | 'completed' | 'failed';
 
 export interface MediaAnalysisJob {
   job_id: string;
@@ -212,6 +213,17 @@ export interface MediaAnalysisJob {
   environment?: TenantEnvironmentSlug | string | null;
 }
 
+export interface MediaAnalysisUploadTicket {
+  job: MediaAnalysisJob;
+  upload: {
+    method: 'POST';
+    url: string;
+    fields: Record<string, string>;
+    expires_in: number;
+    max_bytes: number;
+  };
+}
+
 export interface MediaAnalysisListResponse {
   jobs: MediaAnalysisJob[];
   total: number;
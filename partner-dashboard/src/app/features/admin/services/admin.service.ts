@@ -10,6 +10,8 @@ export interface TenantQueryParams {
   search?: string;
   subscription_tier?: string;
   status?: string;
+  sort?: 'created_at' | 'email' | 'total_sessions' | 'last_active_at';
+  order?: 'asc' | 'desc';
 }
 
 export interface TenantSummary {
@@ -76,6 +78,8 @@ export class AdminService {
     if (params.search) httpParams = httpParams.set('search', params.search);
     if (params.subscription_tier) httpParams = httpParams.set('subscription_tier', params.subscription_tier);
     if (params.status) httpParams = httpParams.set('status', params.status);
+    if (params.sort) httpParams = httpParams.set('sort', params.sort);
+    if (params.order) httpParams = httpParams.set('order', params.order);
 
     return this.api.get<TenantListResponse>(`${this.baseUrl}/tenants`, httpParams);
   }
@@ -35,7 +35,7 @@ export class DashboardService {
     return forkJoin({
       analytics: this.analyticsService.getStats(),
       subscription: this.billingService.getSubscription(),
-      sessions: this.sessionsService.getSessions({ limit: 10, offset: 0 })
+      sessions: this.sessionsService.getSessions({ limit: 10 })
     }).pipe(
       map(({ analytics, subscription, sessions }) => ({
         stats: {
@@ -62,7 +62,7 @@ export class MediaAnalysisWorkbenchComponent implements OnInit, OnDestroy {
   }
 
   get hasActiveJobs(): boolean {
-    return this.jobs.some(job => job.status === 'pending' || job.status === 'analyzing');
+    return this.jobs.some(job => job.status === 'pending_upload' || job.status === 'pending' || job.status === 'analyzing');
   }
 
   onFileSelected(event: Event): void {
@@ -85,7 +85,7 @@ export class MediaAnalysisWorkbenchComponent implements OnInit, OnDestroy {
     }
 
     this.uploading = true;
-    this.mediaAnalysisService.uploadMedia(this.selectedFile, metadata).subscribe({
+    this.mediaAnalysisService.uploadMediaDirect(this.selectedFile, metadata).subscribe({
       next: (job) => {
         this.uploading = false;
         this.selectedJob = job;
@@ -1,14 +1,37 @@
+import { HttpBackend, HttpClient } from '@angular/common/http';
 import { Injectable, inject } from '@angular/core';
 import { Observable } from 'rxjs';
+import { switchMap } from 'rxjs/operators';
 
 import { ApiService } from '../../../core/services/api.service';
-import { MediaAnalysisJob, MediaAnalysisListResponse } from '../../../core/models/interfaces';
+import { MediaAnalysisJob, MediaAnalysisListResponse, MediaAnalysisUploadTicket } from '../../../core/models/interfaces';
 
 @Injectable({
   providedIn: 'root'
 })
 export class MediaAnalysisService {
   private apiService = inject(ApiService);
+  // Presigned storage uploads must go out without the API's cookies and headers.
+  private storageHttp = new HttpClient(inject(HttpBackend));
+
+  /** Upload straight to storage through a presigned form, then tell the API the upload is done. */
+  uploadMediaDirect(file: File, metadata?: Record<string, unknown>): Observable<MediaAnalysisJob> {
+    return this.apiService.post<MediaAnalysisUploadTicket>('/api/v1/media-analysis/uploads', {
+      filename: file.name,
+      content_type: file.type || 'application/octet-stream',
+      file_size_bytes: file.size,
+      metadata: metadata || {}
+    }).pipe(
+      switchMap(ticket => {
+        const formData = new FormData();
+        Object.entries(ticket.upload.fields).forEach(([name, value]) => formData.append(name, value));
+        formData.append('file', file, file.name);  // S3 requires the file to be the last field
+        return this.storageHttp.post(ticket.upload.url, formData, { responseType: 'text' }).pipe(
+          switchMap(() => this.apiService.post<MediaAnalysisJob>(`/api/v1/media-analysis/${ticket.job.job_id}/upload-complete`, {}))
+        );
+      })
+    );
+  }
 
   uploadMedia(file: File, metadata?: Record<string, unknown>): Observable<MediaAnalysisJob> {
     const formData = new FormData();
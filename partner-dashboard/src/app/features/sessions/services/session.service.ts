@@ -18,8 +18,9 @@ export interface Session {
 export interface SessionsResponse {
   sessions: Session[];
   total: number;
+  total_is_estimate?: boolean;
   limit: number;
-  offset: number;
+  next_cursor?: string | null;
 }
 
 export interface CreateSessionRequest {
@@ -41,10 +42,12 @@ export class SessionService {
 
   constructor(private http: HttpClient) {}
 
-  getSessions(limit: number = 10, offset: number = 0): Observable<SessionsResponse> {
-    return this.http.get<SessionsResponse>(`${this.apiUrl}/api/v1/sessions`, {
-      params: { limit: limit.toString(), offset: offset.toString() }
-    });
+  getSessions(limit: number = 10, cursor?: string | null): Observable<SessionsResponse> {
+    const params: Record<string, string> = { limit: limit.toString() };
+    if (cursor) {
+      params['cursor'] = cursor;
+    }
+    return this.http.get<SessionsResponse>(`${this.apiUrl}/api/v1/sessions`, { params });
   }
 
   getSession(sessionId: string): Observable<Session> {
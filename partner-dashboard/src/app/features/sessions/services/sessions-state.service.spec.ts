@@ -71,7 +71,7 @@ describe('SessionsStateService', () => {
       expect(state.loading).toBe(false);
       expect(state.error).toBeNull();
       expect(state.filters).toEqual({});
-      expect(state.pagination).toEqual({ total: 0, limit: 25, offset: 0 });
+      expect(state.pagination).toEqual({ total: 0, limit: 25, cursor: null, nextCursor: null, previousCursors: [] });
     });
   });
 
@@ -120,35 +120,39 @@ describe('SessionsStateService', () => {
   });
 
   describe('updateFilters', () => {
-    it('should update filters and reset offset', () => {
-      service.updatePagination({ offset: 25 });
+    it('should update filters and return to the first page', () => {
+      service.updatePagination({ cursor: 'cursor-2', nextCursor: 'cursor-3', previousCursors: [null] });
       service.updateFilters({ status: 'complete', search: 'test' });
       
       const state = service.snapshot();
       expect(state.filters.status).toBe('complete');
       expect(state.filters.search).toBe('test');
-      expect(state.pagination.offset).toBe(0);
+      expect(state.pagination.cursor).toBeNull();
+      expect(state.pagination.nextCursor).toBeNull();
+      expect(state.pagination.previousCursors).toEqual([]);
     });
   });
 
   describe('clearFilters', () => {
-    it('should clear all filters and reset offset', () => {
+    it('should clear all filters and return to the first page', () => {
       service.updateFilters({ status: 'complete', search: 'test' });
+      service.updatePagination({ cursor: 'cursor-2', previousCursors: [null] });
       service.clearFilters();
       
       const state = service.snapshot();
       expect(state.filters).toEqual({});
-      expect(state.pagination.offset).toBe(0);
+      expect(state.pagination.cursor).toBeNull();
+      expect(state.pagination.previousCursors).toEqual([]);
     });
   });
 
   describe('updatePagination', () => {
     it('should update pagination state', () => {
-      service.updatePagination({ limit: 50, offset: 25 });
+      service.updatePagination({ limit: 50, cursor: 'cursor-2' });
       
       const pagination = service.snapshot().pagination;
       expect(pagination.limit).toBe(50);
-      expect(pagination.offset).toBe(25);
+      expect(pagination.cursor).toBe('cursor-2');
     });
   });
 
@@ -158,7 +162,7 @@ describe('SessionsStateService', () => {
         sessions: [mockSession],
         total: 1,
         limit: 25,
-        offset: 0
+        next_cursor: 'cursor-2'
       };
 
       sessionsServiceSpy.getSessions.and.returnValue(of(response));
@@ -169,6 +173,7 @@ describe('SessionsStateService', () => {
         const state = service.snapshot();
         expect(state.sessions).toEqual([mockSession]);
         expect(state.pagination.total).toBe(1);
+        expect(state.pagination.nextCursor).toBe('cursor-2');
         expect(state.loading).toBe(false);
         expect(state.error).toBeNull();
         expect(sessionsServiceSpy.getSessions).toHaveBeenCalled();
@@ -196,19 +201,19 @@ describe('SessionsStateService', () => {
         sessions: [mockSession],
         total: 1,
         limit: 10,
-        offset: 20
+        next_cursor: null
       };
 
       sessionsServiceSpy.getSessions.and.returnValue(of(response));
 
       service.updateFilters({ status: 'complete', search: 'test' });
-      service.updatePagination({ limit: 10, offset: 20 });
+      service.updatePagination({ limit: 10, cursor: 'cursor-2' });
       service.loadSessions();
 
       setTimeout(() => {
         expect(sessionsServiceSpy.getSessions).toHaveBeenCalledWith({
           limit: 10,
-          offset: 20,
+          cursor: 'cursor-2',
           status: 'complete',
           search: 'test',
           date_from: undefined,
@@ -219,6 +224,36 @@ describe('SessionsStateService', () => {
     });
   });
 
+  describe('nextPage and previousPage', () => {
+    it('should send the stored next cursor and walk back through earlier pages', () => {
+      const page = (nextCursor: string | null): SessionListResponse => ({
+        sessions: [mockSession],
+        total: 3,
+        limit: 25,
+        next_cursor: nextCursor
+      });
+      sessionsServiceSpy.getSessions.and.returnValues(of(page('cursor-2')), of(page('cursor-3')), of(page('cursor-2')));
+
+      service.loadSessions();
+      service.nextPage();
+
+      expect(sessionsServiceSpy.getSessions.calls.mostRecent().args[0]?.cursor).toBe('cursor-2');
+      expect(service.snapshot().pagination.nextCursor).toBe('cursor-3');
+
+      service.previousPage();
+
+      expect(sessionsServiceSpy.getSessions.calls.mostRecent().args[0]?.cursor).toBeUndefined();
+      expect(service.snapshot().pagination.previousCursors).toEqual([]);
+    });
+
+    it('should not load anything past the last page', () => {
+      service.setSessions([mockSession], 1, null);
+      service.nextPage();
+
+      expect(sessionsServiceSpy.getSessions).not.toHaveBeenCalled();
+    });
+  });
+
   describe('loadSession', () => {
     it('should load a specific session', (done) => {
       sessionsServiceSpy.getSession.and.returnValue(of(mockSession));
@@ -306,7 +341,7 @@ describe('SessionsStateService', () => {
       expect(state.sessions).toEqual([]);
       expect(state.selectedSession).toBeNull();
       expect(state.filters).toEqual({});
-      expect(state.pagination).toEqual({ total: 0, limit: 25, offset: 0 });
+      expect(state.pagination).toEqual({ total: 0, limit: 25, cursor: null, nextCursor: null, previousCursors: [] });
     });
   });
 
@@ -14,9 +14,20 @@ interface SessionFilters {
 interface PaginationState {
   total: number;
   limit: number;
-  offset: number;
+  /** Cursor the current page was loaded with; null for the first page */
+  cursor: string | null;
+  /** `next_cursor` from the last response; null on the last page */
+  nextCursor: string | null;
+  /** Cursors of the pages before the current one, for back navigation */
+  previousCursors: (string | null)[];
 }
 
+const FIRST_PAGE: Pick<PaginationState, 'cursor' | 'nextCursor' | 'previousCursors'> = {
+  cursor: null,
+  nextCursor: null,
+  previousCursors: []
+};
+
 interface SessionsState {
   sessions: Session[];
   selectedSession: Session | null;
@@ -38,7 +49,7 @@ export class SessionsStateService {
     loading: false,
     error: null,
     filters: {},
-    pagination: { total: 0, limit: 25, offset: 0 }
+    pagination: { total: 0, limit: 25, ...FIRST_PAGE }
   };
 
   private state$ = new BehaviorSubject<SessionsState>(this.initialState);
@@ -91,10 +102,10 @@ export class SessionsStateService {
   /**
    * Set sessions list with pagination info
    */
-  setSessions(sessions: Session[], total: number): void {
+  setSessions(sessions: Session[], total: number, nextCursor: string | null = null): void {
     this.patchState({ 
       sessions, 
-      pagination: { ...this.snapshot().pagination, total },
+      pagination: { ...this.snapshot().pagination, total, nextCursor },
       loading: false,
       error: null
     });
@@ -127,7 +138,7 @@ export class SessionsStateService {
   updateFilters(filters: Partial<SessionFilters>): void {
     this.patchState({ 
       filters: { ...this.snapshot().filters, ...filters },
-      pagination: { ...this.snapshot().pagination, offset: 0 }
+      pagination: { ...this.snapshot().pagination, ...FIRST_PAGE }
     });
   }
 
@@ -137,7 +148,7 @@ export class SessionsStateService {
   clearFilters(): void {
     this.patchState({ 
       filters: {},
-      pagination: { ...this.snapshot().pagination, offset: 0 }
+      pagination: { ...this.snapshot().pagination, ...FIRST_PAGE }
     });
   }
 
@@ -150,6 +161,38 @@ export class SessionsStateService {
     });
   }
 
+  /**
+   * Load the page after the current one using the cursor from the last response
+   */
+  nextPage(): void {
+    const pagination = this.snapshot().pagination;
+    if (!pagination.nextCursor) {
+      return;
+    }
+    this.updatePagination({
+      cursor: pagination.nextCursor,
+      nextCursor: null,
+      previousCursors: [...pagination.previousCursors, pagination.cursor]
+    });
+    this.loadSessions();
+  }
+
+  /**
+   * Go back to the page before the current one
+   */
+  previousPage(): void {
+    const pagination = this.snapshot().pagination;
+    if (pagination.previousCursors.length === 0) {
+      return;
+    }
+    this.updatePagination({
+      cursor: pagination.previousCursors[pagination.previousCursors.length - 1],
+      nextCursor: null,
+      previousCursors: pagination.previousCursors.slice(0, -1)
+    });
+    this.loadSessions();
+  }
+
   /**
    * Load sessions from the backend with current filters and pagination
    */
@@ -159,7 +202,7 @@ export class SessionsStateService {
     
     const params: SessionQueryParams = {
       limit: state.pagination.limit,
-      offset: state.pagination.offset,
+      cursor: state.pagination.cursor ?? undefined,
       status: state.filters.status,
       date_from: state.filters.dateFrom,
       date_to: state.filters.dateTo,
@@ -167,7 +210,7 @@ export class SessionsStateService {
     };
 
     this.sessionsService.getSessions(params).subscribe({
-      next: (response) => this.setSessions(response.sessions, response.total),
+      next: (response) => this.setSessions(response.sessions, response.total, response.next_cursor ?? null),
       error: (error) => this.setError(error.message || 'Failed to load sessions')
     });
   }
@@ -93,7 +93,7 @@ describe('SessionsService', () => {
         sessions: [mockSession],
         total: 1,
         limit: 25,
-        offset: 0
+        next_cursor: null
       };
 
       apiServiceSpy.get.and.returnValue(of(response));
@@ -110,14 +110,14 @@ describe('SessionsService', () => {
         sessions: [mockSession],
         total: 1,
         limit: 10,
-        offset: 0
+        next_cursor: 'cursor-2'
       };
 
       apiServiceSpy.get.and.returnValue(of(response));
 
       service.getSessions({
         limit: 10,
-        offset: 0,
+        cursor: 'cursor-1',
         status: 'complete',
         date_from: '2024-01-01',
         date_to: '2024-01-31',
@@ -129,7 +129,8 @@ describe('SessionsService', () => {
         
         const params = callArgs[1] as HttpParams;
         expect(params.get('limit')).toBe('10');
-        expect(params.get('offset')).toBe('0');
+        expect(params.get('cursor')).toBe('cursor-1');
+        expect(params.has('offset')).toBe(false);
         expect(params.get('status')).toBe('complete');
         expect(params.get('date_from')).toBe('2024-01-01');
         expect(params.get('date_to')).toBe('2024-01-31');
@@ -46,7 +46,7 @@ export class SessionsService {
     let httpParams = new HttpParams();
     
     if (params.limit !== undefined) httpParams = httpParams.set('limit', params.limit.toString());
-    if (params.offset !== undefined) httpParams = httpParams.set('offset', params.offset.toString());
+    if (params.cursor) httpParams = httpParams.set('cursor', params.cursor);
     if (params.status) httpParams = httpParams.set('status', params.status);
     if (params.date_from) httpParams = httpParams.set('date_from', params.date_from);
     if (params.date_to) httpParams = httpParams.set('date_to', params.date_to);
@@ -16,6 +16,8 @@ import { StatusRendererComponent } from '../../../shared/components/data-table/r
 import { ActionRendererComponent } from '../../../shared/components/data-table/renderers/action-renderer.component';
 import { getTrustScoreTone } from '../../../shared/utils/ui-presenters';
 
+const SESSIONS_PAGE_SIZE = 1000;
+
 interface Session {
   session_id: string;
   created_at: string;
@@ -45,6 +47,8 @@ export class SessionsListComponent implements OnInit, OnDestroy {
   sessions: Session[] = [];
   loading = false;
   totalSessions = 0;
+  nextCursor: string | null = null;
+  loadingMore = false;
   errorMessage: string | null = null;
   activeEnvironment: TenantEnvironmentSummary | null = null;
   private destroy$ = new Subject<void>();
@@ -125,10 +129,11 @@ export class SessionsListComponent implements OnInit, OnDestroy {
     this.loading = true;
     this.errorMessage = null;
 
-    this.sessionService.getSessions(1000, 0).subscribe({
+    this.sessionService.getSessions(SESSIONS_PAGE_SIZE).subscribe({
       next: (response) => {
         this.sessions = response.sessions;
         this.totalSessions = response.total;
+        this.nextCursor = response.next_cursor ?? null;
         this.loading = false;
       },
       error: () => {
@@ -139,6 +144,26 @@ export class SessionsListComponent implements OnInit, OnDestroy {
     });
   }
 
+  loadMoreSessions(): void {
+    if (!this.nextCursor || this.loadingMore) {
+      return;
+    }
+    this.loadingMore = true;
+
+    this.sessionService.getSessions(SESSIONS_PAGE_SIZE, this.nextCursor).subscribe({
+      next: (response) => {
+        this.sessions = [...this.sessions, ...response.sessions];
+        this.totalSessions = response.total;
+        this.nextCursor = response.next_cursor ?? null;
+        this.loadingMore = false;
+      },
+      error: () => {
+        this.loadingMore = false;
+        this.notification.error('Failed to load more sessions');
+      }
+    });
+  }
+
   createSession(): void {
     this.router.navigate(['/sessions/create']);
   }